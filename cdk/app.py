@@ -2,9 +2,9 @@
 """Entry point for the Tiny URL CDK application."""
 
 import os
-from aws_cdk import App, Environment
+from aws_cdk import App
 
-from lib.tiny_url_stack import TinyUrlStack
+from lib.tiny_url_stack import create_stacks
 
 # Get environment variables
 account = os.environ.get("CDK_DEFAULT_ACCOUNT")
@@ -12,15 +12,7 @@ region = os.environ.get("CDK_DEFAULT_REGION", "us-east-1")
 
 app = App()
 
-# Create stack in the specified environment
-# If no account is specified, the stack will be environment-agnostic
-env = Environment(account=account, region=region) if account else None
-
-TinyUrlStack(
-    app,
-    "TinyUrlStack",
-    env=env,
-    description="URL shortening service infrastructure",
-)
+# One stack, or one per region with -c regions=us-east-1,eu-west-1
+create_stacks(app, account=account, region=region)
 
 app.synth()
@@ -0,0 +1,163 @@
+"""Per-function performance profiles for the Lambda stack.
+
+A profile describes how a function is provisioned: architecture, memory
+(which also scales CPU on Lambda), reserved and provisioned concurrency with
+optional autoscaling, and SnapStart. Profiles are chosen through CDK context:
+
+    cdk deploy -c performanceProfile=latency
+    cdk deploy -c functionProfiles='{"redirect": {"memory_size": 2048}}'
+
+``performanceProfile`` selects a named preset and ``functionProfiles``
+overrides individual fields per function on top of it.
+"""
+
+import json
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional
+
+from constructs import Node
+
+ARCHITECTURES = ("x86_64", "arm64")
+FUNCTIONS = ("shorten", "redirect")
+
+
+@dataclass(frozen=True)
+class FunctionProfile:
+    """Provisioning settings for one Lambda function."""
+
+    architecture: str = "x86_64"
+    memory_size: int = 128
+    # Concurrency carved out of the account pool (and capped) for the function
+    reserved_concurrency: Optional[int] = None
+    # Pre-initialized environments kept warm behind the "live" alias
+    provisioned_concurrency: int = 0
+    # Upper bound for target-tracking autoscaling of provisioned concurrency;
+    # no autoscaling when unset
+    max_provisioned_concurrency: Optional[int] = None
+    autoscaling_utilization: float = 0.7
+    # Restore published versions from an initialized snapshot (Python 3.12+)
+    snap_start: bool = False
+
+    @property
+    def uses_alias(self) -> bool:
+        """Whether traffic must go through a published version alias."""
+        return self.provisioned_concurrency > 0 or self.snap_start
+
+    def validate(self, name: str) -> None:
+        """Check the profile for settings Lambda would reject.
+
+        Args:
+            name: Function name used in error messages
+
+        Raises:
+            ValueError: If the profile is invalid
+        """
+        if self.architecture not in ARCHITECTURES:
+            raise ValueError(
+                f"{name}: architecture must be one of {ARCHITECTURES}"
+            )
+        if not 128 <= self.memory_size <= 10240:
+            raise ValueError(f"{name}: memory_size must be 128-10240 MB")
+        if self.provisioned_concurrency < 0:
+            raise ValueError(f"{name}: provisioned_concurrency must be >= 0")
+        if self.snap_start and self.provisioned_concurrency:
+            raise ValueError(
+                f"{name}: SnapStart cannot be combined with provisioned "
+                "concurrency"
+            )
+        if self.max_provisioned_concurrency is not None and (
+            self.max_provisioned_concurrency < self.provisioned_concurrency
+            or not self.provisioned_concurrency
+        ):
+            raise ValueError(
+                f"{name}: max_provisioned_concurrency needs a lower, "
+                "non-zero provisioned_concurrency"
+            )
+        if self.reserved_concurrency is not None and (
+            self.reserved_concurrency
+            < (self.max_provisioned_concurrency
+               or self.provisioned_concurrency)
+        ):
+            raise ValueError(
+                f"{name}: reserved_concurrency must cover provisioned "
+                "concurrency"
+            )
+        if not 0.1 <= self.autoscaling_utilization <= 0.9:
+            raise ValueError(
+                f"{name}: autoscaling_utilization must be 0.1-0.9"
+            )
+
+
+PRESETS: Dict[str, Dict[str, FunctionProfile]] = {
+    # What the stack has always deployed
+    "default": {
+        "shorten": FunctionProfile(),
+        "redirect": FunctionProfile(),
+    },
+    # Cheapest per invocation: Graviton, enough memory to keep the
+    # CPU-bound init and JSON work short, no idle capacity
+    "cost": {
+        "shorten": FunctionProfile(architecture="arm64", memory_size=256),
+        "redirect": FunctionProfile(architecture="arm64", memory_size=256),
+    },
+    # Lowest tail latency: warm, autoscaled capacity for redirects and
+    # snapshot-restored cold starts for the lower-volume shorten path
+    "latency": {
+        "shorten": FunctionProfile(
+            architecture="arm64", memory_size=512, snap_start=True
+        ),
+        "redirect": FunctionProfile(
+            architecture="arm64",
+            memory_size=1024,
+            reserved_concurrency=100,
+            provisioned_concurrency=2,
+            max_provisioned_concurrency=20,
+        ),
+    },
+}
+
+
+def _context_value(node: Node, key: str) -> Any:
+    """Read a context value, decoding JSON passed as a CLI string."""
+    value = node.try_get_context(key)
+    if isinstance(value, str) and value.lstrip().startswith("{"):
+        return json.loads(value)
+    return value
+
+
+def load_profiles(node: Node) -> Dict[str, FunctionProfile]:
+    """Resolve the function profiles from CDK context.
+
+    Args:
+        node: Construct node to read context from
+
+    Returns:
+        Profile per function name ("shorten", "redirect")
+
+    Raises:
+        ValueError: On unknown presets, functions or fields, or invalid
+            profiles
+    """
+    preset = _context_value(node, "performanceProfile") or "default"
+    if preset not in PRESETS:
+        raise ValueError(
+            f"Unknown performance profile '{preset}', "
+            f"expected one of {sorted(PRESETS)}"
+        )
+    profiles = dict(PRESETS[preset])
+
+    overrides = _context_value(node, "functionProfiles") or {}
+    known_fields = {field.name for field in fields(FunctionProfile)}
+    for name, values in overrides.items():
+        if name not in FUNCTIONS:
+            raise ValueError(f"Unknown function in functionProfiles: {name}")
+        unknown = set(values) - known_fields
+        if unknown:
+            raise ValueError(
+                f"{name}: unknown profile fields {sorted(unknown)}"
+            )
+        profiles[name] = replace(profiles[name], **values)
+
+    for name, profile in profiles.items():
+        profile.validate(name)
+    return profiles
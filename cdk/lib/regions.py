@@ -0,0 +1,94 @@
+"""Multi-region (global table) deployment settings.
+
+Setting the ``regions`` context deploys one stack per region on a shared
+DynamoDB global table; the first region is the primary, which owns the
+table definition and reserves custom short codes:
+
+    cdk deploy --all -c regions=us-east-1,eu-west-1
+
+Each region also owns a one-character prefix for the codes it generates.
+Prefixes default to "a", "b", ... in region order (so only append regions)
+and can be pinned by adding ``regionPrefixes``:
+
+    -c regionPrefixes=us-east-1=a,eu-west-1=e
+"""
+
+import string
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from constructs import Node
+
+# Characters a short code may start with, and the order prefixes are handed
+# out in when not pinned
+PREFIX_CHARS = string.ascii_lowercase + string.digits + string.ascii_uppercase
+
+
+@dataclass(frozen=True)
+class RegionDeployment:
+    """Regions of a global table deployment and their code prefixes."""
+
+    regions: Tuple[str, ...]
+    prefixes: Dict[str, str]
+
+    @property
+    def primary_region(self) -> str:
+        """Region holding the table definition and custom code claims."""
+        return self.regions[0]
+
+    @property
+    def replica_regions(self) -> Tuple[str, ...]:
+        """Regions other than the primary."""
+        return self.regions[1:]
+
+    def environment(self) -> Dict[str, str]:
+        """Lambda environment variables describing the deployment."""
+        return {
+            "PRIMARY_REGION": self.primary_region,
+            "REGION_CODE_PREFIXES": ",".join(
+                f"{region}={self.prefixes[region]}" for region in self.regions
+            ),
+        }
+
+
+def _as_list(value: Any) -> List[str]:
+    """Accept a list or a comma-separated CLI string."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip() for item in value or [] if item.strip()]
+
+
+def load_regions(node: Node) -> Optional[RegionDeployment]:
+    """Resolve the multi-region settings from CDK context.
+
+    Args:
+        node: Construct node to read context from
+
+    Returns:
+        The deployment, or None for a single-region deployment
+
+    Raises:
+        ValueError: On duplicate regions or invalid prefixes
+    """
+    regions = _as_list(node.try_get_context("regions"))
+    if len(regions) < 2:
+        return None
+    if len(set(regions)) != len(regions):
+        raise ValueError(f"Duplicate regions in {regions}")
+
+    prefixes = dict(zip(regions, PREFIX_CHARS))
+    for entry in _as_list(node.try_get_context("regionPrefixes")):
+        region, _, prefix = entry.partition("=")
+        if region not in prefixes:
+            raise ValueError(f"regionPrefixes names unknown region {region}")
+        prefixes[region] = prefix
+
+    for region, prefix in prefixes.items():
+        if len(prefix) != 1 or prefix not in PREFIX_CHARS:
+            raise ValueError(
+                f"Prefix for {region} must be one letter or digit"
+            )
+    if len(set(prefixes.values())) != len(prefixes):
+        raise ValueError(f"Region prefixes must be unique: {prefixes}")
+
+    return RegionDeployment(tuple(regions), prefixes)
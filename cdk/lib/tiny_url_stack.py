@@ -1,9 +1,12 @@
 """CDK Stack for URL shortening service."""
 
-from typing import Any
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
 from aws_cdk import (
+    App,
     Duration,
+    Environment,
     Stack,
     RemovalPolicy,
     CfnOutput,
@@ -11,39 +14,99 @@ from aws_cdk import (
 from aws_cdk import aws_dynamodb as dynamodb
 from aws_cdk import aws_lambda as lambda_
 from aws_cdk import aws_apigateway as apigateway
+from aws_cdk import aws_apigatewayv2 as apigwv2
+from aws_cdk import aws_apigatewayv2_authorizers as authorizers
+from aws_cdk import aws_apigatewayv2_integrations as integrations
+from aws_cdk import aws_cloudfront as cloudfront
+from aws_cdk import aws_cloudfront_origins as origins
+from aws_cdk import aws_iam as iam
 from constructs import Construct
 
+from lib.performance import FunctionProfile, load_profiles
+from lib.regions import RegionDeployment, load_regions
+
+# Lambda assets are built from the repository root, wherever synth runs from
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..")
+)
+
+TABLE_NAME = "url_mappings"
+IDEMPOTENCY_TABLE_NAME = "idempotency_keys"
+CLICKS_TABLE_NAME = "click_rollups"
+# GSI of url_mappings listing the links to a domain
+DOMAIN_INDEX_NAME = "domain-index"
+# GSI of url_mappings listing each hour's new links, for incremental exports
+CREATED_INDEX_NAME = "created-index"
+API_TYPES = ("rest", "http")
+# How long the edge keeps a 404 for an unknown short code
+NOT_FOUND_CACHE_SECONDS = 30
+# Longest the edge keeps a redirect (the origin sends up to one day)
+REDIRECT_MAX_CACHE_SECONDS = 86400
+
 
 class TinyUrlStack(Stack):
     """Stack for URL shortening service infrastructure."""
 
     def __init__(
-        self, scope: Construct, construct_id: str, **kwargs: Any
+        self,
+        scope: Construct,
+        construct_id: str,
+        regions: Optional[RegionDeployment] = None,
+        **kwargs: Any,
     ) -> None:
         """Initialize the stack.
 
         Args:
             scope: CDK app or parent stack
             construct_id: ID of the construct
+            regions: Global table deployment this stack is one region of
             kwargs: Additional keyword arguments
         """
         super().__init__(scope, construct_id, **kwargs)
+        self.regions = regions
 
         # 1. Create DynamoDB table
         url_table = self._create_dynamo_table()
+        idempotency_table = self._create_idempotency_table()
+        clicks_table = self._create_clicks_table()
 
-        # 2. Create Lambda functions
-        shorten_lambda = self._create_shorten_lambda(url_table)
-        redirect_lambda = self._create_redirect_lambda(url_table)
-
-        # 3. Create API Gateway
-        api = self._create_api_gateway(shorten_lambda, redirect_lambda)
+        # 2. Create Lambda functions with their performance profiles
+        profiles = load_profiles(self.node)
+        shorten_lambda = self._create_shorten_lambda(
+            url_table, idempotency_table, profiles["shorten"]
+        )
+        redirect_lambda = self._create_redirect_lambda(
+            url_table, clicks_table, profiles["redirect"]
+        )
+        stats_lambda = self._create_stats_lambda(clicks_table)
+        admin_lambda = self._create_admin_links_lambda(url_table)
+
+        # 3. Create API Gateway (REST, or HTTP API with an edge cache)
+        api_type, edge_cache = self._api_options()
+        if api_type == "http":
+            http_api = self._create_http_api(
+                shorten_lambda, redirect_lambda, stats_lambda, admin_lambda
+            )
+            api_url = f"{http_api.api_endpoint}/shorten"
+            if edge_cache:
+                distribution = self._create_edge_cache(http_api)
+                CfnOutput(
+                    self,
+                    "RedirectUrl",
+                    value=f"https://{distribution.distribution_domain_name}",
+                    description="CloudFront base URL for cached redirects",
+                )
+        else:
+            api = self._create_api_gateway(
+                shorten_lambda, redirect_lambda, stats_lambda, admin_lambda
+            )
+            api_url = f"{api.url}shorten"
 
         # 4. Output the API Gateway URL
         CfnOutput(
             self,
             "ApiUrl",
-            value=f"{api.url}shorten",
+            value=api_url,
             description="URL for the /shorten endpoint",
         )
 
@@ -55,50 +118,225 @@ class TinyUrlStack(Stack):
             description="Name of the DynamoDB table for URL mappings",
         )
 
-    def _create_dynamo_table(self) -> dynamodb.Table:
+    def _api_options(self) -> Tuple[str, bool]:
+        """Read the API type and edge cache switch from CDK context.
+
+        ``apiType`` is "rest" (default) or "http"; ``edgeCache`` (default
+        on for HTTP APIs) puts CloudFront in front of redirects.
+
+        Returns:
+            Tuple of (api_type, edge_cache)
+
+        Raises:
+            ValueError: On an unknown API type or an unsupported combination
+        """
+        api_type = self.node.try_get_context("apiType") or "rest"
+        if api_type not in API_TYPES:
+            raise ValueError(
+                f"Unknown apiType '{api_type}', expected one of {API_TYPES}"
+            )
+
+        edge_cache = self.node.try_get_context("edgeCache")
+        if isinstance(edge_cache, str):
+            edge_cache = edge_cache.lower() == "true"
+        if edge_cache is None:
+            edge_cache = api_type == "http"
+        if edge_cache and api_type != "http":
+            raise ValueError("edgeCache requires apiType=http")
+
+        return api_type, edge_cache
+
+    def _create_dynamo_table(self) -> dynamodb.ITable:
         """Create DynamoDB table for URL mappings.
 
+        In a multi-region deployment the primary region's stack creates a
+        global table with a replica in every other region, and the other
+        stacks reference their local replica by name.
+
+        The domain and created indexes are sparse: items carry ``domain``
+        and ``created_hour`` only once written by a version that sets them
+        (or backfilled). CloudFormation adds one index per deployment, so
+        a stack predating both needs two deployments.
+
+        Returns:
+            The DynamoDB table
+        """
+        table = self._create_shared_table(
+            "UrlMappings", TABLE_NAME, "creation_date"
+        )
+        # Referenced replicas get the index from the global table
+        if isinstance(table, (dynamodb.Table, dynamodb.TableV2)):
+            table.add_global_secondary_index(
+                index_name=DOMAIN_INDEX_NAME,
+                partition_key=dynamodb.Attribute(
+                    name="domain", type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="creation_date", type=dynamodb.AttributeType.STRING
+                ),
+                projection_type=dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=["long_url", "long_url_z", "expires_at"],
+            )
+            table.add_global_secondary_index(
+                index_name=CREATED_INDEX_NAME,
+                partition_key=dynamodb.Attribute(
+                    name="created_hour", type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="creation_date", type=dynamodb.AttributeType.STRING
+                ),
+                projection_type=dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=[
+                    "long_url", "long_url_z", "expires_at", "domain"
+                ],
+            )
+        return table
+
+    def _create_clicks_table(self) -> dynamodb.ITable:
+        """Create the table of hourly and daily click counters.
+
+        Sort keys carry the region that counted the clicks, so a global
+        table never sees concurrent increments of the same item.
+
+        Returns:
+            The DynamoDB table
+        """
+        return self._create_shared_table(
+            "ClickRollups", CLICKS_TABLE_NAME, "bucket"
+        )
+
+    def _create_shared_table(
+        self, construct_id: str, table_name: str, sort_key_name: str
+    ) -> dynamodb.ITable:
+        """Create a table keyed by short code, global when multi-region.
+
+        Args:
+            construct_id: ID of the table construct
+            table_name: Physical table name
+            sort_key_name: Name of the string sort key
+
+        Returns:
+            The DynamoDB table
+        """
+        partition_key = dynamodb.Attribute(
+            name="short_code",
+            type=dynamodb.AttributeType.STRING
+        )
+        sort_key = dynamodb.Attribute(
+            name=sort_key_name,
+            type=dynamodb.AttributeType.STRING
+        )
+
+        if self.regions:
+            if self.region != self.regions.primary_region:
+                return dynamodb.TableV2.from_table_name(
+                    self, construct_id, table_name
+                )
+            return dynamodb.TableV2(
+                self,
+                construct_id,
+                table_name=table_name,
+                partition_key=partition_key,
+                sort_key=sort_key,
+                billing=dynamodb.Billing.on_demand(),
+                time_to_live_attribute="expires_at",
+                replicas=[
+                    dynamodb.ReplicaTableProps(region=region)
+                    for region in self.regions.replica_regions
+                ],
+                # For dev; use RETAIN in prod
+                removal_policy=RemovalPolicy.DESTROY,
+            )
+
+        return dynamodb.Table(
+            self,
+            construct_id,
+            table_name=table_name,
+            partition_key=partition_key,
+            sort_key=sort_key,
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            # For dev; use RETAIN in prod
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+    def _create_idempotency_table(self) -> dynamodb.Table:
+        """Create the table of idempotency keys for POST /shorten.
+
+        Keys only guard client retries, which land in the same region, so
+        every region keeps its own table rather than a global one.
+
         Returns:
             The DynamoDB table
         """
         return dynamodb.Table(
             self,
-            "UrlMappings",
-            table_name="url_mappings",
+            "IdempotencyKeys",
+            table_name=IDEMPOTENCY_TABLE_NAME,
             partition_key=dynamodb.Attribute(
-                name="short_code",
-                type=dynamodb.AttributeType.STRING
-            ),
-            sort_key=dynamodb.Attribute(
-                name="creation_date",
+                name="idempotency_key",
                 type=dynamodb.AttributeType.STRING
             ),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             time_to_live_attribute="expires_at",
-            # For dev; use RETAIN in prod
             removal_policy=RemovalPolicy.DESTROY,
         )
 
+    def _region_environment(self) -> Dict[str, str]:
+        """Environment telling the handlers about the other regions."""
+        return self.regions.environment() if self.regions else {}
+
+    def _grant_remote_table_access(
+        self, lambda_fn: lambda_.Function, actions: List[str]
+    ) -> None:
+        """Allow a function to use the table replicas in other regions.
+
+        Args:
+            lambda_fn: The Lambda function
+            actions: DynamoDB actions to allow
+        """
+        if not self.regions:
+            return
+        lambda_fn.add_to_role_policy(iam.PolicyStatement(
+            actions=actions,
+            resources=[
+                self.format_arn(
+                    service="dynamodb",
+                    region=region,
+                    resource="table",
+                    resource_name=TABLE_NAME,
+                )
+                for region in self.regions.regions
+                if region != self.region
+            ],
+        ))
+
     def _create_shorten_lambda(
-        self, table: dynamodb.Table
-    ) -> lambda_.Function:
+        self,
+        table: dynamodb.ITable,
+        idempotency_table: dynamodb.ITable,
+        profile: FunctionProfile,
+    ) -> lambda_.IFunction:
         """Create Lambda function for URL shortening.
 
         Args:
             table: The DynamoDB table for URL mappings
+            idempotency_table: The DynamoDB table for idempotency keys
+            profile: Performance profile for the function
 
         Returns:
-            The Lambda function
+            The Lambda function, or its alias when the profile needs one
         """
+        runtime = self._runtime(profile)
         lambda_fn = lambda_.Function(
             self,
             "ShortenUrlFunction",
             function_name="tiny_url_shorten",
-            runtime=lambda_.Runtime.PYTHON_3_11,
+            runtime=runtime,
             code=lambda_.Code.from_asset(
-                "..",
+                PROJECT_ROOT,
                 bundling={
-                    "image": lambda_.Runtime.PYTHON_3_11.bundling_image,
+                    "image": runtime.bundling_image,
                     "command": [
                         "bash", "-c",
                         "pip install validators -t /asset-output && "
@@ -108,39 +346,52 @@ class TinyUrlStack(Stack):
             ),
             handler="handlers.shorten_url.handler",
             timeout=Duration.seconds(10),
-            memory_size=128,
+            **self._function_props(profile),
             environment={
                 "TABLE_NAME": table.table_name,
+                "IDEMPOTENCY_TABLE_NAME": idempotency_table.table_name,
                 # Replace with actual domain
                 "BASE_URL": "https://tiny.url",
+                **self._region_environment(),
             },
         )
 
         # Grant Lambda permissions to access DynamoDB
         table.grant_read_write_data(lambda_fn)
+        idempotency_table.grant_read_write_data(lambda_fn)
+        # Custom codes are reserved through the primary region's replica
+        self._grant_remote_table_access(
+            lambda_fn, ["dynamodb:Query", "dynamodb:PutItem"]
+        )
 
-        return lambda_fn
+        return self._apply_profile(lambda_fn, profile)
 
     def _create_redirect_lambda(
-        self, table: dynamodb.Table
-    ) -> lambda_.Function:
+        self,
+        table: dynamodb.ITable,
+        clicks_table: dynamodb.ITable,
+        profile: FunctionProfile,
+    ) -> lambda_.IFunction:
         """Create Lambda function for URL redirection.
 
         Args:
             table: The DynamoDB table for URL mappings
+            clicks_table: The DynamoDB table for click counters
+            profile: Performance profile for the function
 
         Returns:
-            The Lambda function
+            The Lambda function, or its alias when the profile needs one
         """
+        runtime = self._runtime(profile)
         lambda_fn = lambda_.Function(
             self,
             "RedirectUrlFunction",
             function_name="tiny_url_redirect",
-            runtime=lambda_.Runtime.PYTHON_3_11,
+            runtime=runtime,
             code=lambda_.Code.from_asset(
-                "..",
+                PROJECT_ROOT,
                 bundling={
-                    "image": lambda_.Runtime.PYTHON_3_11.bundling_image,
+                    "image": runtime.bundling_image,
                     "command": [
                         "bash", "-c",
                         "cp -au /asset-input/src/* /asset-output/"
@@ -149,26 +400,198 @@ class TinyUrlStack(Stack):
             ),
             handler="handlers.redirect_url.handler",
             timeout=Duration.seconds(3),  # Shorter timeout for redirects
-            memory_size=128,
+            **self._function_props(profile),
             environment={
                 "TABLE_NAME": table.table_name,
+                "NOT_FOUND_CACHE_SECONDS": str(NOT_FOUND_CACHE_SECONDS),
+                "CLICKS_TABLE_NAME": clicks_table.table_name,
+                **self._region_environment(),
             },
         )
 
         # Grant Lambda read-only permissions to DynamoDB
         table.grant_read_data(lambda_fn)
+        # Click counters are flushed from the redirect path
+        clicks_table.grant_write_data(lambda_fn)
+        # Local misses fall back to the replica the code was written to
+        self._grant_remote_table_access(lambda_fn, ["dynamodb:Query"])
+
+        return self._apply_profile(lambda_fn, profile)
+
+    def _create_stats_lambda(
+        self, clicks_table: dynamodb.ITable
+    ) -> lambda_.Function:
+        """Create Lambda function serving click statistics.
+
+        Args:
+            clicks_table: The DynamoDB table for click counters
+
+        Returns:
+            The Lambda function
+        """
+        profile = FunctionProfile()
+        runtime = self._runtime(profile)
+        lambda_fn = lambda_.Function(
+            self,
+            "ClickStatsFunction",
+            function_name="tiny_url_stats",
+            runtime=runtime,
+            code=lambda_.Code.from_asset(
+                PROJECT_ROOT,
+                bundling={
+                    "image": runtime.bundling_image,
+                    "command": [
+                        "bash", "-c",
+                        "cp -au /asset-input/src/* /asset-output/"
+                    ]
+                }
+            ),
+            handler="handlers.click_stats.handler",
+            timeout=Duration.seconds(10),
+            **self._function_props(profile),
+            environment={"CLICKS_TABLE_NAME": clicks_table.table_name},
+        )
+
+        clicks_table.grant_read_data(lambda_fn)
+        return lambda_fn
 
+    def _create_admin_links_lambda(
+        self, table: dynamodb.ITable
+    ) -> lambda_.Function:
+        """Create Lambda function listing the links to a domain.
+
+        Args:
+            table: The DynamoDB table for URL mappings
+
+        Returns:
+            The Lambda function
+        """
+        profile = FunctionProfile()
+        runtime = self._runtime(profile)
+        lambda_fn = lambda_.Function(
+            self,
+            "AdminLinksFunction",
+            function_name="tiny_url_admin_links",
+            runtime=runtime,
+            code=lambda_.Code.from_asset(
+                PROJECT_ROOT,
+                bundling={
+                    "image": runtime.bundling_image,
+                    "command": [
+                        "bash", "-c",
+                        "cp -au /asset-input/src/* /asset-output/"
+                    ]
+                }
+            ),
+            handler="handlers.admin_links.handler",
+            timeout=Duration.seconds(10),
+            **self._function_props(profile),
+            environment={"TABLE_NAME": table.table_name},
+        )
+
+        # Only the domain index is read, never the table itself
+        lambda_fn.add_to_role_policy(iam.PolicyStatement(
+            actions=["dynamodb:Query"],
+            resources=[f"{table.table_arn}/index/{DOMAIN_INDEX_NAME}"],
+        ))
         return lambda_fn
 
+    @staticmethod
+    def _runtime(profile: FunctionProfile) -> lambda_.Runtime:
+        """Pick the Python runtime for a profile.
+
+        SnapStart is only available for Python 3.12 and later.
+        """
+        if profile.snap_start:
+            return lambda_.Runtime.PYTHON_3_12
+        return lambda_.Runtime.PYTHON_3_11
+
+    @staticmethod
+    def _function_props(profile: FunctionProfile) -> Dict[str, Any]:
+        """Build the Function properties controlled by a profile.
+
+        Args:
+            profile: Performance profile for the function
+
+        Returns:
+            Keyword arguments for ``lambda_.Function``
+        """
+        architecture = (
+            lambda_.Architecture.ARM_64
+            if profile.architecture == "arm64"
+            else lambda_.Architecture.X86_64
+        )
+        props: Dict[str, Any] = {
+            "architecture": architecture,
+            "memory_size": profile.memory_size,
+        }
+        if profile.reserved_concurrency is not None:
+            props["reserved_concurrent_executions"] = (
+                profile.reserved_concurrency
+            )
+        return props
+
+    def _apply_profile(
+        self, lambda_fn: lambda_.Function, profile: FunctionProfile
+    ) -> lambda_.IFunction:
+        """Add SnapStart, provisioned concurrency and autoscaling.
+
+        Both features only apply to published versions, so the function is
+        then fronted by a "live" alias that API Gateway invokes instead of
+        $LATEST.
+
+        Args:
+            lambda_fn: The Lambda function
+            profile: Performance profile for the function
+
+        Returns:
+            The alias when one is needed, otherwise the function itself
+        """
+        if not profile.uses_alias:
+            return lambda_fn
+
+        if profile.snap_start:
+            # The pinned CDK release only models SnapStart for Java runtimes
+            cfn_function = lambda_fn.node.default_child
+            cfn_function.add_property_override(
+                "SnapStart", {"ApplyOn": "PublishedVersions"}
+            )
+
+        alias = lambda_.Alias(
+            self,
+            f"{lambda_fn.node.id}LiveAlias",
+            alias_name="live",
+            version=lambda_fn.current_version,
+            provisioned_concurrent_executions=(
+                profile.provisioned_concurrency or None
+            ),
+        )
+
+        if profile.max_provisioned_concurrency:
+            scaling = alias.add_auto_scaling(
+                min_capacity=profile.provisioned_concurrency,
+                max_capacity=profile.max_provisioned_concurrency,
+            )
+            scaling.scale_on_utilization(
+                utilization_target=profile.autoscaling_utilization
+            )
+
+        return alias
+
     def _create_api_gateway(
-        self, shorten_lambda: lambda_.Function,
-        redirect_lambda: lambda_.Function
+        self, shorten_lambda: lambda_.IFunction,
+        redirect_lambda: lambda_.IFunction,
+        stats_lambda: lambda_.IFunction,
+        admin_lambda: lambda_.IFunction,
     ) -> apigateway.RestApi:
         """Create API Gateway for the URL shortening service.
 
         Args:
-            shorten_lambda: The Lambda function for shortening URLs
-            redirect_lambda: The Lambda function for redirecting URLs
+            shorten_lambda: The Lambda function (or alias) for shortening URLs
+            redirect_lambda: The Lambda function (or alias) for redirecting
+                URLs
+            stats_lambda: The Lambda function for click statistics
+            admin_lambda: The Lambda function listing links by domain
 
         Returns:
             The REST API
@@ -250,4 +673,209 @@ class TinyUrlStack(Stack):
             ],
         )
 
+        # Add /stats/{shortCode} endpoint for click statistics
+        stats = api.root.add_resource("stats").add_resource("{shortCode}")
+        stats.add_method(
+            "GET",
+            apigateway.LambdaIntegration(stats_lambda, proxy=True),
+        )
+
+        # Add /admin/links for abuse and ops lookups, SigV4-signed only
+        admin_links = api.root.add_resource("admin").add_resource("links")
+        admin_links.add_method(
+            "GET",
+            apigateway.LambdaIntegration(admin_lambda, proxy=True),
+            authorization_type=apigateway.AuthorizationType.IAM,
+        )
+
         return api
+
+    def _create_http_api(
+        self, shorten_lambda: lambda_.IFunction,
+        redirect_lambda: lambda_.IFunction,
+        stats_lambda: lambda_.IFunction,
+        admin_lambda: lambda_.IFunction,
+    ) -> apigwv2.HttpApi:
+        """Create an HTTP API using Lambda payload format 2.0.
+
+        Args:
+            shorten_lambda: The Lambda function (or alias) for shortening URLs
+            redirect_lambda: The Lambda function (or alias) for redirecting
+                URLs
+            stats_lambda: The Lambda function for click statistics
+            admin_lambda: The Lambda function listing links by domain
+
+        Returns:
+            The HTTP API
+        """
+        payload_v2 = apigwv2.PayloadFormatVersion.VERSION_2_0
+        api = apigwv2.HttpApi(
+            self,
+            "TinyUrlHttpApi",
+            api_name="TinyUrl HTTP API",
+            description="HTTP API for URL shortening service",
+            cors_preflight=apigwv2.CorsPreflightOptions(
+                allow_origins=["*"],
+                allow_methods=[apigwv2.CorsHttpMethod.ANY],
+                allow_headers=["*"],
+            ),
+        )
+
+        api.add_routes(
+            path="/shorten",
+            methods=[apigwv2.HttpMethod.POST],
+            integration=integrations.HttpLambdaIntegration(
+                "ShortenIntegration",
+                shorten_lambda,
+                payload_format_version=payload_v2,
+            ),
+        )
+        api.add_routes(
+            path="/{shortCode}",
+            methods=[apigwv2.HttpMethod.GET],
+            integration=integrations.HttpLambdaIntegration(
+                "RedirectIntegration",
+                redirect_lambda,
+                payload_format_version=payload_v2,
+            ),
+        )
+        api.add_routes(
+            path="/stats/{shortCode}",
+            methods=[apigwv2.HttpMethod.GET],
+            integration=integrations.HttpLambdaIntegration(
+                "StatsIntegration",
+                stats_lambda,
+                payload_format_version=payload_v2,
+            ),
+        )
+        api.add_routes(
+            path="/admin/links",
+            methods=[apigwv2.HttpMethod.GET],
+            integration=integrations.HttpLambdaIntegration(
+                "AdminLinksIntegration",
+                admin_lambda,
+                payload_format_version=payload_v2,
+            ),
+            authorizer=authorizers.HttpIamAuthorizer(),
+        )
+
+        return api
+
+    def _create_edge_cache(
+        self, api: apigwv2.HttpApi
+    ) -> cloudfront.Distribution:
+        """Create a CloudFront distribution that caches redirects.
+
+        The cache key is the path alone and TTLs follow the origin's
+        ``Cache-Control`` (nothing is cached without it). 404s are kept
+        briefly; server errors are never cached.
+
+        Args:
+            api: The HTTP API serving ``GET /{shortCode}``
+
+        Returns:
+            The CloudFront distribution
+        """
+        cache_policy = cloudfront.CachePolicy(
+            self,
+            "RedirectCachePolicy",
+            comment="Honor origin Cache-Control for short code redirects",
+            min_ttl=Duration.seconds(0),
+            default_ttl=Duration.seconds(0),
+            max_ttl=Duration.seconds(REDIRECT_MAX_CACHE_SECONDS),
+            query_string_behavior=cloudfront.CacheQueryStringBehavior.none(),
+            header_behavior=cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior=cloudfront.CacheCookieBehavior.none(),
+        )
+
+        error_responses = [
+            cloudfront.ErrorResponse(
+                http_status=404,
+                ttl=Duration.seconds(NOT_FOUND_CACHE_SECONDS),
+            )
+        ] + [
+            cloudfront.ErrorResponse(
+                http_status=status, ttl=Duration.seconds(0)
+            )
+            for status in (500, 502, 503, 504)
+        ]
+
+        origin = origins.HttpOrigin(
+            f"{api.api_id}.execute-api.{self.region}.{self.url_suffix}"
+        )
+        return cloudfront.Distribution(
+            self,
+            "RedirectDistribution",
+            comment="Edge cache for TinyUrl redirects",
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=origin,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+                cached_methods=cloudfront.CachedMethods.CACHE_GET_HEAD,
+                viewer_protocol_policy=(
+                    cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                ),
+                cache_policy=cache_policy,
+            ),
+            additional_behaviors={
+                # Stats are live and take their range from the query string
+                "/stats/*": cloudfront.BehaviorOptions(
+                    origin=origin,
+                    viewer_protocol_policy=(
+                        cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                    ),
+                    cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                    origin_request_policy=(
+                        cloudfront.OriginRequestPolicy
+                        .ALL_VIEWER_EXCEPT_HOST_HEADER
+                    ),
+                ),
+            },
+            error_responses=error_responses,
+            price_class=cloudfront.PriceClass.PRICE_CLASS_100,
+        )
+
+
+def create_stacks(
+    app: App, account: Optional[str] = None, region: str = "us-east-1"
+) -> List[TinyUrlStack]:
+    """Create the stack, or one stack per region for a global table.
+
+    Args:
+        app: The CDK app
+        account: AWS account; stacks are environment-agnostic without one
+        region: Region for single-region deployments
+
+    Returns:
+        The created stacks, primary region first
+    """
+    regions = load_regions(app.node)
+    if not regions:
+        # If no account is specified, the stack will be environment-agnostic
+        env = Environment(account=account, region=region) if account else None
+        return [TinyUrlStack(
+            app,
+            "TinyUrlStack",
+            env=env,
+            description="URL shortening service infrastructure",
+        )]
+
+    primary = TinyUrlStack(
+        app,
+        "TinyUrlStack",
+        regions=regions,
+        env=Environment(account=account, region=regions.primary_region),
+        description="URL shortening service infrastructure (primary region)",
+    )
+    stacks = [primary]
+    for replica_region in regions.replica_regions:
+        stack = TinyUrlStack(
+            app,
+            f"TinyUrlStack-{replica_region}",
+            regions=regions,
+            env=Environment(account=account, region=replica_region),
+            description=f"URL shortening service in {replica_region}",
+        )
+        # The replica table is created by the primary region's stack
+        stack.add_dependency(primary)
+        stacks.append(stack)
+    return stacks
@@ -5,11 +5,26 @@ Web service wrapper for the redirect URL Lambda function.
 Transforms the Lambda handler into a containerized microservice.
 """
 
+from src.handlers.click_stats import handler as stats_handler
+from src.handlers.redirect_url import clicks, dynamo_ops, hot_links, resolver
 from src.handlers.redirect_url import handler as lambda_handler
+from src.utils.access_log import AccessLog
+from src.utils.admission import HIGH, LOW, AdmissionController, Overloaded
+from src.utils.change_feed import ChangeFeedConsumer
+from src.utils.prometheus import render_prometheus
+from src.utils.profiler import RequestProfiler, admin_allowed
+from src.utils.warmup import CacheWarmer, load_hot_codes
+import atexit
 import json
+import math
 import os
+import signal
 import sys
-from flask import Flask, request, jsonify, redirect
+import threading
+import time
+from flask import (
+    Flask, Response, g, request, jsonify, redirect, send_from_directory
+)
 
 # Add the src directory to Python path for imports
 sys.path.insert(0, '/app/src')
@@ -21,13 +36,255 @@ app = Flask(__name__)
 # Set default environment variables for containerized deployment
 os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
 
+# Admission control: cap in-flight requests with a limit that adapts to
+# DynamoDB latency, and shed excess work early instead of queueing it
+admission = AdmissionController(
+    initial_limit=int(os.environ.get('ADMISSION_INITIAL_LIMIT', 32)),
+    max_limit=int(os.environ.get('ADMISSION_MAX_LIMIT', 256)),
+    max_queue_delay=float(
+        os.environ.get('ADMISSION_MAX_QUEUE_DELAY_MS', 100)) / 1000,
+)
+dynamo_ops.add_latency_listener(
+    lambda _, seconds: admission.observe_latency(seconds))
+
+# Endpoints that must keep answering when the service is overloaded
+UNMETERED_PATHS = {'/', '/health', '/metrics', '/metrics/prometheus',
+                   '/hot', '/admin/profile'}
+
+# On-demand profiling of sampled requests, started with POST /admin/profile
+# or SIGUSR2; unavailable unless PROFILE_DIR is set
+profiler = RequestProfiler(
+    output_dir=os.environ.get('PROFILE_DIR'),
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+)
+
+
+# Bearer token required by the profiling endpoints; without one they only
+# answer callers on the loopback interface
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+
+
+def _profiling_allowed():
+    """Whether the caller may use the profiling endpoints."""
+    return admin_allowed(request.remote_addr,
+                         request.headers.get('Authorization'), PROFILE_TOKEN)
+
+
+def _toggle_profiling():
+    """Start or stop a profiling session (SIGUSR2)."""
+    try:
+        profiler.toggle()
+    except ValueError as e:
+        app.logger.warning(f"Profiling not started: {e}")
+
+
+if profiler.available:
+    signal.signal(signal.SIGUSR2, lambda *_: threading.Thread(
+        target=_toggle_profiling, daemon=True).start())
+
+
+# Privacy-scrubbed access log for traffic replay (scripts/replay_traffic.py);
+# off unless ACCESS_LOG_DIR is set
+access_log = None
+if os.environ.get('ACCESS_LOG_DIR'):
+    access_log = AccessLog(
+        os.environ['ACCESS_LOG_DIR'], 'redirect',
+        key=os.environ.get('ACCESS_LOG_KEY'),
+    )
+    access_log.start()
+    atexit.register(access_log.stop)
+
+
+# Keep the lookup cache coherent with the table's stream, so cached
+# mappings can live for long TTLs. Attached before warming starts.
+change_feed = None
+if resolver.cache and os.environ.get('CHANGE_FEED', '') in ('1', 'true'):
+    change_feed = ChangeFeedConsumer(
+        resolver.cache,
+        dynamo_ops.table_name,
+        checkpoint_path=os.environ.get('CHANGE_FEED_CHECKPOINT_PATH'),
+        poll_interval=float(
+            os.environ.get('CHANGE_FEED_POLL_INTERVAL_MS', 500)) / 1000,
+    )
+    change_feed.start()
+    atexit.register(change_feed.stop)
+
+# Pre-warm the lookup cache with hot codes (a file, or the /hot list of the
+# running pods) before reporting ready, for at most WARMUP_BUDGET_SECONDS
+WARMUP_SOURCE = os.environ.get('WARMUP_SOURCE')
+warmer = None
+if resolver.cache and WARMUP_SOURCE:
+    warmer = CacheWarmer(
+        resolver.cache,
+        dynamo_ops.get_url_mappings,
+        budget=float(os.environ.get('WARMUP_BUDGET_SECONDS', 20)),
+        workers=int(os.environ.get('WARMUP_WORKERS', 8)),
+    )
+    warmer.start(lambda: load_hot_codes(
+        WARMUP_SOURCE, limit=resolver.cache.max_entries,
+        timeout=min(5.0, warmer.budget)))
+
+
+@app.before_request
+def note_arrival():
+    """Note when the request arrived, for the access log."""
+    if access_log:
+        g.arrived = (time.time(), time.perf_counter())
+
+
+@app.after_request
+def log_request(response):
+    """Add the request to the access log."""
+    arrived = g.pop('arrived', None)
+    if arrived and request.url_rule and request.path not in UNMETERED_PATHS:
+        code = (request.view_args or {}).get('short_code')
+        access_log.record(
+            arrived[0],
+            f"{request.method} {request.url_rule.rule}",
+            code if isinstance(code, str) else None,
+            response.status_code,
+            time.perf_counter() - arrived[1],
+        )
+    return response
+
+
+@app.before_request
+def profile_request():
+    """Sample the request's stacks while a profiling session runs."""
+    if profiler.active:
+        rule = request.url_rule.rule if request.url_rule else request.path
+        g.profiled = profiler.begin(f"{request.method} {rule}")
+
+
+@app.before_request
+def admit_request():
+    """Shed the request with 503 if the service is over its limit."""
+    if request.path in UNMETERED_PATHS:
+        return None
+
+    # Stats reads give way before redirects do
+    priority = LOW if request.path.startswith('/stats/') else HIGH
+    try:
+        admission.acquire(priority)
+    except Overloaded as e:
+        response = jsonify({"error": "Service overloaded, retry later"})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response, 503
+
+    g.admitted = True
+    return None
+
+
+@app.teardown_request
+def release_request(exc):
+    """Release the admission slot taken by the request."""
+    if g.pop('admitted', False):
+        admission.release()
+    if g.pop('profiled', False):
+        profiler.end()
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint for container orchestration."""
+    """Health check endpoint for container orchestration.
+
+    Reports not ready (503) until cache warmup has finished or run out of
+    time, so new pods only receive traffic once warm.
+    """
+    if warmer and not warmer.ready:
+        return jsonify({
+            "status": "warming",
+            "service": "redirect",
+            "warmup": warmer.stats(),
+        }), 503
     return jsonify({"status": "healthy", "service": "redirect"}), 200
 
 
+def _collect_metrics():
+    """Gather the service counters."""
+    stats = {
+        "service": "redirect",
+        "resolver": resolver.stats(),
+        "admission": admission.stats(),
+    }
+    if clicks:
+        stats["clicks"] = clicks.stats()
+    if warmer:
+        stats["warmup"] = warmer.stats()
+    if change_feed:
+        stats["change_feed"] = change_feed.stats()
+    if profiler.available:
+        stats["profiler"] = profiler.stats()
+    if access_log:
+        stats["access_log"] = access_log.stats()
+    return stats
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Service counters for monitoring and capacity planning."""
+    return jsonify(_collect_metrics()), 200
+
+
+@app.route('/metrics/prometheus', methods=['GET'])
+def prometheus_metrics():
+    """Service counters in the Prometheus text format, for autoscaling."""
+    return Response(render_prometheus(_collect_metrics()),
+                    mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/hot', methods=['GET'])
+def hot():
+    """Most requested short codes of this process, with count bounds."""
+    if not hot_links:
+        return jsonify({"error": "Hot link tracking is disabled"}), 404
+    try:
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    sketch = hot_links.sketch()
+    return jsonify({
+        "service": "redirect",
+        "window_seconds": hot_links.window,
+        **sketch.to_dict(limit),
+    }), 200
+
+
+@app.route('/stats/<short_code>', methods=['GET'])
+def click_stats(short_code):
+    """Click counts per hour or day for a short code."""
+    try:
+        lambda_event = {
+            'httpMethod': 'GET',
+            'path': f'/stats/{short_code}',
+            'headers': dict(request.headers),
+            'body': None,
+            'queryStringParameters': (dict(request.args)
+                                      if request.args else None),
+            'pathParameters': {'shortCode': short_code},
+            'requestContext': {
+                'requestId': 'container-request',
+                'stage': 'prod'
+            }
+        }
+
+        lambda_response = stats_handler(lambda_event, None)
+
+        status_code = lambda_response.get('statusCode', 500)
+        response_body = json.loads(lambda_response.get('body', '{}'))
+        headers = {
+            name: value
+            for name, value in (lambda_response.get('headers') or {}).items()
+            if name.lower() != 'content-type'
+        }
+        return jsonify(response_body), status_code, headers
+
+    except Exception as e:
+        app.logger.error(f"Error reading click stats: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @app.route('/<short_code>', methods=['GET'])
 def redirect_url(short_code):
     """
@@ -57,21 +314,65 @@ def redirect_url(short_code):
         # Handle different response types
         status_code = lambda_response.get('statusCode', 500)
 
+        headers = lambda_response.get('headers', {})
+        cache_headers = {
+            key: value for key, value in headers.items()
+            if key in ('Cache-Control', 'Retry-After')
+        }
+
         # If it's a redirect response (302), handle it specially
         if status_code == 302:
-            location = lambda_response.get('headers', {}).get('Location')
+            location = headers.get('Location')
             if location:
-                return redirect(location, code=302)
+                response = redirect(location, code=302)
+                response.headers.update(cache_headers)
+                return response
 
         # For error responses, return JSON
         response_body = json.loads(lambda_response.get('body', '{}'))
-        return jsonify(response_body), status_code
+        return jsonify(response_body), status_code, cache_headers
 
     except Exception as e:
         app.logger.error(f"Error processing redirect: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route('/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def profile():
+    """Show, start (POST) or stop (DELETE) a profiling session."""
+    if not profiler.available:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if not _profiling_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    if request.method == 'DELETE':
+        files = profiler.stop()
+        return jsonify({"files": [os.path.basename(f) for f in files]}), 200
+    if request.method == 'POST':
+        options = {**request.args, **(request.get_json(silent=True) or {})}
+        try:
+            return jsonify(profiler.start(
+                sample_rate=float(options.get('sample_rate', 0.05)),
+                duration=float(options.get('duration_seconds', 60)),
+                memory=str(options.get('memory', '')).lower() in (
+                    '1', 'true'),
+            )), 200
+        except ValueError as e:
+            status = 409 if profiler.active else 400
+            return jsonify({"error": str(e)}), status
+    return jsonify(profiler.stats()), 200
+
+
+@app.route('/admin/profile/<name>', methods=['GET'])
+def profile_file(name):
+    """Download a profile written by a finished session."""
+    if not profiler.available:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if not _profiling_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return send_from_directory(profiler.output_dir, name,
+                               mimetype='text/plain')
+
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint with service information."""
@@ -80,7 +381,12 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "GET /<short_code>": "Redirect to original URL",
-            "GET /health": "Health check"
+            "GET /stats/<short_code>": "Clicks per hour or day",
+            "GET /health": "Health check",
+            "GET /metrics": "Service counters",
+            "GET /metrics/prometheus": "Service counters for Prometheus",
+            "GET /hot": "Most requested short codes",
+            "GET|POST|DELETE /admin/profile": "On-demand request profiling"
         }
     }), 200
 
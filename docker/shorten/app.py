@@ -5,11 +5,29 @@ Web service wrapper for the shorten URL Lambda function.
 Transforms the Lambda handler into a containerized microservice.
 """
 
+from src.handlers.admin_links import handler as admin_links_handler
+from src.handlers.shorten_url import (
+    code_generator, dynamo_ops, write_coalescer
+)
 from src.handlers.shorten_url import handler as lambda_handler
+from src.utils.access_log import AccessLog
+from src.utils.admission import (
+    HIGH, LOW, AdmissionController, ClientRateLimiter, Overloaded
+)
+from src.utils.prometheus import render_prometheus
+from src.utils.profiler import RequestProfiler, admin_allowed
+import atexit
 import json
+import math
 import os
+import signal
 import sys
-from flask import Flask, request, jsonify
+import threading
+import time
+from flask import (
+    Flask, Response, g, request, jsonify, send_from_directory
+)
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Add the src directory to Python path for imports
 sys.path.insert(0, '/app/src')
@@ -18,10 +36,162 @@ sys.path.insert(0, '/app/src')
 # Initialize Flask application
 app = Flask(__name__)
 
+# Proxies in front of the service (e.g. 1 behind an ingress) whose
+# X-Forwarded-For hop is trusted as the client address. Hops added by the
+# client itself are ignored, so they cannot dodge the per-client limits.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
 # Set default environment variables for containerized deployment
 os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
 os.environ.setdefault('BASE_URL', 'http://localhost:8000')
 
+# Admission control: cap in-flight requests with a limit that adapts to
+# DynamoDB latency, and shed excess work early instead of queueing it.
+# Domain listings run at low priority so they give way to shortening.
+admission = AdmissionController(
+    initial_limit=int(os.environ.get('ADMISSION_INITIAL_LIMIT', 32)),
+    max_limit=int(os.environ.get('ADMISSION_MAX_LIMIT', 256)),
+    max_queue_delay=float(
+        os.environ.get('ADMISSION_MAX_QUEUE_DELAY_MS', 100)) / 1000,
+)
+dynamo_ops.add_latency_listener(
+    lambda _, seconds: admission.observe_latency(seconds))
+
+# Per-client token buckets on the write path (POST /shorten)
+write_limits = ClientRateLimiter(
+    rate=float(os.environ.get('SHORTEN_CLIENT_RATE', 20)),
+    burst=float(os.environ.get('SHORTEN_CLIENT_BURST', 40)),
+)
+
+# Endpoints that must keep answering when the service is overloaded
+UNMETERED_PATHS = {'/', '/health', '/metrics', '/metrics/prometheus',
+                   '/admin/profile'}
+
+# On-demand profiling of sampled requests, started with POST /admin/profile
+# or SIGUSR2; unavailable unless PROFILE_DIR is set
+profiler = RequestProfiler(
+    output_dir=os.environ.get('PROFILE_DIR'),
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+)
+
+
+# Bearer token required by the profiling endpoints; without one they only
+# answer callers on the loopback interface
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+
+
+def _profiling_allowed():
+    """Whether the caller may use the profiling endpoints."""
+    return admin_allowed(request.remote_addr,
+                         request.headers.get('Authorization'), PROFILE_TOKEN)
+
+
+# Bearer token required by GET /admin/links, which lists every link of a
+# domain; without one it only answers callers on the loopback interface
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+
+def _toggle_profiling():
+    """Start or stop a profiling session (SIGUSR2)."""
+    try:
+        profiler.toggle()
+    except ValueError as e:
+        app.logger.warning(f"Profiling not started: {e}")
+
+
+if profiler.available:
+    signal.signal(signal.SIGUSR2, lambda *_: threading.Thread(
+        target=_toggle_profiling, daemon=True).start())
+
+
+# Privacy-scrubbed access log for traffic replay (scripts/replay_traffic.py);
+# off unless ACCESS_LOG_DIR is set
+access_log = None
+if os.environ.get('ACCESS_LOG_DIR'):
+    access_log = AccessLog(
+        os.environ['ACCESS_LOG_DIR'], 'shorten',
+        key=os.environ.get('ACCESS_LOG_KEY'),
+    )
+    access_log.start()
+    atexit.register(access_log.stop)
+
+
+def _client_id():
+    """Identify the caller by address (set by ProxyFix behind proxies)."""
+    return request.remote_addr or '-'
+
+
+def _reject(message, status_code, retry_after):
+    """Build a shed response with a Retry-After hint."""
+    response = jsonify({"error": message})
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response, status_code
+
+
+@app.before_request
+def note_arrival():
+    """Note when the request arrived, for the access log."""
+    if access_log:
+        g.arrived = (time.time(), time.perf_counter())
+
+
+@app.after_request
+def log_request(response):
+    """Add the request to the access log."""
+    arrived = g.pop('arrived', None)
+    if arrived and request.url_rule and request.path not in UNMETERED_PATHS:
+        code = (request.view_args or {}).get('short_code')
+        if request.path == '/shorten':
+            # The custom code (pseudonymized), never the URL
+            code = (request.get_json(silent=True) or {}).get('custom_code')
+        access_log.record(
+            arrived[0],
+            f"{request.method} {request.url_rule.rule}",
+            code if isinstance(code, str) else None,
+            response.status_code,
+            time.perf_counter() - arrived[1],
+        )
+    return response
+
+
+@app.before_request
+def profile_request():
+    """Sample the request's stacks while a profiling session runs."""
+    if profiler.active:
+        rule = request.url_rule.rule if request.url_rule else request.path
+        g.profiled = profiler.begin(f"{request.method} {rule}")
+
+
+@app.before_request
+def admit_request():
+    """Apply per-client limits and shed the request if overloaded."""
+    if request.path in UNMETERED_PATHS:
+        return None
+
+    if request.path == '/shorten':
+        allowed, retry_after = write_limits.check(_client_id())
+        if not allowed:
+            return _reject("Rate limit exceeded", 429, retry_after)
+
+    try:
+        admission.acquire(LOW if request.path == '/admin/links' else HIGH)
+    except Overloaded as e:
+        return _reject("Service overloaded, retry later", 503, e.retry_after)
+
+    g.admitted = True
+    return None
+
+
+@app.teardown_request
+def release_request(exc):
+    """Release the admission slot taken by the request."""
+    if g.pop('admitted', False):
+        admission.release()
+    if g.pop('profiled', False):
+        profiler.end()
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -29,6 +199,36 @@ def health_check():
     return jsonify({"status": "healthy", "service": "shorten"}), 200
 
 
+def _collect_metrics():
+    """Gather the service counters."""
+    stats = {
+        "service": "shorten",
+        "admission": admission.stats(),
+        "client_limits": write_limits.stats(),
+        "short_codes": code_generator.stats(),
+    }
+    if profiler.available:
+        stats["profiler"] = profiler.stats()
+    if write_coalescer:
+        stats["write_coalescer"] = write_coalescer.stats()
+    if access_log:
+        stats["access_log"] = access_log.stats()
+    return stats
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Service counters for monitoring and capacity planning."""
+    return jsonify(_collect_metrics()), 200
+
+
+@app.route('/metrics/prometheus', methods=['GET'])
+def prometheus_metrics():
+    """Service counters in the Prometheus text format, for autoscaling."""
+    return Response(render_prometheus(_collect_metrics()),
+                    mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/shorten', methods=['POST'])
 def shorten_url():
     """
@@ -59,13 +259,93 @@ def shorten_url():
         status_code = lambda_response.get('statusCode', 500)
         response_body = json.loads(lambda_response.get('body', '{}'))
 
-        return jsonify(response_body), status_code
+        # Forward handler headers such as Idempotent-Replayed and
+        # Retry-After; Flask sets Content-Type itself
+        headers = {
+            name: value
+            for name, value in (lambda_response.get('headers') or {}).items()
+            if name.lower() != 'content-type'
+        }
+        return jsonify(response_body), status_code, headers
 
     except Exception as e:
         app.logger.error(f"Error processing request: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route('/admin/links', methods=['GET'])
+def admin_links():
+    """Paginated list of the short codes pointing at a domain."""
+    if not admin_allowed(request.remote_addr,
+                         request.headers.get('Authorization'), ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        lambda_event = {
+            'httpMethod': 'GET',
+            'path': '/admin/links',
+            'headers': dict(request.headers),
+            'body': None,
+            'queryStringParameters': (dict(request.args)
+                                      if request.args else None),
+            'pathParameters': None,
+            'requestContext': {
+                'requestId': 'container-request',
+                'stage': 'prod'
+            }
+        }
+
+        lambda_response = admin_links_handler(lambda_event, None)
+
+        status_code = lambda_response.get('statusCode', 500)
+        response_body = json.loads(lambda_response.get('body', '{}'))
+        headers = {
+            name: value
+            for name, value in (lambda_response.get('headers') or {}).items()
+            if name.lower() != 'content-type'
+        }
+        return jsonify(response_body), status_code, headers
+
+    except Exception as e:
+        app.logger.error(f"Error listing links: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def profile():
+    """Show, start (POST) or stop (DELETE) a profiling session."""
+    if not profiler.available:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if not _profiling_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    if request.method == 'DELETE':
+        files = profiler.stop()
+        return jsonify({"files": [os.path.basename(f) for f in files]}), 200
+    if request.method == 'POST':
+        options = {**request.args, **(request.get_json(silent=True) or {})}
+        try:
+            return jsonify(profiler.start(
+                sample_rate=float(options.get('sample_rate', 0.05)),
+                duration=float(options.get('duration_seconds', 60)),
+                memory=str(options.get('memory', '')).lower() in (
+                    '1', 'true'),
+            )), 200
+        except ValueError as e:
+            status = 409 if profiler.active else 400
+            return jsonify({"error": str(e)}), status
+    return jsonify(profiler.stats()), 200
+
+
+@app.route('/admin/profile/<name>', methods=['GET'])
+def profile_file(name):
+    """Download a profile written by a finished session."""
+    if not profiler.available:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if not _profiling_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return send_from_directory(profiler.output_dir, name,
+                               mimetype='text/plain')
+
+
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint with service information."""
@@ -74,7 +354,11 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /shorten": "Create a short URL",
-            "GET /health": "Health check"
+            "GET /admin/links?domain=": "Short codes pointing at a domain",
+            "GET /health": "Health check",
+            "GET /metrics": "Service counters",
+            "GET /metrics/prometheus": "Service counters for Prometheus",
+            "GET|POST|DELETE /admin/profile": "On-demand request profiling"
         }
     }), 200
 
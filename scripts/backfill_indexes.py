@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Add the index attributes to mappings written before their indexes existed.
+
+Fills in ``domain`` (domain index) and ``created_hour`` (created index, read
+by incremental exports). Only items lacking an attribute are read and
+updated, so the backfill can be interrupted and rerun.
+
+Examples:
+    python scripts/backfill_indexes.py
+    python scripts/backfill_indexes.py --table url_mappings --segments 16
+"""
+
+import argparse
+import os
+import sys
+
+# Make the repository root importable when run as a script
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from src.utils.dynamo_ops import DynamoDBOperations  # noqa: E402
+
+
+def main() -> int:
+    """Parse arguments and backfill the index attributes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--table", default="url_mappings")
+    parser.add_argument("--region",
+                        default=os.environ.get("AWS_DEFAULT_REGION",
+                                               "us-east-1"))
+    parser.add_argument("--segments", type=int, default=8,
+                        help="Parallel scan segments")
+    args = parser.parse_args()
+
+    dynamo_ops = DynamoDBOperations(
+        table_name=args.table, region_name=args.region
+    )
+    count = dynamo_ops.backfill_index_attributes(segments=args.segments)
+    print(f"Added index attributes to {count} mappings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched DynamoDB reads and writes against per-item calls.
+
+reads:  seeds a set of short codes, then drives concurrent lookups of random
+        codes, once with one query per lookup and once per batching window.
+writes: drives bursts of concurrent shorten-style saves of fresh codes, once
+        with save_url_mapping per request and once per coalescing window.
+
+Each scenario runs for a fixed duration and reports throughput, latency
+percentiles and DynamoDB requests. Run against DynamoDB Local
+(DYNAMODB_ENDPOINT_URL=http://localhost:8002) or a scratch table; benchmark
+codes are prefixed with "bench-".
+
+Examples:
+    python scripts/bench_batching.py reads --threads 64 --windows 200 500
+    python scripts/bench_batching.py writes --threads 200 --windows 2000
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+
+# Make the repository root importable when run as a script
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from src.utils.dynamo_ops import (  # noqa: E402
+    BATCH_READ_MAX_KEYS, BATCH_WRITE_MAX_ITEMS, DynamoDBOperations
+)
+from src.utils.lookup_batcher import LookupBatcher  # noqa: E402
+from src.utils.write_coalescer import WriteCoalescer  # noqa: E402
+
+
+def seed(dynamo_ops: DynamoDBOperations, count: int) -> List[str]:
+    """Write ``count`` benchmark mappings and return their codes."""
+    codes = [f"bench-{i:07d}" for i in range(count)]
+    for start in range(0, count, BATCH_WRITE_MAX_ITEMS):
+        pending = [
+            dynamo_ops.build_item(code, f"https://example.com/{code}")
+            for code in codes[start:start + BATCH_WRITE_MAX_ITEMS]
+        ]
+        while pending:
+            pending = dynamo_ops.batch_write_items(pending)
+    return codes
+
+
+def run(
+    call: Callable[[], object], threads: int, duration: float
+) -> List[float]:
+    """Run ``call`` from ``threads`` workers and return the latencies."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker() -> None:
+        local: List[float] = []
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            call()
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies
+
+
+def report(
+    name: str, latencies: List[float], requests: int, duration: float
+) -> None:
+    """Print one result row."""
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1] if ordered else 0.0
+    print(f"{name:<18} {len(ordered) / duration:>10.0f} "
+          f"{statistics.median(ordered) * 1000:>9.2f} "
+          f"{p99 * 1000:>9.2f} {requests:>10} "
+          f"{len(ordered) / max(requests, 1):>10.1f}")
+
+
+def bench_reads(
+    dynamo_ops: DynamoDBOperations,
+    args: argparse.Namespace,
+    requests: Dict[str, int],
+) -> None:
+    """Compare per-key lookups with batched lookups."""
+    codes = seed(dynamo_ops, args.keys)
+
+    requests["count"] = 0
+    latencies = run(
+        lambda: dynamo_ops.get_url_mapping(random.choice(codes)),
+        args.threads, args.duration,
+    )
+    report("per-key", latencies, requests["count"], args.duration)
+
+    for window in args.windows:
+        batcher = LookupBatcher(
+            dynamo_ops.get_url_mappings,
+            window=window / 1_000_000,
+            max_batch=args.max_batch,
+        )
+        requests["count"] = 0
+        latencies = run(
+            lambda b=batcher: b.get(random.choice(codes)),
+            args.threads, args.duration,
+        )
+        report(f"batched {window}us", latencies, requests["count"],
+               args.duration)
+
+
+def bench_writes(
+    dynamo_ops: DynamoDBOperations,
+    args: argparse.Namespace,
+    requests: Dict[str, int],
+) -> None:
+    """Compare per-request saves with coalesced saves."""
+    url = "https://example.com/bench"
+
+    def fresh_code() -> str:
+        return f"bench-{uuid.uuid4().hex[:12]}"
+
+    requests["count"] = 0
+    latencies = run(
+        lambda: dynamo_ops.save_url_mapping(fresh_code(), url),
+        args.threads, args.duration,
+    )
+    report("per-request", latencies, requests["count"], args.duration)
+
+    for window in args.windows:
+        coalescer = WriteCoalescer(
+            dynamo_ops, window=window / 1_000_000, max_batch=args.max_batch
+        )
+        requests["count"] = 0
+        latencies = run(
+            lambda c=coalescer: c.save(fresh_code(), url),
+            args.threads, args.duration,
+        )
+        report(f"coalesced {window}us", latencies, requests["count"],
+               args.duration)
+
+
+def main() -> int:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("mode", choices=["reads", "writes"])
+    parser.add_argument("--table", default="url_mappings")
+    parser.add_argument("--region",
+                        default=os.environ.get("AWS_DEFAULT_REGION",
+                                               "us-east-1"))
+    parser.add_argument("--keys", type=int, default=1000,
+                        help="Distinct codes to seed and look up (reads)")
+    parser.add_argument("--threads", type=int, default=32,
+                        help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds per scenario")
+    parser.add_argument("--windows", type=int, nargs="+",
+                        default=[200, 500, 1000],
+                        help="Batching windows to test, in microseconds")
+    parser.add_argument("--max-batch", type=int, default=BATCH_READ_MAX_KEYS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    dynamo_ops = DynamoDBOperations(
+        table_name=args.table, region_name=args.region
+    )
+    requests: Dict[str, int] = {"count": 0}
+    dynamo_ops.add_latency_listener(
+        lambda *_: requests.update(count=requests["count"] + 1)
+    )
+
+    print(f"{'scenario':<18} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'requests':>10} {'per req':>10}")
+    if args.mode == "reads":
+        bench_reads(dynamo_ops, args, requests)
+    else:
+        bench_writes(dynamo_ops, args, requests)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Measure the image size and start-up time of the service containers.
+
+For each service the image is built (unless --no-build) and its size read,
+then --runs containers are started one after another, each timed until its
+/health endpoint first answers 200. Two times are reported: from the
+container's start (the process itself) and from the ``docker run`` call
+(including container creation). One JSON line per service is appended to
+--output with the git commit, so builds can be compared over time.
+
+Examples:
+    python scripts/bench_images.py
+    python scripts/bench_images.py --services redirect --runs 10 --no-build
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = {"shorten": 8000, "redirect": 8001}
+
+
+def docker(*args: str) -> str:
+    """Run a docker command and return its output."""
+    return subprocess.run(
+        ["docker", *args], cwd=ROOT, check=True, capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def parse_docker_time(value: str) -> float:
+    """Return a Unix timestamp for Docker's nanosecond RFC 3339 times."""
+    seconds, _, fraction = value.rstrip("Z").partition(".")
+    started = datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S")
+    return (
+        started.replace(tzinfo=timezone.utc).timestamp()
+        + float(f"0.{fraction or 0}")
+    )
+
+
+def wait_healthy(url: str, timeout: float) -> Optional[float]:
+    """Poll ``url`` until it answers 200 and return the time it did."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.time()
+        except OSError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def start_once(image: str, port: int, timeout: float) -> Dict[str, float]:
+    """Start one container and time it until healthy."""
+    requested = time.time()
+    container = docker(
+        "run", "-d", "--rm", "-p", f"127.0.0.1::{port}",
+        "-e", "AWS_DEFAULT_REGION=us-east-1", image,
+    )
+    try:
+        address = docker("port", container, str(port)).splitlines()[0]
+        ready = wait_healthy(f"http://{address}/health", timeout)
+        if ready is None:
+            raise RuntimeError(f"{image} was not healthy within {timeout}s")
+        started = parse_docker_time(
+            docker("inspect", "-f", "{{.State.StartedAt}}", container)
+        )
+        return {
+            "start_to_ready": ready - started,
+            "run_to_ready": ready - requested,
+        }
+    finally:
+        subprocess.run(["docker", "rm", "-f", container],
+                       capture_output=True)
+
+
+def bench(service: str, runs: int, build: bool,
+          timeout: float) -> Dict[str, object]:
+    """Build (optionally) and measure one service image."""
+    image = f"tiny-url-{service}:local"
+    build_seconds = None
+    if build:
+        started = time.monotonic()
+        docker("build", "-f", f"docker/{service}/Dockerfile", "-t", image,
+               ".")
+        build_seconds = round(time.monotonic() - started, 1)
+
+    samples: List[Dict[str, float]] = [
+        start_once(image, SERVICES[service], timeout) for _ in range(runs)
+    ]
+    result: Dict[str, object] = {
+        "service": service,
+        "image_mb": round(int(docker(
+            "image", "inspect", "-f", "{{.Size}}", image
+        )) / 1e6, 1),
+        "build_seconds": build_seconds,
+        "runs": runs,
+    }
+    for metric in ("start_to_ready", "run_to_ready"):
+        values = sorted(sample[metric] for sample in samples)
+        result[f"{metric}_median"] = round(statistics.median(values), 3)
+        result[f"{metric}_max"] = round(values[-1], 3)
+    return result
+
+
+def git_commit() -> str:
+    """Return the checked-out commit, or "unknown" outside a git tree."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+        capture_output=True, text=True,
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def main() -> int:
+    """Parse arguments and benchmark the images."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", nargs="+", choices=sorted(SERVICES),
+                        default=sorted(SERVICES))
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Containers started per service")
+    parser.add_argument("--no-build", dest="build", action="store_false",
+                        help="Measure the existing :local images")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="Seconds a container may take to be healthy")
+    parser.add_argument("--output", default="bench_images.jsonl",
+                        help="JSON lines file the results are appended to")
+    args = parser.parse_args()
+
+    try:
+        commit = git_commit()
+        results = [
+            bench(service, args.runs, args.build, args.timeout)
+            for service in args.services
+        ]
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        print(f"Benchmark failed: {getattr(e, 'stderr', None) or e}")
+        return 1
+
+    with open(args.output, "a", encoding="utf-8") as f:
+        for result in results:
+            print(f"{result['service']}: {result['image_mb']} MB, ready "
+                  f"{result['start_to_ready_median']}s after start "
+                  f"(max {result['start_to_ready_max']}s), "
+                  f"{result['run_to_ready_median']}s after docker run")
+            f.write(json.dumps({
+                "time": datetime.now(timezone.utc).isoformat(
+                    timespec="seconds"
+                ),
+                "commit": commit,
+                **result,
+            }) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
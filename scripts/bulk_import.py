@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bulk import short links from a CSV or JSONL export into url_mappings.
+
+Each row needs ``short_code`` and ``long_url`` and may carry ``expires_at``
+(Unix timestamp or ISO-8601). Point DYNAMODB_ENDPOINT_URL at DynamoDB Local
+(e.g. http://localhost:8002) to rehearse an import locally.
+
+Examples:
+    python scripts/bulk_import.py links.csv --rate 1000 --workers 8
+    python scripts/bulk_import.py links.jsonl --checkpoint import.ckpt
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Make the repository root importable when run as a script
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from src.utils.bulk_import import BulkImporter  # noqa: E402
+from src.utils.dynamo_ops import DynamoDBOperations  # noqa: E402
+
+
+def main() -> int:
+    """Parse arguments and run the import."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", help="CSV or JSONL file to import")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="Input format (default: from file extension)")
+    parser.add_argument("--table", default="url_mappings")
+    parser.add_argument("--region",
+                        default=os.environ.get("AWS_DEFAULT_REGION",
+                                               "us-east-1"))
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent BatchWriteItem workers")
+    parser.add_argument("--rate", type=float, default=500.0,
+                        help="Maximum item writes per second")
+    parser.add_argument("--checkpoint",
+                        help="Checkpoint file (default: <file>.checkpoint)")
+    parser.add_argument("--rejects",
+                        help="Rejected rows file (default: <file>.rejects)")
+    parser.add_argument("--progress-interval", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    importer = BulkImporter(
+        DynamoDBOperations(table_name=args.table, region_name=args.region),
+        workers=args.workers,
+        writes_per_second=args.rate,
+        checkpoint_path=args.checkpoint or f"{args.file}.checkpoint",
+        rejects_path=args.rejects or f"{args.file}.rejects",
+        progress_interval=args.progress_interval,
+    )
+    stats = importer.run(args.file, args.format)
+
+    print(f"Imported {stats.written} links, rejected {stats.rejected} "
+          f"({stats.read} rows read in {stats.elapsed:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -66,12 +66,18 @@ else
     echo -e "${YELLOW}⚠️  Namespace '$NAMESPACE' not found${NC}"
 fi
 
+# Autoscaling metrics live outside the namespace; the custom metrics
+# APIService must go with its adapter or API discovery starts failing
+echo -e "${RED}🗑️  Deleting autoscaling metrics (Prometheus, adapter)...${NC}"
+kubectl delete -f k8s/local/monitoring/ --ignore-not-found=true >/dev/null 2>&1 || true
+
 echo ""
 echo -e "${GREEN}🎉 Kubernetes resources cleanup completed!${NC}"
 echo ""
 echo -e "${YELLOW}📋 What was cleaned up:${NC}"
 echo "  • Namespace: $NAMESPACE"
-echo "  • All pods, services, deployments, configmaps, jobs"
+echo "  • All pods, services, deployments, configmaps, jobs, autoscalers"
+echo "  • Namespace: monitoring (Prometheus, prometheus-adapter)"
 echo "  • Application data (DynamoDB tables, etc.)"
 echo ""
 echo -e "${YELLOW}💡 Note:${NC}"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Merge the hot short codes reported by several redirect instances.
+
+Each instance serves its own heavy-hitters sketch on GET /hot. The sketches
+are merged with their error bounds, and the result is printed as JSON or
+written as a code list (one per line, hottest first) for cache pre-warming.
+
+Examples:
+    python scripts/hot_links.py http://localhost:8001
+    python scripts/hot_links.py http://a:8001 http://b:8001 -o hot.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+import requests
+
+# Make the repository root importable when run as a script
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from src.utils.heavy_hitters import SpaceSaving  # noqa: E402
+
+
+def fetch_merged(urls: List[str], timeout: float = 5.0) -> SpaceSaving:
+    """Fetch the full sketch of every instance and merge them."""
+    merged = None
+    for url in urls:
+        response = requests.get(f"{url.rstrip('/')}/hot", timeout=timeout)
+        response.raise_for_status()
+        sketch = SpaceSaving.from_dict(response.json())
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
+
+
+def main() -> int:
+    """Parse arguments and merge the hot codes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("urls", nargs="+",
+                        help="Base URLs of redirect instances")
+    parser.add_argument("--top", type=int, default=100,
+                        help="Number of codes to report")
+    parser.add_argument("-o", "--output",
+                        help="Write the codes to this file instead of JSON")
+    args = parser.parse_args()
+
+    merged = fetch_merged(args.urls)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for item in merged.top(args.top):
+                f.write(f"{item['short_code']}\n")
+        print(f"Wrote {min(args.top, len(merged))} codes to {args.output}")
+    else:
+        print(json.dumps(merged.to_dict(args.top), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/bin/bash
+set -e
+
+# Drive redirect traffic inside the local cluster and watch the HPA scale the
+# redirect deployment out (and, after the stabilization window, back in).
+#
+# Usage: ./scripts/k8s-load-test.sh [duration_seconds] [connections]
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+# Configuration
+CLUSTER_NAME="tiny-url-local"
+NAMESPACE="tiny-url"
+DURATION=${1:-180}
+CONNECTIONS=${2:-64}
+LOAD_POD="redirect-load"
+
+echo -e "${GREEN}📈 Redirect autoscaling load test (${DURATION}s, ${CONNECTIONS} connections)${NC}"
+echo ""
+
+# Check prerequisites
+if ! kubectl config current-context | grep -q "kind-${CLUSTER_NAME}"; then
+    echo -e "${RED}❌ Not connected to ${CLUSTER_NAME} cluster.${NC}"
+    echo "   Run 'make k8s-setup' first or switch context."
+    exit 1
+fi
+
+if ! kubectl get hpa redirect -n $NAMESPACE >/dev/null 2>&1; then
+    echo -e "${RED}❌ HPA 'redirect' not found.${NC}"
+    echo "   Run 'make k8s-setup' to deploy services and autoscalers."
+    exit 1
+fi
+
+replicas() {
+    kubectl get deployment redirect -n $NAMESPACE -o jsonpath='{.status.replicas}'
+}
+
+cleanup() {
+    kubectl delete pod $LOAD_POD -n $NAMESPACE --ignore-not-found=true >/dev/null 2>&1 || true
+}
+trap cleanup EXIT
+
+# Create a short URL to redirect to
+echo -e "${BLUE}🔗 Creating a short URL...${NC}"
+RESPONSE=$(kubectl run shorten-once --image=curlimages/curl:latest --rm -i --quiet \
+    --restart=Never -n $NAMESPACE -- \
+    curl -s -X POST http://shorten-service:8000/shorten \
+    -H 'Content-Type: application/json' -d '{"url":"https://example.com/load-test"}')
+SHORT_CODE=$(echo "$RESPONSE" | sed -n 's/.*"short_url": *"[^"]*\/\([^"/]*\)".*/\1/p')
+if [ -z "$SHORT_CODE" ]; then
+    echo -e "${RED}❌ Could not create a short URL: $RESPONSE${NC}"
+    exit 1
+fi
+echo -e "${GREEN}✅ Using short code: $SHORT_CODE${NC}"
+
+START_REPLICAS=$(replicas)
+PEAK_REPLICAS=$START_REPLICAS
+echo -e "${YELLOW}📊 Redirect replicas before load: $START_REPLICAS${NC}"
+echo ""
+
+# Closed-loop load at maximum rate; redirects are not followed
+echo -e "${BLUE}🚀 Starting load generator...${NC}"
+cleanup
+kubectl run $LOAD_POD --image=fortio/fortio:latest --restart=Never -n $NAMESPACE -- \
+    load -qps 0 -c "$CONNECTIONS" -t "${DURATION}s" -allow-initial-errors \
+    "http://redirect-service:8001/$SHORT_CODE" >/dev/null
+
+# Report the autoscaler's view every 10 seconds while the load runs
+END=$(( $(date +%s) + DURATION ))
+while [ "$(date +%s)" -lt "$END" ]; do
+    sleep 10
+    CURRENT=$(replicas)
+    [ "$CURRENT" -gt "$PEAK_REPLICAS" ] && PEAK_REPLICAS=$CURRENT
+    METRICS=$(kubectl get hpa redirect -n $NAMESPACE \
+        -o jsonpath='{range .status.currentMetrics[*]}{.resource.name}{.pods.metric.name}={.resource.current.averageUtilization}{.pods.current.averageValue} {end}')
+    echo "  $(date +%H:%M:%S)  replicas=$CURRENT  $METRICS"
+done
+
+echo ""
+echo -e "${BLUE}📋 Load generator summary:${NC}"
+kubectl logs $LOAD_POD -n $NAMESPACE 2>/dev/null | grep -E "All done|Code|target 50%|target 99%" || true
+
+echo ""
+if [ "$PEAK_REPLICAS" -gt "$START_REPLICAS" ]; then
+    echo -e "${GREEN}🎉 Scaled out from $START_REPLICAS to $PEAK_REPLICAS redirect pods${NC}"
+else
+    echo -e "${YELLOW}⚠️  No scale-out observed (still $START_REPLICAS pods)${NC}"
+    echo "   Check 'kubectl describe hpa redirect -n $NAMESPACE' for metric errors,"
+    echo "   or rerun with more connections."
+fi
+echo ""
+echo -e "${YELLOW}💡 Scale-in starts after the 5 minute stabilization window:${NC}"
+echo "  • kubectl get hpa -n $NAMESPACE -w"
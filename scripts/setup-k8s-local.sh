@@ -11,6 +11,7 @@ NC='\033[0m' # No Color
 # Configuration
 CLUSTER_NAME="tiny-url-local"
 NAMESPACE="tiny-url"
+METRICS_SERVER_URL="https://github.com/kubernetes-sigs/metrics-server/releases/download/v0.7.1/components.yaml"
 
 echo -e "${GREEN}🚀 Setting up local Kubernetes environment for tiny-url-app${NC}"
 echo ""
@@ -133,7 +134,19 @@ kubectl delete job dynamodb-init -n $NAMESPACE >/dev/null 2>&1 || true
 kubectl apply -f k8s/local/dynamodb/init-job.yaml >/dev/null
 wait_for_job dynamodb-init $NAMESPACE
 
-# 4. Application services
+# 4. Autoscaling metrics: metrics-server for CPU, Prometheus and
+#    prometheus-adapter for the per-pod request metrics the services export
+echo -e "${YELLOW}📈 Deploying autoscaling metrics...${NC}"
+kubectl apply -f "$METRICS_SERVER_URL" >/dev/null
+# kind kubelets serve self-signed certificates
+kubectl patch deployment metrics-server -n kube-system --type=json \
+    -p '[{"op": "add", "path": "/spec/template/spec/containers/0/args/-", "value": "--kubelet-insecure-tls"}]' \
+    >/dev/null 2>&1 || true
+kubectl apply -f k8s/local/monitoring/ >/dev/null
+wait_for_deployment prometheus monitoring
+wait_for_deployment prometheus-adapter monitoring
+
+# 5. Application services (replica counts come from their HPAs)
 echo -e "${YELLOW}🔄 Deploying application services...${NC}"
 kubectl apply -f k8s/local/shorten/ >/dev/null
 kubectl apply -f k8s/local/redirect/ >/dev/null
@@ -149,6 +162,10 @@ echo ""
 echo -e "${YELLOW}📊 Cluster Status:${NC}"
 kubectl get pods -n $NAMESPACE
 
+echo ""
+echo -e "${YELLOW}📈 Autoscalers:${NC}"
+kubectl get hpa -n $NAMESPACE
+
 echo ""
 echo -e "${YELLOW}🌐 Services:${NC}"
 kubectl get services -n $NAMESPACE
@@ -183,6 +200,7 @@ echo ""
 echo -e "${YELLOW}🧪 Test commands:${NC}"
 echo "  • List pods: kubectl get pods -n $NAMESPACE"
 echo "  • View logs: kubectl logs -f deployment/shorten -n $NAMESPACE"
+echo "  • Watch autoscaling under load: make k8s-load"
 echo "  • Test API: kubectl run test-pod --image=curlimages/curl:latest --rm -it --restart=Never -n $NAMESPACE -- curl -X POST http://shorten-service:8000/shorten -H 'Content-Type: application/json' -d '{\"url\":\"https://example.com\"}'"
 echo ""
 echo -e "${YELLOW}🛑 To cleanup:${NC}"
@@ -12,6 +12,19 @@ SHORTEN_SERVICE_URL="http://localhost:8000"
 REDIRECT_SERVICE_URL="http://localhost:8001"
 DYNAMODB_ENDPOINT="http://localhost:8002"
 TABLE_NAME="url_mappings"
+IDEMPOTENCY_TABLE_NAME="idempotency_keys"
+CLICKS_TABLE_NAME="click_rollups"
+
+# MULTI_REGION=1 adds a second stand-in region (eu-west-1) with its own
+# DynamoDB Local instance and services
+MULTI_REGION="${MULTI_REGION:-0}"
+EU_SHORTEN_SERVICE_URL="http://localhost:8010"
+EU_REDIRECT_SERVICE_URL="http://localhost:8011"
+EU_DYNAMODB_ENDPOINT="http://localhost:8003"
+COMPOSE_FILES="-f docker-compose.yml"
+if [ "$MULTI_REGION" = "1" ]; then
+    COMPOSE_FILES="$COMPOSE_FILES -f docker-compose.multi-region.yml"
+fi
 
 echo -e "${GREEN}🚀 Setting up local development environment for tiny-url-app${NC}"
 echo -e "${YELLOW}⚠️  Make sure AWS credentials are configured to run this script properly${NC}"
@@ -58,6 +71,7 @@ wait_for_service() {
 
 # Function to wait for DynamoDB Local
 wait_for_dynamodb() {
+    local DYNAMODB_ENDPOINT=${1:-$DYNAMODB_ENDPOINT}
     local max_attempts=30
     local attempt=1
 
@@ -78,33 +92,103 @@ wait_for_dynamodb() {
     return 1
 }
 
+# Function to create a table keyed by a string attribute (and optionally a
+# string sort key) on a DynamoDB Local instance
+create_table() {
+    local endpoint=$1
+    local table_name=$2
+    local key=$3
+    local sort_key=$4
+    local stream_view=$5
+    local attributes="AttributeName=$key,AttributeType=S"
+    local key_schema="AttributeName=$key,KeyType=HASH"
+    if [ -n "$sort_key" ]; then
+        attributes="$attributes AttributeName=$sort_key,AttributeType=S"
+        key_schema="$key_schema AttributeName=$sort_key,KeyType=RANGE"
+    fi
+    local stream_spec=""
+    if [ -n "$stream_view" ]; then
+        stream_spec="--stream-specification StreamEnabled=true,StreamViewType=$stream_view"
+    fi
+
+    echo -e "${YELLOW}🗄️  Creating DynamoDB table: $table_name ($endpoint)${NC}"
+
+    # Check if table already exists
+    if aws dynamodb describe-table --table-name "$table_name" --endpoint-url "$endpoint" > /dev/null 2>&1; then
+        echo -e "${YELLOW}⚠️  Table $table_name already exists, skipping creation${NC}"
+    else
+        aws dynamodb create-table \
+            --table-name "$table_name" \
+            --attribute-definitions $attributes \
+            --key-schema $key_schema \
+            --billing-mode PAY_PER_REQUEST \
+            $stream_spec \
+            --endpoint-url "$endpoint" > /dev/null
+
+        echo -e "${GREEN}✅ Table $table_name created successfully${NC}"
+    fi
+}
+
+add_index() {
+    local endpoint=$1
+    local table_name=$2
+    local index_name=$3
+    local hash_key=$4
+    local non_key_attributes=$5
+
+    if aws dynamodb describe-table --table-name "$table_name" --endpoint-url "$endpoint" \
+            --query "Table.GlobalSecondaryIndexes[].IndexName" --output text 2>/dev/null | grep -qw "$index_name"; then
+        echo -e "${YELLOW}⚠️  Index $index_name already exists, skipping creation${NC}"
+    else
+        aws dynamodb update-table \
+            --table-name "$table_name" \
+            --attribute-definitions AttributeName=$hash_key,AttributeType=S AttributeName=creation_date,AttributeType=S \
+            --global-secondary-index-updates "[{\"Create\": {\"IndexName\": \"$index_name\", \"KeySchema\": [{\"AttributeName\": \"$hash_key\", \"KeyType\": \"HASH\"}, {\"AttributeName\": \"creation_date\", \"KeyType\": \"RANGE\"}], \"Projection\": {\"ProjectionType\": \"INCLUDE\", \"NonKeyAttributes\": $non_key_attributes}}}]" \
+            --endpoint-url "$endpoint" > /dev/null
+
+        echo -e "${GREEN}✅ Index $index_name created on $table_name${NC}"
+    fi
+}
+
+add_mapping_indexes() {
+    local endpoint=$1
+    local table_name=$2
+
+    # GET /admin/links and incremental exports
+    add_index "$endpoint" "$table_name" domain-index domain '["long_url", "long_url_z", "expires_at"]'
+    add_index "$endpoint" "$table_name" created-index created_hour '["long_url", "long_url_z", "expires_at", "domain"]'
+}
+
 # Step 1: Start Docker Compose services
 echo -e "${YELLOW}📦 Starting Docker Compose services...${NC}"
-cd docker && docker compose up -d && cd ..
+cd docker && docker compose $COMPOSE_FILES up -d && cd ..
 
 # Step 2: Wait for DynamoDB Local to be ready
-wait_for_dynamodb
-
-# Step 3: Create DynamoDB table
-echo -e "${YELLOW}🗄️  Creating DynamoDB table: $TABLE_NAME${NC}"
-
-# Check if table already exists
-if aws dynamodb describe-table --table-name "$TABLE_NAME" --endpoint-url "$DYNAMODB_ENDPOINT" > /dev/null 2>&1; then
-    echo -e "${YELLOW}⚠️  Table $TABLE_NAME already exists, skipping creation${NC}"
-else
-    aws dynamodb create-table \
-        --table-name "$TABLE_NAME" \
-        --attribute-definitions AttributeName=short_code,AttributeType=S \
-        --key-schema AttributeName=short_code,KeyType=HASH \
-        --billing-mode PAY_PER_REQUEST \
-        --endpoint-url "$DYNAMODB_ENDPOINT" > /dev/null
-
-    echo -e "${GREEN}✅ Table $TABLE_NAME created successfully${NC}"
+wait_for_dynamodb "$DYNAMODB_ENDPOINT"
+if [ "$MULTI_REGION" = "1" ]; then
+    wait_for_dynamodb "$EU_DYNAMODB_ENDPOINT"
+fi
+
+# Step 3: Create DynamoDB tables (idempotency keys are per region)
+# Redirect caches follow the url_mappings stream (CHANGE_FEED)
+create_table "$DYNAMODB_ENDPOINT" "$TABLE_NAME" short_code "" NEW_IMAGE
+add_mapping_indexes "$DYNAMODB_ENDPOINT" "$TABLE_NAME"
+create_table "$DYNAMODB_ENDPOINT" "$IDEMPOTENCY_TABLE_NAME" idempotency_key
+create_table "$DYNAMODB_ENDPOINT" "$CLICKS_TABLE_NAME" short_code bucket
+if [ "$MULTI_REGION" = "1" ]; then
+    create_table "$EU_DYNAMODB_ENDPOINT" "$TABLE_NAME" short_code "" NEW_IMAGE
+    add_mapping_indexes "$EU_DYNAMODB_ENDPOINT" "$TABLE_NAME"
+    create_table "$EU_DYNAMODB_ENDPOINT" "$IDEMPOTENCY_TABLE_NAME" idempotency_key
+    create_table "$EU_DYNAMODB_ENDPOINT" "$CLICKS_TABLE_NAME" short_code bucket
 fi
 
 # Step 4: Wait for microservices to be ready
 wait_for_service "$SHORTEN_SERVICE_URL/health" "Shorten Service"
 wait_for_service "$REDIRECT_SERVICE_URL/health" "Redirect Service"
+if [ "$MULTI_REGION" = "1" ]; then
+    wait_for_service "$EU_SHORTEN_SERVICE_URL/health" "Shorten Service (eu-west-1)"
+    wait_for_service "$EU_REDIRECT_SERVICE_URL/health" "Redirect Service (eu-west-1)"
+fi
 
 # Step 5: Verify all services are healthy
 echo -e "${YELLOW}🔍 Verifying all services...${NC}"
@@ -119,6 +203,11 @@ echo -e "${YELLOW}📋 Service URLs:${NC}"
 echo "  • Shorten Service: $SHORTEN_SERVICE_URL"
 echo "  • Redirect Service: $REDIRECT_SERVICE_URL"
 echo "  • DynamoDB Local: $DYNAMODB_ENDPOINT"
+if [ "$MULTI_REGION" = "1" ]; then
+    echo "  • eu-west-1 Shorten Service: $EU_SHORTEN_SERVICE_URL"
+    echo "  • eu-west-1 Redirect Service: $EU_REDIRECT_SERVICE_URL"
+    echo "  • eu-west-1 DynamoDB Local: $EU_DYNAMODB_ENDPOINT"
+fi
 echo ""
 echo -e "${YELLOW}🧪 Test commands:${NC}"
 echo "  • Health check: curl $SHORTEN_SERVICE_URL/health"
@@ -126,4 +215,4 @@ echo "  • Create short URL: curl -X POST $SHORTEN_SERVICE_URL/shorten -H 'Cont
 echo "  • List tables: aws dynamodb list-tables --endpoint-url $DYNAMODB_ENDPOINT"
 echo ""
 echo -e "${YELLOW}🛑 To stop services:${NC}"
-echo "  cd docker && docker compose down"
+echo "  cd docker && docker compose $COMPOSE_FILES down"
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Report storage and capacity savings of the compressed long_url encoding.
+
+Items are sized with DynamoDB's rules (attribute names plus values) for the
+plain and compressed encodings, and converted to capacity units: writes are
+billed per 1 KB of item and reads per 4 KB, per item for GetItem/Query and
+summed over all items for scans.
+
+The corpus is a file with one URL per line, or a generated sample of
+tracking URLs. With --train, a dictionary is also trained on half of the
+corpus and measured on the other half, showing what a new dictionary version
+would add; --print-dictionary emits it for ``url_codec.DICTIONARIES``.
+
+Examples:
+    python scripts/url_encoding_report.py --sample 10000
+    python scripts/url_encoding_report.py --input urls.txt --train
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import string
+import sys
+from typing import Callable, Dict, List
+
+# Make the repository root importable when run as a script
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from src.utils import url_codec  # noqa: E402
+from src.utils.url_validator import MAX_URL_LENGTH  # noqa: E402
+
+# short_code (8 chars), creation_date (ISO timestamp), expires_at (number)
+KEY_BYTES = len("short_code") + 8 + len("creation_date") + 26
+EXPIRES_BYTES = len("expires_at") + 7
+
+DOMAINS = [
+    "www.example.com", "shop.example.co.uk", "www.amazon.com",
+    "blog.example.io", "news.example.org", "www.youtube.com",
+    "www.linkedin.com", "github.com", "medium.com", "docs.example.dev",
+]
+SEGMENTS = [
+    "products", "category", "blog", "2025", "spring-collection", "article",
+    "en-us", "landing", "running-shoes", "how-to-choose", "dp", "watch",
+]
+SOURCES = ["google", "facebook", "newsletter", "twitter", "linkedin", "bing"]
+MEDIUMS = ["cpc", "email", "social", "referral", "display"]
+
+
+def sample_corpus(count: int, seed: int = 7) -> List[str]:
+    """Generate tracking URLs typical of marketing links."""
+    rng = random.Random(seed)
+    token_chars = string.ascii_letters + string.digits + "-_"
+
+    def token(length: int) -> str:
+        return "".join(rng.choice(token_chars) for _ in range(length))
+
+    urls = []
+    for _ in range(count):
+        path = "/".join(
+            rng.choice(SEGMENTS) for _ in range(rng.randint(1, 4))
+        )
+        params = [
+            f"utm_source={rng.choice(SOURCES)}",
+            f"utm_medium={rng.choice(MEDIUMS)}",
+            f"utm_campaign={rng.choice(SEGMENTS)}_{rng.randint(1, 99)}",
+        ]
+        if rng.random() < 0.5:
+            params.append(f"utm_content={rng.choice(SEGMENTS)}")
+        if rng.random() < 0.6:
+            key = rng.choice(["gclid", "fbclid", "msclkid"])
+            params.append(f"{key}={token(rng.randint(40, 90))}")
+        if rng.random() < 0.2:
+            # Nested redirect targets make for the longest links
+            params.append(
+                f"redirect=https%3A%2F%2F{rng.choice(DOMAINS)}%2F"
+                f"{rng.choice(SEGMENTS)}%3Fref%3D{token(12)}"
+            )
+        if rng.random() < 0.15:
+            # Ad-tech links stacking tracking parameters near the length cap
+            while sum(map(len, params)) < rng.randint(900, 1900):
+                params.append(
+                    f"{rng.choice(SEGMENTS)}_{rng.choice(MEDIUMS)}="
+                    f"{rng.choice(SOURCES)}-{token(rng.randint(4, 24))}"
+                )
+        url = f"https://{rng.choice(DOMAINS)}/{path}?{'&'.join(params)}"
+        urls.append(url[:MAX_URL_LENGTH])
+    return urls
+
+
+def plain_item_bytes(url: str) -> int:
+    """Size of an item storing the URL as text."""
+    return KEY_BYTES + EXPIRES_BYTES + len("long_url") + len(url.encode())
+
+
+def encoded_item_bytes(url: str) -> int:
+    """Size of an item written with compression enabled."""
+    ((name, value),) = url_codec.encode_url_attributes(url).items()
+    size = value if isinstance(value, bytes) else value.encode()
+    return KEY_BYTES + EXPIRES_BYTES + len(name) + len(size)
+
+
+def summarize(label: str, sizes: List[int]) -> Dict[str, float]:
+    """Capacity figures for a list of item sizes."""
+    return {
+        "label": label,
+        "avg_bytes": statistics.mean(sizes),
+        "p95_bytes": sorted(sizes)[int(len(sizes) * 0.95)],
+        "wcu_per_write": statistics.mean(
+            math.ceil(size / 1024) for size in sizes
+        ),
+        "rcu_per_read": statistics.mean(
+            math.ceil(size / 4096) for size in sizes
+        ),
+        "scan_rcu_per_million": sum(sizes) / len(sizes) * 1e6 / 4096,
+    }
+
+
+def print_report(rows: List[Dict[str, float]]) -> None:
+    """Print one line per encoding, relative to the first."""
+    base = rows[0]
+    print(f"{'encoding':<22}{'avg B':>8}{'p95 B':>8}{'WCU/put':>9}"
+          f"{'RCU/get':>9}{'scan RCU/1M':>13}{'saved':>8}")
+    for row in rows:
+        saved = 1 - row["avg_bytes"] / base["avg_bytes"]
+        print(f"{row['label']:<22}{row['avg_bytes']:>8.0f}"
+              f"{row['p95_bytes']:>8}{row['wcu_per_write']:>9.2f}"
+              f"{row['rcu_per_read']:>9.2f}"
+              f"{row['scan_rcu_per_million']:>13.0f}{saved:>8.1%}")
+
+
+def measure(urls: List[str], size: Callable[[str], int]) -> List[int]:
+    """Item sizes of a corpus under one encoding."""
+    return [size(url) for url in urls]
+
+
+def main() -> None:
+    """Parse arguments and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--input", help="File with one URL per line")
+    parser.add_argument("--sample", type=int, default=10000,
+                        help="Generated URLs when no input is given")
+    parser.add_argument("--train", action="store_true",
+                        help="Also measure a dictionary trained on the corpus")
+    parser.add_argument("--dictionary-size", type=int, default=1024)
+    parser.add_argument("--print-dictionary", action="store_true",
+                        help="Print the trained dictionary as a literal")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = sample_corpus(args.sample)
+    print(f"{len(urls)} URLs, avg {statistics.mean(map(len, urls)):.0f} "
+          f"chars, max {max(map(len, urls))}\n")
+
+    rows = [
+        summarize("plain", measure(urls, plain_item_bytes)),
+        summarize(
+            f"zlib v{url_codec.CURRENT_VERSION}",
+            measure(urls, encoded_item_bytes),
+        ),
+    ]
+
+    if args.train:
+        train, test = urls[::2], urls[1::2]
+        dictionary = url_codec.train_dictionary(train, args.dictionary_size)
+        version = url_codec.CURRENT_VERSION + 1
+        url_codec.DICTIONARIES[version] = dictionary
+        rows = [
+            summarize("plain (held out)", measure(test, plain_item_bytes)),
+            summarize(
+                f"zlib v{url_codec.CURRENT_VERSION} (held out)",
+                measure(test, encoded_item_bytes),
+            ),
+            summarize("zlib trained", measure(test, lambda url: (
+                KEY_BYTES + EXPIRES_BYTES + len(url_codec.ENCODED_ATTRIBUTE)
+                + len(url_codec.compress_url(url, version))
+            ))),
+        ]
+        if args.print_dictionary:
+            print(f"DICTIONARIES[{version}] = {dictionary!r}\n")
+
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
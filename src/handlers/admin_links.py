@@ -0,0 +1,84 @@
+"""Lambda handler listing the short codes that point at a domain."""
+
+import logging
+import os
+from typing import Any, Dict
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.api_gateway import create_response, get_query_parameter
+    from utils.domain_index import normalize_domain
+    from utils.dynamo_ops import DynamoDBOperations
+except ModuleNotFoundError:
+    from src.utils.api_gateway import create_response, get_query_parameter
+    from src.utils.domain_index import normalize_domain
+    from src.utils.dynamo_ops import DynamoDBOperations
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+TABLE_NAME = os.environ.get("TABLE_NAME", "url_mappings")
+REGION_NAME = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+dynamo_ops = DynamoDBOperations(table_name=TABLE_NAME, region_name=REGION_NAME)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Return one page of the links to a domain, newest first.
+
+    Query parameters: ``domain`` (a host name or URL; ``www.`` and the port
+    are ignored), ``limit`` (default 100, at most 1000) and ``cursor`` (the
+    ``next_cursor`` of the previous page).
+
+    Args:
+        event: API Gateway event (payload format 1.0 or 2.0)
+        context: Lambda context
+
+    Returns:
+        API Gateway response with the links and the next cursor
+    """
+    try:
+        domain = normalize_domain(get_query_parameter(event, "domain") or "")
+        if not domain:
+            return create_response(400, {"error": "domain is required"})
+
+        try:
+            limit = int(
+                get_query_parameter(event, "limit") or DEFAULT_PAGE_SIZE
+            )
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return create_response(
+                400,
+                {"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"},
+            )
+
+        try:
+            items, next_cursor = dynamo_ops.query_by_domain(
+                domain, limit, get_query_parameter(event, "cursor")
+            )
+        except ValueError as e:
+            return create_response(400, {"error": str(e)})
+
+        links = [
+            {
+                "short_code": item["short_code"],
+                "long_url": item.get("long_url"),
+                "creation_date": item["creation_date"],
+                "expires_at": int(item["expires_at"])
+                if item.get("expires_at") else None,
+            }
+            for item in items
+        ]
+        return create_response(
+            200,
+            {"domain": domain, "links": links, "next_cursor": next_cursor},
+            {"Cache-Control": "no-store"},
+        )
+    except Exception as e:
+        logger.error(f"Error listing links: {str(e)}", exc_info=True)
+        return create_response(500, {"error": "Internal server error"})
@@ -0,0 +1,124 @@
+"""Lambda handler for the click statistics endpoint."""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.api_gateway import (
+        create_response, get_path_parameter, get_query_parameter
+    )
+    from utils.click_rollups import DAY, HOUR, ClickRollups
+except ModuleNotFoundError:
+    from src.utils.api_gateway import (
+        create_response, get_path_parameter, get_query_parameter
+    )
+    from src.utils.click_rollups import DAY, HOUR, ClickRollups
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+REGION_NAME = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+CLICKS_TABLE_NAME = os.environ.get("CLICKS_TABLE_NAME", "click_rollups")
+rollups = ClickRollups(CLICKS_TABLE_NAME, region_name=REGION_NAME)
+
+# Range returned when none is given, and the longest range served; hourly
+# buckets are only kept for two weeks
+DEFAULT_SPAN = {HOUR: timedelta(hours=23), DAY: timedelta(days=29)}
+MAX_SPAN = {HOUR: timedelta(days=14), DAY: timedelta(days=400)}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date or time in UTC; raises ValueError if invalid."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_range(event: Dict[str, Any]) -> Union[
+    Tuple[str, datetime, datetime], Dict[str, Any]
+]:
+    """Read the granularity and time range from the query string.
+
+    Args:
+        event: API Gateway event
+
+    Returns:
+        ``(granularity, start, end)``, or an error response
+    """
+    granularity = get_query_parameter(event, "granularity") or DAY
+    if granularity not in (HOUR, DAY):
+        return create_response(
+            400, {"error": "granularity must be 'hour' or 'day'"}
+        )
+
+    try:
+        end = _parse_time(get_query_parameter(event, "to"))
+        start = _parse_time(get_query_parameter(event, "from"))
+    except ValueError:
+        return create_response(
+            400, {"error": "from and to must be ISO 8601 dates or times"}
+        )
+    end = end or datetime.utcnow()
+    start = start or end - DEFAULT_SPAN[granularity]
+
+    if start > end:
+        return create_response(400, {"error": "from must not be after to"})
+    if end - start > MAX_SPAN[granularity]:
+        return create_response(
+            400,
+            {
+                "error": f"{granularity} ranges are limited to "
+                f"{MAX_SPAN[granularity].days} days"
+            },
+        )
+    return granularity, start, end
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Return click counts of a short code per hour or day.
+
+    Query parameters: ``granularity`` (``hour`` or ``day``, default day),
+    ``from`` and ``to`` (ISO 8601, UTC; default the last 24 hours or 30
+    days).
+
+    Args:
+        event: API Gateway event (payload format 1.0 or 2.0) with the short
+            code in path parameters
+        context: Lambda context
+
+    Returns:
+        API Gateway response with the time series
+    """
+    try:
+        short_code = get_path_parameter(event, "shortCode")
+        if not short_code:
+            return create_response(400, {"error": "No short code provided"})
+
+        parsed = parse_range(event)
+        if isinstance(parsed, dict):
+            return parsed
+        granularity, start, end = parsed
+
+        buckets = rollups.query(short_code, granularity, start, end)
+        return create_response(
+            200,
+            {
+                "short_code": short_code,
+                "granularity": granularity,
+                "from": buckets[0]["start"],
+                "to": buckets[-1]["start"],
+                "total": sum(bucket["clicks"] for bucket in buckets),
+                "buckets": buckets,
+            },
+            {"Cache-Control": "no-store"},
+        )
+    except Exception as e:
+        logger.error(f"Error reading click stats: {str(e)}", exc_info=True)
+        return create_response(500, {"error": "Internal server error"})
@@ -1,17 +1,38 @@
 """Lambda handler for URL redirection endpoint."""
 
+import atexit
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Union
 
 # Add compatibility for both direct imports and importing through tests
 try:
-    from utils.api_gateway import create_response, create_redirect_response
-    from utils.dynamo_ops import DynamoDBOperations
+    from utils.api_gateway import (
+        create_redirect_response, create_response, get_path_parameter
+    )
+    from utils.click_rollups import ClickRollups
+    from utils.dynamo_ops import BATCH_READ_MAX_KEYS, DynamoDBOperations
+    from utils.heavy_hitters import HotLinks
+    from utils.lookup_batcher import LookupBatcher
+    from utils.lookup_cache import LookupCache
+    from utils.multi_region import RegionalTables
+    from utils.shared_cache import SharedLookupCache
+    from utils.snapshot import SnapshotStore
+    from utils.url_resolver import LookupUnavailable, UrlResolver
 except ModuleNotFoundError:
-    from src.utils.api_gateway import create_response, create_redirect_response
-    from src.utils.dynamo_ops import DynamoDBOperations
+    from src.utils.api_gateway import (
+        create_redirect_response, create_response, get_path_parameter
+    )
+    from src.utils.click_rollups import ClickRollups
+    from src.utils.dynamo_ops import BATCH_READ_MAX_KEYS, DynamoDBOperations
+    from src.utils.heavy_hitters import HotLinks
+    from src.utils.lookup_batcher import LookupBatcher
+    from src.utils.lookup_cache import LookupCache
+    from src.utils.multi_region import RegionalTables
+    from src.utils.shared_cache import SharedLookupCache
+    from src.utils.snapshot import SnapshotStore
+    from src.utils.url_resolver import LookupUnavailable, UrlResolver
 
 # Configure logging
 logger = logging.getLogger()
@@ -22,12 +43,141 @@ TABLE_NAME = "url_mappings"
 REGION_NAME = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
 dynamo_ops = DynamoDBOperations(table_name=TABLE_NAME, region_name=REGION_NAME)
 
+# Optional read-only snapshot, used as a fallback when DynamoDB errors or as
+# the primary source for static link sets (SNAPSHOT_MODE=primary)
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH")
+SNAPSHOT_MODE = os.environ.get("SNAPSHOT_MODE", "fallback")
+
+# Optional micro-batching of concurrent lookups (0 disables it)
+LOOKUP_BATCH_WINDOW_US = int(os.environ.get("LOOKUP_BATCH_WINDOW_US", "0"))
+LOOKUP_BATCH_MAX_KEYS = min(
+    int(os.environ.get("LOOKUP_BATCH_MAX_KEYS", BATCH_READ_MAX_KEYS)),
+    BATCH_READ_MAX_KEYS,
+)
+
+# Optional in-process cache of found mappings (0 disables it). With
+# LOOKUP_CACHE_PATH (e.g. on /dev/shm) it is one shared-memory table for all
+# worker processes of a pod instead of a copy per process.
+LOOKUP_CACHE_SIZE = int(os.environ.get("LOOKUP_CACHE_SIZE", "0"))
+LOOKUP_CACHE_TTL_SECONDS = float(
+    os.environ.get("LOOKUP_CACHE_TTL_SECONDS", "300")
+)
+LOOKUP_CACHE_PATH = os.environ.get("LOOKUP_CACHE_PATH")
+# How long past its TTL a cached mapping may still be served while DynamoDB
+# is slow or failing
+LOOKUP_CACHE_STALE_SECONDS = float(
+    os.environ.get("LOOKUP_CACHE_STALE_SECONDS", "3600")
+)
+
+# Latency budget of a lookup, capped by the time left in the invocation
+# (0 waits for DynamoDB however long it takes)
+LOOKUP_BUDGET_MS = int(os.environ.get("LOOKUP_BUDGET_MS", "1000"))
+# Threads running deadline-bound lookups, sized to the requests a process
+# serves at once (the container's ADMISSION_MAX_LIMIT); threads are only
+# started as lookups need them
+LOOKUP_WORKERS = int(os.environ.get("LOOKUP_WORKERS", "256"))
+# Codes whose lookups may be pending while DynamoDB is past the budget
+# before further lookups are shed (0: one per worker)
+MAX_PENDING_LOOKUPS = int(os.environ.get("MAX_PENDING_LOOKUPS", "0"))
+# Invocation time kept back for building the response
+RESPONSE_RESERVE_MS = 200
+MIN_LOOKUP_BUDGET_MS = 10
+
+
+def _create_lookup_cache() -> Optional[
+    Union[LookupCache, SharedLookupCache]
+]:
+    """Build the configured lookup cache, if any."""
+    if not LOOKUP_CACHE_SIZE:
+        return None
+    if LOOKUP_CACHE_PATH:
+        return SharedLookupCache(
+            LOOKUP_CACHE_PATH,
+            max_entries=LOOKUP_CACHE_SIZE,
+            ttl=LOOKUP_CACHE_TTL_SECONDS,
+            stale_ttl=LOOKUP_CACHE_STALE_SECONDS,
+        )
+    return LookupCache(
+        max_entries=LOOKUP_CACHE_SIZE,
+        ttl=LOOKUP_CACHE_TTL_SECONDS,
+        stale_ttl=LOOKUP_CACHE_STALE_SECONDS,
+    )
+
+
+def _lookup_budget(context: Any) -> Optional[float]:
+    """Return the seconds a lookup may take in this invocation."""
+    if not LOOKUP_BUDGET_MS:
+        return None
+    budget_ms = LOOKUP_BUDGET_MS
+    if hasattr(context, "get_remaining_time_in_millis"):
+        budget_ms = min(
+            budget_ms,
+            context.get_remaining_time_in_millis() - RESPONSE_RESERVE_MS,
+        )
+    return max(budget_ms, MIN_LOOKUP_BUDGET_MS) / 1000
+
+
+# Edge caches may keep a redirect for up to a day (0: not at all, so every
+# click reaches the statistics), and a 404 briefly so that repeated clicks on
+# unknown codes do not all reach the origin
+REDIRECT_CACHE_SECONDS = int(
+    os.environ.get("REDIRECT_CACHE_SECONDS", "86400")
+)
+NOT_FOUND_CACHE_SECONDS = int(os.environ.get("NOT_FOUND_CACHE_SECONDS", "30"))
+
+resolver = UrlResolver(
+    dynamo_ops,
+    snapshot=SnapshotStore(SNAPSHOT_PATH) if SNAPSHOT_PATH else None,
+    snapshot_mode=SNAPSHOT_MODE,
+    batcher=LookupBatcher(
+        dynamo_ops.get_url_mappings,
+        window=LOOKUP_BATCH_WINDOW_US / 1_000_000,
+        max_batch=LOOKUP_BATCH_MAX_KEYS,
+    ) if LOOKUP_BATCH_WINDOW_US else None,
+    # Global table deployments read locally, falling back to the home region
+    regions=RegionalTables.from_env(dynamo_ops, REGION_NAME),
+    cache=_create_lookup_cache(),
+    workers=LOOKUP_WORKERS,
+    max_pending=MAX_PENDING_LOOKUPS or None,
+)
+
+# Clicks are counted per hour and day in memory and flushed in batches for
+# GET /stats/{shortCode} (0 disables counting)
+CLICKS_TABLE_NAME = os.environ.get("CLICKS_TABLE_NAME", "click_rollups")
+CLICK_FLUSH_INTERVAL_SECONDS = float(
+    os.environ.get("CLICK_FLUSH_INTERVAL_SECONDS", "10")
+)
+clicks = ClickRollups(
+    CLICKS_TABLE_NAME,
+    region_name=REGION_NAME,
+    flush_interval=CLICK_FLUSH_INTERVAL_SECONDS,
+) if CLICK_FLUSH_INTERVAL_SECONDS else None
+# Lambda freezes the environment between invocations and may discard it
+# without running atexit handlers, so there each invocation writes its own
+# clicks before returning
+FLUSH_CLICKS_PER_INVOCATION = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+if clicks and not FLUSH_CLICKS_PER_INVOCATION:
+    # Counts are written by a background thread, never by a redirect
+    clicks.start()
+    atexit.register(clicks.stop)
+
+# Most requested codes over a rolling window, in fixed memory, for GET /hot
+# and cache pre-warming (0 disables tracking)
+HOT_LINKS_CAPACITY = int(os.environ.get("HOT_LINKS_CAPACITY", "1000"))
+HOT_LINKS_WINDOW_SECONDS = float(
+    os.environ.get("HOT_LINKS_WINDOW_SECONDS", "300")
+)
+hot_links = HotLinks(
+    capacity=HOT_LINKS_CAPACITY, window=HOT_LINKS_WINDOW_SECONDS
+) if HOT_LINKS_CAPACITY else None
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle URL redirection requests.
 
     Args:
-        event: API Gateway event containing short code in path parameters
+        event: API Gateway event (payload format 1.0 or 2.0) containing
+            the short code in path parameters
         context: Lambda context
 
     Returns:
@@ -37,23 +187,35 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.info(f"Received redirect request: {event}")
 
         # Extract short code from path parameters
-        path_parameters = event.get("pathParameters", {})
-        if not path_parameters or not path_parameters.get("shortCode"):
+        short_code = get_path_parameter(event, "shortCode")
+        if not short_code:
             logger.warning("No short code provided in path parameters")
             return create_response(
                 400, {"error": "No short code provided"}
             )
 
-        short_code = path_parameters.get("shortCode")
         logger.info(f"Looking up short code: {short_code}")
 
-        # Lookup URL in DynamoDB
-        found, url_data = dynamo_ops.get_url_mapping(short_code)
+        # Lookup URL in DynamoDB (or the snapshot, if configured), within
+        # the latency budget
+        try:
+            found, url_data = resolver.resolve(
+                short_code, timeout=_lookup_budget(context)
+            )
+        except LookupUnavailable:
+            logger.error(f"Lookup unavailable for short code: {short_code}")
+            return create_response(
+                503,
+                {"error": "Service temporarily unavailable"},
+                {"Retry-After": "1", "Cache-Control": "no-store"},
+            )
 
         if not found or not url_data:
             logger.warning(f"Short code not found: {short_code}")
             return create_response(
-                404, {"error": f"Short URL '{short_code}' not found"}
+                404,
+                {"error": f"Short URL '{short_code}' not found"},
+                {"Cache-Control": f"public, max-age={NOT_FOUND_CACHE_SECONDS}"},
             )
 
         # Check if URL has expired
@@ -70,10 +232,18 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         long_url = url_data.get("long_url")
         logger.info(f"Redirecting to: {long_url}")
 
-        # Log this redirect for analytics (future enhancement)
-        # This would be an async operation, perhaps using SQS
-
-        return create_redirect_response(long_url)
+        if clicks:
+            clicks.record(short_code)
+            if FLUSH_CLICKS_PER_INVOCATION:
+                clicks.flush()
+        if hot_links:
+            hot_links.record(short_code)
+
+        # Never let caches serve the redirect past the link's expiry
+        cache_ttl = REDIRECT_CACHE_SECONDS
+        if expires_at:
+            cache_ttl = min(cache_ttl, expires_at - now)
+        return create_redirect_response(long_url, cache_ttl)
 
     except Exception as e:
         logger.error(f"Error processing redirect: {str(e)}", exc_info=True)
@@ -3,21 +3,36 @@
 import json
 import logging
 import os
-import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, Tuple, Union
 
+from botocore.exceptions import ClientError
+
 # Add compatibility for both direct imports and importing through tests
 try:
-    from utils.api_gateway import create_response
+    from utils.api_gateway import create_response, get_body, get_header
     from utils.dynamo_ops import DynamoDBOperations
-    from utils.short_code_generator import generate_short_code
-    from utils.url_validator import validate_url
+    from utils.idempotency import (
+        MAX_KEY_LENGTH, IdempotencyStore, fingerprint
+    )
+    from utils.multi_region import RegionalTables
+    from utils.short_code_generator import (
+        CODE_LENGTH, MAX_CODE_LENGTH, ShortCodeGenerator
+    )
+    from utils.url_validator import validate_short_code, validate_url
+    from utils.write_coalescer import MAX_BATCH, WriteCoalescer
 except ModuleNotFoundError:
-    from src.utils.api_gateway import create_response
+    from src.utils.api_gateway import create_response, get_body, get_header
     from src.utils.dynamo_ops import DynamoDBOperations
-    from src.utils.short_code_generator import generate_short_code
-    from src.utils.url_validator import validate_url
+    from src.utils.idempotency import (
+        MAX_KEY_LENGTH, IdempotencyStore, fingerprint
+    )
+    from src.utils.multi_region import RegionalTables
+    from src.utils.short_code_generator import (
+        CODE_LENGTH, MAX_CODE_LENGTH, ShortCodeGenerator
+    )
+    from src.utils.url_validator import validate_short_code, validate_url
+    from src.utils.write_coalescer import MAX_BATCH, WriteCoalescer
 
 # Configure logging
 logger = logging.getLogger()
@@ -29,8 +44,62 @@ REGION_NAME = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
 dynamo_ops = DynamoDBOperations(table_name=TABLE_NAME, region_name=REGION_NAME)
 
 MAX_RETRIES = 3
-CUSTOM_CODE_MAX_LENGTH = 30
-CUSTOM_CODE_PATTERN = r'^[a-zA-Z0-9_-]+$'
+
+# Generated codes start at SHORT_CODE_LENGTH characters and grow, up to
+# SHORT_CODE_MAX_LENGTH, while the collision rate is above the threshold
+code_generator = ShortCodeGenerator(
+    length=int(os.environ.get("SHORT_CODE_LENGTH", CODE_LENGTH)),
+    max_length=int(os.environ.get("SHORT_CODE_MAX_LENGTH", MAX_CODE_LENGTH)),
+    collision_threshold=float(
+        os.environ.get("SHORT_CODE_COLLISION_THRESHOLD", "0.01")
+    ),
+)
+
+# Global table deployments: generated codes carry this region's prefix and
+# custom codes are reserved through the primary region
+regions = RegionalTables.from_env(dynamo_ops, REGION_NAME)
+
+# Optional coalescing of concurrent writes into batches (0 disables it)
+WRITE_BATCH_WINDOW_MS = float(os.environ.get("WRITE_BATCH_WINDOW_MS", "0"))
+WRITE_BATCH_MAX_ITEMS = int(os.environ.get("WRITE_BATCH_MAX_ITEMS", MAX_BATCH))
+write_coalescer = WriteCoalescer(
+    dynamo_ops,
+    window=WRITE_BATCH_WINDOW_MS / 1000,
+    max_batch=WRITE_BATCH_MAX_ITEMS,
+) if WRITE_BATCH_WINDOW_MS else None
+
+# Responses to requests carrying an Idempotency-Key are kept this long and
+# replayed to retries with the same key
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TABLE_NAME = os.environ.get(
+    "IDEMPOTENCY_TABLE_NAME", "idempotency_keys"
+)
+IDEMPOTENCY_TTL_SECONDS = int(
+    os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400")
+)
+idempotency = IdempotencyStore(
+    table_name=IDEMPOTENCY_TABLE_NAME,
+    region_name=REGION_NAME,
+    ttl=IDEMPOTENCY_TTL_SECONDS,
+)
+
+
+def save_url_mapping(short_code: str, url: str, custom: bool = False) -> bool:
+    """Save a mapping directly or through the write coalescer.
+
+    Args:
+        short_code: The short code to claim
+        url: The URL to redirect to
+        custom: Whether the code was chosen by the caller
+
+    Returns:
+        True if saved, False if the short code is already in use
+    """
+    if custom and regions and not regions.is_primary:
+        return regions.reserve_custom_code(short_code, url)
+    if write_coalescer:
+        return write_coalescer.save(short_code, url)
+    return dynamo_ops.save_url_mapping(short_code, url)
 
 
 def validate_request(event: Dict[str, Any]) -> Tuple[
@@ -50,7 +119,7 @@ def validate_request(event: Dict[str, Any]) -> Tuple[
     logger.info("Validating request")
     # Parse request body
     try:
-        body = json.loads(event.get("body", "{}"))
+        body = json.loads(get_body(event) or "{}")
         logger.info(f"Request body: {body}")
     except json.JSONDecodeError:
         logger.error("Invalid JSON in request body")
@@ -75,15 +144,14 @@ def validate_request(event: Dict[str, Any]) -> Tuple[
     # Check if custom short code is provided and validate it
     custom_code = body.get("custom_code")
     if custom_code:
-        if len(custom_code) > CUSTOM_CODE_MAX_LENGTH:
-            error_msg = (f"Custom code exceeds maximum length of "
-                         f"{CUSTOM_CODE_MAX_LENGTH}")
-            logger.warning(error_msg)
-            return False, create_response(400, {"error": error_msg}), None
-
-        if not re.match(CUSTOM_CODE_PATTERN, custom_code):
-            error_msg = ("Custom code must contain only letters, numbers, "
-                         "underscores, and hyphens")
+        is_valid, error_msg = validate_short_code(custom_code)
+        if is_valid and regions and regions.is_reserved(custom_code):
+            is_valid = False
+            error_msg = (
+                "Custom codes cannot start with "
+                f"'{custom_code[0]}', which is reserved for generated codes"
+            )
+        if not is_valid:
             logger.warning(error_msg)
             return False, create_response(400, {"error": error_msg}), None
 
@@ -94,6 +162,9 @@ def validate_request(event: Dict[str, Any]) -> Tuple[
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle URL shortening requests.
 
+    Requests with an ``Idempotency-Key`` header run at most once per key;
+    retries get the first response back.
+
     Args:
         event: API Gateway event
         context: Any
@@ -103,6 +174,79 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     logger.info(f"Received event: {json.dumps(event)}")
 
+    key = get_header(event, IDEMPOTENCY_HEADER)
+    if key is None:
+        return shorten(event)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return create_response(
+            400,
+            {
+                "error": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} "
+                "characters"
+            },
+        )
+
+    try:
+        claim = idempotency.claim(key, fingerprint(get_body(event)))
+    except ClientError as e:
+        # Idempotency protects retries but must not take shortening down
+        logger.warning(f"Idempotency store unavailable, skipping: {e}")
+        return shorten(event)
+
+    if claim.mismatch:
+        return create_response(
+            422,
+            {
+                "error": f"{IDEMPOTENCY_HEADER} was already used with a "
+                "different request"
+            },
+        )
+    if claim.response is not None:
+        logger.info(f"Replaying response for idempotency key {key}")
+        return replay_response(claim.response)
+    if not claim.acquired:
+        return create_response(
+            409,
+            {"error": "A request with this key is still in progress"},
+            headers={"Retry-After": "1"},
+        )
+
+    response = shorten(event)
+    try:
+        if response["statusCode"] >= 500:
+            idempotency.release(key)
+        else:
+            idempotency.complete(key, response)
+    except ClientError as e:
+        logger.warning(f"Failed to record idempotency key {key}: {e}")
+    return response
+
+
+def replay_response(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a stored response, marking it as a replay.
+
+    Args:
+        stored: Response saved by the first request with the key
+
+    Returns:
+        API Gateway response
+    """
+    return {
+        "statusCode": int(stored["statusCode"]),
+        "headers": {**stored["headers"], "Idempotent-Replayed": "true"},
+        "body": stored["body"],
+    }
+
+
+def shorten(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the request and create the short URL.
+
+    Args:
+        event: API Gateway event
+
+    Returns:
+        API Gateway response
+    """
     try:
         # Validate request
         is_valid, result, custom_code = validate_request(event)
@@ -116,7 +260,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if custom_code:
             logger.info(f"Custom short code requested: {custom_code}")
 
-            if dynamo_ops.save_url_mapping(custom_code, url):
+            if save_url_mapping(custom_code, url, custom=True):
                 expires_at = (
                     datetime.utcnow() + timedelta(days=30)
                 ).isoformat()
@@ -147,10 +291,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.info(
                 f"Attempt {attempt+1} of {MAX_RETRIES} to generate short URL"
             )
-            short_code = generate_short_code()
+            short_code = code_generator.generate(
+                regions.code_prefix if regions else ""
+            )
             logger.info(f"Generated short code: {short_code}")
 
-            if dynamo_ops.save_url_mapping(short_code, url):
+            saved = save_url_mapping(short_code, url)
+            code_generator.record(collided=not saved)
+            if saved:
                 expires_at = (
                     datetime.utcnow() + timedelta(days=30)
                 ).isoformat()
@@ -169,6 +317,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 )
 
         # If all retries failed
+        code_generator.record_exhausted()
         logger.error("Failed to generate unique short code after max retries")
         return create_response(
             409, {"error": "Failed to generate unique short code"}
@@ -0,0 +1,230 @@
+"""Compact, privacy-scrubbed access logs for traffic replay.
+
+Each request is one tab-separated line: start time, route, short code,
+status and latency. Nothing identifying the caller is kept: no client
+address, headers, query string or long URL. Short codes are replaced by a
+keyed pseudonym, so the log keeps the key skew and custom-code mix of real
+traffic without the codes themselves; processes sharing a key (set
+``ACCESS_LOG_KEY`` on every pod) map a code to the same pseudonym.
+
+Lines are buffered in memory and appended as gzip members about once a
+second by a background thread, so a request only pays for a list append.
+If the disk falls behind, lines beyond ``max_pending`` are dropped and
+counted rather than held. Each process writes its own file, named after the
+service, host and pid; ``read_access_logs`` merges files back into one
+stream in start order.
+"""
+
+import gzip
+import heapq
+import hmac
+import logging
+import os
+import socket
+import string
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMAT_HEADER = "#tiny-url-access-log v1"
+ROUTE_REDIRECT = "GET /<short_code>"
+ROUTE_SHORTEN = "POST /shorten"
+# Pseudonyms use the generated code alphabet, so they are valid custom codes
+PSEUDONYM_CHARS = string.ascii_letters + string.digits
+PSEUDONYM_LENGTH = 10
+# Lines are written when they finish, so a file is in start order only
+# within the longest request; records are reordered within this window
+REORDER_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class AccessRecord:
+    """One logged request."""
+
+    timestamp: float
+    route: str
+    code: str
+    status: int
+    latency_ms: float
+
+
+def pseudonymize(code: str, key: bytes) -> str:
+    """Return the keyed pseudonym of a short code.
+
+    Args:
+        code: Short code to hide
+        key: Secret shared by the processes whose logs are merged
+
+    Returns:
+        A stable code of PSEUDONYM_LENGTH letters and digits
+    """
+    value = int.from_bytes(
+        hmac.digest(key, code.encode("utf-8"), "sha256")[:8], "big"
+    )
+    chars = []
+    for _ in range(PSEUDONYM_LENGTH):
+        value, index = divmod(value, len(PSEUDONYM_CHARS))
+        chars.append(PSEUDONYM_CHARS[index])
+    return "".join(chars)
+
+
+class AccessLog:
+    """Buffered writer of one process's access log."""
+
+    def __init__(
+        self,
+        directory: str,
+        service: str,
+        key: Optional[str] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 100_000,
+    ) -> None:
+        """Initialize the log.
+
+        Args:
+            directory: Directory the log file is written to
+            service: Service name, used in the file name
+            key: Pseudonym key; a random one (codes only consistent within
+                this process) if omitted
+            flush_interval: Seconds between writes
+            max_pending: Lines buffered before new ones are dropped
+        """
+        self.path = os.path.join(
+            directory,
+            f"{service}-{socket.gethostname()}-{os.getpid()}.log.gz",
+        )
+        self.key = key.encode("utf-8") if key else os.urandom(32)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[str] = []
+        self._records = 0
+        self._dropped = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        started: float,
+        route: str,
+        code: Optional[str],
+        status: int,
+        latency: float,
+    ) -> None:
+        """Buffer one request.
+
+        Args:
+            started: Unix time the request arrived
+            route: Method and URL rule, e.g. ``GET /<short_code>``
+            code: Short code or custom code of the request, if any
+            status: Response status
+            latency: Seconds the request took
+        """
+        line = (
+            f"{started:.3f}\t{route}\t"
+            f"{pseudonymize(code, self.key) if code else ''}\t"
+            f"{status}\t{latency * 1000:.2f}\n"
+        )
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._dropped += 1
+                return
+            self._pending.append(line)
+            self._records += 1
+
+    def flush(self) -> None:
+        """Append the buffered lines to the file as one gzip member."""
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines:
+            return
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if not os.path.exists(self.path):
+                lines.insert(0, f"{FORMAT_HEADER}\n")
+            data = gzip.compress("".join(lines).encode("utf-8"))
+            with open(self.path, "ab") as f:
+                f.write(data)
+        with self._lock:
+            self._bytes += len(data)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="access-log"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write what is buffered."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self) -> None:
+        """Flush every ``flush_interval`` seconds until stopped."""
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Could not write access log: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters of logged, dropped and written data."""
+        with self._lock:
+            return {
+                "records": self._records,
+                "dropped": self._dropped,
+                "pending": len(self._pending),
+                "bytes_written": self._bytes,
+            }
+
+
+def _read_file(path: str) -> Iterator[AccessRecord]:
+    """Yield the records of one log file in the order they were written."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            timestamp, route, code, status, latency = (
+                line.rstrip("\n").split("\t")
+            )
+            yield AccessRecord(
+                float(timestamp), route, code, int(status), float(latency)
+            )
+
+
+def _in_start_order(
+    records: Iterable[AccessRecord], window: float
+) -> Iterator[AccessRecord]:
+    """Reorder records that are out of start order by at most ``window``."""
+    heap: List[Any] = []
+    for sequence, record in enumerate(records):
+        heapq.heappush(heap, (record.timestamp, sequence, record))
+        while heap[0][0] < record.timestamp - window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def read_access_logs(
+    paths: Iterable[str], window: float = REORDER_SECONDS
+) -> Iterator[AccessRecord]:
+    """Merge access log files into one stream in start order.
+
+    Args:
+        paths: Log files, e.g. one per pod
+        window: Longest request latency in the logs, in seconds
+
+    Yields:
+        Records ordered by start time
+    """
+    return heapq.merge(
+        *[_in_start_order(_read_file(path), window) for path in paths],
+        key=lambda record: record.timestamp,
+    )
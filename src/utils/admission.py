@@ -0,0 +1,233 @@
+"""Admission control and load shedding for the container services.
+
+``AdmissionController`` caps the number of requests in flight. Requests that
+arrive while the service is at its limit wait briefly in a priority queue and
+are shed with a retry hint if no slot frees up in time. The limit itself
+adapts to observed DynamoDB latency: it grows while latency stays near its
+baseline and shrinks as latency rises, so the service stops piling work onto
+a slow backend instead of letting every thread block on it.
+
+``ClientRateLimiter`` keeps a token bucket per client for endpoints that
+need per-caller fairness (the write path).
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.rate_limit import TokenBucket
+except ModuleNotFoundError:
+    from src.utils.rate_limit import TokenBucket
+
+HIGH = "high"
+LOW = "low"
+# Share of the concurrency limit each priority may use; low-priority work
+# is shed first so that redirects keep flowing under pressure
+PRIORITY_SHARES = {HIGH: 1.0, LOW: 0.75}
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed."""
+
+    def __init__(self, retry_after: float) -> None:
+        """Initialize with the suggested retry delay in seconds."""
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Adaptive concurrency limit with a short, prioritized wait queue."""
+
+    def __init__(
+        self,
+        initial_limit: int = 32,
+        min_limit: int = 4,
+        max_limit: int = 256,
+        max_queue_delay: float = 0.1,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest the adaptive limit may go
+            max_limit: Highest the adaptive limit may go
+            max_queue_delay: Seconds a request may wait for a slot
+            latency_tolerance: Latency/baseline ratio tolerated before the
+                limit starts shrinking
+            smoothing: Weight of each new sample in the limit update
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue_delay = max_queue_delay
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiting = {HIGH: 0, LOW: 0}
+        self._baseline = 0.0
+        self._latency = 0.0
+        self._queue_delay = 0.0
+        self._admitted = 0
+        self._shed = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    def _capacity(self, priority: str) -> int:
+        """Slots available to ``priority`` under the current limit."""
+        return max(1, int(self._limit * PRIORITY_SHARES[priority]))
+
+    def _can_enter(self, priority: str) -> bool:
+        """Whether a request of ``priority`` may take a slot now."""
+        if self._in_flight >= self._capacity(priority):
+            return False
+        return priority == HIGH or self._waiting[HIGH] == 0
+
+    def acquire(self, priority: str = HIGH) -> None:
+        """Take a slot, waiting up to ``max_queue_delay`` for one.
+
+        Args:
+            priority: HIGH or LOW
+
+        Raises:
+            Overloaded: If no slot became available in time
+        """
+        arrived = time.monotonic()
+        deadline = arrived + self.max_queue_delay
+
+        with self._cond:
+            # Shed immediately when the queue alone would exceed the limit
+            if sum(self._waiting.values()) >= self._capacity(priority):
+                self._shed += 1
+                raise Overloaded(self._retry_after())
+
+            self._waiting[priority] += 1
+            try:
+                while not self._can_enter(priority):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed += 1
+                        raise Overloaded(self._retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting[priority] -= 1
+
+            self._in_flight += 1
+            self._admitted += 1
+            waited = time.monotonic() - arrived
+            self._queue_delay += (waited - self._queue_delay) * 0.1
+
+    def release(self) -> None:
+        """Return a slot taken by ``acquire``."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def observe_latency(self, seconds: float) -> None:
+        """Feed a backend latency sample into the adaptive limit.
+
+        The limit follows ``limit * baseline / latency`` (bounded by the
+        tolerance) plus ``sqrt(limit)`` headroom, so it probes upward while
+        latency is at its baseline and backs off as latency climbs.
+
+        Args:
+            seconds: Duration of one DynamoDB call
+        """
+        with self._cond:
+            if not self._latency:
+                self._latency = self._baseline = seconds
+            self._latency += (seconds - self._latency) * self.smoothing
+            # Track the no-load latency, forgetting old minimums slowly
+            self._baseline = min(
+                seconds, self._baseline + (self._latency - self._baseline)
+                * 0.01
+            )
+
+            gradient = self.latency_tolerance * self._baseline / max(
+                self._latency, 1e-6
+            )
+            gradient = max(0.5, min(1.0, gradient))
+            target = self._limit * gradient + math.sqrt(self._limit)
+            self._limit += (target - self._limit) * self.smoothing
+            self._limit = max(self.min_limit, min(self.max_limit, self._limit))
+            self._cond.notify_all()
+
+    def _retry_after(self) -> float:
+        """Suggest a retry delay based on backend latency and queueing."""
+        return max(1.0, self._latency * 10 + self._queue_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the controller state."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queued": sum(self._waiting.values()),
+                "admitted": self._admitted,
+                "shed": self._shed,
+                "queue_delay_ms": round(self._queue_delay * 1000, 3),
+                "backend_latency_ms": round(self._latency * 1000, 3),
+                "backend_baseline_ms": round(self._baseline * 1000, 3),
+            }
+
+
+class ClientRateLimiter:
+    """Per-client token buckets with a bounded client table."""
+
+    def __init__(
+        self, rate: float, burst: float, max_clients: int = 10000
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            rate: Requests per second allowed for each client
+            burst: Bucket capacity for each client
+            max_clients: Clients tracked before the least recent is evicted
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def check(self, client: str) -> Tuple[bool, float]:
+        """Take a token for ``client``.
+
+        Args:
+            client: Client identity (e.g. source IP)
+
+        Returns:
+            Tuple of (allowed, retry_after_seconds)
+        """
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, capacity=self.burst)
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+
+        if bucket.try_acquire():
+            return True, 0.0
+
+        with self._lock:
+            self.limited += 1
+        return False, max(bucket.retry_after(), 0.001)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limiter counters."""
+        with self._lock:
+            return {"clients": len(self._buckets), "limited": self.limited}
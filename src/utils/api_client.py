@@ -7,18 +7,48 @@ This client can work against different environments:
 
 The client automatically detects the environment and handles the differences
 in URL structure, response formats, and networking.
+
+Requests share one pooled keep-alive session. Idempotent GETs are hedged: if
+no response has arrived after the endpoint's recent p95 latency, a second
+request is sent and the first response wins, within a budget of extra
+requests. Connection errors and overload responses are retried with
+jittered backoff (shorten calls keep their Idempotency-Key, so retrying them
+is safe), and a circuit breaker per backend stops sending to one that keeps
+failing. ``AsyncTinyURLClient`` offers the same calls to asyncio code.
 """
 
+import asyncio
 import logging
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.tail_latency import (
+        CircuitBreaker, CircuitOpenError, LatencyTracker, backoff_delay,
+    )
+except ModuleNotFoundError:
+    from src.utils.tail_latency import (
+        CircuitBreaker, CircuitOpenError, LatencyTracker, backoff_delay,
+    )
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: rate limited, or the backend is overloaded
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Latencies an endpoint needs before its requests are hedged
+HEDGE_MIN_SAMPLES = 20
+
 
 @dataclass
 class APIResponse:
@@ -49,7 +79,19 @@ class TinyURLClient:
     Automatically handles environment differences.
     """
 
-    def __init__(self, base_url: Optional[str] = None, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        pool_size: int = 20,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2.0,
+        hedge: bool = True,
+        hedge_budget: float = 0.1,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+    ):
         """
         Initialize the API client.
 
@@ -57,8 +99,42 @@ class TinyURLClient:
             base_url: Base URL for the API. If None, auto-detects from
                      environment.
             timeout: Request timeout in seconds.
+            pool_size: Keep-alive connections kept per backend, and worker
+                threads for hedged requests.
+            max_retries: Retries after a connection error or a 429/502/
+                503/504 response.
+            backoff_base: Upper bound of the first retry delay in seconds;
+                it doubles per retry.
+            backoff_max: Largest retry delay in seconds.
+            hedge: Hedge idempotent GETs.
+            hedge_budget: Hedged requests allowed per request sent.
+            failure_threshold: Consecutive failures that open a backend's
+                circuit.
+            reset_timeout: Seconds a circuit stays open before a trial.
         """
         self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._requests = 0
+        self._retries = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._lock = threading.Lock()
+
         self.base_url = self._determine_base_url(base_url)
         self.shorten_endpoint = f"{self.base_url}/shorten"
 
@@ -100,34 +176,266 @@ class TinyURLClient:
         self,
         method: str,
         url: str,
+        endpoint: Optional[str] = None,
         **kwargs
     ) -> APIResponse:
-        """Make HTTP request and return standardized response."""
+        """Make HTTP request and return standardized response.
+
+        GETs are hedged, and failed attempts retried with backoff.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            endpoint: Name the latency is tracked under (default: method)
+            kwargs: Passed to ``requests.Session.request``
+
+        Raises:
+            CircuitOpenError: If the backend's circuit is open
+            ConnectionError: If the last attempt could not connect
+        """
+        endpoint = endpoint or method
+        self._count("_requests")
+        retries = 0
+        while True:
+            try:
+                if method == "GET" and self.hedge:
+                    response = self._hedged(method, url, endpoint, kwargs)
+                else:
+                    response = self._attempt(method, url, endpoint, kwargs)
+            except CircuitOpenError:
+                raise
+            except ConnectionError:
+                delay = self._retry_delay(retries, None)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(retries, response)
+                if delay is None:
+                    return response
+            retries += 1
+            time.sleep(delay)
+
+    def _attempt(
+        self, method: str, url: str, endpoint: str, kwargs: Dict[str, Any]
+    ) -> APIResponse:
+        """Send one request through the backend's circuit breaker."""
+        breaker = self._breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"Circuit open for {self._origin(url)}; not sending {url}"
+            )
+        started = time.monotonic()
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 timeout=self.timeout,
                 **kwargs
             )
-
-            # Try to parse JSON, but don't fail if it's not JSON
-            json_data = None
-            try:
-                json_data = response.json()
-            except (ValueError, requests.exceptions.JSONDecodeError):
-                pass
-
-            return APIResponse(
-                status_code=response.status_code,
-                json_data=json_data,
-                headers=dict(response.headers),
-                text=response.text
-            )
         except requests.exceptions.RequestException as e:
+            breaker.record_failure()
             # Handle network errors
             raise ConnectionError(f"Failed to connect to {url}: {e}")
 
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            self.latency.record(endpoint, time.monotonic() - started)
+
+        # Try to parse JSON, but don't fail if it's not JSON
+        json_data = None
+        try:
+            json_data = response.json()
+        except (ValueError, requests.exceptions.JSONDecodeError):
+            pass
+
+        return APIResponse(
+            status_code=response.status_code,
+            json_data=json_data,
+            headers=dict(response.headers),
+            text=response.text
+        )
+
+    def _hedged(
+        self, method: str, url: str, endpoint: str, kwargs: Dict[str, Any]
+    ) -> APIResponse:
+        """Send a request, and a second one if the first is slow.
+
+        The first good response wins; the slower request is left to finish
+        on its worker thread. If neither is good, the primary's outcome is
+        returned or raised.
+        """
+        delay = self.hedge_delay(endpoint)
+        if delay is None:
+            return self._attempt(method, url, endpoint, kwargs)
+
+        executor = self._workers()
+        primary = executor.submit(self._attempt, method, url, endpoint, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        hedge = executor.submit(self._attempt, method, url, endpoint, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if self._good(future):
+                    if future is hedge:
+                        self._count("_hedge_wins")
+                    return future.result()
+        return primary.result()
+
+    @staticmethod
+    def _good(future: Any) -> bool:
+        """Whether a finished attempt got a non-5xx response."""
+        return (
+            future.exception() is None
+            and future.result().status_code < 500
+        )
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Return how long a GET waits before it is hedged.
+
+        Args:
+            endpoint: Endpoint name
+
+        Returns:
+            The endpoint's recent p95 latency in seconds, or None until it
+            has enough samples to hedge
+        """
+        return self.latency.percentile(
+            endpoint, 0.95, min_samples=HEDGE_MIN_SAMPLES
+        )
+
+    def _take_hedge(self) -> bool:
+        """Count a hedge if the budget allows one more."""
+        with self._lock:
+            if self._hedges + 1 > self.hedge_budget * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def _retry_delay(
+        self, retries: int, response: Optional[APIResponse]
+    ) -> Optional[float]:
+        """Return the delay before the next retry, or None to stop.
+
+        Args:
+            retries: Retries made so far
+            response: The last response, or None after a connection error
+        """
+        if retries >= self.max_retries:
+            return None
+        if response is not None and (
+            response.status_code not in RETRY_STATUSES
+        ):
+            return None
+        delay = backoff_delay(retries, self.backoff_base, self.backoff_max)
+        if response is not None:
+            retry_after = (response.headers or {}).get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+        self._count("_retries")
+        return delay
+
+    def _count(self, counter: str) -> None:
+        """Increment one of the request counters."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        """Return the scheme and host:port a URL is sent to."""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of a URL's backend."""
+        origin = self._origin(url)
+        with self._lock:
+            breaker = self._breakers.get(origin)
+            if breaker is None:
+                breaker = self._breakers[origin] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def _workers(self) -> ThreadPoolExecutor:
+        """Return the worker pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix="tiny-url-client",
+                )
+            return self._executor
+
+    def stats(self) -> Dict[str, Any]:
+        """Return latency percentiles and retry, hedge and circuit counters.
+
+        Returns:
+            Per-endpoint request counts and p50/p95/p99 latencies (ms), the
+            requests, retries, hedges and winning hedges sent, and the
+            circuit state per backend
+        """
+        with self._lock:
+            counters = {
+                "requests": self._requests,
+                "retries": self._retries,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+            }
+            breakers = dict(self._breakers)
+        return {
+            "endpoints": self.latency.stats(),
+            **counters,
+            "circuits": {
+                origin: breaker.state for origin, breaker in breakers.items()
+            },
+        }
+
+    def close(self) -> None:
+        """Close pooled connections and stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self) -> "TinyURLClient":
+        """Return the client for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the client."""
+        self.close()
+
+    def _service_url(self, service: str) -> str:
+        """Return the base URL of a service ("shorten" or "redirect")."""
+        if service == "shorten":
+            return self.base_url
+        if service == "redirect":
+            return self.redirect_base
+        raise ValueError(f"Unknown service: {service}")
+
+    @staticmethod
+    def _shorten_kwargs(
+        url: str, custom_code: Optional[str], idempotency_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Return the body and headers of a shorten request."""
+        payload = {"url": url}
+        if custom_code:
+            payload["custom_code"] = custom_code
+        return {
+            "json": payload,
+            "headers": {
+                "Content-Type": "application/json",
+                "Idempotency-Key": idempotency_key or str(uuid.uuid4()),
+            },
+        }
+
     def health_check(self, service: str = "shorten") -> APIResponse:
         """
         Check health of a specific service.
@@ -138,14 +446,9 @@ class TinyURLClient:
         Returns:
             APIResponse with health status
         """
-        if service == "shorten":
-            url = f"{self.base_url}/health"
-        elif service == "redirect":
-            url = f"{self.redirect_base}/health"
-        else:
-            raise ValueError(f"Unknown service: {service}")
-
-        return self._make_request("GET", url)
+        return self._make_request(
+            "GET", f"{self._service_url(service)}/health", f"{service}_health"
+        )
 
     def get_service_info(self, service: str = "shorten") -> APIResponse:
         """
@@ -157,39 +460,37 @@ class TinyURLClient:
         Returns:
             APIResponse with service information
         """
-        if service == "shorten":
-            url = self.base_url
-        elif service == "redirect":
-            url = self.redirect_base
-        else:
-            raise ValueError(f"Unknown service: {service}")
-
-        return self._make_request("GET", url)
+        return self._make_request(
+            "GET", self._service_url(service), f"{service}_info"
+        )
 
     def shorten_url(
         self,
         url: str,
-        custom_code: Optional[str] = None
+        custom_code: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> APIResponse:
         """
         Shorten a URL.
 
+        Every call is sent with an Idempotency-Key header, so the service
+        answers a resent request with the original response instead of
+        creating a second short URL. Retries reuse the key.
+
         Args:
             url: The URL to shorten
             custom_code: Optional custom short code
+            idempotency_key: Key to send; pass the same key when retrying a
+                call yourself. A new one is generated if omitted.
 
         Returns:
             APIResponse with shortened URL data
         """
-        payload = {"url": url}
-        if custom_code:
-            payload["custom_code"] = custom_code
-
         return self._make_request(
             "POST",
             self.shorten_endpoint,
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            "shorten",
+            **self._shorten_kwargs(url, custom_code, idempotency_key)
         )
 
     def redirect(
@@ -211,6 +512,7 @@ class TinyURLClient:
         return self._make_request(
             "GET",
             url,
+            "redirect",
             allow_redirects=follow_redirects
         )
 
@@ -244,3 +546,170 @@ class TinyURLClient:
         env_type = "local" if self.is_local else "deployed"
         return (f"TinyURLClient(base_url='{self.base_url}', "
                 f"environment='{env_type}')")
+
+
+class AsyncTinyURLClient:
+    """
+    asyncio variant of TinyURLClient for high fan-out callers.
+
+    Each attempt runs on the wrapped client's worker threads and pooled
+    session, so both clients share connections, latency windows and circuit
+    breakers; hedging and retry delays are awaited instead of blocking.
+    Up to ``pool_size`` requests are sent at once; more wait for a worker.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        **options: Any,
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            base_url: Base URL for the API. If None, auto-detects from
+                     environment.
+            timeout: Request timeout in seconds.
+            options: Other TinyURLClient options (pool size, retries,
+                hedging and circuit breaker settings).
+        """
+        self.client = TinyURLClient(base_url, timeout, **options)
+
+    async def _make_request(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str] = None,
+        **kwargs
+    ) -> APIResponse:
+        """Make HTTP request and return standardized response.
+
+        Same policy as ``TinyURLClient._make_request``.
+        """
+        client = self.client
+        endpoint = endpoint or method
+        client._count("_requests")
+        retries = 0
+        while True:
+            try:
+                if method == "GET" and client.hedge:
+                    response = await self._hedged(method, url, endpoint, kwargs)
+                else:
+                    response = await self._attempt(
+                        method, url, endpoint, kwargs
+                    )
+            except CircuitOpenError:
+                raise
+            except ConnectionError:
+                delay = client._retry_delay(retries, None)
+                if delay is None:
+                    raise
+            else:
+                delay = client._retry_delay(retries, response)
+                if delay is None:
+                    return response
+            retries += 1
+            await asyncio.sleep(delay)
+
+    def _attempt(
+        self, method: str, url: str, endpoint: str, kwargs: Dict[str, Any]
+    ) -> "asyncio.Future[APIResponse]":
+        """Send one request on a worker thread."""
+        return asyncio.get_running_loop().run_in_executor(
+            self.client._workers(), self.client._attempt,
+            method, url, endpoint, kwargs,
+        )
+
+    async def _hedged(
+        self, method: str, url: str, endpoint: str, kwargs: Dict[str, Any]
+    ) -> APIResponse:
+        """Send a request, and a second one if the first is slow."""
+        client = self.client
+        delay = client.hedge_delay(endpoint)
+        primary = self._attempt(method, url, endpoint, kwargs)
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done or not client._take_hedge():
+            return await primary
+
+        hedge = self._attempt(method, url, endpoint, kwargs)
+        pending: Any = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                if client._good(future):
+                    if future is hedge:
+                        client._count("_hedge_wins")
+                    # Stop waiting for the loser; its thread still finishes
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+        return primary.result()
+
+    async def health_check(self, service: str = "shorten") -> APIResponse:
+        """Check health of a specific service ("shorten" or "redirect")."""
+        return await self._make_request(
+            "GET", f"{self.client._service_url(service)}/health",
+            f"{service}_health",
+        )
+
+    async def get_service_info(self, service: str = "shorten") -> APIResponse:
+        """Get service information and available endpoints."""
+        return await self._make_request(
+            "GET", self.client._service_url(service), f"{service}_info"
+        )
+
+    async def shorten_url(
+        self,
+        url: str,
+        custom_code: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> APIResponse:
+        """Shorten a URL; see ``TinyURLClient.shorten_url``."""
+        return await self._make_request(
+            "POST",
+            self.client.shorten_endpoint,
+            "shorten",
+            **self.client._shorten_kwargs(url, custom_code, idempotency_key)
+        )
+
+    async def redirect(
+        self,
+        short_code: str,
+        follow_redirects: bool = False
+    ) -> APIResponse:
+        """Test redirection for a short code."""
+        return await self._make_request(
+            "GET",
+            f"{self.client.redirect_base}/{short_code}",
+            "redirect",
+            allow_redirects=follow_redirects
+        )
+
+    def extract_short_code(self, shorten_response: APIResponse) -> str:
+        """Extract short code from a shorten response."""
+        return self.client.extract_short_code(shorten_response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the wrapped client's latency and request statistics."""
+        return self.client.stats()
+
+    async def aclose(self) -> None:
+        """Close pooled connections and stop the worker threads."""
+        self.client.close()
+
+    async def __aenter__(self) -> "AsyncTinyURLClient":
+        """Return the client for use in an async with statement."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the client."""
+        await self.aclose()
+
+    def __repr__(self) -> str:
+        """Return string representation of the client."""
+        return f"Async{self.client!r}"
@@ -1,24 +1,108 @@
-"""Utilities for API Gateway response handling."""
+"""Utilities for API Gateway event and response handling.
 
+Handlers are invoked by REST APIs (payload format 1.0), HTTP APIs (payload
+format 2.0) and the container apps, which build 1.0-style events. Both
+formats carry ``pathParameters`` and ``body`` under the same keys, but bodies
+may be null or base64-encoded, so handlers read them through these helpers.
+Responses in the 1.0 shape are accepted by both API types.
+"""
+
+import base64
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+
+def is_http_api_event(event: Dict[str, Any]) -> bool:
+    """Check whether an event uses the HTTP API payload format 2.0.
+
+    Args:
+        event: API Gateway event
+
+    Returns:
+        True for payload format 2.0 events
+    """
+    return event.get("version") == "2.0"
+
+
+def get_path_parameter(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Read a path parameter from a 1.0 or 2.0 event.
+
+    Args:
+        event: API Gateway event
+        name: Path parameter name
+
+    Returns:
+        The parameter value, or None if it is missing
+    """
+    return (event.get("pathParameters") or {}).get(name)
+
+
+def get_query_parameter(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Read a query string parameter from a 1.0 or 2.0 event.
+
+    Args:
+        event: API Gateway event
+        name: Parameter name
+
+    Returns:
+        The parameter value, or None if it is missing
+    """
+    return (event.get("queryStringParameters") or {}).get(name)
+
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Read a request header from a 1.0 or 2.0 event.
+
+    Header names are matched case-insensitively, since 2.0 events lowercase
+    them and 1.0 events keep the client's spelling.
+
+    Args:
+        event: API Gateway event
+        name: Header name
+
+    Returns:
+        The header value, or None if it is missing
+    """
+    name = name.lower()
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def get_body(event: Dict[str, Any]) -> str:
+    """Read the request body from a 1.0 or 2.0 event.
+
+    Args:
+        event: API Gateway event
+
+    Returns:
+        The decoded body, or an empty string if there is none
+    """
+    body = event.get("body") or ""
+    if body and event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    return body
 
 
 def create_response(
-    status_code: int, body: Dict[str, Any]
+    status_code: int,
+    body: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     """Create API Gateway response with given status code and body.
 
     Args:
         status_code: HTTP status code to return
         body: Response body to serialize to JSON
+        headers: Additional response headers
 
     Returns:
         Formatted API Gateway response dictionary
     """
     return {
         "statusCode": status_code,
-        "headers": {"Content-Type": "application/json"},
+        "headers": {"Content-Type": "application/json", **(headers or {})},
         "body": json.dumps(body),
     }
 
@@ -30,7 +114,8 @@ def create_redirect_response(
 
     Args:
         location: URL to redirect to
-        cache_ttl: Cache TTL in seconds (default: 86400 - 1 day)
+        cache_ttl: Cache TTL in seconds (default: 86400 - 1 day); 0 or
+            less forbids caching
 
     Returns:
         Formatted API Gateway response dictionary for redirection
@@ -39,7 +124,10 @@ def create_redirect_response(
         "statusCode": 302,
         "headers": {
             "Location": location,
-            "Cache-Control": f"public, max-age={cache_ttl}"
+            "Cache-Control": (
+                f"public, max-age={cache_ttl}" if cache_ttl > 0
+                else "no-store"
+            )
         },
         "body": ""
     }
@@ -0,0 +1,476 @@
+"""Streaming bulk import of existing short links into DynamoDB.
+
+Rows of ``(short_code, long_url, expires_at)`` are read from a CSV or JSONL
+file one at a time, validated with the same rules as ``POST /shorten`` and
+written through a pool of ``BatchWriteItem`` workers. Memory stays bounded by
+the size of the work queue regardless of the input size, and a checkpoint
+file makes an interrupted import resumable. Batches finish out of order, so
+the checkpoint also lists the rows rejected past its line, which a resumed
+run skips instead of rejecting (and counting) them again.
+
+Like ``POST /shorten``, an import never takes over a code that already
+exists: each batch is first checked with one batched read, and rows whose
+code is taken are rejected with reason ``exists``. Rows written by an
+earlier, interrupted run of the same import carry the import's creation
+date and are counted as written instead.
+"""
+
+import csv
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import BATCH_WRITE_MAX_ITEMS, DynamoDBOperations
+    from utils.rate_limit import TokenBucket
+    from utils.url_validator import validate_short_code, validate_url
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import BATCH_WRITE_MAX_ITEMS, DynamoDBOperations
+    from src.utils.rate_limit import TokenBucket
+    from src.utils.url_validator import validate_short_code, validate_url
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+}
+EXISTS = "exists"
+
+
+def _backoff(attempt: int) -> None:
+    """Sleep with exponential backoff and full jitter, capped at 5 seconds."""
+    time.sleep(random.uniform(0, min(5.0, 0.05 * 2 ** attempt)))
+
+
+@dataclass
+class ImportStats:
+    """Counters describing the progress of an import."""
+
+    read: int = 0
+    written: int = 0
+    rejected: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Items written per second."""
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class _Batch:
+    """A unit of work covering an inclusive range of input lines."""
+
+    seq: int
+    first_line: int
+    last_line: int
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    lines: Dict[str, int] = field(default_factory=dict)
+
+
+def iter_rows(
+    path: str, fmt: Optional[str] = None
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """Stream rows from a CSV or JSONL file.
+
+    Args:
+        path: Path of the input file
+        fmt: "csv" or "jsonl" (default: inferred from the file extension)
+
+    Yields:
+        Tuples of (line_number, row, parse_error)
+    """
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row, ""
+            return
+
+        for line_no, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield line_no, None, "Invalid JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "Row must be a JSON object"
+                continue
+            yield line_no, row, ""
+
+
+def parse_expires_at(value: Any) -> Optional[int]:
+    """Convert an epoch number or ISO-8601 string to a Unix timestamp.
+
+    Args:
+        value: Raw ``expires_at`` value from the input row
+
+    Returns:
+        The Unix timestamp, or None when the value is empty
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    text = str(value).strip()
+    try:
+        return int(float(text))
+    except ValueError:
+        pass
+
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def validate_row(
+    row: Dict[str, Any], now: int
+) -> Tuple[bool, Any]:
+    """Validate an input row.
+
+    Args:
+        row: Row with short_code, long_url and optional expires_at
+        now: Current Unix timestamp
+
+    Returns:
+        Tuple of (is_valid, (short_code, long_url, expires_at) or error)
+    """
+    short_code = str(row.get("short_code") or "").strip()
+    long_url = str(row.get("long_url") or "").strip()
+
+    is_valid, error = validate_short_code(short_code)
+    if not is_valid:
+        return False, error
+
+    is_valid, error = validate_url(long_url)
+    if not is_valid:
+        return False, error
+
+    try:
+        expires_at = parse_expires_at(row.get("expires_at"))
+    except ValueError:
+        return False, "Invalid expires_at"
+
+    if expires_at is not None and expires_at <= now:
+        return False, "Link has already expired"
+
+    return True, (short_code, long_url, expires_at)
+
+
+class BulkImporter:
+    """Import URL mappings from a file with parallel batch writers."""
+
+    def __init__(
+        self,
+        dynamo_ops: DynamoDBOperations,
+        workers: int = 4,
+        writes_per_second: float = 500.0,
+        checkpoint_path: Optional[str] = None,
+        rejects_path: Optional[str] = None,
+        max_attempts: int = 8,
+        progress_interval: float = 10.0,
+    ) -> None:
+        """Initialize the importer.
+
+        Args:
+            dynamo_ops: DynamoDB operations for the target table
+            workers: Number of concurrent BatchWriteItem workers
+            writes_per_second: Maximum item writes per second
+            checkpoint_path: File used to record and resume progress
+            rejects_path: JSONL file that receives rejected rows
+            max_attempts: Write attempts per batch before giving up
+            progress_interval: Seconds between progress log lines
+        """
+        self.dynamo_ops = dynamo_ops
+        self.workers = workers
+        self.bucket = TokenBucket(
+            writes_per_second,
+            capacity=max(writes_per_second, BATCH_WRITE_MAX_ITEMS),
+        )
+        self.checkpoint_path = checkpoint_path
+        self.rejects_path = rejects_path
+        self.max_attempts = max_attempts
+        self.progress_interval = progress_interval
+
+        self.stats = ImportStats()
+        self._lock = threading.Lock()
+        self._rejects = None
+        self._source = ""
+        self._creation_date = ""
+        self._done: Dict[int, int] = {}
+        self._next_seq = 0
+        self._watermark = 0
+        # Rejected lines past the watermark, already counted and recorded
+        self._rejected_lines: Set[int] = set()
+        self._last_saved = 0.0
+        self._started = 0.0
+
+    def run(self, path: str, fmt: Optional[str] = None) -> ImportStats:
+        """Import every row of ``path`` not covered by the checkpoint.
+
+        Args:
+            path: Path of the CSV or JSONL file
+            fmt: "csv" or "jsonl" (default: inferred from the extension)
+
+        Returns:
+            Final import statistics
+        """
+        self._source = os.path.abspath(path)
+        self._load_checkpoint()
+        self._started = time.monotonic() - self.stats.elapsed
+        now = int(time.time())
+
+        work: "queue.Queue[Optional[_Batch]]" = queue.Queue(
+            maxsize=self.workers * 2
+        )
+        threads = [
+            threading.Thread(target=self._worker, args=(work,), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        if self.rejects_path:
+            self._rejects = open(self.rejects_path, "a", encoding="utf-8")
+
+        try:
+            seq = 0
+            last_line = self._watermark
+            batch = _Batch(seq, last_line + 1, last_line)
+            next_report = time.monotonic() + self.progress_interval
+
+            for line_no, row, error in iter_rows(path, fmt):
+                if (line_no <= self._watermark
+                        or line_no in self._rejected_lines):
+                    continue
+
+                last_line = line_no
+                with self._lock:
+                    self.stats.read += 1
+
+                if row is not None:
+                    is_valid, result = validate_row(row, now)
+                    error = "" if is_valid else result
+                if error:
+                    self._reject(line_no, row, error)
+                else:
+                    short_code, long_url, expires_at = result
+                    # Last row wins for duplicate codes inside a batch
+                    batch.lines[short_code] = line_no
+                    batch.items = [
+                        item for item in batch.items
+                        if item["short_code"] != short_code
+                    ]
+                    batch.items.append(self.dynamo_ops.build_item(
+                        short_code, long_url, expires_at,
+                        creation_date=self._creation_date,
+                    ))
+
+                batch.last_line = line_no
+                if len(batch.items) == BATCH_WRITE_MAX_ITEMS:
+                    work.put(batch)
+                    seq += 1
+                    batch = _Batch(seq, line_no + 1, line_no)
+
+                if time.monotonic() >= next_report:
+                    self._report()
+                    next_report = time.monotonic() + self.progress_interval
+
+            batch.last_line = last_line
+            work.put(batch)
+        finally:
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+            if self._rejects:
+                self._rejects.close()
+                self._rejects = None
+
+        self._save_checkpoint(force=True)
+        self._report()
+        return self.stats
+
+    def _worker(self, work: "queue.Queue[Optional[_Batch]]") -> None:
+        """Write batches from the queue until a sentinel arrives."""
+        while True:
+            batch = work.get()
+            if batch is None:
+                return
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Batch {batch.seq} failed: {e}")
+                for item in batch.items:
+                    self._reject(
+                        batch.lines[item["short_code"]], item,
+                        f"Write failed: {e}",
+                    )
+            self._complete(batch)
+
+    def _existing(self, batch: _Batch) -> Dict[str, Dict[str, Any]]:
+        """Read the mappings that already exist for a batch's codes."""
+        codes = [item["short_code"] for item in batch.items]
+        attempt = 0
+        while True:
+            try:
+                return self.dynamo_ops.get_url_mappings(codes)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "")
+                attempt += 1
+                if code not in RETRYABLE_ERRORS or (
+                    attempt >= self.max_attempts
+                ):
+                    raise
+            with self._lock:
+                self.stats.retries += 1
+            _backoff(attempt)
+
+    def _write_batch(self, batch: _Batch) -> None:
+        """Write a batch, retrying unprocessed items with backoff.
+
+        Codes that already exist are rejected, except those this import
+        wrote before it was interrupted.
+        """
+        existing = self._existing(batch) if batch.items else {}
+        pending = []
+        for item in batch.items:
+            current = existing.get(item["short_code"])
+            if current is None:
+                pending.append(item)
+            elif current["creation_date"] == item["creation_date"]:
+                with self._lock:
+                    self.stats.written += 1
+            else:
+                self._reject(batch.lines[item["short_code"]], item, EXISTS)
+        attempt = 0
+        while pending:
+            self.bucket.acquire(len(pending))
+            try:
+                unprocessed = self.dynamo_ops.batch_write_items(pending)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "")
+                if code not in RETRYABLE_ERRORS:
+                    raise
+                unprocessed = pending
+
+            with self._lock:
+                self.stats.written += len(pending) - len(unprocessed)
+                if unprocessed:
+                    self.stats.retries += 1
+
+            pending = unprocessed
+            attempt += 1
+            if pending and attempt >= self.max_attempts:
+                for item in pending:
+                    self._reject(
+                        batch.lines[item["short_code"]], item,
+                        "Unprocessed after max attempts",
+                    )
+                return
+            if pending:
+                _backoff(attempt)
+
+    def _complete(self, batch: _Batch) -> None:
+        """Advance the contiguous watermark once earlier batches finish."""
+        with self._lock:
+            self._done[batch.seq] = batch.last_line
+            while self._next_seq in self._done:
+                self._watermark = max(
+                    self._watermark, self._done.pop(self._next_seq)
+                )
+                self._next_seq += 1
+        self._save_checkpoint()
+
+    def _reject(
+        self, line_no: int, row: Optional[Dict[str, Any]], reason: str
+    ) -> None:
+        """Count a rejected row and append it to the rejects file."""
+        with self._lock:
+            self.stats.rejected += 1
+            self._rejected_lines.add(line_no)
+            if self._rejects:
+                record = {"line": line_no, "reason": reason, "row": row}
+                self._rejects.write(json.dumps(record, default=str) + "\n")
+
+    def _report(self) -> None:
+        """Log a progress line."""
+        with self._lock:
+            stats = self.stats
+            stats.elapsed = time.monotonic() - self._started
+            logger.info(
+                f"Bulk import: read={stats.read} written={stats.written} "
+                f"rejected={stats.rejected} retries={stats.retries} "
+                f"line={self._watermark} rate={stats.rate:.0f}/s"
+            )
+
+    def _load_checkpoint(self) -> None:
+        """Restore progress from the checkpoint file if there is one."""
+        self._creation_date = datetime.utcnow().isoformat()
+        if not self.checkpoint_path or not os.path.exists(
+            self.checkpoint_path
+        ):
+            return
+
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+
+        if checkpoint.get("source") != self._source:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_path} belongs to "
+                f"{checkpoint.get('source')}, not {self._source}"
+            )
+
+        # Reusing the original sort key keeps re-written rows idempotent
+        self._creation_date = checkpoint["creation_date"]
+        self._watermark = checkpoint["line"]
+        self._rejected_lines = set(checkpoint.get("rejected_lines", []))
+        self.stats = ImportStats(**checkpoint.get("stats", {}))
+        logger.info(f"Resuming bulk import after line {self._watermark}")
+
+    def _save_checkpoint(self, force: bool = False) -> None:
+        """Atomically persist the watermark, at most once per second."""
+        if not self.checkpoint_path:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_saved < 1.0:
+                return
+            self._last_saved = now
+            self.stats.elapsed = now - self._started
+            self._rejected_lines = {
+                line for line in self._rejected_lines
+                if line > self._watermark
+            }
+            checkpoint = {
+                "source": self._source,
+                "line": self._watermark,
+                "rejected_lines": sorted(self._rejected_lines),
+                "creation_date": self._creation_date,
+                "stats": asdict(self.stats),
+            }
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_path, self.checkpoint_path)
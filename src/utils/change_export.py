@@ -0,0 +1,326 @@
+"""Incremental export of URL mappings for downstream analytics.
+
+Every mapping stores the hour it was created in a ``created_hour``
+attribute, and the ``created-index`` GSI (``created_hour`` plus
+``creation_date``) lists each hour's mappings in order. An export queries
+the hours after its watermark, so its cost follows the number of new
+mappings rather than the table size, and its reads draw on the index's
+capacity instead of the base table that serves redirects.
+
+Mappings are never updated in place (a reclaimed code is a new item with a
+new creation date), so the mappings created after the watermark are all the
+mappings that changed; expiry is carried by ``expires_at``.
+
+Rows are written as gzip-compressed NDJSON or Parquet chunks of bounded
+size. The position reached is saved after each chunk and a chunk is always
+rewritten under the same name, so an interrupted export resumes without gaps
+or duplicates.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import BUCKET_FORMAT, created_hour
+    from utils.rate_limit import TokenBucket
+    from utils.url_codec import decode_item
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import BUCKET_FORMAT, created_hour
+    from src.utils.rate_limit import TokenBucket
+    from src.utils.url_codec import decode_item
+
+logger = logging.getLogger(__name__)
+
+CREATED_INDEX_NAME = "created-index"
+FORMATS = ("ndjson", "parquet")
+# Uncompressed size at which a chunk is closed
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+# Mappings newer than this may not have reached the index yet
+DEFAULT_SETTLE_SECONDS = 60
+
+
+def read_capacity_share(table: Any, share: float) -> float:
+    """Return a share of the created index's provisioned read capacity.
+
+    Args:
+        table: boto3 Table of the URL mappings
+        share: Fraction of the index's read capacity units, e.g. 0.2
+
+    Returns:
+        Read capacity units per second the export may consume
+
+    Raises:
+        ValueError: If the index is missing or billed on demand
+    """
+    for index in table.global_secondary_indexes or []:
+        if index["IndexName"] != CREATED_INDEX_NAME:
+            continue
+        units = index.get("ProvisionedThroughput", {}).get(
+            "ReadCapacityUnits", 0
+        )
+        if not units:
+            raise ValueError(
+                f"{CREATED_INDEX_NAME} has no provisioned read capacity; "
+                "set a fixed rate instead"
+            )
+        return units * share
+    raise ValueError(f"{table.name} has no {CREATED_INDEX_NAME}")
+
+
+def _pyarrow() -> Any:
+    """Return ``pyarrow``, which only Parquet output needs."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ValueError("Parquet output requires pyarrow (pip install "
+                         "pyarrow)")
+    return pyarrow
+
+
+@dataclass
+class ExportStats:
+    """Counters describing an export run."""
+
+    exported: int = 0
+    chunks: int = 0
+    bytes_written: int = 0
+    queries: int = 0
+    consumed_rcu: float = 0.0
+    throttled_seconds: float = 0.0
+    elapsed: float = 0.0
+
+
+class ChangeExporter:
+    """Export the mappings created since a watermark in bounded chunks."""
+
+    def __init__(
+        self,
+        table: Any,
+        output_dir: str,
+        watermark_path: Optional[str] = None,
+        fmt: str = "ndjson",
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        max_rcu: float = 50.0,
+        page_size: int = 500,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            table: boto3 Table of the URL mappings
+            output_dir: Directory receiving the chunks
+            watermark_path: Progress file (default: watermark.json in
+                output_dir)
+            fmt: "ndjson" (gzip-compressed) or "parquet"
+            chunk_bytes: Uncompressed size at which a chunk is closed
+            max_rcu: Read capacity units consumed per second, at most
+            page_size: Items read per query
+            settle_seconds: Age below which mappings are left for the next
+                run, as the index may not have them yet
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {', '.join(FORMATS)}")
+        if fmt == "parquet":
+            _pyarrow()
+
+        self.table = table
+        self.output_dir = output_dir
+        self.watermark_path = watermark_path or os.path.join(
+            output_dir, "watermark.json"
+        )
+        self.fmt = fmt
+        self.chunk_bytes = chunk_bytes
+        self.bucket = TokenBucket(max_rcu)
+        self.page_size = page_size
+        self.settle_seconds = settle_seconds
+
+        self.stats = ExportStats()
+        self._position: Dict[str, Optional[str]] = {}
+        self._chunk = 0
+
+    def run(
+        self, since: Optional[str] = None, until: Optional[str] = None
+    ) -> ExportStats:
+        """Export every mapping created after the watermark.
+
+        Args:
+            since: ISO timestamp to start after when there is no watermark
+            until: ISO timestamp to stop at (default: now minus the settle
+                time)
+
+        Returns:
+            Statistics of this run
+
+        Raises:
+            ValueError: If there is no watermark and ``since`` is missing or
+                invalid
+        """
+        started = time.monotonic()
+        self._load_watermark(since)
+        until = until or (
+            datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+        ).isoformat()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        rows: List[Dict[str, Any]] = []
+        size = 0
+        for row in self._changes(until):
+            rows.append(row)
+            size += len(json.dumps(row, separators=(",", ":"))) + 1
+            self._position = {
+                "creation_date": row["creation_date"],
+                "short_code": row["short_code"],
+            }
+            if size >= self.chunk_bytes:
+                self._write_chunk(rows)
+                rows, size = [], 0
+
+        if rows:
+            self._write_chunk(rows)
+        # Everything up to ``until`` is exported, even the empty hours
+        if self._position["creation_date"] < until:
+            self._position = {"creation_date": until, "short_code": None}
+        self._save_watermark()
+
+        self.stats.elapsed = time.monotonic() - started
+        logger.info(
+            f"Change export: exported={self.stats.exported} "
+            f"chunks={self.stats.chunks} "
+            f"rcu={self.stats.consumed_rcu:.1f} "
+            f"throttled={self.stats.throttled_seconds:.1f}s "
+            f"until={until}"
+        )
+        return self.stats
+
+    def _changes(self, until: str) -> Iterator[Dict[str, Any]]:
+        """Yield the mappings after the position, oldest first."""
+        after = self._position["creation_date"]
+        # A position without a code is a time whose rows were all exported
+        skip_after = not self._position["short_code"]
+        hour = datetime.strptime(created_hour(after), BUCKET_FORMAT)
+        last = datetime.strptime(created_hour(until), BUCKET_FORMAT)
+        first = True
+        while hour <= last:
+            kwargs: Dict[str, Any] = {
+                "IndexName": CREATED_INDEX_NAME,
+                "KeyConditionExpression": (
+                    "created_hour = :hour AND creation_date <= :until"
+                ),
+                "ExpressionAttributeValues": {
+                    ":hour": hour.strftime(BUCKET_FORMAT), ":until": until,
+                },
+                "Limit": self.page_size,
+                "ReturnConsumedCapacity": "TOTAL",
+            }
+            if first and not skip_after:
+                # Resume right after the last exported row
+                kwargs["ExclusiveStartKey"] = {
+                    "created_hour": kwargs["ExpressionAttributeValues"][
+                        ":hour"
+                    ],
+                    "creation_date": after,
+                    "short_code": self._position["short_code"],
+                }
+            elif first:
+                kwargs["KeyConditionExpression"] = (
+                    "created_hour = :hour AND "
+                    "creation_date BETWEEN :after AND :until"
+                )
+                kwargs["ExpressionAttributeValues"][":after"] = after
+
+            while True:
+                response = self.table.query(**kwargs)
+                consumed = response.get("ConsumedCapacity", {}).get(
+                    "CapacityUnits", 0.0
+                )
+                self.stats.queries += 1
+                self.stats.consumed_rcu += consumed
+                self.stats.throttled_seconds += self.bucket.acquire(consumed)
+
+                for item in response.get("Items", []):
+                    item = decode_item(item)
+                    if skip_after and item["creation_date"] == after:
+                        continue
+                    yield {
+                        "short_code": item["short_code"],
+                        "long_url": item.get("long_url"),
+                        "creation_date": item["creation_date"],
+                        "expires_at": int(item["expires_at"])
+                        if item.get("expires_at") else None,
+                        "domain": item.get("domain"),
+                    }
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+            first = False
+            hour += timedelta(hours=1)
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        """Write one chunk atomically, then save the position it reaches."""
+        extension = "parquet" if self.fmt == "parquet" else "ndjson.gz"
+        path = os.path.join(
+            self.output_dir, f"changes-{self._chunk:06d}.{extension}"
+        )
+        temporary = f"{path}.tmp"
+        if self.fmt == "parquet":
+            pa = _pyarrow()
+            schema = pa.schema([
+                ("short_code", pa.string()),
+                ("long_url", pa.string()),
+                ("creation_date", pa.string()),
+                ("expires_at", pa.int64()),
+                ("domain", pa.string()),
+            ])
+            pa.parquet.write_table(
+                pa.Table.from_pylist(rows, schema=schema), temporary,
+                compression="zstd",
+            )
+        else:
+            with gzip.open(temporary, "wt", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        os.replace(temporary, path)
+
+        self._chunk += 1
+        self.stats.chunks += 1
+        self.stats.exported += len(rows)
+        self.stats.bytes_written += os.path.getsize(path)
+        self._save_watermark()
+
+    def _load_watermark(self, since: Optional[str]) -> None:
+        """Restore the position and chunk number from the watermark file."""
+        if os.path.exists(self.watermark_path):
+            with open(self.watermark_path, encoding="utf-8") as f:
+                watermark = json.load(f)
+            self._position = watermark["position"]
+            self._chunk = watermark["chunk"]
+            logger.info(f"Resuming change export after {self._position}")
+            return
+        if not since:
+            raise ValueError(
+                "No watermark found; give the time to export from"
+            )
+        start = datetime.fromisoformat(since)
+        if start.tzinfo:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        self._position = {
+            "creation_date": start.isoformat(), "short_code": None
+        }
+        self._chunk = 0
+
+    def _save_watermark(self) -> None:
+        """Atomically persist the position and the next chunk number."""
+        watermark = {"position": self._position, "chunk": self._chunk}
+        temporary = f"{self.watermark_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(watermark, f)
+        os.replace(temporary, self.watermark_path)
@@ -0,0 +1,420 @@
+"""Lookup cache coherence from the url_mappings change stream.
+
+A cached mapping otherwise stays served after the item is deleted or the
+code reclaimed, until its TTL runs out. ``ChangeFeedConsumer`` tails the
+table's DynamoDB stream (DynamoDB Local supports streams too) and applies
+every change to the local cache: a new mapping replaces a cached one, and
+updates and deletes drop the cached entry so the next read sees the table.
+Each redirect replica runs its own consumer, so caches can keep entries for
+much longer TTLs.
+
+A read that started before a change can still put the old mapping into the
+cache after the change was applied, so every changed code is invalidated a
+second time ``reinvalidate_after`` seconds later, once such reads are done.
+
+Shards are read parent first: when a shard splits, its children are only
+read once the parent is closed and drained, so changes to one key apply in
+order. Positions are checkpointed per shard; without a checkpoint the
+consumer cannot tell what the cache missed, so it clears the cache and
+starts from the newest records. The same happens when records were trimmed
+before they were read.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.lookup_cache import LookupCache
+    from utils.url_codec import PROJECTED_ATTRIBUTES, decode_item
+except ModuleNotFoundError:
+    from src.utils.lookup_cache import LookupCache
+    from src.utils.url_codec import PROJECTED_ATTRIBUTES, decode_item
+
+logger = logging.getLogger(__name__)
+
+# Records fetched per GetRecords call (the service maximum)
+MAX_RECORDS = 1000
+# Change-to-apply delays kept for the lag percentiles
+LAG_SAMPLES = 1000
+ATTACH_RETRY_SECONDS = 5.0
+
+_deserializer = TypeDeserializer()
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """Return a percentile of sorted samples."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class ChangeFeedConsumer:
+    """Apply the url_mappings stream to a lookup cache."""
+
+    def __init__(
+        self,
+        cache: LookupCache,
+        table_name: str,
+        region_name: str = "us-east-1",
+        endpoint_url: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        poll_interval: float = 0.5,
+        checkpoint_interval: float = 5.0,
+        reinvalidate_after: float = 2.0,
+        streams_client: Any = None,
+    ) -> None:
+        """Initialize the consumer.
+
+        Args:
+            cache: Cache to keep coherent (``LookupCache`` or
+                ``SharedLookupCache``)
+            table_name: Table whose stream is read
+            region_name: AWS region name
+            endpoint_url: DynamoDB Local endpoint; defaults to
+                DYNAMODB_ENDPOINT_URL
+            checkpoint_path: File the shard positions are saved to, if any
+            poll_interval: Seconds between polls when no records arrived
+            checkpoint_interval: Seconds between checkpoint writes
+            reinvalidate_after: Seconds after which changed codes are
+                invalidated again
+            streams_client: DynamoDB Streams client; built from the other
+                arguments by default
+        """
+        endpoint_url = endpoint_url or os.environ.get("DYNAMODB_ENDPOINT_URL")
+        client_kwargs: Dict[str, Any] = {"region_name": region_name}
+        if endpoint_url:
+            client_kwargs.update(
+                endpoint_url=endpoint_url,
+                aws_access_key_id="dummy",
+                aws_secret_access_key="dummy",
+            )
+
+        self.cache = cache
+        self.table_name = table_name
+        self.checkpoint_path = checkpoint_path
+        self.poll_interval = poll_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.reinvalidate_after = reinvalidate_after
+        self._dynamodb = boto3.client("dynamodb", **client_kwargs)
+        self.streams = streams_client or boto3.client(
+            "dynamodbstreams", **client_kwargs
+        )
+        self.stream_arn: Optional[str] = None
+
+        # Shard id -> parent shard id, for every shard seen in the stream
+        self._parents: Dict[str, Optional[str]] = {}
+        self._finished: Set[str] = set()
+        self._positions: Dict[str, str] = {}
+        self._from_latest: Set[str] = set()
+        self._iterators: Dict[str, str] = {}
+        self._refresh_shards = True
+        self._dirty = False
+        self._last_checkpoint = 0.0
+
+        # (due time, short code) of the second invalidations
+        self._pending: Deque[Tuple[float, str]] = deque()
+        self._lags: Deque[float] = deque(maxlen=LAG_SAMPLES)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.records = 0
+        self.refreshed = 0
+        self.invalidated = 0
+        self.gaps = 0
+        self.errors = 0
+
+    def start(self) -> threading.Thread:
+        """Attach to the stream, then tail it in a background thread.
+
+        Attaching is tried before returning, so changes made after ``start``
+        are not missed by a cache filled afterwards (e.g. by warmup). If the
+        table or its stream is not available yet, the thread keeps retrying.
+        """
+        self._try_attach()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop tailing and save the checkpoint."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        self.save_checkpoint()
+
+    def _try_attach(self) -> bool:
+        """Attach, logging instead of raising on failure."""
+        try:
+            self.attach()
+            return True
+        except (ClientError, ValueError) as e:
+            self.stream_arn = None
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Change feed not attached, will retry: {e}")
+            return False
+
+    def attach(self) -> None:
+        """Find the stream, restore the checkpoint and open shard iterators.
+
+        Raises:
+            ValueError: If the table has no stream enabled
+        """
+        table = self._dynamodb.describe_table(TableName=self.table_name)
+        self.stream_arn = table["Table"].get("LatestStreamArn")
+        if not self.stream_arn:
+            raise ValueError(f"Table {self.table_name} has no stream enabled")
+
+        shards = self._describe_shards()
+        if not self._load_checkpoint():
+            # Nothing tells what a warm cache missed; start it over and
+            # follow only what changes from now on
+            self.cache.clear()
+            for shard in shards:
+                if "EndingSequenceNumber" in shard["SequenceNumberRange"]:
+                    self._finished.add(shard["ShardId"])
+                else:
+                    self._from_latest.add(shard["ShardId"])
+        self._open_shards(shards)
+
+    def poll(self) -> int:
+        """Read every open shard once and apply its records.
+
+        Returns:
+            The number of records applied
+        """
+        now = time.monotonic()
+        while self._pending and self._pending[0][0] <= now:
+            self.cache.invalidate(self._pending.popleft()[1])
+
+        if self._refresh_shards:
+            self._open_shards(self._describe_shards())
+
+        applied = 0
+        for shard_id, iterator in list(self._iterators.items()):
+            try:
+                response = self.streams.get_records(
+                    ShardIterator=iterator, Limit=MAX_RECORDS
+                )
+            except ClientError as e:
+                self._handle_iterator_error(shard_id, e)
+                continue
+
+            for record in response.get("Records", []):
+                self._apply(record)
+                self._positions[shard_id] = (
+                    record["dynamodb"]["SequenceNumber"]
+                )
+                self._dirty = True
+                applied += 1
+
+            next_iterator = response.get("NextShardIterator")
+            if next_iterator:
+                self._iterators[shard_id] = next_iterator
+            else:
+                # Closed and drained; its children may be read now
+                del self._iterators[shard_id]
+                self._finished.add(shard_id)
+                self._positions.pop(shard_id, None)
+                self._dirty = True
+                self._refresh_shards = True
+        return applied
+
+    def _run(self) -> None:
+        """Poll until stopped, checkpointing on the way."""
+        while not self._stopped.is_set():
+            if not self.stream_arn and not self._try_attach():
+                self._stopped.wait(ATTACH_RETRY_SECONDS)
+                continue
+            try:
+                applied = self.poll()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.warning(f"Change feed poll failed: {e}")
+                self._refresh_shards = True
+                applied = 0
+
+            if time.monotonic() - self._last_checkpoint >= (
+                    self.checkpoint_interval):
+                self.save_checkpoint()
+            if not applied:
+                self._stopped.wait(self.poll_interval)
+
+    def _describe_shards(self) -> List[Dict[str, Any]]:
+        """Return every shard of the stream."""
+        shards: List[Dict[str, Any]] = []
+        kwargs: Dict[str, Any] = {"StreamArn": self.stream_arn}
+        while True:
+            description = self.streams.describe_stream(**kwargs)[
+                "StreamDescription"
+            ]
+            shards.extend(description["Shards"])
+            last_shard = description.get("LastEvaluatedShardId")
+            if not last_shard:
+                return shards
+            kwargs["ExclusiveStartShardId"] = last_shard
+
+    def _open_shards(self, shards: List[Dict[str, Any]]) -> None:
+        """Open iterators for shards whose parent has been read."""
+        self._refresh_shards = False
+        described = {shard["ShardId"] for shard in shards}
+        for shard in shards:
+            self._parents.setdefault(
+                shard["ShardId"], shard.get("ParentShardId")
+            )
+
+        # Shards past the stream's retention are gone for good
+        for shard_id in set(self._parents) - described:
+            del self._parents[shard_id]
+            self._finished.discard(shard_id)
+            self._positions.pop(shard_id, None)
+
+        for shard_id, parent in self._parents.items():
+            if shard_id in self._iterators or shard_id in self._finished:
+                continue
+            if parent in self._parents and parent not in self._finished:
+                continue
+            self._iterators[shard_id] = self._shard_iterator(shard_id)
+
+    def _shard_iterator(self, shard_id: str) -> str:
+        """Return an iterator at the shard's checkpointed position."""
+        kwargs: Dict[str, Any] = {
+            "StreamArn": self.stream_arn,
+            "ShardId": shard_id,
+        }
+        if shard_id in self._positions:
+            kwargs.update(
+                ShardIteratorType="AFTER_SEQUENCE_NUMBER",
+                SequenceNumber=self._positions[shard_id],
+            )
+        elif shard_id in self._from_latest:
+            kwargs["ShardIteratorType"] = "LATEST"
+        else:
+            kwargs["ShardIteratorType"] = "TRIM_HORIZON"
+        return self.streams.get_shard_iterator(**kwargs)["ShardIterator"]
+
+    def _handle_iterator_error(self, shard_id: str, error: ClientError) -> None:
+        """Reopen a shard whose iterator expired or fell off the stream."""
+        code = error.response.get("Error", {}).get("Code")
+        if code == "TrimmedDataAccessException":
+            # Records were dropped unread: the cache may hold anything
+            logger.warning(
+                f"Change feed lost records of shard {shard_id}, "
+                f"clearing the lookup cache"
+            )
+            with self._lock:
+                self.gaps += 1
+            self.cache.clear()
+            self._positions.pop(shard_id, None)
+            self._from_latest.discard(shard_id)
+        elif code != "ExpiredIteratorException":
+            raise error
+        self._iterators[shard_id] = self._shard_iterator(shard_id)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one stream record to the cache."""
+        change = record["dynamodb"]
+        short_code = change["Keys"]["short_code"]["S"]
+        image = change.get("NewImage")
+
+        if record["eventName"] == "INSERT" and image:
+            item = decode_item({
+                name: _deserializer.deserialize(value)
+                for name, value in image.items()
+                if name in PROJECTED_ATTRIBUTES
+            })
+            changed = self.cache.refresh(short_code, item)
+        else:
+            changed = self.cache.invalidate(short_code)
+        self._pending.append(
+            (time.monotonic() + self.reinvalidate_after, short_code)
+        )
+
+        created = change.get("ApproximateCreationDateTime")
+        with self._lock:
+            self.records += 1
+            if changed and record["eventName"] == "INSERT":
+                self.refreshed += 1
+            elif changed:
+                self.invalidated += 1
+            if isinstance(created, datetime):
+                if created.tzinfo is None:
+                    created = created.replace(tzinfo=timezone.utc)
+                self._lags.append(max(0.0, time.time() - created.timestamp()))
+
+    def _load_checkpoint(self) -> bool:
+        """Restore shard positions saved for the current stream."""
+        if not self.checkpoint_path:
+            return False
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return False
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable change feed checkpoint: {e}")
+            return False
+
+        if checkpoint.get("stream_arn") != self.stream_arn:
+            logger.warning("Ignoring change feed checkpoint of another stream")
+            return False
+        self._positions = dict(checkpoint.get("positions", {}))
+        self._finished = set(checkpoint.get("finished", []))
+        return True
+
+    def save_checkpoint(self) -> None:
+        """Write the shard positions, if they changed since the last save.
+
+        The file is replaced atomically. Positions only ever cover records
+        already applied, so with a shared cache any worker's checkpoint is
+        valid for all of them.
+        """
+        self._last_checkpoint = time.monotonic()
+        if not self.checkpoint_path or not self._dirty:
+            return
+
+        self._dirty = False
+        checkpoint = {
+            "stream_arn": self.stream_arn,
+            "positions": dict(self._positions),
+            "finished": sorted(self._finished),
+        }
+        temporary = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(temporary, self.checkpoint_path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not save change feed checkpoint: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return record counters and change-to-apply lag percentiles."""
+        with self._lock:
+            lags = sorted(self._lags)
+            return {
+                "records": self.records,
+                "refreshed": self.refreshed,
+                "invalidated": self.invalidated,
+                "attached": self.stream_arn is not None,
+                "open_shards": len(self._iterators),
+                "gaps": self.gaps,
+                "errors": self.errors,
+                "lag_seconds": {
+                    "p50": round(_percentile(lags, 0.5), 3),
+                    "p99": round(_percentile(lags, 0.99), 3),
+                    "max": round(lags[-1], 3) if lags else 0.0,
+                },
+            }
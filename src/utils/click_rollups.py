@@ -0,0 +1,326 @@
+"""Pre-aggregated click counts per short code and time bucket.
+
+Redirects are counted in memory per ``(short_code, bucket)`` and flushed
+every ``flush_interval`` seconds as one ``ADD`` update per counter, so a
+popular link costs a couple of writes per interval rather than one per
+click. Flushes run on a background thread (``start``), so a redirect only
+pays for a dictionary update; where no thread may outlive a request (AWS
+Lambda), callers ``flush`` before returning instead. Each click feeds an
+hourly and a daily bucket:
+
+    short_code (PK)   bucket (SK)                     clicks  expires_at
+    abc123            D#2026-10-19#us-east-1          1520    +400 days
+    abc123            H#2026-10-19T13#us-east-1       87      +14 days
+
+Hourly rows expire after ``hourly_retention_days`` while the daily rows
+holding the same clicks live on, so old data is kept only at the coarser
+resolution and storage per link stays bounded. The region suffix keeps
+every item single-writer, which lets the table be a global table without
+last-writer-wins dropping increments; a range of buckets across all regions
+is still read with one query.
+
+Counts are approximate in the way of any buffered counter: clicks still in
+memory when a process is killed are lost, and stats lag by up to one flush
+interval.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import BotoCoreError, ClientError
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import dynamodb_resource
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import dynamodb_resource
+
+logger = logging.getLogger(__name__)
+
+HOUR = "hour"
+DAY = "day"
+# Sort key prefix, bucket format and bucket length per resolution
+RESOLUTIONS: Dict[str, Tuple[str, str, timedelta]] = {
+    HOUR: ("H", "%Y-%m-%dT%H", timedelta(hours=1)),
+    DAY: ("D", "%Y-%m-%d", timedelta(days=1)),
+}
+# Sorts after any region name, closing a bucket range
+_RANGE_END = "~"
+
+
+def bucket_start(resolution: str, when: datetime) -> datetime:
+    """Truncate a UTC time to the start of its bucket."""
+    if resolution == HOUR:
+        return when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_key(resolution: str, when: datetime, region: str = "") -> str:
+    """Sort key of the bucket holding ``when``.
+
+    Args:
+        resolution: ``HOUR`` or ``DAY``
+        when: UTC time
+        region: Region that counted the clicks; omitted for range bounds
+
+    Returns:
+        The sort key, e.g. ``H#2026-10-19T13#us-east-1``
+    """
+    prefix, fmt, _ = RESOLUTIONS[resolution]
+    key = f"{prefix}#{when.strftime(fmt)}"
+    return f"{key}#{region}" if region else key
+
+
+class ClickRollups:
+    """Buffer click counts and read them back as time series."""
+
+    def __init__(
+        self,
+        table_name: str,
+        region_name: str = "us-east-1",
+        flush_interval: float = 10.0,
+        max_pending: int = 10000,
+        hourly_retention_days: int = 14,
+        daily_retention_days: int = 400,
+        flush_workers: int = 8,
+    ) -> None:
+        """Initialize the rollups.
+
+        Args:
+            table_name: Name of the rollup table
+            region_name: AWS region name, also tagged on written buckets
+            flush_interval: Seconds between flushes of buffered counts
+            max_pending: Counters kept in memory; the flusher is woken
+                early at half this size, and clicks needing new counters
+                are dropped beyond it
+            hourly_retention_days: Days hourly buckets are kept
+            daily_retention_days: Days daily buckets are kept
+            flush_workers: Concurrent updates per flush
+        """
+        self.table = dynamodb_resource(region_name).Table(table_name)
+        self.region = region_name
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retention = {
+            HOUR: timedelta(days=hourly_retention_days),
+            DAY: timedelta(days=daily_retention_days),
+        }
+        self.flush_workers = flush_workers
+
+        self._pending: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.recorded = 0
+        self.flushed = 0
+        self.writes = 0
+        self.dropped = 0
+
+    def record(self, short_code: str, when: Optional[datetime] = None) -> None:
+        """Count one click in memory; nothing is written here.
+
+        Args:
+            short_code: The short code that was followed
+            when: UTC time of the click (default: now)
+        """
+        when = when or datetime.utcnow()
+        keys = [
+            (short_code, resolution,
+             bucket_start(resolution, when).isoformat())
+            for resolution in RESOLUTIONS
+        ]
+        with self._lock:
+            if len(self._pending) >= self.max_pending and any(
+                key not in self._pending for key in keys
+            ):
+                self.dropped += 1
+                return
+            for key in keys:
+                self._pending[key] = self._pending.get(key, 0) + 1
+            self.recorded += 1
+            if len(self._pending) >= self.max_pending // 2:
+                self._wake.set()
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="click-rollups"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write what is buffered."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown()
+
+    def _run(self) -> None:
+        """Flush every ``flush_interval`` seconds or when woken."""
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Could not flush clicks: {e}")
+
+    def _workers(self) -> ThreadPoolExecutor:
+        """Return the pool that writes a flush's updates."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    self.flush_workers, thread_name_prefix="click-flush"
+                )
+            return self._pool
+
+    def flush(self) -> int:
+        """Write buffered counts to the table.
+
+        Only one flush runs at a time; a concurrent call returns at once.
+        Counts that fail to write are put back for the next flush.
+
+        Returns:
+            Number of counters written
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            # Executors take no new work once the interpreter is shutting
+            # down, so the final flush of ``stop`` writes serially
+            mapper = map if self._stopped.is_set() else self._workers().map
+            results = list(mapper(self._write, pending.items()))
+
+            failed = {
+                key: count
+                for (key, count), ok in zip(pending.items(), results)
+                if not ok
+            }
+            with self._lock:
+                self.writes += len(pending) - len(failed)
+                # Every click lands in exactly one daily bucket, so clicks
+                # are tallied from those
+                self.flushed += sum(
+                    count for (key, count) in pending.items()
+                    if key not in failed and key[1] == DAY
+                )
+                for key, count in failed.items():
+                    if len(self._pending) < self.max_pending:
+                        self._pending[key] = (
+                            self._pending.get(key, 0) + count
+                        )
+                    elif key[1] == DAY:
+                        self.dropped += count
+            return len(pending) - len(failed)
+        finally:
+            self._flush_lock.release()
+
+    def _write(self, entry: Tuple[Tuple[str, str, str], int]) -> bool:
+        """Add one buffered count to its bucket item."""
+        (short_code, resolution, start), count = entry
+        when = datetime.fromisoformat(start)
+        expires_at = int((when + self.retention[resolution]).timestamp())
+        try:
+            self.table.update_item(
+                Key={
+                    "short_code": short_code,
+                    "bucket": bucket_key(resolution, when, self.region),
+                },
+                UpdateExpression="ADD clicks :count SET expires_at = :exp",
+                ExpressionAttributeValues={
+                    ":count": count, ":exp": expires_at,
+                },
+            )
+            return True
+        except (BotoCoreError, ClientError) as e:
+            logger.warning(f"Failed to flush clicks for {short_code}: {e}")
+            return False
+
+    def query(
+        self,
+        short_code: str,
+        resolution: str,
+        start: datetime,
+        end: datetime,
+    ) -> List[Dict[str, Any]]:
+        """Read click counts of a bucket range.
+
+        Args:
+            short_code: The short code
+            resolution: ``HOUR`` or ``DAY``
+            start: First bucket (any time inside it), UTC
+            end: Last bucket (any time inside it), UTC
+
+        Returns:
+            One ``{"start", "clicks"}`` entry per bucket in the range, in
+            order, with zero for buckets without clicks and counts summed
+            across regions
+
+        Raises:
+            ClientError: If DynamoDB fails
+        """
+        _, fmt, step = RESOLUTIONS[resolution]
+        first = bucket_start(resolution, start)
+        last = bucket_start(resolution, end)
+
+        counts: Dict[str, int] = {}
+        kwargs = {
+            "KeyConditionExpression": (
+                Key("short_code").eq(short_code)
+                & Key("bucket").between(
+                    bucket_key(resolution, first),
+                    bucket_key(resolution, last) + _RANGE_END,
+                )
+            ),
+            # "bucket" is a reserved word
+            "ProjectionExpression": "#bucket, clicks",
+            "ExpressionAttributeNames": {"#bucket": "bucket"},
+        }
+        while True:
+            response = self.table.query(**kwargs)
+            for item in response.get("Items", []):
+                period = item["bucket"].split("#")[1]
+                counts[period] = counts.get(period, 0) + int(item["clicks"])
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        series = []
+        current = first
+        while current <= last:
+            series.append({
+                "start": current.isoformat(),
+                "clicks": counts.get(current.strftime(fmt), 0),
+            })
+            current += step
+        return series
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffering counters."""
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "flushed": self.flushed,
+                "pending_counters": len(self._pending),
+                "writes": self.writes,
+                "dropped": self.dropped,
+            }
@@ -0,0 +1,70 @@
+"""Keys and cursors of the domain reverse-lookup index.
+
+Every mapping stores the normalized host of its URL in a ``domain``
+attribute, written in the same request as the mapping itself. The
+``domain-index`` GSI (``domain`` plus ``creation_date``) is then kept up to
+date by DynamoDB, and listing the links to a domain is a query whose cost
+follows the result size. Items written before the attribute existed are
+added by ``scripts/backfill_indexes.py``.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+DOMAIN_INDEX_NAME = "domain-index"
+# Attributes of a LastEvaluatedKey on the index
+DOMAIN_INDEX_KEYS = ("domain", "short_code", "creation_date")
+
+
+def normalize_domain(value: str) -> Optional[str]:
+    """Return the host a URL (or a bare host name) points at.
+
+    Hosts are lowercased and IDNA-encoded, and a trailing dot, the port and
+    a leading ``www.`` are dropped, so every spelling of a domain maps to the
+    same index key.
+
+    Args:
+        value: A URL such as ``https://Example.com:8080/x``, or a host name
+
+    Returns:
+        The normalized host (``example.com``), or None if there is none
+    """
+    try:
+        host = urlsplit(value if "://" in value else f"//{value}").hostname
+    except ValueError:
+        return None
+    host = (host or "").rstrip(".")
+    if not host:
+        return None
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    return host[4:] if host.startswith("www.") and len(host) > 4 else host
+
+
+def encode_cursor(key: Dict[str, Any]) -> str:
+    """Encode a domain index key as an opaque, URL-safe cursor."""
+    data = json.dumps(
+        {name: key[name] for name in DOMAIN_INDEX_KEYS},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, str]:
+    """Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is not one
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if (not isinstance(key, dict) or set(key) != set(DOMAIN_INDEX_KEYS)
+            or not all(isinstance(value, str) for value in key.values())):
+        raise ValueError("Invalid cursor")
+    return key
@@ -1,48 +1,200 @@
 """DynamoDB operations for URL shortening service."""
 
+import functools
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
 
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.url_codec import (
+        ENCODED_ATTRIBUTE, PROJECTED_ATTRIBUTES, decode_item,
+        encode_url_attributes
+    )
+    from utils.domain_index import (
+        DOMAIN_INDEX_NAME, decode_cursor, encode_cursor, normalize_domain
+    )
+except ModuleNotFoundError:
+    from src.utils.url_codec import (
+        ENCODED_ATTRIBUTE, PROJECTED_ATTRIBUTES, decode_item,
+        encode_url_attributes
+    )
+    from src.utils.domain_index import (
+        DOMAIN_INDEX_NAME, decode_cursor, encode_cursor, normalize_domain
+    )
+
+DEFAULT_TTL_DAYS = 30
+# DynamoDB rejects BatchWriteItem calls with more than 25 requests
+BATCH_WRITE_MAX_ITEMS = 25
+# Short codes looked up per batched read statement
+BATCH_READ_MAX_KEYS = 25
+# Prefix of a creation date naming its hour, e.g. "2026-10-19T09"
+BUCKET_FORMAT = "%Y-%m-%dT%H"
+
+
+@functools.lru_cache(maxsize=None)
+def dynamodb_resource(
+    region_name: str = "us-east-1", endpoint_url: Optional[str] = None
+) -> Any:
+    """Return the DynamoDB resource for a region, shared by all callers.
+
+    Building a resource loads and parses the DynamoDB service model, the
+    largest part of a service's start-up work, so every table of a process
+    is read through one.
+
+    Args:
+        region_name: AWS region name
+        endpoint_url: DynamoDB Local endpoint; defaults to
+            DYNAMODB_ENDPOINT_URL
+
+    Returns:
+        boto3 DynamoDB service resource
+    """
+    endpoint_url = endpoint_url or os.environ.get("DYNAMODB_ENDPOINT_URL")
+    if endpoint_url:
+        # Local development mode - use local DynamoDB
+        return boto3.resource(
+            "dynamodb",
+            region_name=region_name,
+            endpoint_url=endpoint_url,
+            aws_access_key_id="dummy",
+            aws_secret_access_key="dummy"
+        )
+    # Production mode - use AWS DynamoDB
+    return boto3.resource("dynamodb", region_name=region_name)
+
+
+def created_hour(creation_date: str) -> str:
+    """Return the ``created_hour`` bucket of an ISO creation date."""
+    return creation_date[:13]
+
+
+def index_attributes(long_url: str, creation_date: str) -> Dict[str, str]:
+    """Return the attributes that place a mapping in the secondary indexes.
+
+    ``domain`` feeds the domain index and ``created_hour`` the created index
+    read by incremental exports. A URL without a host has no domain.
+    """
+    attributes = {"created_hour": created_hour(creation_date)}
+    domain = normalize_domain(long_url)
+    if domain:
+        attributes["domain"] = domain
+    return attributes
+
 
 class DynamoDBOperations:
     """Handle DynamoDB operations for URL mappings."""
 
-    def __init__(self, table_name: str, region_name: str = "us-east-1") -> None:
+    def __init__(
+        self,
+        table_name: str,
+        region_name: str = "us-east-1",
+        endpoint_url: Optional[str] = None,
+        compress_urls: Optional[bool] = None,
+    ) -> None:
         """Initialize DynamoDB operations.
 
         Args:
             table_name: Name of the DynamoDB table
             region_name: AWS region name (default: us-east-1)
+            endpoint_url: DynamoDB Local endpoint; defaults to
+                DYNAMODB_ENDPOINT_URL
+            compress_urls: Store new URLs compressed (see ``url_codec``);
+                defaults to URL_COMPRESSION. Both encodings are always read.
         """
-        # Check if we're running in local development mode
-        endpoint_url = os.environ.get("DYNAMODB_ENDPOINT_URL")
-
-        if endpoint_url:
-            # Local development mode - use local DynamoDB
-            self.dynamodb = boto3.resource(
-                "dynamodb",
-                region_name=region_name,
-                endpoint_url=endpoint_url,
-                aws_access_key_id="dummy",
-                aws_secret_access_key="dummy"
+        self.dynamodb = dynamodb_resource(region_name, endpoint_url)
+
+        if compress_urls is None:
+            compress_urls = os.environ.get("URL_COMPRESSION", "") in (
+                "1", "true"
             )
-        else:
-            # Production mode - use AWS DynamoDB
-            self.dynamodb = boto3.resource("dynamodb", region_name=region_name)
 
+        self.table_name = table_name
         self.table = self.dynamodb.Table(table_name)
+        self.compress_urls = compress_urls
+        self._latency_listeners: List[Callable[[str, float], None]] = []
+
+    def add_latency_listener(
+        self, listener: Callable[[str, float], None]
+    ) -> None:
+        """Report the duration of every DynamoDB call to ``listener``.
+
+        The listener is called as ``listener(operation_name, seconds)``
+        after each API call, including the time spent on retries.
+
+        Args:
+            listener: Callback receiving the operation name and duration
+        """
+        if not self._latency_listeners:
+            events = self.dynamodb.meta.client.meta.events
+            events.register("before-call.dynamodb", self._start_timer)
+            events.register("after-call.dynamodb", self._stop_timer)
+        self._latency_listeners.append(listener)
+
+    @staticmethod
+    def _start_timer(context: Dict[str, Any], **kwargs: Any) -> None:
+        """Record when a DynamoDB call starts."""
+        context["latency_started"] = time.monotonic()
+
+    def _stop_timer(
+        self, model: Any, context: Dict[str, Any], **kwargs: Any
+    ) -> None:
+        """Report the duration of a finished DynamoDB call."""
+        started = context.get("latency_started")
+        if started is None:
+            return
+        elapsed = time.monotonic() - started
+        for listener in self._latency_listeners:
+            listener(model.name, elapsed)
+
+    def build_item(
+        self,
+        short_code: str,
+        long_url: str,
+        expires_at: Optional[int] = None,
+        creation_date: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the DynamoDB item stored for a URL mapping.
+
+        Args:
+            short_code: The short code (partition key)
+            long_url: The URL to redirect to
+            expires_at: Expiry as a Unix timestamp (default: 30 days from now)
+            creation_date: ISO timestamp used as the sort key (default: now)
+
+        Returns:
+            The item ready to be written to the table
+        """
+        now = datetime.utcnow()
+        if expires_at is None:
+            expires_at = int(
+                (now + timedelta(days=DEFAULT_TTL_DAYS)).timestamp()
+            )
+
+        url_attributes = (
+            encode_url_attributes(long_url) if self.compress_urls
+            else {"long_url": long_url}
+        )
+        creation_date = creation_date or now.isoformat()
+        return {
+            "short_code": short_code,
+            "creation_date": creation_date,
+            **url_attributes,
+            "expires_at": expires_at,
+            # Written with the mapping, so DynamoDB maintains the secondary
+            # indexes without another request
+            **index_attributes(long_url, creation_date),
+        }
 
     def save_url_mapping(
         self, short_code: str, long_url: str
     ) -> bool:
         """Save URL mapping to DynamoDB."""
-        now = datetime.utcnow()
-        expires_at = int((now + timedelta(days=30)).timestamp())
-
         # First check if the short_code already exists
         try:
             response = self.table.query(
@@ -56,26 +208,58 @@ class DynamoDBOperations:
                 return False
 
             # Short code doesn't exist, save it
-            self.table.put_item(
-                Item={
-                    "short_code": short_code,
-                    "creation_date": now.isoformat(),
-                    "long_url": long_url,
-                    "expires_at": expires_at,
-                }
-            )
+            self.table.put_item(Item=self.build_item(short_code, long_url))
             return True
         except ClientError:
             # Handle unexpected errors
             raise
 
+    def batch_write_items(
+        self, items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Write up to 25 items with a single BatchWriteItem call.
+
+        Unlike ``save_url_mapping`` this does not check for existing short
+        codes; callers are expected to own the keys they write.
+
+        Args:
+            items: Items built with ``build_item``
+
+        Returns:
+            Items DynamoDB left unprocessed and that should be retried
+        """
+        if len(items) > BATCH_WRITE_MAX_ITEMS:
+            raise ValueError(
+                f"At most {BATCH_WRITE_MAX_ITEMS} items per batch write"
+            )
+        if not items:
+            return []
+
+        response = self.dynamodb.meta.client.batch_write_item(
+            RequestItems={
+                self.table_name: [
+                    {"PutRequest": {"Item": item}} for item in items
+                ]
+            }
+        )
+        unprocessed = response.get("UnprocessedItems", {})
+        return [
+            request["PutRequest"]["Item"]
+            for request in unprocessed.get(self.table_name, [])
+        ]
+
     def get_url_mapping(
-        self, short_code: str
+        self, short_code: str, raise_errors: bool = False
     ) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """Get URL mapping from DynamoDB.
 
+        Only the attributes a redirect needs are read, and compressed URLs
+        are decoded, so callers always see a plain ``long_url``.
+
         Args:
             short_code: The short code to look up
+            raise_errors: Re-raise ClientError instead of reporting the
+                mapping as not found
 
         Returns:
             Tuple containing:
@@ -87,13 +271,179 @@ class DynamoDBOperations:
                 KeyConditionExpression="short_code = :code",
                 ExpressionAttributeValues={":code": short_code},
                 Limit=1,
-                ScanIndexForward=False  # Get the most recent entry first
+                ScanIndexForward=False,  # Get the most recent entry first
+                ProjectionExpression=", ".join(PROJECTED_ATTRIBUTES),
             )
 
             items = response.get("Items", [])
             if not items:
                 return False, None
 
-            return True, items[0]
+            return True, decode_item(items[0])
         except ClientError:
+            if raise_errors:
+                raise
             return False, None
+
+    def get_url_mappings(
+        self, short_codes: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get the latest mapping of several short codes in one request.
+
+        The table's sort key (creation_date) is unknown at lookup time, so
+        BatchGetItem cannot address the items. A PartiQL ``IN`` condition on
+        the partition key reads all requested codes in a single
+        ExecuteStatement call instead, without scanning the table.
+
+        Args:
+            short_codes: Up to ``BATCH_READ_MAX_KEYS`` distinct short codes
+
+        Returns:
+            Mapping of short code to its most recent item; codes that do
+            not exist are absent
+
+        Raises:
+            ClientError: If DynamoDB rejects or fails the request
+        """
+        if len(short_codes) > BATCH_READ_MAX_KEYS:
+            raise ValueError(
+                f"At most {BATCH_READ_MAX_KEYS} short codes per batch read"
+            )
+        if not short_codes:
+            return {}
+
+        placeholders = ", ".join("?" for _ in short_codes)
+        kwargs = {
+            "Statement": (
+                f"SELECT {', '.join(PROJECTED_ATTRIBUTES)} "
+                f'FROM "{self.table_name}" '
+                f"WHERE short_code IN [{placeholders}]"
+            ),
+            "Parameters": list(short_codes),
+        }
+
+        mappings: Dict[str, Dict[str, Any]] = {}
+        while True:
+            response = self.dynamodb.meta.client.execute_statement(**kwargs)
+            for item in response.get("Items", []):
+                current = mappings.get(item["short_code"])
+                if (current is None
+                        or item["creation_date"] > current["creation_date"]):
+                    mappings[item["short_code"]] = decode_item(item)
+            if "NextToken" not in response:
+                return mappings
+            kwargs["NextToken"] = response["NextToken"]
+
+    def query_by_domain(
+        self, domain: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of the mappings pointing at a domain.
+
+        Reads the domain index newest first, so the cost is proportional to
+        the page, not the table.
+
+        Args:
+            domain: Normalized host, as stored by ``build_item``
+            limit: Maximum number of mappings on the page
+            cursor: ``next_cursor`` of the previous page, if any
+
+        Returns:
+            Tuple of (mappings, next_cursor); next_cursor is None on the last
+            page
+
+        Raises:
+            ValueError: If the cursor is invalid or belongs to another domain
+        """
+        kwargs: Dict[str, Any] = {
+            "IndexName": DOMAIN_INDEX_NAME,
+            "KeyConditionExpression": "#domain = :domain",
+            "ExpressionAttributeNames": {"#domain": "domain"},
+            "ExpressionAttributeValues": {":domain": domain},
+            "ScanIndexForward": False,
+            "Limit": limit,
+        }
+        if cursor:
+            start_key = decode_cursor(cursor)
+            if start_key["domain"] != domain:
+                raise ValueError("Cursor belongs to another domain")
+            kwargs["ExclusiveStartKey"] = start_key
+
+        response = self.table.query(**kwargs)
+        items = [
+            decode_item(item) for item in response.get("Items", [])
+        ]
+        last_key = response.get("LastEvaluatedKey")
+        return items, encode_cursor(last_key) if last_key else None
+
+    def backfill_index_attributes(self, segments: int = 8) -> int:
+        """Add the index attributes to mappings written without them.
+
+        A parallel scan reads only items lacking an attribute, and each is
+        updated on the condition that it still exists, so links deleted (or
+        expired) meanwhile are not brought back. Safe to run again. Items
+        are addressed by the table's own key schema, so tables keyed on
+        ``short_code`` alone (as DynamoDB Local is set up) work as well.
+
+        Args:
+            segments: Number of parallel scan segments
+
+        Returns:
+            Number of items updated
+        """
+        key_names = [key["AttributeName"] for key in self.table.key_schema]
+
+        def backfill_segment(segment: int) -> int:
+            updated = 0
+            kwargs: Dict[str, Any] = {
+                "Segment": segment,
+                "TotalSegments": segments,
+                "FilterExpression": (
+                    "attribute_not_exists(#domain) OR "
+                    "attribute_not_exists(created_hour)"
+                ),
+                "ProjectionExpression": (
+                    "short_code, creation_date, long_url, "
+                    f"{ENCODED_ATTRIBUTE}, #domain, created_hour"
+                ),
+                "ExpressionAttributeNames": {"#domain": "domain"},
+            }
+            while True:
+                response = self.table.scan(**kwargs)
+                for item in response.get("Items", []):
+                    item = decode_item(item)
+                    missing = {
+                        name: value
+                        for name, value in index_attributes(
+                            item.get("long_url") or "", item["creation_date"]
+                        ).items()
+                        if name not in item
+                    }
+                    if not missing:
+                        continue
+                    names = {f"#a{i}": name for i, name in enumerate(missing)}
+                    try:
+                        self.table.update_item(
+                            Key={name: item[name] for name in key_names},
+                            UpdateExpression="SET " + ", ".join(
+                                f"{name} = :{name[1:]}" for name in names
+                            ),
+                            ConditionExpression=(
+                                "attribute_exists(short_code)"
+                            ),
+                            ExpressionAttributeNames=names,
+                            ExpressionAttributeValues={
+                                f":{name[1:]}": missing[attribute]
+                                for name, attribute in names.items()
+                            },
+                        )
+                        updated += 1
+                    except ClientError as e:
+                        code = e.response.get("Error", {}).get("Code")
+                        if code != "ConditionalCheckFailedException":
+                            raise
+                if "LastEvaluatedKey" not in response:
+                    return updated
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            return sum(executor.map(backfill_segment, range(segments)))
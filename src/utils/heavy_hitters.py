@@ -0,0 +1,219 @@
+"""Fixed-memory tracking of the most requested short codes.
+
+``SpaceSaving`` keeps at most ``capacity`` codes with their counts. A code
+that is not tracked replaces the one with the smallest count and inherits
+that count as its error, so every code seen more than ``total / capacity``
+times is guaranteed to be listed and no count is under-estimated. Sketches
+of different processes merge into a sketch with the same guarantees, which
+is how the hot codes of several pods are combined.
+
+``HotLinks`` wraps two sketches in a rolling window so that the list follows
+current traffic rather than everything since the process started.
+"""
+
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters sketch (not thread-safe).
+
+    Counts live in a dict and the smallest count is found through a min-heap
+    that is only corrected when an entry is evicted, so memory is bounded by
+    ``capacity`` and an update costs O(1), or amortized O(log capacity)
+    when it evicts.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the sketch.
+
+        Args:
+            capacity: Maximum number of tracked codes
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # One (count, code) entry per tracked code; the count may be stale
+        self._heap: List[tuple] = []
+
+    def __len__(self) -> int:
+        """Return the number of tracked codes."""
+        return len(self._counts)
+
+    def add(self, key: str, count: int = 1) -> None:
+        """Count occurrences of a code.
+
+        Args:
+            key: The short code
+            count: Number of occurrences
+        """
+        self.total += count
+        if key in self._counts:
+            self._counts[key] += count
+            return
+
+        if len(self._counts) < self.capacity:
+            self._counts[key] = count
+            self._errors[key] = 0
+            heapq.heappush(self._heap, (count, key))
+            return
+
+        # Refresh stale heap entries until the top one is the true minimum
+        while True:
+            seen, victim = self._heap[0]
+            current = self._counts[victim]
+            if seen == current:
+                break
+            heapq.heapreplace(self._heap, (current, victim))
+
+        floor = self._counts.pop(victim)
+        del self._errors[victim]
+        self._counts[key] = floor + count
+        self._errors[key] = floor
+        heapq.heapreplace(self._heap, (floor + count, key))
+
+    def min_count(self) -> int:
+        """Return an upper bound on the count of an untracked code."""
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the most frequent codes.
+
+        Args:
+            n: Number of codes to return (default: all tracked)
+
+        Returns:
+            ``{"short_code", "count", "error"}`` entries by descending count;
+            the true count lies between ``count - error`` and ``count``
+        """
+        ranked = sorted(
+            self._counts.items(), key=lambda item: (-item[1], item[0])
+        )
+        return [
+            {"short_code": key, "count": count, "error": self._errors[key]}
+            for key, count in ranked[:n]
+        ]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combine two sketches into a new one.
+
+        A code tracked by only one sketch may have been counted by the other
+        up to that sketch's ``min_count``, which is added to its count and
+        error, keeping counts upper bounds.
+
+        Args:
+            other: Sketch to merge with
+
+        Returns:
+            A sketch with the larger of the two capacities
+        """
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        own_floor, other_floor = self.min_count(), other.min_count()
+        combined: Dict[str, List[int]] = {
+            key: [count + other_floor, self._errors[key] + other_floor]
+            for key, count in self._counts.items()
+        }
+        for key, count in other._counts.items():
+            error = other._errors[key]
+            if key in combined:
+                # Replace the floor assumed above by the actual count
+                combined[key][0] += count - other_floor
+                combined[key][1] += error - other_floor
+            else:
+                combined[key] = [count + own_floor, error + own_floor]
+
+        ranked = sorted(
+            combined.items(), key=lambda item: (-item[1][0], item[0])
+        )
+        for key, (count, error) in ranked[:merged.capacity]:
+            merged._counts[key] = count
+            merged._errors[key] = error
+            merged._heap.append((count, key))
+        heapq.heapify(merged._heap)
+        merged.total = self.total + other.total
+        return merged
+
+    def to_dict(self, n: Optional[int] = None) -> Dict[str, Any]:
+        """Serialize the sketch (or its top ``n`` codes) for JSON."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": self.top(n),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        """Rebuild a sketch from ``to_dict`` output.
+
+        A sketch exported with fewer than ``capacity`` items is treated as
+        complete, so merge full exports to keep the error bounds.
+        """
+        sketch = cls(data["capacity"])
+        for item in data["items"][:sketch.capacity]:
+            key = item["short_code"]
+            sketch._counts[key] = item["count"]
+            sketch._errors[key] = item.get("error", 0)
+            sketch._heap.append((item["count"], key))
+        heapq.heapify(sketch._heap)
+        sketch.total = data.get("total", sum(sketch._counts.values()))
+        return sketch
+
+
+class HotLinks:
+    """Thread-safe hot short codes over a rolling window.
+
+    Codes are counted in the current sketch; every ``window`` seconds it
+    becomes the previous sketch and a new one starts. Reads merge both, so
+    they cover between one and two windows of traffic.
+    """
+
+    def __init__(self, capacity: int = 1000, window: float = 300.0) -> None:
+        """Initialize the tracker.
+
+        Args:
+            capacity: Codes tracked per window
+            window: Seconds per window
+        """
+        self.capacity = capacity
+        self.window = window
+        self._current = SpaceSaving(capacity)
+        self._previous = SpaceSaving(capacity)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rotate(self, now: float) -> None:
+        """Start a new window if the current one is over."""
+        elapsed = now - self._started
+        if elapsed < self.window:
+            return
+        # After more than one idle window there is nothing recent to keep
+        self._previous = (
+            self._current if elapsed < 2 * self.window
+            else SpaceSaving(self.capacity)
+        )
+        self._current = SpaceSaving(self.capacity)
+        self._started = now
+
+    def record(self, short_code: str) -> None:
+        """Count one request for a short code."""
+        with self._lock:
+            self._rotate(time.monotonic())
+            self._current.add(short_code)
+
+    def sketch(self) -> SpaceSaving:
+        """Return a merged copy of the recent sketches."""
+        with self._lock:
+            self._rotate(time.monotonic())
+            return self._previous.merge(self._current)
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the hottest recent codes, as in ``SpaceSaving.top``."""
+        return self.sketch().top(n)
@@ -0,0 +1,174 @@
+"""Idempotency keys for retried write requests.
+
+The first request carrying a key claims it with a conditional put, runs, and
+stores its response under the key for ``ttl`` seconds. Retries with the same
+key replay the stored response instead of writing again. A duplicate that
+arrives while the first request is still running waits briefly for its
+result; claims abandoned by a crashed request expire after
+``lock_timeout`` seconds so that a later retry can take over.
+
+Keys are bound to a fingerprint of the request body, so reusing a key for a
+different request is rejected rather than answered with an unrelated
+response.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import dynamodb_resource
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import dynamodb_resource
+
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+# Longest key accepted from clients
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class Claim:
+    """Outcome of claiming an idempotency key."""
+
+    # True if this request owns the key and must run
+    acquired: bool
+    # Stored response to replay, for completed keys
+    response: Optional[Dict[str, Any]] = None
+    # True if the key was used with a different request body
+    mismatch: bool = False
+
+
+def fingerprint(body: str) -> str:
+    """Hash a request body for comparison across retries."""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Idempotency records in a DynamoDB table keyed by ``idempotency_key``."""
+
+    def __init__(
+        self,
+        table_name: str,
+        region_name: str = "us-east-1",
+        ttl: int = 86400,
+        lock_timeout: float = 30.0,
+        wait_timeout: float = 2.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            table_name: Name of the idempotency table
+            region_name: AWS region name
+            ttl: Seconds a completed response is replayed for
+            lock_timeout: Seconds before an unfinished claim can be taken
+                over by a retry
+            wait_timeout: Seconds a concurrent duplicate waits for the first
+                request to finish
+            poll_interval: Seconds between checks while waiting
+        """
+        self.table = dynamodb_resource(region_name).Table(table_name)
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    def claim(self, key: str, request_hash: str) -> Claim:
+        """Claim a key, or return what a previous request left under it.
+
+        Args:
+            key: The client's idempotency key
+            request_hash: Fingerprint of the request body
+
+        Returns:
+            The claim outcome; when not acquired, either a response to
+            replay, a mismatch, or neither if the first request is still
+            running after ``wait_timeout``
+
+        Raises:
+            ClientError: If DynamoDB fails
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if self._try_acquire(key, request_hash):
+                return Claim(acquired=True)
+
+            item = self.table.get_item(
+                Key={"idempotency_key": key}, ConsistentRead=True
+            ).get("Item")
+            if item is None:
+                # Released or expired between the put and the read
+                continue
+            if item.get("request_hash") != request_hash:
+                return Claim(acquired=False, mismatch=True)
+            if item.get("state") == COMPLETED:
+                return Claim(acquired=False, response=item["response"])
+            if time.monotonic() >= deadline:
+                return Claim(acquired=False)
+            time.sleep(self.poll_interval)
+
+    def _try_acquire(self, key: str, request_hash: str) -> bool:
+        """Write an in-progress record unless a live one exists."""
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    "idempotency_key": key,
+                    "state": IN_PROGRESS,
+                    "request_hash": request_hash,
+                    "locked_until": now + int(self.lock_timeout),
+                    "expires_at": now + self.ttl,
+                },
+                ConditionExpression=(
+                    "attribute_not_exists(idempotency_key)"
+                    " OR expires_at < :now"
+                    " OR (#state = :in_progress AND locked_until < :now)"
+                ),
+                ExpressionAttributeNames={"#state": "state"},
+                ExpressionAttributeValues={
+                    ":now": now, ":in_progress": IN_PROGRESS,
+                },
+            )
+            return True
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def complete(self, key: str, response: Dict[str, Any]) -> None:
+        """Store the response for replay.
+
+        Args:
+            key: The claimed idempotency key
+            response: The API Gateway response to replay
+        """
+        self.table.update_item(
+            Key={"idempotency_key": key},
+            UpdateExpression=(
+                "SET #state = :completed, #response = :response, "
+                "expires_at = :expires_at REMOVE locked_until"
+            ),
+            ExpressionAttributeNames={
+                "#state": "state", "#response": "response",
+            },
+            ExpressionAttributeValues={
+                ":completed": COMPLETED,
+                ":response": response,
+                ":expires_at": int(time.time()) + self.ttl,
+            },
+        )
+
+    def release(self, key: str) -> None:
+        """Drop a claim whose request failed, so that a retry can run.
+
+        Args:
+            key: The claimed idempotency key
+        """
+        self.table.delete_item(Key={"idempotency_key": key})
@@ -0,0 +1,105 @@
+"""Micro-batching of concurrent key lookups.
+
+Callers asking for different keys at nearly the same time are grouped: the
+first caller opens a batch and waits up to ``window`` seconds (or until the
+batch holds ``max_batch`` distinct keys), then fetches every key in the batch
+with one call and hands each waiter its own result. This trades a small,
+bounded delay for far fewer backend requests under high concurrency.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Batch:
+    """Keys collected during one batching window."""
+
+    __slots__ = ("keys", "full", "done", "results", "error")
+
+    def __init__(self) -> None:
+        self.keys: Dict[Hashable, None] = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: Dict[Hashable, Any] = {}
+        self.error: Optional[BaseException] = None
+
+
+class LookupBatcher:
+    """Coalesce concurrent lookups of distinct keys into batched fetches."""
+
+    def __init__(
+        self,
+        fetch_many: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        window: float = 0.0005,
+        max_batch: int = 25,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            fetch_many: Fetches a list of keys and returns found results
+            window: Seconds the first caller waits for more keys
+            max_batch: Distinct keys that close a batch early
+        """
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        self.requests = 0
+        self.batches = 0
+        self.keys = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Look up one key as part of the current batch.
+
+        Args:
+            key: The key to look up
+
+        Returns:
+            The fetched result, or None if the key was not found
+
+        Raises:
+            Whatever exception the batched fetch raised
+        """
+        with self._lock:
+            self.requests += 1
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.keys[key] = None
+            if len(batch.keys) >= self.max_batch:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                self.batches += 1
+                self.keys += len(batch.keys)
+            try:
+                batch.results = self.fetch_many(list(batch.keys))
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "keys": self.keys,
+                "avg_batch_size": (
+                    round(self.keys / self.batches, 2) if self.batches else 0
+                ),
+            }
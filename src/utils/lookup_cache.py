@@ -0,0 +1,150 @@
+"""In-process cache of resolved short codes."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class LookupCache:
+    """Thread-safe LRU cache of found mappings.
+
+    Entries live for at most ``ttl`` seconds and never past the link's own
+    ``expires_at``. Only found mappings are cached; unknown codes are left
+    to the edge cache's short 404 TTL. With ``stale_ttl``, entries past
+    their TTL are kept that much longer (while there is room) for
+    ``get_stale``, the last-known-good answer when the table cannot be read.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 300.0,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is
+                evicted
+            ttl: Seconds an entry is served
+            stale_ttl: Seconds past ``ttl`` an entry is still available to
+                ``get_stale``
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Return the cached mapping of a short code, if still fresh."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is None or entry[0] <= now:
+                if entry is not None and entry[0] + self.stale_ttl <= now:
+                    del self._entries[short_code]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(short_code)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Return the cached mapping of a short code, even past its TTL.
+
+        Entries are served up to ``stale_ttl`` seconds past their TTL, but
+        never past the link's ``expires_at``.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(short_code)
+            if entry is None or entry[0] + self.stale_ttl <= now:
+                return None
+            expires_at = entry[1].get("expires_at")
+            if expires_at and int(expires_at) <= time.time():
+                return None
+            self.stale_hits += 1
+            return entry[1]
+
+    def put(self, short_code: str, item: Dict[str, Any]) -> None:
+        """Cache a found mapping.
+
+        Args:
+            short_code: The short code
+            item: Its mapping, with ``long_url`` and ``expires_at``
+        """
+        deadline = self._deadline(item)
+        if deadline is None:
+            return
+
+        with self._lock:
+            self._entries[short_code] = (deadline, item)
+            self._entries.move_to_end(short_code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, short_code: str, item: Dict[str, Any]) -> bool:
+        """Replace the mapping of a cached short code.
+
+        Codes that are not cached are left alone, so a change feed does not
+        fill the cache with codes nobody reads here.
+
+        Returns:
+            True if a cached entry was replaced
+        """
+        deadline = self._deadline(item)
+        with self._lock:
+            if short_code not in self._entries:
+                return False
+            if deadline is None:
+                del self._entries[short_code]
+            else:
+                self._entries[short_code] = (deadline, item)
+            return True
+
+    def invalidate(self, short_code: str) -> bool:
+        """Drop a short code from the cache.
+
+        Returns:
+            True if it was cached
+        """
+        with self._lock:
+            return self._entries.pop(short_code, None) is not None
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _deadline(self, item: Dict[str, Any]) -> Optional[float]:
+        """Return when an entry for ``item`` goes stale, or None if now."""
+        ttl = self.ttl
+        expires_at = item.get("expires_at")
+        if expires_at:
+            ttl = min(ttl, int(expires_at) - time.time())
+        if ttl <= 0:
+            return None
+        return time.monotonic() + ttl
+
+    def stats(self) -> Dict[str, Any]:
+        """Return occupancy and hit counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_hits": self.stale_hits,
+            }
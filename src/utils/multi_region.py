@@ -0,0 +1,242 @@
+"""Multi-region (global table) support.
+
+In an active-active deployment every region serves reads from its local
+replica of the ``url_mappings`` global table. Global tables resolve
+concurrent writes to the same key by last-writer-wins, so short codes must
+never be issued by two regions at once:
+
+- generated codes start with a prefix owned by the issuing region, so
+  regions draw from disjoint code spaces;
+- custom codes are reserved in the primary region, whose table serializes
+  all claims with the usual check-then-put, and may not start with any
+  region's prefix, so they never collide with a generated code that has not
+  replicated yet.
+
+Because replication is asynchronous, a code created in another region may
+not have reached the local replica yet. Lookups that miss locally therefore
+fall back to the code's home region, identified by its prefix, and to the
+primary region.
+
+Configuration comes from the environment:
+
+    REGION_CODE_PREFIXES   us-east-1=a,eu-west-1=e (enables multi-region)
+    PRIMARY_REGION         region that reserves custom codes
+    DYNAMODB_ENDPOINT_URLS us-east-1=http://...,eu-west-1=http://... (DynamoDB
+                           Local instance standing in for each region)
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import DynamoDBOperations
+    from utils.short_code_generator import CHARS
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import DynamoDBOperations
+    from src.utils.short_code_generator import CHARS
+
+logger = logging.getLogger(__name__)
+
+
+def parse_region_map(value: Optional[str]) -> Dict[str, str]:
+    """Parse a ``region=value,region=value`` setting.
+
+    Args:
+        value: The raw setting, possibly empty
+
+    Returns:
+        Mapping of region name to value
+
+    Raises:
+        ValueError: If an entry is not ``region=value``
+    """
+    mapping: Dict[str, str] = {}
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        region, sep, item = entry.partition("=")
+        if not sep or not region.strip() or not item.strip():
+            raise ValueError(f"Expected region=value, got '{entry}'")
+        mapping[region.strip()] = item.strip()
+    return mapping
+
+
+class RegionalTables:
+    """Route mapping reads and writes across the regions of a global table."""
+
+    def __init__(
+        self,
+        local: DynamoDBOperations,
+        region: str,
+        primary_region: str,
+        prefixes: Dict[str, str],
+    ) -> None:
+        """Initialize the router.
+
+        Args:
+            local: DynamoDB operations for this region's replica
+            region: This region's name
+            primary_region: Region that reserves custom codes
+            prefixes: Code prefix owned by each region
+
+        Raises:
+            ValueError: If the prefixes are ambiguous or incomplete
+        """
+        if region not in prefixes or primary_region not in prefixes:
+            raise ValueError(
+                "REGION_CODE_PREFIXES must cover the local and primary "
+                "regions"
+            )
+        owners: Dict[str, str] = {}
+        for name, prefix in prefixes.items():
+            if len(prefix) != 1 or prefix not in CHARS:
+                raise ValueError(
+                    f"Region prefix for {name} must be one letter or digit"
+                )
+            if prefix in owners:
+                raise ValueError(
+                    f"Regions {owners[prefix]} and {name} share prefix "
+                    f"'{prefix}'"
+                )
+            owners[prefix] = name
+
+        self.local = local
+        self.region = region
+        self.primary_region = primary_region
+        self.prefixes = prefixes
+        self._owners = owners
+        self._endpoints = parse_region_map(
+            os.environ.get("DYNAMODB_ENDPOINT_URLS")
+        )
+        self._remote: Dict[str, DynamoDBOperations] = {}
+        self._lock = threading.Lock()
+        self.remote_reads = 0
+        self.remote_hits = 0
+
+    @classmethod
+    def from_env(
+        cls, local: DynamoDBOperations, region: str
+    ) -> Optional["RegionalTables"]:
+        """Build a router from the environment, if multi-region is enabled.
+
+        Args:
+            local: DynamoDB operations for this region's replica
+            region: This region's name
+
+        Returns:
+            The router, or None for single-region deployments
+        """
+        prefixes = parse_region_map(os.environ.get("REGION_CODE_PREFIXES"))
+        if not prefixes:
+            return None
+        return cls(
+            local,
+            region,
+            os.environ.get("PRIMARY_REGION", region),
+            prefixes,
+        )
+
+    @property
+    def code_prefix(self) -> str:
+        """Prefix for codes generated in this region."""
+        return self.prefixes[self.region]
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this region reserves custom codes itself."""
+        return self.region == self.primary_region
+
+    def ops_for(self, region: str) -> DynamoDBOperations:
+        """Return DynamoDB operations for a region's replica.
+
+        Args:
+            region: Region name
+
+        Returns:
+            Operations on that region's table, created on first use
+        """
+        if region == self.region:
+            return self.local
+        with self._lock:
+            ops = self._remote.get(region)
+            if ops is None:
+                ops = DynamoDBOperations(
+                    table_name=self.local.table_name,
+                    region_name=region,
+                    endpoint_url=self._endpoints.get(region),
+                )
+                self._remote[region] = ops
+            return ops
+
+    def home_region(self, short_code: str) -> Optional[str]:
+        """Region that issued a generated code, if it has a known prefix."""
+        return self._owners.get(short_code[:1])
+
+    def is_reserved(self, short_code: str) -> bool:
+        """Whether a code starts with a prefix owned by a region.
+
+        Such codes belong to a region's generated code space and cannot be
+        chosen as custom codes.
+        """
+        return short_code[:1] in self._owners
+
+    def reserve_custom_code(self, short_code: str, long_url: str) -> bool:
+        """Claim a custom code through the primary region.
+
+        Args:
+            short_code: The custom code
+            long_url: The URL it should redirect to
+
+        Returns:
+            True if saved, False if the code is already taken
+        """
+        return self.ops_for(self.primary_region).save_url_mapping(
+            short_code, long_url
+        )
+
+    def lookup_home(
+        self, short_code: str
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Look a code up where it was written, after a local miss.
+
+        That is the region owning the code's prefix (generated codes) and
+        then the primary region (custom codes).
+
+        Args:
+            short_code: The short code
+
+        Returns:
+            Same as ``DynamoDBOperations.get_url_mapping``; (False, None)
+            when no other region can hold the code
+        """
+        candidates = []
+        for region in (self.home_region(short_code), self.primary_region):
+            if region and region != self.region and region not in candidates:
+                candidates.append(region)
+
+        for region in candidates:
+            with self._lock:
+                self.remote_reads += 1
+            found, item = self.ops_for(region).get_url_mapping(short_code)
+            if found:
+                with self._lock:
+                    self.remote_hits += 1
+                logger.info(
+                    f"Short code {short_code} served from region {region}"
+                )
+                return found, item
+        return False, None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return routing counters."""
+        with self._lock:
+            return {
+                "region": self.region,
+                "primary_region": self.primary_region,
+                "remote_reads": self.remote_reads,
+                "remote_hits": self.remote_hits,
+            }
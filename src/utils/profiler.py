@@ -0,0 +1,299 @@
+"""On-demand sampling profiler for the container services.
+
+A profiling session samples a fraction of requests: while a sampled request
+runs, a background thread records the stack of the thread serving it every
+few milliseconds. When the session ends the samples are written in the
+folded-stack format (``frame;frame;frame count``) read by ``flamegraph.pl``,
+speedscope and most other flame graph tools, one file per session. Samples
+are wall-clock, so time spent waiting on DynamoDB shows up under the boto3
+frames that wait, next to CPU work such as URL validation or JSON encoding.
+
+A session can also trace memory with ``tracemalloc``. Tracing covers the
+whole process and slows it down noticeably, so it is off unless asked for;
+its output is a folded file of the bytes still allocated at the end of the
+session, by allocation traceback.
+
+Outside a session the request hooks only check a flag, and no thread runs.
+
+The endpoints that start sessions and serve profiles expose code paths and
+timings, so ``admin_allowed`` limits them to holders of a token or, without
+one, to callers on the loopback interface (``kubectl exec`` or
+``kubectl port-forward``).
+"""
+
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest session a single start may request
+MAX_DURATION_SECONDS = 600
+# Frames kept per allocation traceback when tracing memory
+MEMORY_FRAMES = 25
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+
+
+def admin_allowed(
+    remote_addr: Optional[str],
+    authorization: Optional[str],
+    token: Optional[str],
+) -> bool:
+    """Whether a request may use the profiling endpoints.
+
+    Args:
+        remote_addr: Address of the caller
+        authorization: The request's ``Authorization`` header, if any
+        token: Required bearer token; without one only loopback callers
+            are allowed
+
+    Returns:
+        True if the caller is allowed
+    """
+    if token:
+        return hmac.compare_digest(
+            (authorization or "").encode("utf-8"),
+            f"Bearer {token}".encode("utf-8"),
+        )
+    return remote_addr in LOOPBACK_ADDRESSES
+
+
+class RequestProfiler:
+    """Sample the stacks of a fraction of requests during a session."""
+
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        interval: float = 0.005,
+        max_depth: int = 128,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            output_dir: Directory the profiles are written to; profiling is
+                unavailable without one
+            interval: Seconds between stack samples
+            max_depth: Innermost frames kept per sampled stack
+        """
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_depth = max_depth
+        # Read by the request hooks without the lock
+        self.active = False
+
+        self.sample_rate = 0.0
+        self.memory = False
+        self._deadline = 0.0
+        self._session = 0
+        self._threads: Dict[int, str] = {}
+        self._stacks: Counter = Counter()
+        self._profiled = 0
+        self._samples = 0
+        self._traced_memory = False
+        self._files: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether profiles can be written."""
+        return bool(self.output_dir)
+
+    def begin(self, label: str) -> bool:
+        """Sample the calling thread's request if the session picks it.
+
+        Args:
+            label: Root frame of the request's stacks, e.g. its route
+
+        Returns:
+            True if the request is sampled; ``end`` must then be called
+        """
+        if not self.active or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if not self.active:
+                return False
+            self._threads[threading.get_ident()] = label
+            self._profiled += 1
+        return True
+
+    def end(self) -> None:
+        """Stop sampling the calling thread."""
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+
+    def start(
+        self,
+        sample_rate: float = 0.05,
+        duration: float = 60.0,
+        memory: bool = False,
+    ) -> Dict[str, Any]:
+        """Start a session that ends by itself after ``duration`` seconds.
+
+        Args:
+            sample_rate: Fraction of requests to sample, in (0, 1]
+            duration: Session length in seconds, at most 600
+            memory: Also trace memory allocations
+
+        Returns:
+            The profiler status
+
+        Raises:
+            ValueError: If profiling is unavailable, a session is running or
+                an argument is out of range
+        """
+        if not self.available:
+            raise ValueError("Profiling is disabled (PROFILE_DIR is unset)")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if not 0 < duration <= MAX_DURATION_SECONDS:
+            raise ValueError(
+                f"duration must be in (0, {MAX_DURATION_SECONDS}] seconds"
+            )
+
+        with self._lock:
+            if self.active:
+                raise ValueError("A profiling session is already running")
+            self._session += 1
+            self._threads.clear()
+            self._stacks.clear()
+            self._profiled = 0
+            self._samples = 0
+            self.sample_rate = sample_rate
+            self.memory = memory
+            self._deadline = time.monotonic() + duration
+            self._traced_memory = memory and not tracemalloc.is_tracing()
+            if self._traced_memory:
+                tracemalloc.start(MEMORY_FRAMES)
+            self.active = True
+            session = self._session
+
+        threading.Thread(
+            target=self._sample, args=(session,), daemon=True,
+            name="request-profiler",
+        ).start()
+        logger.info(
+            f"Profiling {sample_rate:.0%} of requests for {duration:.0f}s"
+            + (" with memory tracing" if memory else "")
+        )
+        return self.stats()
+
+    def stop(self) -> List[str]:
+        """End the session and write its profiles.
+
+        Returns:
+            Paths of the files written (none if no session was running)
+        """
+        with self._lock:
+            if not self.active:
+                return []
+            self.active = False
+            self._threads.clear()
+            stacks, self._stacks = self._stacks, Counter()
+            snapshot = None
+            if self.memory and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                if self._traced_memory:
+                    tracemalloc.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = f"{os.getpid()}-{datetime.utcnow():%Y%m%dT%H%M%S}"
+        files = []
+        if stacks:
+            files.append(self._write(f"cpu-{stamp}.folded", stacks))
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            allocations: Counter = Counter()
+            for stat in snapshot.statistics("traceback"):
+                allocations[";".join(
+                    f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                    for frame in stat.traceback
+                )] += stat.size
+            files.append(self._write(f"memory-{stamp}.folded", allocations))
+
+        self._files = files
+        logger.info(f"Profiling stopped; wrote {', '.join(files) or 'none'}")
+        return files
+
+    def toggle(self) -> None:
+        """Stop a running session, or start one with the given defaults."""
+        if self.active:
+            self.stop()
+        else:
+            self.start(
+                sample_rate=float(
+                    os.environ.get("PROFILE_SAMPLE_RATE", 0.05)
+                ),
+                duration=float(
+                    os.environ.get("PROFILE_DURATION_SECONDS", 60)
+                ),
+                memory=os.environ.get("PROFILE_MEMORY", "") in ("1", "true"),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the session state and the files of the last session."""
+        with self._lock:
+            return {
+                "available": self.available,
+                "active": self.active,
+                "sample_rate": self.sample_rate if self.active else 0.0,
+                "memory": self.active and self.memory,
+                "remaining_seconds": round(
+                    max(0.0, self._deadline - time.monotonic()), 1
+                ) if self.active else 0.0,
+                "profiled_requests": self._profiled,
+                "samples": self._samples,
+                "files": [os.path.basename(path) for path in self._files],
+            }
+
+    def _sample(self, session: int) -> None:
+        """Record the stacks of sampled requests until the session ends."""
+        while True:
+            time.sleep(self.interval)
+            if time.monotonic() >= self._deadline:
+                with self._lock:
+                    expired = self.active and self._session == session
+                if expired:
+                    self.stop()
+                return
+
+            frames = sys._current_frames()
+            with self._lock:
+                if not self.active or self._session != session:
+                    return
+                for ident, label in self._threads.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self._stacks[self._fold(label, frame)] += 1
+                        self._samples += 1
+
+    def _fold(self, label: str, frame: Any) -> str:
+        """Return a stack as ``label;outermost;...;innermost``."""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(
+                f"{code.co_name} "
+                f"({os.path.basename(code.co_filename)}:"
+                f"{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        names.append(label)
+        return ";".join(reversed(names))
+
+    def _write(self, name: str, stacks: Counter) -> str:
+        """Write folded stacks, heaviest first, and return the path."""
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, weight in stacks.most_common():
+                f.write(f"{stack} {weight}\n")
+        return path
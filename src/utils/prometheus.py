@@ -0,0 +1,37 @@
+"""Prometheus text rendering of the services' JSON counters."""
+
+import re
+from typing import Any, Dict, List
+
+_INVALID = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _flatten(prefix: str, value: Any, lines: List[str]) -> None:
+    """Append one sample per numeric leaf of ``value``."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}_{_INVALID.sub('_', str(key))}", child, lines)
+    elif isinstance(value, bool):
+        lines.append(f"{prefix} {int(value)}")
+    elif isinstance(value, (int, float)):
+        lines.append(f"{prefix} {value}")
+
+
+def render_prometheus(stats: Dict[str, Any], prefix: str = "tiny_url") -> str:
+    """Render nested service counters in the Prometheus text format.
+
+    Nested keys are joined with underscores, e.g. ``{"admission":
+    {"in_flight": 3}}`` becomes ``tiny_url_admission_in_flight 3``. Strings
+    and missing values are skipped. Samples are untyped, which Prometheus
+    accepts for both gauges and counters (``rate()`` works on the latter).
+
+    Args:
+        stats: Counters as served on ``/metrics``
+        prefix: Metric name prefix
+
+    Returns:
+        The exposition text
+    """
+    lines: List[str] = []
+    _flatten(prefix, stats, lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+"""Token-bucket rate limiting utilities."""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Requests larger than the capacity are allowed to drive the bucket into
+    debt, so a caller writing fixed-size batches is still paced correctly.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (default: one second of tokens)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if they are available right now.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            True if the tokens were taken, False otherwise
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= min(tokens, self.capacity):
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def retry_after(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` would be available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            needed = min(tokens, self.capacity)
+            return max(0.0, (needed - self._tokens) / self.rate)
@@ -0,0 +1,410 @@
+"""Lookup cache shared by all worker processes of a pod.
+
+With several worker processes per pod, a per-process cache holds every hot
+mapping once per worker and each worker warms its own copy. This cache lives
+in one memory-mapped file (on ``/dev/shm`` in containers) that every worker
+maps, so a mapping read by one worker is a hit for all of them::
+
+    header | set 0 | set 1 | ... | set N-1
+    set    = write counter, clock hand | slot 0 | ... | slot ways-1
+    slot   = flags, key length, url length, fresh until, expires_at,
+             key (KEY_SIZE bytes), url (up to slot_size - SLOT_HEADER)
+
+A short code hashes (crc32, identical in every process) to one set of
+``ways`` fixed-size slots. When a set is full, a CLOCK hand stored in the
+set header evicts the first slot not referenced since the hand last passed
+it. Each set is guarded by a byte-range ``fcntl`` lock on its header, shared
+by readers and exclusive for writers, across processes; a striped thread
+lock does the same between the threads of one process, since ``fcntl``
+locks are held per process. URLs longer than a slot are not cached.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TURLSHMC"
+VERSION = 1
+# Room for the longest custom code (30 characters)
+KEY_SIZE = 32
+# magic, version, sets, ways, slot size
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+# write counter, clock hand
+SET_HEADER = struct.Struct("<II")
+# flags, key length, url length, fresh until, expires_at
+SLOT = struct.Struct("<BBHdq")
+SLOT_HEADER = SLOT.size + KEY_SIZE
+
+USED = 0x1
+REFERENCED = 0x2
+
+# Thread locks per process; sets share them round-robin
+LOCK_STRIPES = 64
+
+
+def _file_size(sets: int, ways: int, slot_size: int) -> int:
+    """Return the size of a table file with the given geometry."""
+    return HEADER_SIZE + sets * (SET_HEADER.size + ways * slot_size)
+
+
+class SharedLookupCache:
+    """Set-associative CLOCK cache of found mappings in shared memory.
+
+    Drop-in for ``LookupCache``: entries live for at most ``ttl`` seconds and
+    never past the link's ``expires_at``, and stay available to
+    ``get_stale`` for ``stale_ttl`` seconds more until their slot is
+    reused. Hit and miss counters are kept per process; occupancy is read
+    from the shared table.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl: float = 300.0,
+        slot_size: int = 512,
+        ways: int = 8,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        """Map the cache file, creating it if needed.
+
+        Processes opening the same path share the table. An existing table
+        keeps its geometry even if it differs from the arguments, since
+        resizing it would pull the mapping from under other processes.
+
+        Args:
+            path: Cache file, e.g. ``/dev/shm/tiny-url-lookup-cache``
+            max_entries: Slots in the table, rounded up to whole sets
+            ttl: Seconds an entry is served
+            slot_size: Bytes per slot, which bounds the cached URL length
+            ways: Slots per set
+            stale_ttl: Seconds past ``ttl`` an entry is still available to
+                ``get_stale``
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if slot_size <= SLOT_HEADER:
+            raise ValueError(f"slot_size must exceed {SLOT_HEADER}")
+
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        sets = -(-max_entries // ways)
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            existing = self._read_geometry()
+            if existing is None:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, _file_size(sets, ways, slot_size))
+                os.pwrite(
+                    self._fd,
+                    HEADER.pack(MAGIC, VERSION, sets, ways, slot_size),
+                    0,
+                )
+            elif existing != (sets, ways, slot_size):
+                logger.warning(
+                    f"Shared cache {path} exists with sets, ways, slot size "
+                    f"{existing}; using it instead of "
+                    f"{(sets, ways, slot_size)}"
+                )
+                sets, ways, slot_size = existing
+            self._mm = mmap.mmap(
+                self._fd, _file_size(sets, ways, slot_size)
+            )
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.max_entries = sets * ways
+        self._set_size = SET_HEADER.size + ways * slot_size
+
+        self._thread_locks = [
+            threading.Lock() for _ in range(min(LOCK_STRIPES, self.sets))
+        ]
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.too_large = 0
+
+    def _read_geometry(self) -> Optional[Tuple[int, int, int]]:
+        """Return the geometry of a valid existing table, if any."""
+        header = os.pread(self._fd, HEADER.size, 0)
+        if len(header) < HEADER.size:
+            return None
+        magic, version, sets, ways, slot_size = HEADER.unpack(header)
+        if (magic != MAGIC or version != VERSION
+                or os.fstat(self._fd).st_size
+                != _file_size(sets, ways, slot_size)):
+            return None
+        return sets, ways, slot_size
+
+    def _set_offset(self, short_code: bytes) -> int:
+        """Return the offset of the set a key belongs to."""
+        index = zlib.crc32(short_code) % self.sets
+        return HEADER_SIZE + index * self._set_size
+
+    def _lock(self, offset: int, exclusive: bool) -> threading.Lock:
+        """Lock a set against other threads and processes."""
+        index = (offset - HEADER_SIZE) // self._set_size
+        thread_lock = self._thread_locks[index % len(self._thread_locks)]
+        thread_lock.acquire()
+        try:
+            fcntl.lockf(
+                self._fd,
+                fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH,
+                SET_HEADER.size,
+                offset,
+            )
+        except BaseException:
+            thread_lock.release()
+            raise
+        return thread_lock
+
+    def _unlock(self, offset: int, thread_lock: threading.Lock) -> None:
+        """Release a set locked by ``_lock``."""
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, SET_HEADER.size, offset)
+        thread_lock.release()
+
+    def _find(self, offset: int, key: bytes) -> Optional[int]:
+        """Return the offset of the slot holding ``key`` in a set."""
+        for way in range(self.ways):
+            slot = offset + SET_HEADER.size + way * self.slot_size
+            flags, key_length, _, _, _ = SLOT.unpack_from(self._mm, slot)
+            if (flags & USED and key_length == len(key)
+                    and self._mm[slot + SLOT.size:
+                                 slot + SLOT.size + key_length] == key):
+                return slot
+        return None
+
+    def get(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Return the cached mapping of a short code, if still fresh."""
+        item = self._read(short_code, 0.0)
+        with self._stats_lock:
+            if item:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return item
+
+    def get_stale(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Return the cached mapping of a short code, even past its TTL.
+
+        Entries are served up to ``stale_ttl`` seconds past their TTL, but
+        never past the link's ``expires_at``.
+        """
+        item = self._read(short_code, self.stale_ttl)
+        if item:
+            with self._stats_lock:
+                self.stale_hits += 1
+        return item
+
+    def _read(
+        self, short_code: str, stale_ttl: float
+    ) -> Optional[Dict[str, Any]]:
+        """Read a mapping up to ``stale_ttl`` seconds past its TTL."""
+        key = short_code.encode("utf-8")
+        if len(key) > KEY_SIZE:
+            return None
+
+        offset = self._set_offset(key)
+        lock = self._lock(offset, exclusive=False)
+        try:
+            slot = self._find(offset, key)
+            item = None
+            if slot is not None:
+                flags, _, url_length, fresh_until, expires_at = (
+                    SLOT.unpack_from(self._mm, slot)
+                )
+                now = time.time()
+                if (fresh_until + stale_ttl > now
+                        and not 0 < expires_at <= now):
+                    start = slot + SLOT_HEADER
+                    item = {
+                        "short_code": short_code,
+                        "long_url": self._mm[start:start + url_length]
+                        .decode("utf-8"),
+                        "expires_at": expires_at,
+                    }
+                    # Concurrent readers may set the same bit; a lost
+                    # update only makes the entry look colder once
+                    if not flags & REFERENCED:
+                        self._mm[slot] = flags | REFERENCED
+        finally:
+            self._unlock(offset, lock)
+        return item
+
+    def put(self, short_code: str, item: Dict[str, Any]) -> None:
+        """Cache a found mapping.
+
+        Args:
+            short_code: The short code
+            item: Its mapping, with ``long_url`` and ``expires_at``
+        """
+        self._store(short_code, item, replace_only=False)
+
+    def refresh(self, short_code: str, item: Dict[str, Any]) -> bool:
+        """Replace the mapping of a cached short code.
+
+        Codes that are not cached are left alone. A replacement that cannot
+        be cached (too large or already expired) drops the old entry.
+
+        Returns:
+            True if a cached entry was replaced or dropped
+        """
+        return self._store(short_code, item, replace_only=True)
+
+    def _store(
+        self, short_code: str, item: Dict[str, Any], replace_only: bool
+    ) -> bool:
+        """Write a mapping into its set; see ``put`` and ``refresh``."""
+        key = short_code.encode("utf-8")
+        url = item["long_url"].encode("utf-8")
+        if len(key) > KEY_SIZE:
+            return False
+
+        now = time.time()
+        ttl = self.ttl
+        expires_at = int(item.get("expires_at") or 0)
+        if expires_at:
+            ttl = min(ttl, expires_at - now)
+        too_large = SLOT_HEADER + len(url) > self.slot_size
+        if too_large:
+            with self._stats_lock:
+                self.too_large += 1
+        if too_large or ttl <= 0:
+            return self.invalidate(short_code) if replace_only else False
+
+        offset = self._set_offset(key)
+        lock = self._lock(offset, exclusive=True)
+        try:
+            slot = self._find(offset, key)
+            evicted = False
+            if slot is None:
+                if replace_only:
+                    return False
+                slot, evicted = self._victim(offset, now)
+            SLOT.pack_into(
+                self._mm, slot, USED, len(key), len(url), now + ttl,
+                expires_at,
+            )
+            self._mm[slot + SLOT.size:slot + SLOT.size + len(key)] = key
+            start = slot + SLOT_HEADER
+            self._mm[start:start + len(url)] = url
+        finally:
+            self._unlock(offset, lock)
+
+        if evicted:
+            with self._stats_lock:
+                self.evictions += 1
+        return True
+
+    def invalidate(self, short_code: str) -> bool:
+        """Drop a short code from the shared table.
+
+        Returns:
+            True if it was cached
+        """
+        key = short_code.encode("utf-8")
+        if len(key) > KEY_SIZE:
+            return False
+
+        offset = self._set_offset(key)
+        lock = self._lock(offset, exclusive=True)
+        try:
+            slot = self._find(offset, key)
+            if slot is not None:
+                self._mm[slot] = 0
+        finally:
+            self._unlock(offset, lock)
+        return slot is not None
+
+    def clear(self) -> None:
+        """Drop every entry of the shared table, one set at a time."""
+        for index in range(self.sets):
+            offset = HEADER_SIZE + index * self._set_size
+            lock = self._lock(offset, exclusive=True)
+            try:
+                for way in range(self.ways):
+                    slot = offset + SET_HEADER.size + way * self.slot_size
+                    self._mm[slot] = 0
+            finally:
+                self._unlock(offset, lock)
+
+    def _victim(self, offset: int, now: float) -> Tuple[int, bool]:
+        """Pick the slot to overwrite in a set, advancing its CLOCK hand.
+
+        Returns:
+            ``(slot offset, whether a live entry is evicted)``
+        """
+        base = offset + SET_HEADER.size
+        for way in range(self.ways):
+            slot = base + way * self.slot_size
+            flags = self._mm[slot]
+            fresh_until = SLOT.unpack_from(self._mm, slot)[3]
+            if not flags & USED or fresh_until <= now:
+                return slot, False
+
+        writes, hand = SET_HEADER.unpack_from(self._mm, offset)
+        # Every referenced slot is cleared on the first pass, so a victim
+        # is found within two turns of the hand
+        for _ in range(2 * self.ways):
+            slot = base + hand * self.slot_size
+            hand = (hand + 1) % self.ways
+            flags = self._mm[slot]
+            if flags & REFERENCED:
+                self._mm[slot] = flags & ~REFERENCED
+                continue
+            break
+        SET_HEADER.pack_into(self._mm, offset, writes + 1, hand)
+        return slot, True
+
+    def occupancy(self) -> int:
+        """Return the number of live entries in the shared table."""
+        now = time.time()
+        used = 0
+        for index in range(self.sets):
+            base = HEADER_SIZE + index * self._set_size + SET_HEADER.size
+            for way in range(self.ways):
+                flags, _, _, fresh_until, _ = SLOT.unpack_from(
+                    self._mm, base + way * self.slot_size
+                )
+                if flags & USED and fresh_until > now:
+                    used += 1
+        return used
+
+    def stats(self) -> Dict[str, Any]:
+        """Return shared occupancy and this process's hit counters."""
+        size = self.occupancy()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "shared": True,
+                "size": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "too_large": self.too_large,
+            }
+
+    def close(self) -> None:
+        """Unmap the table; the file stays for other processes."""
+        self._mm.close()
+        os.close(self._fd)
@@ -1,12 +1,158 @@
 """Short code generator for URL shortening service."""
 
+import logging
 import secrets
 import string
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+logger = logging.getLogger(__name__)
 
 CODE_LENGTH = 8
+MAX_CODE_LENGTH = 12
 CHARS = string.ascii_letters + string.digits
+# Largest multiple of len(CHARS) below 256; bytes at or above it are
+# discarded so every character is equally likely
+_BYTE_LIMIT = 256 - 256 % len(CHARS)
+
+
+class ShortCodeGenerator:
+    """Random short codes whose length grows as the keyspace fills up.
+
+    A generated code collides with probability roughly equal to the fraction
+    of the keyspace in use. The outcome of each save is reported back with
+    ``record``; once the collision rate over the last ``window`` attempts
+    exceeds ``collision_threshold``, codes get one character longer, which
+    makes the keyspace 62 times larger. The length is tracked per process
+    and starts from ``length`` again on restart, so raise the configured
+    length once the stats show that it has grown.
+
+    Random bytes are drawn from ``secrets`` in blocks of ``buffer_size``
+    instead of one call per character.
+    """
+
+    def __init__(
+        self,
+        length: int = CODE_LENGTH,
+        max_length: int = MAX_CODE_LENGTH,
+        collision_threshold: float = 0.01,
+        window: int = 1000,
+        min_samples: int = 200,
+        buffer_size: int = 4096,
+    ) -> None:
+        """Initialize the generator.
+
+        Args:
+            length: Initial code length, including any prefix
+            max_length: Length the code never grows beyond
+            collision_threshold: Collision rate that triggers growth
+            window: Recent attempts the collision rate is measured over
+            min_samples: Attempts needed before the rate is acted on
+            buffer_size: Random bytes fetched at a time
+        """
+        if not 0 < length <= max_length:
+            raise ValueError("length must be between 1 and max_length")
+
+        self.length = length
+        self.max_length = max_length
+        self.collision_threshold = collision_threshold
+        self.min_samples = min(min_samples, window)
+        self.buffer_size = buffer_size
+
+        self._recent: Deque[bool] = deque(maxlen=window)
+        self._recent_collisions = 0
+        self._buffer = b""
+        self._position = 0
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.collisions = 0
+        self.exhausted = 0
+        self.length_increases = 0
+
+    def _random_chars(self, count: int) -> str:
+        """Return ``count`` uniformly random characters (lock held)."""
+        chars = []
+        while len(chars) < count:
+            if self._position >= len(self._buffer):
+                self._buffer = secrets.token_bytes(self.buffer_size)
+                self._position = 0
+            byte = self._buffer[self._position]
+            self._position += 1
+            if byte < _BYTE_LIMIT:
+                chars.append(CHARS[byte % len(CHARS)])
+        return "".join(chars)
+
+    def generate(self, prefix: str = "") -> str:
+        """Generate a code of the current length.
+
+        Args:
+            prefix: Leading characters to keep (e.g. the issuing region's
+                prefix); the rest of the code is random
+        """
+        with self._lock:
+            return prefix + self._random_chars(self.length - len(prefix))
+
+    def record(self, collided: bool) -> None:
+        """Report whether a generated code was already taken.
+
+        Args:
+            collided: True if saving the code failed because it exists
+        """
+        with self._lock:
+            self.attempts += 1
+            self.collisions += collided
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_collisions -= self._recent[0]
+            self._recent.append(collided)
+            self._recent_collisions += collided
+
+            if (len(self._recent) >= self.min_samples
+                    and self._recent_rate() > self.collision_threshold
+                    and self.length < self.max_length):
+                self.length += 1
+                self.length_increases += 1
+                self._recent.clear()
+                self._recent_collisions = 0
+                logger.warning(
+                    f"Short code collision rate above "
+                    f"{self.collision_threshold:.2%}, growing codes to "
+                    f"{self.length} characters"
+                )
+
+    def record_exhausted(self) -> None:
+        """Report a request that ran out of retries."""
+        with self._lock:
+            self.exhausted += 1
+
+    def _recent_rate(self) -> float:
+        """Collision rate over the recent window (lock held)."""
+        if not self._recent:
+            return 0.0
+        return self._recent_collisions / len(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return length, collision and retry counters."""
+        with self._lock:
+            return {
+                "length": self.length,
+                "keyspace": len(CHARS) ** self.length,
+                "attempts": self.attempts,
+                "collisions": self.collisions,
+                "collision_rate": round(self._recent_rate(), 6),
+                "exhausted": self.exhausted,
+                "length_increases": self.length_increases,
+            }
+
+
+_default_generator = ShortCodeGenerator()
+
 
+def generate_short_code(prefix: str = "") -> str:
+    """Generate a cryptographically secure 8-character code.
 
-def generate_short_code() -> str:
-    """Generate a cryptographically secure 8-character code."""
-    return "".join(secrets.choice(CHARS) for _ in range(CODE_LENGTH))
+    Args:
+        prefix: Leading characters to keep (e.g. the issuing region's
+            prefix); the rest of the code is random
+    """
+    return _default_generator.generate(prefix)
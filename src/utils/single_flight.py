@@ -0,0 +1,197 @@
+"""Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller runs it and everyone else waits for, and receives, the same
+result or exception. Nothing is cached once the call completes.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class FlightsFull(Exception):
+    """Too many calls are in flight to start another."""
+
+
+class _Call:
+    """An in-flight call shared by the threads waiting on it."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls per key across threads."""
+
+    def __init__(self) -> None:
+        """Initialize an empty call table and counters."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, Future] = {}
+        # Start times of submitted calls, oldest first
+        self._started: Dict[Hashable, float] = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` unless a call for ``key`` is already running.
+
+        Args:
+            key: Identity of the call (e.g. the short code)
+            fn: Function to run
+            args: Arguments passed to ``fn``
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Whatever exception the shared call raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def submit(
+        self,
+        key: Hashable,
+        executor: Executor,
+        fn: Callable[..., Any],
+        *args: Any,
+        limit: Optional[int] = None,
+        max_age: float = 0.0,
+    ) -> Future:
+        """Start ``fn(*args)`` on ``executor`` unless ``key`` is in flight.
+
+        Unlike ``do``, callers get a future and may stop waiting for it
+        while the call completes in the background. Only the first caller
+        for a key queues work, so callers that give up never leave
+        duplicate calls behind.
+
+        Args:
+            key: Identity of the call (e.g. the short code)
+            executor: Executor the call runs on
+            fn: Function to run
+            args: Arguments passed to ``fn``
+            limit: Calls started this way beyond which new keys are refused,
+                while the oldest of them has been in flight for ``max_age``
+            max_age: Seconds the oldest call must have been in flight for
+                ``limit`` to apply; younger calls are expected to finish
+
+        Returns:
+            The future of the shared call
+
+        Raises:
+            FlightsFull: If ``limit`` calls are in flight, none for ``key``,
+                and the oldest has been for ``max_age`` seconds
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.collapsed += 1
+                return future
+            now = time.monotonic()
+            if (limit is not None and len(self._futures) >= limit
+                    and now - next(iter(self._started.values())) >= max_age):
+                raise FlightsFull(f"{len(self._futures)} calls in flight")
+            future = self._futures[key] = executor.submit(fn, *args)
+            self._started[key] = now
+            self.executed += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        """Forget a completed submitted call."""
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+                del self._started[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for executed and collapsed calls."""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._calls) + len(self._futures),
+            }
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent calls per key within one event loop.
+
+    The shared call runs as its own task, so cancelling the caller that
+    started it does not cancel the result the other waiters are expecting.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty call table and counters."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Await ``fn(*args)`` unless a call for ``key`` is already running.
+
+        Args:
+            key: Identity of the call (e.g. the short code)
+            fn: Coroutine function to run
+            args: Arguments passed to ``fn``
+
+        Returns:
+            The result of the shared call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        """Forget a completed call and mark its exception as retrieved."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for executed and collapsed calls."""
+        return {
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,397 @@
+"""Read-only, memory-mapped snapshots of live URL mappings.
+
+A snapshot is a single binary file::
+
+    header | index (sorted, fixed-size entries) | url data
+
+Each index entry holds the short code padded to ``KEY_SIZE`` bytes, the
+expiry timestamp and the offset/length of the long URL in the data section.
+Lookups binary-search the mmapped index, so opening a snapshot costs the same
+regardless of its size and only the touched pages are ever read.
+
+Snapshots are produced by ``export_snapshot`` with a parallel table scan and
+are replaced atomically (write to a temp file, then ``os.replace``), which
+``SnapshotStore`` picks up without interrupting readers.
+"""
+
+import heapq
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import DynamoDBOperations
+    from utils.url_codec import PROJECTED_ATTRIBUTES, decode_item
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import DynamoDBOperations
+    from src.utils.url_codec import PROJECTED_ATTRIBUTES, decode_item
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TURLSNAP"
+VERSION = 1
+# Room for the longest custom code (30 characters)
+KEY_SIZE = 32
+# magic, version, key size, entry count, created at, data offset, crc32
+HEADER = struct.Struct("<8sIIQQQI")
+# padded short code, expires_at, url offset, url length
+ENTRY = struct.Struct(f"<{KEY_SIZE}sqQI")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing or malformed."""
+
+
+def _key(short_code: str) -> bytes:
+    """Encode a short code as a fixed-size, order-preserving index key."""
+    return short_code.encode("ascii").ljust(KEY_SIZE, b"\0")
+
+
+def write_snapshot(
+    path: str, entries: Iterable[Tuple[str, str, int]]
+) -> int:
+    """Write a snapshot from entries already sorted by short code.
+
+    The file is written next to ``path`` and moved into place atomically.
+
+    Args:
+        path: Destination path of the snapshot
+        entries: Sorted (short_code, long_url, expires_at) tuples
+
+    Returns:
+        Number of entries written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    count = 0
+    data_size = 0
+    crc = 0
+
+    with tempfile.TemporaryFile(dir=directory) as index, \
+            tempfile.TemporaryFile(dir=directory) as data:
+        previous = b""
+        for short_code, long_url, expires_at in entries:
+            key = _key(short_code)
+            if len(key) != KEY_SIZE:
+                raise ValueError(f"Short code too long: {short_code}")
+            if key <= previous:
+                raise ValueError("Snapshot entries must be sorted and unique")
+            previous = key
+
+            url = long_url.encode("utf-8")
+            entry = ENTRY.pack(key, int(expires_at or 0), data_size, len(url))
+            index.write(entry)
+            data.write(url)
+            crc = zlib.crc32(url, zlib.crc32(entry, crc))
+            data_size += len(url)
+            count += 1
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(HEADER.pack(
+                    MAGIC, VERSION, KEY_SIZE, count, int(time.time()),
+                    HEADER.size + count * ENTRY.size, crc,
+                ))
+                for part in (index, data):
+                    part.seek(0)
+                    shutil.copyfileobj(part, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    return count
+
+
+class Snapshot:
+    """A memory-mapped snapshot opened for lookups."""
+
+    def __init__(self, path: str) -> None:
+        """Map a snapshot file.
+
+        Args:
+            path: Path of the snapshot file
+
+        Raises:
+            SnapshotError: If the file is not a valid snapshot
+        """
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self.inode = os.fstat(f.fileno()).st_ino
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {e}") from e
+
+        if len(self._mm) < HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+
+        (magic, version, key_size, self.count, self.created_at,
+         self._data_offset, self._crc) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or key_size != KEY_SIZE:
+            raise SnapshotError(f"Snapshot {path} has an unsupported format")
+        if self._data_offset != HEADER.size + self.count * ENTRY.size:
+            raise SnapshotError(f"Snapshot {path} has a corrupt header")
+
+        self._view = memoryview(self._mm)
+
+    def __len__(self) -> int:
+        """Return the number of mappings in the snapshot."""
+        return self.count
+
+    def _key_at(self, position: int) -> bytes:
+        """Return the index key stored at ``position``."""
+        offset = HEADER.size + position * ENTRY.size
+        return self._view[offset:offset + KEY_SIZE].tobytes()
+
+    def codes(self, limit: Optional[int] = None) -> List[str]:
+        """Return the short codes in the snapshot, in index order.
+
+        Args:
+            limit: Maximum number of codes (default: all)
+
+        Returns:
+            Short codes, sorted
+        """
+        count = self.count if limit is None else min(limit, self.count)
+        return [
+            self._key_at(position).rstrip(b"\0").decode("ascii")
+            for position in range(count)
+        ]
+
+    def get(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Look up a short code with a binary search over the index.
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            Item-shaped dict with long_url and expires_at, or None
+        """
+        try:
+            key = _key(short_code)
+        except UnicodeEncodeError:
+            return None
+        if len(key) != KEY_SIZE:
+            return None
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.count or self._key_at(low) != key:
+            return None
+
+        _, expires_at, url_offset, url_length = ENTRY.unpack_from(
+            self._view, HEADER.size + low * ENTRY.size
+        )
+        start = self._data_offset + url_offset
+        long_url = str(self._view[start:start + url_length], "utf-8")
+        return {
+            "short_code": short_code,
+            "long_url": long_url,
+            "expires_at": expires_at,
+        }
+
+    def verify(self) -> bool:
+        """Check the stored CRC32 against the index and data sections."""
+        crc = 0
+        for position in range(self.count):
+            offset = HEADER.size + position * ENTRY.size
+            entry = self._view[offset:offset + ENTRY.size]
+            _, _, url_offset, url_length = ENTRY.unpack(entry)
+            start = self._data_offset + url_offset
+            crc = zlib.crc32(self._view[start:start + url_length],
+                             zlib.crc32(entry, crc))
+        return crc == self._crc
+
+
+class SnapshotStore:
+    """Serve lookups from the current snapshot and swap in new ones.
+
+    The store re-checks the snapshot path at most every ``reload_interval``
+    seconds. A replaced file (new inode) is opened and swapped in with a
+    single reference assignment; in-flight lookups keep using the old map
+    until they finish.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 30.0) -> None:
+        """Initialize the store and load the snapshot if it exists.
+
+        Args:
+            path: Path of the snapshot file
+            reload_interval: Seconds between checks for a new snapshot
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        """The snapshot currently being served."""
+        return self._snapshot
+
+    def reload(self) -> bool:
+        """Swap in the snapshot at ``path`` if it changed.
+
+        Returns:
+            True if a new snapshot was loaded
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            try:
+                inode = os.stat(self.path).st_ino
+            except OSError:
+                return False
+
+            current = self._snapshot
+            if current is not None and current.inode == inode:
+                return False
+
+            try:
+                snapshot = Snapshot(self.path)
+            except SnapshotError as e:
+                logger.error(f"Keeping previous snapshot: {e}")
+                return False
+
+            self._snapshot = snapshot
+            logger.info(
+                f"Loaded snapshot {self.path} with {len(snapshot)} mappings"
+            )
+            return True
+
+    def get(self, short_code: str) -> Optional[Dict[str, Any]]:
+        """Look up a short code in the current snapshot.
+
+        Args:
+            short_code: The short code to look up
+
+        Returns:
+            Item-shaped dict, or None if absent or no snapshot is loaded
+        """
+        if time.monotonic() >= self._next_check:
+            self.reload()
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        return snapshot.get(short_code)
+
+
+def _spill(rows: List[Tuple[str, str, str, int]], directory: str) -> str:
+    """Sort rows and write them to a temporary run file."""
+    rows.sort()
+    fd, run_path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as run:
+        for row in rows:
+            run.write(json.dumps(row) + "\n")
+    return run_path
+
+
+def _read_run(run_path: str) -> Iterator[Tuple[str, str, str, int]]:
+    """Stream rows back from a run file."""
+    with open(run_path, encoding="utf-8") as run:
+        for line in run:
+            yield tuple(json.loads(line))
+
+
+def _latest_per_code(
+    rows: Iterable[Tuple[str, str, str, int]]
+) -> Iterator[Tuple[str, str, int]]:
+    """Keep the most recent row of each short code from sorted rows."""
+    latest = None
+    for row in rows:
+        if latest is not None and row[0] != latest[0]:
+            yield latest[0], latest[2], latest[3]
+        latest = row
+    if latest is not None:
+        yield latest[0], latest[2], latest[3]
+
+
+def export_snapshot(
+    dynamo_ops: DynamoDBOperations,
+    path: str,
+    segments: int = 8,
+    run_size: int = 500_000,
+) -> int:
+    """Export all live mappings to a snapshot with a parallel scan.
+
+    Each scan segment spills sorted runs of at most ``run_size`` rows to
+    disk, and the runs are merged into the final file, so memory use does
+    not grow with the table size.
+
+    Args:
+        dynamo_ops: DynamoDB operations for the source table
+        path: Destination path of the snapshot
+        segments: Number of parallel scan segments
+        run_size: Rows held in memory per segment before spilling
+
+    Returns:
+        Number of mappings written
+    """
+    now = int(time.time())
+    directory = os.path.dirname(os.path.abspath(path))
+    work_dir = tempfile.mkdtemp(dir=directory, prefix=".snapshot-")
+
+    def scan_segment(segment: int) -> List[str]:
+        runs: List[str] = []
+        rows: List[Tuple[str, str, str, int]] = []
+        kwargs = {
+            "Segment": segment,
+            "TotalSegments": segments,
+            "ProjectionExpression": ", ".join(PROJECTED_ATTRIBUTES),
+        }
+        while True:
+            response = dynamo_ops.table.scan(**kwargs)
+            for item in response.get("Items", []):
+                expires_at = int(item.get("expires_at", 0) or 0)
+                if expires_at and expires_at < now:
+                    continue
+                item = decode_item(item)
+                rows.append((item["short_code"], item["creation_date"],
+                             item["long_url"], expires_at))
+                if len(rows) >= run_size:
+                    runs.append(_spill(rows, work_dir))
+                    rows = []
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        if rows:
+            runs.append(_spill(rows, work_dir))
+        return runs
+
+    try:
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            runs = [
+                run
+                for segment_runs in executor.map(
+                    scan_segment, range(segments)
+                )
+                for run in segment_runs
+            ]
+        merged = heapq.merge(*(_read_run(run) for run in runs))
+        count = write_snapshot(path, _latest_per_code(merged))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    logger.info(f"Exported {count} mappings to snapshot {path}")
+    return count
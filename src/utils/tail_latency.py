@@ -0,0 +1,172 @@
+"""Latency tracking, circuit breaking and backoff for API clients.
+
+``LatencyTracker`` keeps a sliding window of recent latencies per endpoint,
+from which a client derives hedge delays and reports percentiles.
+``CircuitBreaker`` stops sending to a backend after consecutive failures and
+lets a single trial request through once its reset timeout has passed; the
+trial's outcome closes or reopens the circuit. ``backoff_delay`` spreads
+retries with full jitter so clients that failed together do not retry
+together.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# Latencies kept per endpoint for the percentiles
+LATENCY_SAMPLES = 512
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a backend known to fail."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Return a full-jitter delay before retry ``attempt`` (0-based).
+
+    Args:
+        attempt: Number of retries already made
+        base: Upper bound of the first delay in seconds
+        cap: Largest upper bound in seconds
+
+    Returns:
+        A delay drawn uniformly from [0, min(cap, base * 2 ** attempt)]
+    """
+    return random.uniform(0.0, min(cap, base * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Thread-safe sliding windows of latencies per endpoint."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES) -> None:
+        """Initialize empty windows.
+
+        Args:
+            samples: Latencies kept per endpoint
+        """
+        self.samples = samples
+        self._windows: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """Add one latency to an endpoint's window."""
+        with self._lock:
+            window = self._windows.get(endpoint)
+            if window is None:
+                window = self._windows[endpoint] = deque(maxlen=self.samples)
+            window.append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def percentile(
+        self, endpoint: str, fraction: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """Return a latency percentile of an endpoint's window.
+
+        Args:
+            endpoint: Endpoint name
+            fraction: Percentile as a fraction, e.g. 0.95
+            min_samples: Fewest samples needed for an answer
+
+        Returns:
+            The percentile in seconds, or None with too few samples
+        """
+        with self._lock:
+            window = sorted(self._windows.get(endpoint, ()))
+        if len(window) < max(1, min_samples):
+            return None
+        return window[min(len(window) - 1, int(fraction * len(window)))]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the request count and percentiles (ms) per endpoint."""
+        with self._lock:
+            windows = {
+                endpoint: sorted(window)
+                for endpoint, window in self._windows.items()
+            }
+            counts = dict(self._counts)
+        return {
+            endpoint: {
+                "count": counts[endpoint],
+                **{
+                    f"p{round(fraction * 100)}_ms": round(
+                        window[min(len(window) - 1,
+                                   int(fraction * len(window)))] * 1000, 2
+                    )
+                    for fraction in (0.5, 0.95, 0.99)
+                },
+            }
+            for endpoint, window in windows.items()
+        }
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one backend."""
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 10.0
+    ) -> None:
+        """Initialize a closed circuit.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The circuit's state: closed, open or half_open."""
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now.
+
+        An open circuit past its reset timeout becomes half-open and lets
+        exactly one trial through until that trial's outcome is recorded.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if (
+                self._state == OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self._state = HALF_OPEN
+                self._trial_running = False
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
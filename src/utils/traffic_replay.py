@@ -0,0 +1,261 @@
+"""Replay of recorded access logs against a target stack.
+
+``TrafficReplayer`` sends every recorded redirect and shorten request
+through a ``TinyURLClient`` at its recorded offset from the first request,
+divided by ``speed``. Requests are started in recorded order and never wait
+for earlier ones to finish, so the recorded bursts and overlap are played
+back as they happened; the client's worker pool only bounds how many can be
+in flight. A request that starts late because the pool was full shows up in
+the schedule lag.
+
+The report compares each route's recorded server latency with the latency
+the replay saw at the client, and counts responses whose status differs
+from the recording. Client latency includes the network, so compare a
+replay with other replays from the same place rather than with zero.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.access_log import ROUTE_REDIRECT, ROUTE_SHORTEN, AccessRecord
+    from utils.api_client import APIResponse, TinyURLClient
+except ModuleNotFoundError:
+    from src.utils.access_log import (
+        ROUTE_REDIRECT, ROUTE_SHORTEN, AccessRecord,
+    )
+    from src.utils.api_client import APIResponse, TinyURLClient
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_ROUTES = (ROUTE_REDIRECT, ROUTE_SHORTEN)
+# Recorded statuses of redirects whose code existed
+FOUND_STATUSES = (301, 302)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and max of latencies in milliseconds."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        f"p{round(fraction * 100)}": round(
+            ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2
+        )
+        for fraction in (0.5, 0.95, 0.99)
+    } | {"max": round(ordered[-1], 2)}
+
+
+def peak_concurrency(intervals: Iterable[Tuple[float, float]]) -> int:
+    """Return the most intervals open at once.
+
+    Args:
+        intervals: (start, end) pairs in seconds
+    """
+    events = []
+    for start, end in intervals:
+        events.append((start, 1))
+        events.append((end, -1))
+    # Ends sort before starts at the same instant
+    events.sort(key=lambda event: (event[0], event[1]))
+    peak = current = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+class TrafficReplayer:
+    """Play access log records back through an API client."""
+
+    def __init__(
+        self,
+        client: TinyURLClient,
+        speed: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        url_prefix: str = "https://replay.example.com/",
+    ) -> None:
+        """Initialize the replayer.
+
+        Args:
+            client: Client of the target stack; build it with
+                ``max_retries=0`` and ``hedge=False`` so each recorded
+                request is sent exactly once
+            speed: Playback speed; 2.0 replays an hour in 30 minutes
+            max_concurrency: Requests in flight at most (default: the
+                client's pool size)
+            url_prefix: Long URLs of replayed shorten requests start with
+                this; the recording holds no URLs
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.client = client
+        self.speed = speed
+        self.max_concurrency = max_concurrency or client.pool_size
+        self.url_prefix = url_prefix
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget the outcomes of a previous replay."""
+        self._results: Dict[str, List[Tuple[float, float]]] = (
+            defaultdict(list)
+        )
+        self._status_changes: Counter = Counter()
+        self._errors = 0
+        self._lags: List[float] = []
+        self._replayed: List[Tuple[float, float]] = []
+
+    def seed(self, records: Iterable[AccessRecord]) -> int:
+        """Create the mappings that recorded redirects found.
+
+        Every code a recorded redirect resolved is created on the target
+        with a custom code, so the replayed redirects find it too; codes
+        that already exist are left alone.
+
+        Args:
+            records: Recorded requests
+
+        Returns:
+            Number of mappings created
+        """
+        codes = {
+            record.code for record in records
+            if record.route == ROUTE_REDIRECT
+            and record.status in FOUND_STATUSES and record.code
+        }
+        created = 0
+        with ThreadPoolExecutor(self.max_concurrency) as executor:
+            for response in executor.map(
+                lambda code: self.client.shorten_url(
+                    f"{self.url_prefix}{code}", custom_code=code
+                ),
+                sorted(codes),
+            ):
+                created += response.success
+        logger.info(f"Seeded {created} of {len(codes)} recorded codes")
+        return created
+
+    def replay(self, records: Iterable[AccessRecord]) -> Dict[str, Any]:
+        """Send the records on their recorded schedule.
+
+        Args:
+            records: Recorded requests in start order
+
+        Returns:
+            The comparison report (see ``_report``)
+        """
+        self._reset()
+        skipped: Counter = Counter()
+        # Recorded requests on the replay's time scale, for the expected
+        # concurrency if latencies stayed as recorded
+        expected: List[Tuple[float, float]] = []
+        recorded_seconds = 0.0
+
+        first = None
+        started = time.monotonic()
+        with ThreadPoolExecutor(
+            self.max_concurrency, thread_name_prefix="replay"
+        ) as executor:
+            for record in records:
+                if record.route not in REPLAYED_ROUTES:
+                    skipped[record.route] += 1
+                    continue
+                if first is None:
+                    first = record.timestamp
+                offset = record.timestamp - first
+                latency = record.latency_ms / 1000
+                recorded_seconds = max(recorded_seconds, offset + latency)
+                expected.append(
+                    (offset / self.speed, offset / self.speed + latency)
+                )
+                due = started + offset / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, record, due)
+        return self._report(
+            expected, skipped, recorded_seconds, time.monotonic() - started
+        )
+
+    def _send(self, record: AccessRecord, due: float) -> None:
+        """Send one recorded request and keep its outcome."""
+        begun = time.monotonic()
+        try:
+            response = self._call(record)
+        except ConnectionError as e:
+            logger.debug(f"Replayed request failed: {e}")
+            status = 0
+        else:
+            status = response.status_code
+        ended = time.monotonic()
+        with self._lock:
+            self._lags.append((begun - due) * 1000)
+            self._replayed.append((begun, ended))
+            if status == 0:
+                self._errors += 1
+                return
+            self._results[record.route].append(
+                (record.latency_ms, (ended - begun) * 1000)
+            )
+            if status != record.status:
+                self._status_changes[f"{record.status}->{status}"] += 1
+
+    def _call(self, record: AccessRecord) -> APIResponse:
+        """Send a record's request through the client."""
+        if record.route == ROUTE_REDIRECT:
+            return self.client.redirect(record.code)
+        return self.client.shorten_url(
+            f"{self.url_prefix}{uuid.uuid4().hex}",
+            custom_code=record.code or None,
+        )
+
+    def _report(
+        self,
+        expected: List[Tuple[float, float]],
+        skipped: Counter,
+        recorded_seconds: float,
+        elapsed: float,
+    ) -> Dict[str, Any]:
+        """Build the replay report.
+
+        Returns:
+            Request, error and status-change counts, the recorded and
+            replay durations, the peak concurrency the recording implies at
+            this speed and the one replayed, schedule lag percentiles, and
+            per route the recorded and replay latency percentiles (ms) with
+            their delta
+        """
+        routes = {}
+        for route, pairs in sorted(self._results.items()):
+            before = _percentiles([pair[0] for pair in pairs])
+            after = _percentiles([pair[1] for pair in pairs])
+            routes[route] = {
+                "count": len(pairs),
+                "recorded_ms": before,
+                "replay_ms": after,
+                "delta_ms": {
+                    name: round(after[name] - before[name], 2)
+                    for name in before
+                },
+            }
+        return {
+            "requests": len(expected),
+            "errors": self._errors,
+            "status_changes": dict(self._status_changes.most_common()),
+            "skipped": dict(skipped),
+            "recorded_seconds": round(recorded_seconds, 3),
+            "replay_seconds": round(elapsed, 3),
+            "peak_concurrency": {
+                "recorded": peak_concurrency(expected),
+                "replay": peak_concurrency(self._replayed),
+            },
+            "schedule_lag_ms": _percentiles(self._lags),
+            "routes": routes,
+        }
@@ -0,0 +1,169 @@
+"""Compact storage encoding for long URLs.
+
+Tracking URLs are long but repetitive (``https://www.``, ``utm_source=``,
+``&utm_medium=``...), so they deflate well against a preset dictionary of
+URL text even though each one alone is too short for plain zlib to help.
+Encoded items keep the URL in ``long_url_z`` instead of ``long_url``:
+
+    version (1 byte) | raw deflate stream primed with DICTIONARIES[version]
+
+The leading version byte selects the dictionary, so a new dictionary can be
+shipped as a new version while rows written with older ones stay readable.
+Items with a plain ``long_url`` are returned unchanged, so both encodings
+coexist in one table.
+"""
+
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+ENCODED_ATTRIBUTE = "long_url_z"
+# Attributes a redirect needs, with either URL encoding
+PROJECTED_ATTRIBUTES = (
+    "short_code", "creation_date", "long_url", ENCODED_ATTRIBUTE,
+    "expires_at",
+)
+
+# Deflate uses matches near the end of the dictionary most cheaply, so the
+# most common fragments come last
+DICTIONARIES: Dict[int, bytes] = {
+    1: (
+        b"utm_id=gclid=fbclid=msclkid=mc_cid=mc_eid=_ga=ref=source=referrer="
+        b"campaign=affiliate=partner=session=token=redirect=return_url=lang=en"
+        b"-us&locale=en_US&currency=USD&country=US&page=1&sort=&filter=&q="
+        b"&category=&product=&item=&id=&variant=&size=&color=&search=&query="
+        b".html.php.aspx/index/products/product/category/blog/news/article/"
+        b"search/docs/en/us/2024/2025/landing/signup/login/cart/checkout/"
+        b"share/watch?v=youtube.com/amazon.com/dp/linkedin.com/facebook.com/"
+        b"twitter.com/instagram.com/github.com/medium.com/google.com/"
+        b"utm_content=email&utm_content=banner&utm_content=cta&utm_content="
+        b"utm_term=&utm_campaign=spring_sale&utm_campaign=newsletter"
+        b"&utm_campaign=launch&utm_campaign=&utm_medium=cpc&utm_medium=social"
+        b"&utm_medium=email&utm_medium=referral&utm_medium="
+        b"?utm_source=google&utm_source=facebook&utm_source=newsletter"
+        b"&utm_source=twitter&utm_source=linkedin&utm_source="
+        b"http://www.https://www."
+    ),
+}
+CURRENT_VERSION = max(DICTIONARIES)
+
+# Fragments a trained dictionary is assembled from
+_TOKEN = re.compile(r"[^/?&#]+[/?&=#]?|[/?&#]")
+
+
+def _compressor(dictionary: bytes) -> Any:
+    """Raw deflate compressor primed with a preset dictionary."""
+    return zlib.compressobj(
+        level=9, wbits=-15, memLevel=9, zdict=dictionary
+    )
+
+
+def compress_url(url: str, version: int = CURRENT_VERSION) -> bytes:
+    """Encode a URL with a dictionary version.
+
+    Args:
+        url: The URL to encode
+        version: Dictionary version to encode with
+
+    Returns:
+        The version byte followed by the deflated URL
+    """
+    compressor = _compressor(DICTIONARIES[version])
+    data = compressor.compress(url.encode("utf-8")) + compressor.flush()
+    return bytes([version]) + data
+
+
+def decompress_url(blob: bytes) -> str:
+    """Decode a URL written by ``compress_url``.
+
+    Args:
+        blob: The stored bytes
+
+    Returns:
+        The original URL
+
+    Raises:
+        ValueError: If the blob names an unknown dictionary version
+    """
+    version = blob[0]
+    if version not in DICTIONARIES:
+        raise ValueError(f"Unknown URL encoding version {version}")
+    decompressor = zlib.decompressobj(wbits=-15, zdict=DICTIONARIES[version])
+    data = decompressor.decompress(blob[1:]) + decompressor.flush()
+    return data.decode("utf-8")
+
+
+def encode_url_attributes(url: str) -> Dict[str, Any]:
+    """Return the item attributes storing a URL as compactly as possible.
+
+    URLs that do not shrink (short or unusual ones) stay plain text.
+
+    Args:
+        url: The URL to store
+
+    Returns:
+        Either ``{"long_url_z": bytes}`` or ``{"long_url": url}``
+    """
+    blob = compress_url(url)
+    # Attribute names count toward the item size as well
+    if len(ENCODED_ATTRIBUTE) + len(blob) < len("long_url") + len(url):
+        return {ENCODED_ATTRIBUTE: blob}
+    return {"long_url": url}
+
+
+def decode_item(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Replace an encoded URL attribute with a plain ``long_url``.
+
+    Args:
+        item: Item as read from DynamoDB, in either encoding
+
+    Returns:
+        The item with ``long_url`` set; plain items are returned as is
+    """
+    if not item or ENCODED_ATTRIBUTE not in item:
+        return item
+    decoded = dict(item)
+    blob = decoded.pop(ENCODED_ATTRIBUTE)
+    # boto3 wraps binary attributes in Binary
+    decoded["long_url"] = decompress_url(bytes(getattr(blob, "value", blob)))
+    return decoded
+
+
+def train_dictionary(urls: Iterable[str], size: int = 1024) -> bytes:
+    """Build a preset dictionary from a sample of URLs.
+
+    URL fragments (path segments, ``key=`` and ``&key=value`` pieces) are
+    ranked by how many bytes they would save across the sample, and the
+    best are packed into ``size`` bytes, most valuable last.
+
+    Args:
+        urls: Sample URLs
+        size: Dictionary size in bytes
+
+    Returns:
+        Dictionary suitable for ``DICTIONARIES``
+    """
+    counts: Counter = Counter()
+    for url in urls:
+        tokens = _TOKEN.findall(url)
+        counts.update(tokens)
+        # Pairs capture "&key=" + "value" and "scheme://" + "host" runs
+        counts.update(a + b for a, b in zip(tokens, tokens[1:]))
+
+    ranked = sorted(
+        (token for token, count in counts.items() if count > 1),
+        key=lambda token: counts[token] * len(token),
+        reverse=True,
+    )
+    chosen = []
+    used = 0
+    for token in ranked:
+        data = token.encode("utf-8")
+        if used + len(data) > size:
+            continue
+        if any(token in other for other in chosen):
+            continue
+        chosen.append(token)
+        used += len(data)
+    return "".join(reversed(chosen)).encode("utf-8")
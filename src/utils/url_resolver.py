@@ -0,0 +1,298 @@
+"""Short code resolution for the redirect path."""
+
+import asyncio
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import DynamoDBOperations
+    from utils.lookup_batcher import LookupBatcher
+    from utils.lookup_cache import LookupCache
+    from utils.multi_region import RegionalTables
+    from utils.single_flight import (
+        AsyncSingleFlight, FlightsFull, SingleFlight
+    )
+    from utils.snapshot import SnapshotStore
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import DynamoDBOperations
+    from src.utils.lookup_batcher import LookupBatcher
+    from src.utils.lookup_cache import LookupCache
+    from src.utils.multi_region import RegionalTables
+    from src.utils.single_flight import (
+        AsyncSingleFlight, FlightsFull, SingleFlight
+    )
+    from src.utils.snapshot import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MODES = ("fallback", "primary")
+
+
+class LookupUnavailable(Exception):
+    """The backend failed or was too slow, and nothing else could answer."""
+
+
+class UrlResolver:
+    """Resolve short codes from DynamoDB and an optional snapshot.
+
+    With ``snapshot_mode="fallback"`` DynamoDB is the source of truth and
+    the snapshot only answers when DynamoDB errors. With ``"primary"`` the
+    snapshot is consulted first and DynamoDB only sees codes it lacks, which
+    suits static link sets.
+
+    Concurrent lookups of the same code are coalesced so that only one
+    backend call per code is in flight at a time, for both threaded
+    (``resolve``) and asyncio (``resolve_async``) servers. With a
+    ``batcher``, lookups of different codes that arrive together are also
+    merged into batched reads. With ``regions`` (global tables), codes
+    missing from the local replica are looked up where they were written,
+    covering replication lag. With a ``cache``, found mappings are served
+    from memory until they go stale.
+
+    Given a ``timeout``, a lookup that DynamoDB does not answer in time, or
+    answers with an error, is served from the last-known-good cache entry
+    (``cache.get_stale``) and then the snapshot. A lookup that timed out
+    keeps running and refreshes the cache when it completes, so the next
+    request finds a fresh entry; requests for a code already being looked
+    up wait on that lookup. Deadline-bound lookups run on ``workers``
+    threads, which should match the server's concurrency. Once
+    ``max_pending`` codes are pending and the oldest of them is past the
+    caller's deadline (the backend is stalled rather than busy), lookups of
+    further codes are shed instead of queued. When neither the cache nor
+    the snapshot has the code, ``LookupUnavailable`` is raised; a backend
+    failure is never reported as a missing code.
+    """
+
+    def __init__(
+        self,
+        dynamo_ops: DynamoDBOperations,
+        snapshot: Optional[SnapshotStore] = None,
+        snapshot_mode: str = "fallback",
+        batcher: Optional[LookupBatcher] = None,
+        regions: Optional[RegionalTables] = None,
+        cache: Optional[LookupCache] = None,
+        workers: int = 16,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """Initialize the resolver.
+
+        Args:
+            dynamo_ops: DynamoDB operations for the mappings table
+            snapshot: Snapshot store to serve from, if any
+            snapshot_mode: "fallback" or "primary"
+            batcher: Batcher over ``dynamo_ops.get_url_mappings``, if any
+            regions: Multi-region router, if deployed on a global table
+            cache: Cache of found mappings, if any
+            workers: Threads running deadline-bound lookups; a lookup that
+                misses its deadline keeps its thread until DynamoDB answers
+            max_pending: Distinct codes whose deadline-bound lookups may be
+                pending while the backend is stalled (default: one per
+                worker, so none queue behind a stalled lookup)
+        """
+        if snapshot_mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode: {snapshot_mode}")
+
+        self.dynamo_ops = dynamo_ops
+        self.snapshot = snapshot
+        self.snapshot_mode = snapshot_mode
+        self.batcher = batcher
+        self.regions = regions
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending or workers
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._outcomes: Counter = Counter()
+
+    def resolve(
+        self, short_code: str, timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Resolve a short code to its mapping.
+
+        Args:
+            short_code: The short code to look up
+            timeout: Seconds to wait for DynamoDB before falling back to
+                stale data (default: wait for it)
+
+        Returns:
+            Tuple containing:
+                - Boolean indicating if mapping was found
+                - Dictionary with URL data if found, None otherwise
+
+        Raises:
+            LookupUnavailable: If DynamoDB failed or timed out and neither
+                the cache nor the snapshot had an answer
+        """
+        if self.snapshot and self.snapshot_mode == "primary":
+            item = self.snapshot.get(short_code)
+            if item:
+                return True, item
+
+        cached = self.cache.get(short_code) if self.cache else None
+        if cached:
+            return True, cached
+
+        try:
+            if timeout is None:
+                result = self.flights.do(short_code, self._lookup, short_code)
+            else:
+                result = self.flights.submit(
+                    short_code, self._workers(), self._lookup, short_code,
+                    limit=self.max_pending, max_age=timeout,
+                ).result(timeout=timeout)
+        except FlightsFull:
+            return self._degraded(short_code, "shed")
+        except TimeoutError:
+            return self._degraded(short_code, "timeouts")
+        except ClientError as e:
+            logger.error(f"DynamoDB lookup failed for {short_code}: {e}")
+            return self._degraded(short_code, "backend_errors")
+        return self._found(result)
+
+    async def resolve_async(
+        self, short_code: str, timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Resolve a short code from an asyncio event loop.
+
+        The blocking backend lookup runs in the default executor.
+
+        Args:
+            short_code: The short code to look up
+            timeout: Same as for ``resolve``
+
+        Returns:
+            Same as ``resolve``
+
+        Raises:
+            LookupUnavailable: Same as ``resolve``
+        """
+        if self.snapshot and self.snapshot_mode == "primary":
+            item = self.snapshot.get(short_code)
+            if item:
+                return True, item
+
+        cached = self.cache.get(short_code) if self.cache else None
+        if cached:
+            return True, cached
+
+        lookup = asyncio.ensure_future(self.async_flights.do(
+            short_code, asyncio.to_thread, self._lookup, short_code
+        ))
+        try:
+            # Shielded, so a lookup past its deadline still fills the cache
+            result = await asyncio.wait_for(asyncio.shield(lookup), timeout)
+        except TimeoutError:
+            lookup.add_done_callback(_consume)
+            return self._degraded(short_code, "timeouts")
+        except ClientError as e:
+            logger.error(f"DynamoDB lookup failed for {short_code}: {e}")
+            return self._degraded(short_code, "backend_errors")
+        return self._found(result)
+
+    def _lookup(
+        self, short_code: str
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Look up DynamoDB and keep the answer in the cache."""
+        if self.batcher:
+            item = self.batcher.get(short_code)
+            found = bool(item)
+        else:
+            found, item = self.dynamo_ops.get_url_mapping(
+                short_code, raise_errors=True
+            )
+        if not found and self.regions:
+            found, item = self.regions.lookup_home(short_code)
+        if self.cache:
+            if found:
+                self.cache.put(short_code, item)
+            else:
+                # Do not serve a deleted code as stale later on
+                self.cache.invalidate(short_code)
+        return found, item
+
+    def _workers(self) -> ThreadPoolExecutor:
+        """Return the pool running deadline-bound lookups."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="lookup"
+                )
+            return self._executor
+
+    def _count(self, outcome: str) -> None:
+        """Count one lookup outcome."""
+        with self._lock:
+            self._outcomes[outcome] += 1
+
+    def _found(
+        self, result: Tuple[bool, Optional[Dict[str, Any]]]
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Count a lookup DynamoDB answered and pass its result on."""
+        if not result[0]:
+            self._count("not_found")
+        return result
+
+    def _degraded(
+        self, short_code: str, reason: str
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Answer a lookup DynamoDB could not, from stale data.
+
+        Args:
+            short_code: The short code to look up
+            reason: Outcome counter of the failure: "timeouts",
+                "backend_errors" or "shed"
+
+        Raises:
+            LookupUnavailable: If neither the cache nor the snapshot has
+                the code
+        """
+        self._count(reason)
+        item = self.cache.get_stale(short_code) if self.cache else None
+        if item:
+            logger.warning(f"Serving stale cache entry for {short_code}")
+            self._count("stale_served")
+            return True, item
+        item = self.snapshot.get(short_code) if self.snapshot else None
+        if item:
+            logger.warning(f"Serving {short_code} from snapshot")
+            self._count("snapshot_served")
+            return True, item
+        self._count("unavailable")
+        raise LookupUnavailable(short_code)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup outcome and coalescing counters."""
+        with self._lock:
+            outcomes = {
+                outcome: self._outcomes[outcome]
+                for outcome in (
+                    "not_found", "timeouts", "backend_errors", "shed",
+                    "stale_served", "snapshot_served", "unavailable",
+                )
+            }
+        stats = {
+            "lookups": outcomes,
+            "single_flight": self.flights.stats(),
+            "async_single_flight": self.async_flights.stats(),
+        }
+        if self.batcher:
+            stats["batcher"] = self.batcher.stats()
+        if self.regions:
+            stats["regions"] = self.regions.stats()
+        if self.cache:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+def _consume(task: "asyncio.Future[Any]") -> None:
+    """Retrieve the outcome of a lookup nobody awaits any more."""
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Late lookup failed: {task.exception()}")
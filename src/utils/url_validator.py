@@ -1,10 +1,13 @@
 """URL validation utilities."""
 
+import re
 from typing import Tuple
 
 import validators
 
 MAX_URL_LENGTH = 2048
+CUSTOM_CODE_MAX_LENGTH = 30
+CUSTOM_CODE_PATTERN = r'^[a-zA-Z0-9_-]+$'
 
 
 def validate_url(url: str) -> Tuple[bool, str]:
@@ -31,3 +34,26 @@ def validate_url(url: str) -> Tuple[bool, str]:
         return False, "Invalid URL format"
 
     return True, ""
+
+
+def validate_short_code(short_code: str) -> Tuple[bool, str]:
+    """Validate a custom (or imported) short code.
+
+    Args:
+        short_code: The short code to validate
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if not short_code:
+        return False, "Short code cannot be empty"
+
+    if len(short_code) > CUSTOM_CODE_MAX_LENGTH:
+        return False, (f"Custom code exceeds maximum length of "
+                       f"{CUSTOM_CODE_MAX_LENGTH}")
+
+    if not re.match(CUSTOM_CODE_PATTERN, short_code):
+        return False, ("Custom code must contain only letters, numbers, "
+                       "underscores, and hyphens")
+
+    return True, ""
@@ -0,0 +1,210 @@
+"""Lookup cache pre-warming for new redirect instances.
+
+A new instance starts with an empty cache, so every rollout or scale-up
+sends a wave of misses to DynamoDB. ``CacheWarmer`` loads a list of hot
+codes (a file written by ``scripts/hot_links.py``, the ``/hot`` endpoint of
+running instances, or every code of a snapshot written by
+``export_snapshot``) and reads them with parallel batched lookups before
+the instance reports ready. Warming never blocks readiness for longer than
+its time budget, and a failure to load the list only skips it.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import BATCH_READ_MAX_KEYS
+    from utils.lookup_cache import LookupCache
+    from utils.snapshot import MAGIC, Snapshot
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import BATCH_READ_MAX_KEYS
+    from src.utils.lookup_cache import LookupCache
+    from src.utils.snapshot import MAGIC, Snapshot
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+DONE = "done"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+
+
+def load_hot_codes(
+    source: str, limit: int, timeout: float = 5.0
+) -> List[str]:
+    """Read the codes to warm, hottest first.
+
+    Args:
+        source: Base URL of a redirect service (its ``/hot`` list is used),
+            path of a snapshot file (its codes are used in index order), or
+            path of a file with one code per line
+        limit: Maximum number of codes
+        timeout: Seconds to wait for a URL source
+
+    Returns:
+        Distinct short codes
+    """
+    if source.startswith(("http://", "https://")):
+        response = requests.get(
+            f"{source.rstrip('/')}/hot",
+            params={"limit": limit},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        codes = [item["short_code"] for item in response.json()["items"]]
+    else:
+        with open(source, "rb") as f:
+            is_snapshot = f.read(len(MAGIC)) == MAGIC
+        if is_snapshot:
+            # A snapshot records no popularity, so it suits link sets that
+            # fit the cache; the mappings are still read from DynamoDB
+            return Snapshot(source).codes(limit)
+        with open(source, encoding="utf-8") as f:
+            codes = [
+                line.strip() for line in f
+                if line.strip() and not line.startswith("#")
+            ]
+    return list(dict.fromkeys(codes))[:limit]
+
+
+class CacheWarmer:
+    """Fill a lookup cache with hot codes before serving."""
+
+    def __init__(
+        self,
+        cache: LookupCache,
+        fetch_many: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+        budget: float = 20.0,
+        workers: int = 8,
+        batch_size: int = BATCH_READ_MAX_KEYS,
+    ) -> None:
+        """Initialize the warmer.
+
+        Args:
+            cache: Cache to fill
+            fetch_many: Batched lookup, e.g.
+                ``DynamoDBOperations.get_url_mappings``
+            budget: Seconds after which warming is abandoned
+            workers: Concurrent batch reads
+            batch_size: Codes per batch read
+        """
+        self.cache = cache
+        self.fetch_many = fetch_many
+        self.budget = budget
+        self.workers = workers
+        self.batch_size = batch_size
+
+        self.state = PENDING
+        self.requested = 0
+        self.loaded = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.duration: Optional[float] = None
+        self._started: Optional[float] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether warming has finished, one way or another."""
+        return self.state not in (PENDING, WARMING)
+
+    def start(self, load_codes: Callable[[], List[str]]) -> threading.Thread:
+        """Warm in a background thread.
+
+        Args:
+            load_codes: Returns the codes to warm; time spent here counts
+                against the budget
+
+        Returns:
+            The warming thread
+        """
+        thread = threading.Thread(
+            target=self.run, args=(load_codes,), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def run(self, load_codes: Callable[[], List[str]]) -> str:
+        """Load the hot codes and warm the cache, blocking.
+
+        Args:
+            load_codes: Returns the codes to warm
+
+        Returns:
+            The final state
+        """
+        self._started = time.monotonic()
+        self.state = WARMING
+        try:
+            codes = load_codes()
+        except Exception as e:
+            logger.warning(f"Skipping cache warmup, no hot codes: {e}")
+            return self._finish(FAILED)
+
+        self.requested = len(codes)
+        batches = [
+            codes[start:start + self.batch_size]
+            for start in range(0, len(codes), self.batch_size)
+        ]
+        remaining = self.budget - (time.monotonic() - self._started)
+        pool = ThreadPoolExecutor(self.workers)
+        futures = [pool.submit(self._warm_batch, batch) for batch in batches]
+        _, not_done = wait(futures, timeout=max(remaining, 0))
+        # Batches still queued are dropped; running ones finish in the
+        # background without delaying readiness
+        self._stopped.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        return self._finish(TIMED_OUT if not_done else DONE)
+
+    def _warm_batch(self, codes: List[str]) -> None:
+        """Read one batch of codes into the cache."""
+        if self._stopped.is_set():
+            return
+        try:
+            mappings = self.fetch_many(codes)
+        except Exception as e:
+            logger.warning(f"Cache warmup batch failed: {e}")
+            with self._lock:
+                self.failed_batches += 1
+            return
+
+        for short_code, item in mappings.items():
+            self.cache.put(short_code, item)
+        with self._lock:
+            self.batches += 1
+            self.loaded += len(mappings)
+
+    def _finish(self, state: str) -> str:
+        """Record the final state and duration."""
+        self.duration = time.monotonic() - self._started
+        self.state = state
+        logger.info(
+            f"Cache warmup {state}: {self.loaded}/{self.requested} codes "
+            f"in {self.duration:.2f}s"
+        )
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        """Return warmup progress."""
+        duration = self.duration
+        if duration is None and self._started is not None:
+            duration = time.monotonic() - self._started
+        with self._lock:
+            return {
+                "state": self.state,
+                "requested": self.requested,
+                "loaded": self.loaded,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "duration_seconds": (
+                    round(duration, 3) if duration is not None else None
+                ),
+            }
@@ -0,0 +1,169 @@
+"""Micro-batching of concurrent URL mapping writes.
+
+Concurrent shorten requests arriving within a short window are persisted
+together: their codes are checked with one batched read and the free ones are
+written with one ``BatchWriteItem``. Each caller still gets its own answer
+with the same meaning as ``DynamoDBOperations.save_url_mapping``: True if the
+code was saved, False if it was already taken (which the handler turns into
+a 409 or a retry with a new code).
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add compatibility for both direct imports and importing through tests
+try:
+    from utils.dynamo_ops import (
+        BATCH_READ_MAX_KEYS, BATCH_WRITE_MAX_ITEMS, DynamoDBOperations
+    )
+except ModuleNotFoundError:
+    from src.utils.dynamo_ops import (
+        BATCH_READ_MAX_KEYS, BATCH_WRITE_MAX_ITEMS, DynamoDBOperations
+    )
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = min(BATCH_READ_MAX_KEYS, BATCH_WRITE_MAX_ITEMS)
+
+
+class _Batch:
+    """Writes collected during one batching window."""
+
+    __slots__ = ("entries", "full", "done", "results", "error")
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[str, str]] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: List[bool] = []
+        self.error: Optional[BaseException] = None
+
+
+class WriteCoalescer:
+    """Coalesce concurrent ``save_url_mapping`` calls into batched writes."""
+
+    def __init__(
+        self,
+        dynamo_ops: DynamoDBOperations,
+        window: float = 0.002,
+        max_batch: int = MAX_BATCH,
+        max_attempts: int = 3,
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            dynamo_ops: DynamoDB operations for the mappings table
+            window: Seconds the first writer waits for more writes
+            max_batch: Writes that close a batch early (at most 25)
+            max_attempts: BatchWriteItem attempts before writing leftovers
+                one by one
+        """
+        self.dynamo_ops = dynamo_ops
+        self.window = window
+        self.max_batch = min(max_batch, MAX_BATCH)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        self.requests = 0
+        self.batches = 0
+        self.conflicts = 0
+
+    def save(self, short_code: str, long_url: str) -> bool:
+        """Save a mapping as part of the current batch.
+
+        Args:
+            short_code: The short code to claim
+            long_url: The URL it should redirect to
+
+        Returns:
+            True if the mapping was saved, False if the code is taken
+
+        Raises:
+            ClientError: If the batched read or write failed
+        """
+        with self._lock:
+            self.requests += 1
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            position = len(batch.entries)
+            batch.entries.append((short_code, long_url))
+            if len(batch.entries) >= self.max_batch:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                self.batches += 1
+            try:
+                batch.results = self._flush(batch.entries)
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[position]
+
+    def _flush(self, entries: List[Tuple[str, str]]) -> List[bool]:
+        """Claim and write a batch, returning one result per entry."""
+        results = [False] * len(entries)
+        claimed: Dict[str, int] = {}
+        for position, (short_code, _) in enumerate(entries):
+            # The first request for a code in the batch wins it
+            claimed.setdefault(short_code, position)
+
+        existing = self.dynamo_ops.get_url_mappings(list(claimed))
+        items: Dict[str, Dict[str, Any]] = {}
+        for short_code, position in claimed.items():
+            if short_code not in existing:
+                items[short_code] = self.dynamo_ops.build_item(
+                    short_code, entries[position][1]
+                )
+
+        pending = list(items.values())
+        for attempt in range(self.max_attempts):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+            pending = self.dynamo_ops.batch_write_items(pending)
+
+        written = set(items)
+        for item in pending:
+            # Last resort for items DynamoDB kept leaving unprocessed
+            short_code = item["short_code"]
+            if not self.dynamo_ops.save_url_mapping(
+                short_code, entries[claimed[short_code]][1]
+            ):
+                written.discard(short_code)
+
+        for short_code in written:
+            results[claimed[short_code]] = True
+
+        with self._lock:
+            self.conflicts += results.count(False)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "conflicts": self.conflicts,
+                "avg_batch_size": (
+                    round(self.requests / self.batches, 2)
+                    if self.batches else 0
+                ),
+            }
@@ -0,0 +1,46 @@
+"""Shared fixtures for CDK synth tests."""
+
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+CDK_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "cdk")
+sys.path.insert(0, os.path.abspath(CDK_DIR))
+
+from aws_cdk import App  # noqa: E402
+from aws_cdk.assertions import Template  # noqa: E402
+
+from lib.tiny_url_stack import TinyUrlStack, create_stacks  # noqa: E402
+
+
+def _app(context: Optional[Dict[str, Any]]) -> App:
+    return App(
+        outdir=tempfile.mkdtemp(),
+        context={"aws:cdk:bundling-stacks": [], **(context or {})},
+    )
+
+
+@pytest.fixture
+def synth() -> Callable[..., Template]:
+    """Synthesize the stack with the given context, skipping bundling."""
+    def _synth(context: Optional[Dict[str, Any]] = None) -> Template:
+        return Template.from_stack(TinyUrlStack(_app(context), "TestStack"))
+
+    return _synth
+
+
+@pytest.fixture
+def synth_app() -> Callable[..., Dict[str, Template]]:
+    """Synthesize every stack the app creates, keyed by region."""
+    def _synth(context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        stacks: List[TinyUrlStack] = create_stacks(
+            _app(context), account="123456789012"
+        )
+        return {
+            stack.region: Template.from_stack(stack) for stack in stacks
+        }
+
+    return _synth
@@ -0,0 +1,62 @@
+"""Synth tests for click rollups and the stats endpoint."""
+
+from typing import Any
+
+from aws_cdk.assertions import Match
+
+
+def test_stats_function_reads_rollups(synth: Any) -> None:
+    """Test the rollup table and the REST route to the stats function."""
+    template = synth()
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "click_rollups",
+        "KeySchema": [
+            {"AttributeName": "short_code", "KeyType": "HASH"},
+            {"AttributeName": "bucket", "KeyType": "RANGE"},
+        ],
+        "TimeToLiveSpecification": {
+            "AttributeName": "expires_at", "Enabled": True,
+        },
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "tiny_url_stats",
+        "Handler": "handlers.click_stats.handler",
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "tiny_url_redirect",
+        "Environment": {"Variables": Match.object_like({
+            "CLICKS_TABLE_NAME": Match.any_value(),
+        })},
+    })
+    template.has_resource_properties(
+        "AWS::ApiGateway::Resource", {"PathPart": "stats"}
+    )
+
+
+def test_global_rollups_across_regions(synth_app: Any) -> None:
+    """Test that rollups replicate like the mappings table."""
+    templates = synth_app({"regions": "us-east-1,eu-west-1"})
+
+    templates["us-east-1"].has_resource_properties(
+        "AWS::DynamoDB::GlobalTable", {
+            "TableName": "click_rollups",
+            "Replicas": Match.array_with([
+                Match.object_like({"Region": "eu-west-1"}),
+            ]),
+        }
+    )
+
+
+def test_edge_cache_passes_stats_through(synth: Any) -> None:
+    """Test that CloudFront never caches stats and forwards the range."""
+    template = synth({"apiType": "http", "edgeCache": "true"})
+
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": Match.object_like({
+            "CacheBehaviors": [Match.object_like({
+                "PathPattern": "/stats/*",
+                "OriginRequestPolicyId": Match.any_value(),
+            })],
+        }),
+    })
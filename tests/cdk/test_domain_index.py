@@ -0,0 +1,88 @@
+"""Synth tests for the secondary indexes and the admin links endpoint."""
+
+from typing import Any
+
+from aws_cdk.assertions import Match
+
+
+def test_domain_index_and_admin_function(synth: Any) -> None:
+    """Test the GSI and an IAM-only REST route reading just the index."""
+    template = synth()
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "url_mappings",
+        "GlobalSecondaryIndexes": Match.array_with([Match.object_like({
+            "IndexName": "domain-index",
+            "KeySchema": [
+                {"AttributeName": "domain", "KeyType": "HASH"},
+                {"AttributeName": "creation_date", "KeyType": "RANGE"},
+            ],
+            "Projection": {
+                "ProjectionType": "INCLUDE",
+                "NonKeyAttributes": ["long_url", "long_url_z", "expires_at"],
+            },
+        })]),
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "tiny_url_admin_links",
+        "Handler": "handlers.admin_links.handler",
+    })
+    template.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {"Statement": [Match.object_like({
+            "Action": "dynamodb:Query",
+            "Resource": {"Fn::Join": ["", Match.array_with([
+                "/index/domain-index",
+            ])]},
+        })]},
+    })
+    template.has_resource_properties("AWS::ApiGateway::Method", {
+        "HttpMethod": "GET",
+        "AuthorizationType": "AWS_IAM",
+    })
+
+
+def test_http_api_route_requires_iam(synth: Any) -> None:
+    """Test that the HTTP API admin route is SigV4-authorized."""
+    template = synth({"apiType": "http"})
+
+    template.has_resource_properties("AWS::ApiGatewayV2::Route", {
+        "RouteKey": "GET /admin/links",
+        "AuthorizationType": "AWS_IAM",
+    })
+
+
+def test_global_table_carries_the_index(synth_app: Any) -> None:
+    """Test that only the primary region defines the replicated index."""
+    templates = synth_app({"regions": "us-east-1,eu-west-1"})
+
+    templates["us-east-1"].has_resource_properties(
+        "AWS::DynamoDB::GlobalTable", {
+            "TableName": "url_mappings",
+            "GlobalSecondaryIndexes": Match.array_with([
+                Match.object_like({"IndexName": "domain-index"}),
+                Match.object_like({"IndexName": "created-index"}),
+            ]),
+        }
+    )
+
+
+def test_created_index_for_exports(synth: Any) -> None:
+    """Test the hourly index read by incremental exports."""
+    template = synth()
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "url_mappings",
+        "GlobalSecondaryIndexes": Match.array_with([Match.object_like({
+            "IndexName": "created-index",
+            "KeySchema": [
+                {"AttributeName": "created_hour", "KeyType": "HASH"},
+                {"AttributeName": "creation_date", "KeyType": "RANGE"},
+            ],
+            "Projection": {
+                "ProjectionType": "INCLUDE",
+                "NonKeyAttributes": [
+                    "long_url", "long_url_z", "expires_at", "domain"
+                ],
+            },
+        })]),
+    })
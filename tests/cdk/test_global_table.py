@@ -0,0 +1,86 @@
+"""Synth tests for the multi-region global table deployment."""
+
+from typing import Any
+
+import pytest
+from aws_cdk.assertions import Match
+
+REGIONS = {"regions": "us-east-1,eu-west-1"}
+
+
+def test_single_region_by_default(synth_app: Any) -> None:
+    """Test that without regions one stack with a plain table is created."""
+    templates = synth_app()
+
+    assert list(templates) == ["us-east-1"]
+    template = templates["us-east-1"]
+    # URL mappings, idempotency keys and click rollups
+    template.resource_count_is("AWS::DynamoDB::Table", 3)
+    template.resource_count_is("AWS::DynamoDB::GlobalTable", 0)
+
+
+def test_global_table_with_regional_stacks(synth_app: Any) -> None:
+    """Test the primary's global table and the replica region's stack."""
+    templates = synth_app(REGIONS)
+
+    assert sorted(templates) == ["eu-west-1", "us-east-1"]
+    primary = templates["us-east-1"]
+    primary.has_resource_properties("AWS::DynamoDB::GlobalTable", {
+        "TableName": "url_mappings",
+        "Replicas": [
+            Match.object_like({"Region": "eu-west-1"}),
+            Match.object_like({"Region": "us-east-1"}),
+        ],
+    })
+
+    replica = templates["eu-west-1"]
+    replica.resource_count_is("AWS::DynamoDB::GlobalTable", 0)
+    # Only the region's own idempotency key table
+    replica.resource_count_is("AWS::DynamoDB::Table", 1)
+    replica.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "tiny_url_redirect",
+        "Environment": {"Variables": Match.object_like({
+            "PRIMARY_REGION": "us-east-1",
+            "REGION_CODE_PREFIXES": "us-east-1=a,eu-west-1=b",
+        })},
+    })
+    # Reads may fall back to the primary region's replica
+    replica.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {"Statement": Match.array_with([
+            Match.object_like({
+                "Action": "dynamodb:Query",
+                "Resource": {"Fn::Join": ["", Match.array_with([
+                    Match.string_like_regexp(
+                        ":dynamodb:us-east-1:123456789012:table/url_mappings"
+                    ),
+                ])]},
+            }),
+        ])},
+    })
+
+
+def test_pinned_prefixes(synth_app: Any) -> None:
+    """Test that region prefixes can be pinned from the CLI."""
+    templates = synth_app(
+        {**REGIONS, "regionPrefixes": "us-east-1=u,eu-west-1=e"}
+    )
+
+    templates["us-east-1"].has_resource_properties("AWS::Lambda::Function", {
+        "Environment": {"Variables": Match.object_like({
+            "REGION_CODE_PREFIXES": "us-east-1=u,eu-west-1=e",
+        })},
+    })
+
+
+@pytest.mark.parametrize("context, message", [
+    ({"regions": "us-east-1,us-east-1"}, "Duplicate regions"),
+    ({**REGIONS, "regionPrefixes": "ap-south-1=x"}, "unknown region"),
+    ({**REGIONS, "regionPrefixes": "eu-west-1=a"}, "must be unique"),
+    ({**REGIONS, "regionPrefixes": "eu-west-1=-"}, "one letter or digit"),
+])
+def test_invalid_regions_fail_synth(
+    synth_app: Any, context: Any, message: str
+) -> None:
+    """Test that invalid region settings are rejected at synth time."""
+    with pytest.raises(ValueError, match=message):
+        synth_app(context)
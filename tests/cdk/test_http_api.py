@@ -0,0 +1,75 @@
+"""Synth tests for the HTTP API and the CloudFront redirect cache."""
+
+from typing import Any
+
+import pytest
+from aws_cdk.assertions import Match
+
+
+def test_rest_api_is_the_default(synth: Any) -> None:
+    """Test that without context the REST API is deployed alone."""
+    template = synth()
+
+    template.resource_count_is("AWS::ApiGateway::RestApi", 1)
+    template.resource_count_is("AWS::ApiGatewayV2::Api", 0)
+    template.resource_count_is("AWS::CloudFront::Distribution", 0)
+
+
+def test_http_api_with_edge_cache(synth: Any) -> None:
+    """Test payload 2.0 routes and the CloudFront caching behaviour."""
+    template = synth({"apiType": "http"})
+
+    template.resource_count_is("AWS::ApiGateway::RestApi", 0)
+    template.has_resource_properties(
+        "AWS::ApiGatewayV2::Api", {"ProtocolType": "HTTP"}
+    )
+    integrations = template.find_resources("AWS::ApiGatewayV2::Integration")
+    # shorten, redirect, stats and admin links
+    assert len(integrations) == 4
+    for integration in integrations.values():
+        assert integration["Properties"]["PayloadFormatVersion"] == "2.0"
+    for route in ("POST /shorten", "GET /{shortCode}"):
+        template.has_resource_properties(
+            "AWS::ApiGatewayV2::Route", {"RouteKey": route}
+        )
+
+    template.has_resource_properties("AWS::CloudFront::CachePolicy", {
+        "CachePolicyConfig": Match.object_like({
+            "DefaultTTL": 0,
+            "MinTTL": 0,
+            "MaxTTL": 86400,
+        }),
+    })
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": Match.object_like({
+            "DefaultCacheBehavior": Match.object_like({
+                "AllowedMethods": ["GET", "HEAD"],
+                "ViewerProtocolPolicy": "redirect-to-https",
+            }),
+            "CustomErrorResponses": Match.array_with([
+                {"ErrorCode": 404, "ErrorCachingMinTTL": 30},
+                {"ErrorCode": 503, "ErrorCachingMinTTL": 0},
+            ]),
+        }),
+    })
+    template.has_output("RedirectUrl", {})
+
+
+def test_http_api_without_edge_cache(synth: Any) -> None:
+    """Test that the edge cache can be switched off from the CLI."""
+    template = synth({"apiType": "http", "edgeCache": "false"})
+
+    template.resource_count_is("AWS::ApiGatewayV2::Api", 1)
+    template.resource_count_is("AWS::CloudFront::Distribution", 0)
+
+
+@pytest.mark.parametrize("context, message", [
+    ({"apiType": "graphql"}, "Unknown apiType"),
+    ({"edgeCache": True}, "edgeCache requires apiType=http"),
+])
+def test_invalid_api_options_fail_synth(
+    synth: Any, context: Any, message: str
+) -> None:
+    """Test that invalid API options are rejected at synth time."""
+    with pytest.raises(ValueError, match=message):
+        synth(context)
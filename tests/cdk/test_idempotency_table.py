@@ -0,0 +1,26 @@
+"""Synth tests for the idempotency key table."""
+
+from typing import Any
+
+from aws_cdk.assertions import Match
+
+
+def test_idempotency_table_expires_keys(synth: Any) -> None:
+    """Test that keys live in their own TTL table used by shorten."""
+    template = synth()
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "idempotency_keys",
+        "KeySchema": [
+            {"AttributeName": "idempotency_key", "KeyType": "HASH"}
+        ],
+        "TimeToLiveSpecification": {
+            "AttributeName": "expires_at", "Enabled": True,
+        },
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "tiny_url_shorten",
+        "Environment": {"Variables": Match.object_like({
+            "IDEMPOTENCY_TABLE_NAME": Match.any_value(),
+        })},
+    })
@@ -0,0 +1,106 @@
+"""Synth tests for Lambda performance profiles."""
+
+from typing import Any, Dict
+
+import pytest
+from aws_cdk.assertions import Match, Template
+
+
+def _function(template: Template, name: str) -> Dict[str, Any]:
+    functions = template.find_resources(
+        "AWS::Lambda::Function",
+        {"Properties": {"FunctionName": f"tiny_url_{name}"}},
+    )
+    assert len(functions) == 1
+    return next(iter(functions.values()))["Properties"]
+
+
+def test_default_profile_keeps_previous_settings(synth: Any) -> None:
+    """Test that without context the functions are provisioned as before."""
+    template = synth()
+
+    for name in ("shorten", "redirect"):
+        function = _function(template, name)
+        assert function["MemorySize"] == 128
+        assert function["Architectures"] == ["x86_64"]
+        assert function["Runtime"] == "python3.11"
+        assert "ReservedConcurrentExecutions" not in function
+        assert "SnapStart" not in function
+    template.resource_count_is("AWS::Lambda::Alias", 0)
+    template.resource_count_is(
+        "AWS::ApplicationAutoScaling::ScalableTarget", 0
+    )
+
+
+def test_cost_profile(synth: Any) -> None:
+    """Test that the cost preset uses arm64 without idle capacity."""
+    template = synth({"performanceProfile": "cost"})
+
+    for name in ("shorten", "redirect"):
+        function = _function(template, name)
+        assert function["Architectures"] == ["arm64"]
+        assert function["MemorySize"] == 256
+    template.resource_count_is("AWS::Lambda::Alias", 0)
+
+
+def test_latency_profile(synth: Any) -> None:
+    """Test warm capacity, autoscaling and SnapStart in the latency preset."""
+    template = synth({"performanceProfile": "latency"})
+
+    redirect = _function(template, "redirect")
+    assert redirect["MemorySize"] == 1024
+    assert redirect["ReservedConcurrentExecutions"] == 100
+    template.has_resource_properties("AWS::Lambda::Alias", {
+        "Name": "live",
+        "ProvisionedConcurrencyConfig": {
+            "ProvisionedConcurrentExecutions": 2,
+        },
+    })
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 2, "MaxCapacity": 20,
+         "ScalableDimension": "lambda:function:ProvisionedConcurrency"},
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {"TargetTrackingScalingPolicyConfiguration": Match.object_like({
+            "TargetValue": 0.7,
+        })},
+    )
+
+    shorten = _function(template, "shorten")
+    assert shorten["SnapStart"] == {"ApplyOn": "PublishedVersions"}
+    assert shorten["Runtime"] == "python3.12"
+    template.resource_count_is("AWS::Lambda::Alias", 2)
+    # API Gateway invokes the aliases rather than $LATEST
+    template.has_resource_properties("AWS::Lambda::Permission", {
+        "FunctionName": {"Ref": Match.string_like_regexp("LiveAlias")},
+    })
+
+
+def test_function_overrides_from_cli_json(synth: Any) -> None:
+    """Test per-function overrides passed as a JSON context string."""
+    template = synth({
+        "performanceProfile": "cost",
+        "functionProfiles": '{"redirect": {"memory_size": 2048}}',
+    })
+
+    assert _function(template, "redirect")["MemorySize"] == 2048
+    assert _function(template, "shorten")["MemorySize"] == 256
+
+
+@pytest.mark.parametrize("context, message", [
+    ({"performanceProfile": "turbo"}, "Unknown performance profile"),
+    ({"functionProfiles": {"resolver": {}}}, "Unknown function"),
+    ({"functionProfiles": {"redirect": {"memory": 512}}},
+     "unknown profile fields"),
+    ({"functionProfiles": {"shorten": {
+        "snap_start": True, "provisioned_concurrency": 1,
+    }}}, "SnapStart cannot be combined"),
+])
+def test_invalid_profiles_fail_synth(
+    synth: Any, context: Dict[str, Any], message: str
+) -> None:
+    """Test that invalid profiles are rejected at synth time."""
+    with pytest.raises(ValueError, match=message):
+        synth(context)
@@ -1,7 +1,10 @@
 """Shared fixtures for component tests."""
 
+import base64
+import copy
+import json
 import os
-from typing import Any, Generator
+from typing import Any, Callable, Dict, Generator
 
 import boto3
 import pytest
@@ -25,9 +28,90 @@ def dynamodb_table() -> Generator[Any, None, None]:
             ],
             AttributeDefinitions=[
                 {"AttributeName": "short_code", "AttributeType": "S"},
-                {"AttributeName": "creation_date", "AttributeType": "S"}
+                {"AttributeName": "creation_date", "AttributeType": "S"},
+                {"AttributeName": "domain", "AttributeType": "S"},
+                {"AttributeName": "created_hour", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "domain-index",
+                "KeySchema": [
+                    {"AttributeName": "domain", "KeyType": "HASH"},
+                    {"AttributeName": "creation_date", "KeyType": "RANGE"}
+                ],
+                "Projection": {
+                    "ProjectionType": "INCLUDE",
+                    "NonKeyAttributes": ["long_url", "long_url_z",
+                                         "expires_at"]
+                },
+            }, {
+                "IndexName": "created-index",
+                "KeySchema": [
+                    {"AttributeName": "created_hour", "KeyType": "HASH"},
+                    {"AttributeName": "creation_date", "KeyType": "RANGE"}
+                ],
+                "Projection": {
+                    "ProjectionType": "INCLUDE",
+                    "NonKeyAttributes": ["long_url", "long_url_z",
+                                         "expires_at", "domain"]
+                },
+            }],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        dynamodb.create_table(
+            TableName="idempotency_keys",
+            KeySchema=[
+                {"AttributeName": "idempotency_key", "KeyType": "HASH"}
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "idempotency_key", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        dynamodb.create_table(
+            TableName="click_rollups",
+            KeySchema=[
+                {"AttributeName": "short_code", "KeyType": "HASH"},
+                {"AttributeName": "bucket", "KeyType": "RANGE"}
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "short_code", "AttributeType": "S"},
+                {"AttributeName": "bucket", "AttributeType": "S"}
             ],
             BillingMode="PAY_PER_REQUEST",
         )
 
         yield table
+
+
+EVENTS_DIR = os.path.join(os.path.dirname(__file__), "events")
+
+
+@pytest.fixture
+def api_event() -> Callable[..., Dict[str, Any]]:
+    """Build API Gateway events from the recorded v1/v2 fixtures.
+
+    ``api_event("redirect", "v2", short_code="abc")`` sets the path
+    parameter; ``body=`` replaces the request body, base64-encoding it when
+    the fixture is base64-encoded.
+    """
+    def _build(
+        name: str, version: str, short_code: Any = None, body: Any = None
+    ) -> Dict[str, Any]:
+        path = os.path.join(EVENTS_DIR, f"{name}_{version}.json")
+        with open(path, encoding="utf-8") as f:
+            event = copy.deepcopy(json.load(f))
+
+        if short_code is not None:
+            event["pathParameters"] = {"shortCode": short_code}
+            if version == "v2":
+                event["rawPath"] = f"/{short_code}"
+            else:
+                event["path"] = f"/{short_code}"
+        if body is not None:
+            body = body if isinstance(body, str) else json.dumps(body)
+            if event.get("isBase64Encoded"):
+                body = base64.b64encode(body.encode()).decode()
+            event["body"] = body
+        return event
+
+    return _build
@@ -0,0 +1,136 @@
+"""Component tests for the domain index and GET /admin/links."""
+
+import json
+from typing import Any, Dict, Optional
+
+import boto3
+
+from src.handlers import admin_links
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.domain_index import normalize_domain
+
+
+def _list(**params: Optional[str]) -> Dict[str, Any]:
+    """Call the handler with the given query parameters."""
+    response = admin_links.handler(
+        {"queryStringParameters": params or None}, None
+    )
+    return {"status": response["statusCode"], **json.loads(response["body"])}
+
+
+def _save(count: int, url: str, prefix: str) -> None:
+    """Store ``count`` mappings to ``url`` with increasing creation dates."""
+    for i in range(count):
+        admin_links.dynamo_ops.table.put_item(
+            Item=admin_links.dynamo_ops.build_item(
+                f"{prefix}{i}", url, creation_date=f"2026-01-0{i + 1}"
+            )
+        )
+
+
+def test_domains_are_normalized() -> None:
+    """Test that every spelling of a host maps to one index key."""
+    assert normalize_domain("https://WWW.Example.com:8443/a?b") == (
+        "example.com"
+    )
+    assert normalize_domain("example.com.") == "example.com"
+    assert normalize_domain("http://bücher.de/") == "xn--bcher-kva.de"
+    assert normalize_domain("") is None
+
+
+def test_pages_follow_cursors_newest_first(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test paging through one domain's links with index queries only."""
+    _save(5, "https://www.example.com/promo", "ex")
+    _save(2, "https://other.org/", "ot")
+    query = mocker.spy(admin_links.dynamo_ops.table, "query")
+    scan = mocker.spy(admin_links.dynamo_ops.table, "scan")
+
+    codes = []
+    cursor = None
+    while True:
+        page = _list(domain="Example.com", limit="2", cursor=cursor)
+        assert page["status"] == 200
+        assert page["domain"] == "example.com"
+        codes.extend(link["short_code"] for link in page["links"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert codes == ["ex4", "ex3", "ex2", "ex1", "ex0"]
+    assert all(
+        call.kwargs["IndexName"] == "domain-index"
+        for call in query.call_args_list
+    )
+    assert query.call_count <= 3
+    scan.assert_not_called()
+
+
+def test_links_include_the_stored_url(dynamodb_table: Any) -> None:
+    """Test the fields returned for each link."""
+    _save(1, "https://example.com/x", "ex")
+
+    link = _list(domain="https://example.com/")["links"][0]
+
+    assert link["short_code"] == "ex0"
+    assert link["long_url"] == "https://example.com/x"
+    assert link["creation_date"] == "2026-01-01"
+    assert isinstance(link["expires_at"], int)
+
+
+def test_invalid_requests_are_rejected(dynamodb_table: Any) -> None:
+    """Test missing domains, bad limits and foreign or corrupt cursors."""
+    _save(3, "https://example.com/", "ex")
+    cursor = _list(domain="example.com", limit="1")["next_cursor"]
+
+    assert _list()["status"] == 400
+    assert _list(domain="example.com", limit="0")["status"] == 400
+    assert _list(domain="example.com", limit="x")["status"] == 400
+    assert _list(domain="example.com", cursor="???")["status"] == 400
+    foreign = _list(domain="other.org", cursor=cursor)
+    assert foreign["status"] == 400
+    assert "another domain" in foreign["error"]
+
+
+def test_backfill_indexes_older_mappings(dynamodb_table: Any) -> None:
+    """Test that mappings written without a domain become listable."""
+    for code in ("old0", "old1"):
+        dynamodb_table.put_item(Item={
+            "short_code": code,
+            "creation_date": f"2025-01-0{code[-1]}",
+            "long_url": "https://Example.com/legacy",
+        })
+    _save(1, "https://example.com/new", "ex")
+
+    backfill = admin_links.dynamo_ops.backfill_index_attributes
+    assert backfill(segments=1) == 2
+    assert backfill(segments=1) == 0
+
+    codes = [link["short_code"] for link in _list(domain="example.com")[
+        "links"
+    ]]
+    assert codes == ["ex0", "old1", "old0"]
+
+
+def test_backfill_uses_the_table_key_schema(dynamodb_table: Any) -> None:
+    """Test the backfill on a table keyed on short_code alone."""
+    table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName="url_mappings_local",
+        KeySchema=[{"AttributeName": "short_code", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "short_code", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.put_item(Item={
+        "short_code": "old0",
+        "creation_date": "2025-01-01",
+        "long_url": "https://Example.com/legacy",
+    })
+
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings_local")
+    assert dynamo_ops.backfill_index_attributes(segments=1) == 1
+    item = table.get_item(Key={"short_code": "old0"})["Item"]
+    assert item["domain"] == "example.com"
+    assert item["created_hour"] == "2025-01-01"
@@ -0,0 +1,97 @@
+"""Component tests for admission control and load shedding."""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from src.utils.admission import (
+    HIGH, LOW, AdmissionController, ClientRateLimiter, Overloaded
+)
+from src.utils.dynamo_ops import DynamoDBOperations
+
+
+def test_sheds_when_at_limit() -> None:
+    """Test that requests over the limit are shed after the queue delay."""
+    controller = AdmissionController(
+        initial_limit=2, min_limit=1, max_queue_delay=0.05
+    )
+    controller.acquire()
+    controller.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(Overloaded) as excinfo:
+        controller.acquire()
+
+    assert time.monotonic() - started >= 0.05
+    assert excinfo.value.retry_after >= 1
+    assert controller.stats()["shed"] == 1
+
+    controller.release()
+    controller.acquire()
+    assert controller.stats()["in_flight"] == 2
+
+
+def test_queued_request_gets_released_slot() -> None:
+    """Test that a waiting request is admitted when a slot frees up."""
+    controller = AdmissionController(initial_limit=1, max_queue_delay=1.0)
+    controller.acquire()
+    threading.Timer(0.05, controller.release).start()
+
+    controller.acquire()
+
+    assert controller.stats()["admitted"] == 2
+
+
+def test_low_priority_is_shed_first() -> None:
+    """Test that low-priority work only gets a share of the limit."""
+    controller = AdmissionController(
+        initial_limit=4, min_limit=1, max_queue_delay=0.01
+    )
+    for _ in range(3):
+        controller.acquire(HIGH)
+
+    with pytest.raises(Overloaded):
+        controller.acquire(LOW)
+    controller.acquire(HIGH)
+
+
+def test_limit_follows_backend_latency() -> None:
+    """Test that the limit grows at baseline latency and shrinks on spikes."""
+    controller = AdmissionController(initial_limit=32, max_limit=256)
+    for _ in range(50):
+        controller.observe_latency(0.005)
+    grown = controller.limit
+    assert grown > 32
+
+    for _ in range(50):
+        controller.observe_latency(0.100)
+    assert controller.limit < grown / 2
+
+
+def test_client_rate_limiter() -> None:
+    """Test per-client token buckets."""
+    limiter = ClientRateLimiter(rate=1, burst=3)
+
+    results = [limiter.check("10.0.0.1")[0] for _ in range(4)]
+    allowed, retry_after = limiter.check("10.0.0.1")
+
+    assert results == [True, True, True, False]
+    assert not allowed and 0 < retry_after <= 1
+    assert limiter.check("10.0.0.2")[0]
+    assert limiter.stats() == {"clients": 2, "limited": 2}
+
+
+def test_dynamo_latency_listener(dynamodb_table: Any) -> None:
+    """Test that DynamoDB call durations reach latency listeners."""
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    samples = []
+    dynamo_ops.add_latency_listener(
+        lambda operation, seconds: samples.append((operation, seconds))
+    )
+
+    dynamo_ops.get_url_mapping("missing")
+
+    assert [operation for operation, _ in samples] == ["Query"]
+    assert samples[0][1] > 0
@@ -0,0 +1,216 @@
+"""Component tests for the API client's tail-latency features."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Generator, List, Tuple
+
+import pytest
+
+from src.utils.api_client import AsyncTinyURLClient, TinyURLClient
+from src.utils.tail_latency import CircuitBreaker, CircuitOpenError
+
+
+class _Backend(ThreadingHTTPServer):
+    """Local stand-in for both services with scripted responses."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        # Per request, in order: (delay seconds, status); then fast 200s
+        self.script: List[Any] = []
+        self.requests: List[Dict[str, Any]] = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _respond(self) -> None:
+        backend = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        with backend.lock:
+            backend.connections.add(self.client_address)
+            backend.requests.append({
+                "path": self.path,
+                "key": self.headers.get("Idempotency-Key"),
+                "body": self.rfile.read(length) if length else b"",
+            })
+            delay, status = (
+                backend.script.pop(0) if backend.script else (0, 200)
+            )
+        time.sleep(delay)
+        body = json.dumps({"short_url": "https://tiny.url/abc123"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+
+@pytest.fixture
+def backend() -> Generator[_Backend, None, None]:
+    """Serve scripted responses on a local port."""
+    server = _Backend()
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(backend: _Backend, **options: Any) -> TinyURLClient:
+    client = TinyURLClient(base_url=backend.url, **options)
+    client.redirect_base = backend.url
+    return client
+
+
+def test_requests_reuse_pooled_connections(backend: _Backend) -> None:
+    """Test that sequential calls share one keep-alive connection."""
+    with _client(backend) as client:
+        for _ in range(10):
+            assert client.redirect("abc123").status_code == 200
+        client.shorten_url("https://example.com")
+
+    assert len(backend.requests) == 11
+    assert len(backend.connections) == 1
+    stats = client.stats()
+    assert stats["endpoints"]["redirect"]["count"] == 10
+    assert stats["endpoints"]["shorten"]["count"] == 1
+    assert stats["requests"] == 11
+
+
+def test_slow_gets_are_hedged_after_p95(backend: _Backend) -> None:
+    """Test that a GET slower than p95 is raced by a hedge, within budget."""
+    with _client(backend) as client:
+        for _ in range(30):
+            client.redirect("abc123")
+        assert client.hedge_delay("redirect") < 0.1
+        before = client.stats()
+        sent = len(backend.requests)
+
+        backend.script = [(1.0, 200)]
+        started = time.monotonic()
+        response = client.redirect("abc123")
+        elapsed = time.monotonic() - started
+
+        assert response.status_code == 200
+        assert elapsed < 0.5
+        assert len(backend.requests) == sent + 2
+        stats = client.stats()
+        assert stats["hedges"] == before["hedges"] + 1
+        assert stats["hedge_wins"] == before["hedge_wins"] + 1
+
+        # POSTs are never hedged, and the budget caps hedges at 10%
+        backend.script = [(0.2, 200)]
+        client.shorten_url("https://example.com")
+        assert len(backend.requests) == sent + 3
+        backend.script = [(0.2, 200)] * 20
+        for _ in range(10):
+            client.redirect("abc123")
+        stats = client.stats()
+        assert 0 < stats["hedges"] <= 0.1 * stats["requests"]
+
+
+def test_overload_is_retried_with_the_same_key(backend: _Backend) -> None:
+    """Test jittered retries of 503s, and giving up after max_retries."""
+    backend.script = [(0, 503), (0, 503)]
+    with _client(backend, backoff_base=0.01) as client:
+        response = client.shorten_url("https://example.com")
+
+        assert response.status_code == 200
+        keys = {request["key"] for request in backend.requests}
+        assert len(backend.requests) == 3 and len(keys) == 1
+
+        backend.script = [(0, 503)] * 3
+        assert client.redirect("abc123").status_code == 503
+        assert client.stats()["retries"] == 4
+
+        backend.script = [(0, 404)]
+        assert client.redirect("missing").status_code == 404
+        assert client.stats()["retries"] == 4
+
+
+def test_failing_backend_opens_its_circuit(mocker: Any) -> None:
+    """Test that a dead backend stops being called until the trial."""
+    client = TinyURLClient(
+        base_url="http://127.0.0.1:9", backoff_base=0.001,
+        failure_threshold=3, reset_timeout=0.2,
+    )
+    send = mocker.spy(client.session, "request")
+
+    # One call: the attempt and both retries fail, opening the circuit
+    with pytest.raises(ConnectionError):
+        client.health_check()
+    with pytest.raises(CircuitOpenError):
+        client.health_check()
+    assert send.call_count == 3
+    assert client.stats()["circuits"] == {"http://127.0.0.1:9": "open"}
+
+    time.sleep(0.25)
+    with pytest.raises(CircuitOpenError):
+        client.health_check()
+    # Only the half-open trial was sent, and it reopened the circuit
+    assert send.call_count == 4
+
+
+def test_half_open_circuit_allows_one_trial() -> None:
+    """Test the breaker's transitions."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.state == "half_open"
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_async_client_fans_out(backend: _Backend) -> None:
+    """Test concurrent async calls over the shared pool, with hedging."""
+    async def fan_out() -> Tuple[List[int], float]:
+        async with AsyncTinyURLClient(
+            base_url=backend.url, hedge_budget=1.0
+        ) as client:
+            client.client.redirect_base = backend.url
+            for _ in range(25):
+                await client.redirect("abc123")
+            backend.script = [(1.0, 200)]
+            started = time.monotonic()
+            responses = await asyncio.gather(
+                *[client.redirect("abc123") for _ in range(20)]
+            )
+            elapsed = time.monotonic() - started
+            created = await client.shorten_url("https://example.com")
+            assert client.extract_short_code(created) == "abc123"
+            return [response.status_code for response in responses], elapsed
+
+    statuses, elapsed = asyncio.run(fan_out())
+
+    assert statuses == [200] * 20
+    assert elapsed < 0.5
+    assert len(backend.connections) <= 20
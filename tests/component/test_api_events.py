@@ -0,0 +1,118 @@
+"""Component tests for API Gateway payload format 1.0 and 2.0 events."""
+
+import json
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from src.handlers import redirect_url
+from src.handlers.redirect_url import handler as redirect_handler
+from src.handlers.shorten_url import handler as shorten_handler
+
+VERSIONS = ["v1", "v2"]
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_shorten_and_redirect(
+    dynamodb_table: Any, api_event: Any, version: str
+) -> None:
+    """Test the full flow with events from either payload format."""
+    response = shorten_handler(api_event("shorten", version), None)
+
+    assert response["statusCode"] == 200
+    short_code = json.loads(response["body"])["short_url"].split("/")[-1]
+
+    response = redirect_handler(
+        api_event("redirect", version, short_code=short_code), None
+    )
+
+    assert response["statusCode"] == 302
+    assert response["headers"]["Location"] == (
+        "https://example.com/very/long/url"
+    )
+    assert response["headers"]["Cache-Control"] == "public, max-age=86400"
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_custom_code_in_body(
+    dynamodb_table: Any, api_event: Any, version: str
+) -> None:
+    """Test that custom codes are read from plain and base64 bodies."""
+    event = api_event("shorten", version, body={
+        "url": "https://example.com", "custom_code": f"custom-{version}",
+    })
+
+    response = shorten_handler(event, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["short_url"].endswith(
+        f"/custom-{version}"
+    )
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_missing_body(
+    dynamodb_table: Any, api_event: Any, version: str
+) -> None:
+    """Test that a request without a body is rejected as a bad request."""
+    event = api_event("shorten", version)
+    event["body"] = None
+
+    response = shorten_handler(event, None)
+
+    assert response["statusCode"] == 400
+    assert "URL is empty or missing" in json.loads(response["body"])["error"]
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_not_found_is_briefly_cacheable(
+    dynamodb_table: Any, api_event: Any, version: str
+) -> None:
+    """Test that 404s carry a short Cache-Control for edge caches."""
+    response = redirect_handler(
+        api_event("redirect", version, short_code="missing"), None
+    )
+
+    assert response["statusCode"] == 404
+    assert response["headers"]["Cache-Control"] == "public, max-age=30"
+
+
+def test_redirect_cache_stops_at_expiry(
+    dynamodb_table: Any, api_event: Any
+) -> None:
+    """Test that a soon-to-expire link is not cached past its expiry."""
+    expires_at = int(datetime.utcnow().timestamp()) + 600
+    dynamodb_table.put_item(Item={
+        "short_code": "soon",
+        "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/soon",
+        "expires_at": expires_at,
+    })
+
+    response = redirect_handler(
+        api_event("redirect", "v2", short_code="soon"), None
+    )
+
+    assert response["statusCode"] == 302
+    max_age = int(response["headers"]["Cache-Control"].split("=")[-1])
+    assert 0 < max_age <= 600
+
+
+def test_redirect_cache_can_be_turned_off(
+    dynamodb_table: Any, api_event: Any, mocker: Any
+) -> None:
+    """Test that a zero REDIRECT_CACHE_SECONDS forbids caching redirects."""
+    mocker.patch.object(redirect_url, "REDIRECT_CACHE_SECONDS", 0)
+    dynamodb_table.put_item(Item={
+        "short_code": "fresh",
+        "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/fresh",
+    })
+
+    response = redirect_handler(
+        api_event("redirect", "v2", short_code="fresh"), None
+    )
+
+    assert response["statusCode"] == 302
+    assert response["headers"]["Cache-Control"] == "no-store"
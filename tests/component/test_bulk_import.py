@@ -0,0 +1,168 @@
+"""Component tests for the streaming bulk importer."""
+
+import json
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from src.utils.bulk_import import BulkImporter
+from src.utils.dynamo_ops import DynamoDBOperations
+
+
+@pytest.fixture
+def dynamo_ops(dynamodb_table: Any, mocker: Any) -> DynamoDBOperations:
+    """Provide DynamoDB operations with batched reads emulated per code.
+
+    moto does not evaluate PartiQL ``IN`` lists, so the batched read is
+    answered with one regular lookup per code.
+    """
+    ops = DynamoDBOperations(table_name="url_mappings")
+
+    def get_url_mappings(short_codes: List[str]) -> Dict[str, Any]:
+        found = {code: ops.get_url_mapping(code)[1] for code in short_codes}
+        return {code: item for code, item in found.items() if item}
+
+    mocker.patch.object(ops, "get_url_mappings", side_effect=get_url_mappings)
+    return ops
+
+
+def _importer(
+    dynamo_ops: DynamoDBOperations, tmp_path: Any, **kwargs: Any
+) -> BulkImporter:
+    return BulkImporter(
+        dynamo_ops,
+        workers=2,
+        writes_per_second=10000,
+        checkpoint_path=str(tmp_path / "import.ckpt"),
+        rejects_path=str(tmp_path / "import.rejects"),
+        **kwargs,
+    )
+
+
+def test_import_csv(
+    dynamodb_table: Any, dynamo_ops: DynamoDBOperations, tmp_path: Any
+) -> None:
+    """Test importing valid rows from CSV and rejecting invalid ones."""
+    future = int(time.time()) + 3600
+    source = tmp_path / "links.csv"
+    rows = ["short_code,long_url,expires_at"]
+    rows += [f"code{i},https://example.com/{i},{future}" for i in range(60)]
+    rows.append("bad/code,https://example.com/x,")
+    rows.append("okcode,not-a-url,")
+    rows.append("old,https://example.com/old,1000")
+    source.write_text("\n".join(rows) + "\n")
+
+    stats = _importer(dynamo_ops, tmp_path).run(str(source))
+
+    assert stats.written == 60
+    assert stats.rejected == 3
+    items = dynamodb_table.scan()["Items"]
+    assert len(items) == 60
+    item = next(i for i in items if i["short_code"] == "code7")
+    assert item["long_url"] == "https://example.com/7"
+    assert item["expires_at"] == future
+
+    rejects = (tmp_path / "import.rejects").read_text().splitlines()
+    reasons = [json.loads(line)["reason"] for line in rejects]
+    assert "Link has already expired" in reasons
+
+
+def test_import_jsonl_resumes_from_checkpoint(
+    dynamodb_table: Any, dynamo_ops: DynamoDBOperations, tmp_path: Any
+) -> None:
+    """Test that a second run only imports rows after the checkpoint."""
+    source = tmp_path / "links.jsonl"
+    lines = [
+        json.dumps({"short_code": f"j{i}", "long_url": f"https://a.io/{i}"})
+        for i in range(30)
+    ]
+    source.write_text("\n".join(lines) + "\n")
+
+    first = _importer(dynamo_ops, tmp_path).run(str(source))
+    assert first.written == 30
+
+    with source.open("a") as f:
+        f.write(json.dumps(
+            {"short_code": "late", "long_url": "https://a.io/late"}
+        ) + "\n")
+        f.write("{not json}\n")
+
+    second = _importer(dynamo_ops, tmp_path).run(str(source))
+
+    assert second.written == 31
+    assert second.rejected == 1
+    assert len(dynamodb_table.scan()["Items"]) == 31
+
+
+def test_existing_codes_are_rejected_and_reruns_are_idempotent(
+    dynamodb_table: Any, dynamo_ops: DynamoDBOperations, tmp_path: Any
+) -> None:
+    """Test that taken codes are kept, and that resuming is idempotent."""
+    dynamo_ops.save_url_mapping("taken", "https://example.com/live")
+    source = tmp_path / "links.jsonl"
+    lines = [
+        json.dumps({"short_code": f"r{i}", "long_url": f"https://a.io/{i}"})
+        for i in range(30)
+    ]
+    lines.insert(3, json.dumps(
+        {"short_code": "taken", "long_url": "https://example.com/hijack"}
+    ))
+    source.write_text("\n".join(lines) + "\n")
+
+    first = _importer(dynamo_ops, tmp_path).run(str(source))
+
+    assert first.written == 30
+    assert first.rejected == 1
+    assert dynamo_ops.get_url_mapping("taken")[1]["long_url"] == (
+        "https://example.com/live"
+    )
+    rejects = (tmp_path / "import.rejects").read_text().splitlines()
+    assert [json.loads(line)["reason"] for line in rejects] == ["exists"]
+
+    # Pretend the run crashed after its first batch was checkpointed
+    checkpoint_path = tmp_path / "import.ckpt"
+    checkpoint = json.loads(checkpoint_path.read_text())
+    checkpoint["line"] = 10
+    checkpoint["stats"] = {"read": 10, "written": 9, "rejected": 1}
+    checkpoint_path.write_text(json.dumps(checkpoint))
+
+    second = _importer(dynamo_ops, tmp_path).run(str(source))
+
+    # Rows 11-31 were already written by this import: none is rejected
+    assert second.written == 30
+    assert second.rejected == 1
+    assert len(dynamodb_table.scan()["Items"]) == 31
+
+
+def test_resume_skips_rows_already_rejected(
+    dynamodb_table: Any, dynamo_ops: DynamoDBOperations, tmp_path: Any
+) -> None:
+    """Test that rejects past the checkpoint line are not recorded twice."""
+    source = tmp_path / "links.jsonl"
+    lines = [
+        json.dumps({"short_code": f"s{i}", "long_url": f"https://a.io/{i}"})
+        for i in range(30)
+    ]
+    lines[19] = "{not json}"
+    source.write_text("\n".join(lines) + "\n")
+
+    first = _importer(dynamo_ops, tmp_path).run(str(source))
+    assert first.rejected == 1
+
+    # Pretend the run crashed after rejecting line 20, with the checkpoint
+    # still at line 10 because a batch before it was in flight
+    checkpoint_path = tmp_path / "import.ckpt"
+    checkpoint = json.loads(checkpoint_path.read_text())
+    assert checkpoint["rejected_lines"] == []
+    checkpoint["line"] = 10
+    checkpoint["rejected_lines"] = [20]
+    checkpoint["stats"] = {"read": 20, "written": 10, "rejected": 1}
+    checkpoint_path.write_text(json.dumps(checkpoint))
+
+    second = _importer(dynamo_ops, tmp_path).run(str(source))
+
+    assert second.rejected == 1
+    rejects = (tmp_path / "import.rejects").read_text().splitlines()
+    assert [json.loads(line)["line"] for line in rejects] == [20]
+    assert len(dynamodb_table.scan()["Items"]) == 29
@@ -0,0 +1,134 @@
+"""Component tests for incremental change exports."""
+
+import gzip
+import json
+import os
+from typing import Any, List
+
+import pytest
+
+from src.utils.change_export import ChangeExporter, read_capacity_share
+from src.utils.dynamo_ops import DynamoDBOperations
+
+
+def _save(table: Any, *created: str) -> None:
+    """Store one mapping per creation date, coded by its minute."""
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    for creation_date in created:
+        code = creation_date[11:16].replace(":", "")
+        table.put_item(Item=dynamo_ops.build_item(
+            f"c{code}", f"https://example.com/{code}",
+            creation_date=creation_date,
+        ))
+
+
+def _read(output_dir: str) -> List[List[str]]:
+    """Return the short codes of each chunk, in chunk order."""
+    chunks = []
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith(".ndjson.gz"):
+            with gzip.open(os.path.join(output_dir, name), "rt") as f:
+                chunks.append([json.loads(line)["short_code"] for line in f])
+    return chunks
+
+
+def test_runs_export_only_new_mappings(
+    dynamodb_table: Any, tmp_path: Any, mocker: Any
+) -> None:
+    """Test chunked hourly reads from the watermark onwards."""
+    _save(dynamodb_table, "2026-10-19T07:59:00", "2026-10-19T08:05:00",
+          "2026-10-19T08:40:00", "2026-10-19T10:15:00")
+    output = str(tmp_path)
+    query = mocker.spy(dynamodb_table.meta.client, "query")
+    scan = mocker.spy(dynamodb_table.meta.client, "scan")
+
+    first = ChangeExporter(dynamodb_table, output, chunk_bytes=150).run(
+        since="2026-10-19T08:00:00", until="2026-10-19T10:30:00"
+    )
+
+    assert (first.exported, first.chunks) == (3, 2)
+    assert _read(output) == [["c0805", "c0840"], ["c1015"]]
+    assert {call.kwargs["IndexName"] for call in query.call_args_list} == {
+        "created-index"
+    }
+    # One query per hour, empty hours included
+    assert query.call_count == 3
+    scan.assert_not_called()
+
+    _save(dynamodb_table, "2026-10-19T10:20:00", "2026-10-19T10:45:00",
+          "2026-10-19T11:05:00")
+    second = ChangeExporter(dynamodb_table, output, chunk_bytes=150).run(
+        until="2026-10-19T11:00:00"
+    )
+
+    # 10:20 predates the first run's end, so only the rows after it count
+    assert second.exported == 1
+    assert _read(output)[-1] == ["c1045"]
+    with open(os.path.join(output, "watermark.json")) as f:
+        watermark = json.load(f)
+    assert watermark == {
+        "position": {
+            "creation_date": "2026-10-19T11:00:00", "short_code": None
+        },
+        "chunk": 3,
+    }
+
+
+def test_interrupted_export_resumes_without_duplicates(
+    dynamodb_table: Any, tmp_path: Any, mocker: Any
+) -> None:
+    """Test that a crash after some chunks loses and repeats nothing."""
+    _save(dynamodb_table, *[f"2026-10-19T08:{m:02d}:00" for m in range(6)])
+    output = str(tmp_path)
+    exporter = ChangeExporter(dynamodb_table, output, chunk_bytes=100)
+    write_chunk = exporter._write_chunk
+    calls = []
+
+    def fail_second_chunk(rows: List[Any]) -> None:
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        write_chunk(rows)
+
+    mocker.patch.object(exporter, "_write_chunk", fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        exporter.run(since="2026-10-19T08:00:00", until="2026-10-19T09:00:00")
+
+    ChangeExporter(dynamodb_table, output, chunk_bytes=100).run(
+        until="2026-10-19T09:00:00"
+    )
+
+    codes = [code for chunk in _read(output) for code in chunk]
+    # The 08:00 row is not after --since
+    assert codes == ["c0801", "c0802", "c0803", "c0804", "c0805"]
+
+
+def test_reads_are_paced_by_consumed_capacity(
+    dynamodb_table: Any, tmp_path: Any, mocker: Any
+) -> None:
+    """Test that every query's consumed capacity is charged to the bucket."""
+    _save(dynamodb_table, "2026-10-19T08:05:00", "2026-10-19T08:10:00")
+    exporter = ChangeExporter(
+        dynamodb_table, str(tmp_path), max_rcu=5, page_size=1
+    )
+    acquire = mocker.spy(exporter.bucket, "acquire")
+
+    stats = exporter.run(
+        since="2026-10-19T08:00:00", until="2026-10-19T08:30:00"
+    )
+
+    assert stats.queries == acquire.call_count >= 2
+    assert stats.consumed_rcu == pytest.approx(
+        sum(call.args[0] for call in acquire.call_args_list)
+    )
+    assert stats.consumed_rcu > 0
+    with pytest.raises(ValueError, match="no provisioned read capacity"):
+        read_capacity_share(dynamodb_table, 0.2)
+
+
+def test_first_run_needs_a_start(dynamodb_table: Any, tmp_path: Any) -> None:
+    """Test that an export without a watermark or --since is refused."""
+    with pytest.raises(ValueError, match="No watermark"):
+        ChangeExporter(dynamodb_table, str(tmp_path)).run()
+    with pytest.raises(ValueError, match="fmt"):
+        ChangeExporter(dynamodb_table, str(tmp_path), fmt="csv")
@@ -0,0 +1,238 @@
+"""Component tests for stream-driven lookup cache coherence."""
+
+from typing import Any, Dict, List, Optional
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+from src.utils.change_feed import ChangeFeedConsumer
+from src.utils.lookup_cache import LookupCache
+
+
+def _item(code: str, url: str) -> Dict[str, Any]:
+    return {"short_code": code, "long_url": url, "expires_at": 0}
+
+
+def _record(event: str, code: str, sequence: int, url: str = "") -> dict:
+    change: Dict[str, Any] = {
+        "Keys": {"short_code": {"S": code}},
+        "SequenceNumber": str(sequence),
+    }
+    if url:
+        change["NewImage"] = {
+            "short_code": {"S": code}, "long_url": {"S": url}
+        }
+    return {"eventName": event, "dynamodb": change}
+
+
+class FakeStreams:
+    """Streams client over in-memory shards and records."""
+
+    def __init__(self) -> None:
+        """Start with no shards."""
+        self.shards: List[Dict[str, Any]] = []
+        self.records: Dict[str, List[dict]] = {}
+        self.opened: List[tuple] = []
+        self.trim_once: Optional[str] = None
+
+    def add_shard(self, shard_id: str, parent: Optional[str] = None) -> None:
+        """Add an open shard, split from ``parent`` if given."""
+        shard: Dict[str, Any] = {
+            "ShardId": shard_id, "SequenceNumberRange": {}
+        }
+        if parent:
+            shard["ParentShardId"] = parent
+        self.shards.append(shard)
+        self.records[shard_id] = []
+
+    def close_shard(self, shard_id: str) -> None:
+        """Mark a shard as closed, as a split does."""
+        for shard in self.shards:
+            if shard["ShardId"] == shard_id:
+                shard["SequenceNumberRange"]["EndingSequenceNumber"] = "9"
+
+    def describe_stream(self, **kwargs: Any) -> dict:
+        """Return all shards on one page."""
+        return {"StreamDescription": {"Shards": self.shards}}
+
+    def get_shard_iterator(self, ShardId: str, ShardIteratorType: str,
+                           **kwargs: Any) -> dict:
+        """Return an iterator encoding the shard and record position."""
+        self.opened.append((ShardId, ShardIteratorType))
+        records = self.records[ShardId]
+        position = {"TRIM_HORIZON": 0, "LATEST": len(records)}.get(
+            ShardIteratorType
+        )
+        if position is None:
+            sequences = [r["dynamodb"]["SequenceNumber"] for r in records]
+            position = sequences.index(kwargs["SequenceNumber"]) + 1
+        return {"ShardIterator": f"{ShardId}:{position}"}
+
+    def get_records(self, ShardIterator: str, Limit: int) -> dict:
+        """Return the remaining records; closed shards end the iterator."""
+        shard_id, position = ShardIterator.split(":")
+        if self.trim_once == shard_id:
+            self.trim_once = None
+            raise ClientError(
+                {"Error": {"Code": "TrimmedDataAccessException"}},
+                "GetRecords",
+            )
+        records = self.records[shard_id][int(position):]
+        response: Dict[str, Any] = {"Records": records}
+        end = int(position) + len(records)
+        shard = next(s for s in self.shards if s["ShardId"] == shard_id)
+        if "EndingSequenceNumber" not in shard["SequenceNumberRange"]:
+            response["NextShardIterator"] = f"{shard_id}:{end}"
+        return response
+
+
+@pytest.fixture
+def stream_table(dynamodb_table: Any) -> Any:
+    """Return the url_mappings table with its stream enabled."""
+    boto3.client("dynamodb", region_name="us-east-1").update_table(
+        TableName="url_mappings",
+        StreamSpecification={
+            "StreamEnabled": True, "StreamViewType": "NEW_IMAGE"
+        },
+    )
+    return dynamodb_table
+
+
+def _put(table: Any, code: str, url: str) -> None:
+    table.put_item(Item={
+        "short_code": code, "creation_date": "2026-01-01", "long_url": url,
+    })
+
+
+def test_changes_refresh_and_invalidate_cached_codes(
+    stream_table: Any,
+) -> None:
+    """Test that new mappings replace cached ones and deletes drop them."""
+    _put(stream_table, "gone", "https://example.com/gone")
+    cache = LookupCache()
+    consumer = ChangeFeedConsumer(cache, "url_mappings")
+    consumer.attach()
+    cache.put("kept", _item("kept", "https://example.com/old"))
+    cache.put("gone", _item("gone", "https://example.com/gone"))
+
+    _put(stream_table, "kept", "https://example.com/new")
+    _put(stream_table, "other", "https://example.com/other")
+    stream_table.delete_item(
+        Key={"short_code": "gone", "creation_date": "2026-01-01"}
+    )
+
+    assert consumer.poll() == 3
+    assert cache.get("kept")["long_url"] == "https://example.com/new"
+    assert cache.get("gone") is None
+    assert cache.get("other") is None
+    stats = consumer.stats()
+    assert (stats["records"], stats["refreshed"], stats["invalidated"]) == (
+        3, 1, 1
+    )
+    assert stats["open_shards"] == 1
+    assert 0 <= stats["lag_seconds"]["max"] < 60
+
+
+def test_checkpoint_resumes_after_applied_records(
+    stream_table: Any, tmp_path: Any
+) -> None:
+    """Test restarts with and without a checkpoint."""
+    path = str(tmp_path / "checkpoint.json")
+    cache = LookupCache()
+    cache.put("stale", _item("stale", "https://example.com/stale"))
+    first = ChangeFeedConsumer(cache, "url_mappings", checkpoint_path=path)
+    first.attach()
+    # Without a checkpoint the cache may have missed anything
+    assert cache.get("stale") is None
+
+    _put(stream_table, "a", "https://example.com/a")
+    first.poll()
+    first.save_checkpoint()
+
+    cache.put("b", _item("b", "https://example.com/old-b"))
+    _put(stream_table, "b", "https://example.com/b")
+    second = ChangeFeedConsumer(cache, "url_mappings", checkpoint_path=path)
+    second.attach()
+
+    assert second.poll() == 1
+    assert cache.get("b")["long_url"] == "https://example.com/b"
+
+
+def test_children_are_read_after_their_parent(stream_table: Any) -> None:
+    """Test that a split shard's children wait until it is drained."""
+    streams = FakeStreams()
+    streams.add_shard("parent")
+    cache = LookupCache()
+    consumer = ChangeFeedConsumer(
+        cache, "url_mappings", streams_client=streams
+    )
+    consumer.attach()
+    cache.put("abc", _item("abc", "https://example.com/v1"))
+
+    streams.records["parent"].append(
+        _record("INSERT", "abc", 1, "https://example.com/v2")
+    )
+    streams.close_shard("parent")
+    for child in ("child-1", "child-2"):
+        streams.add_shard(child, parent="parent")
+    streams.records["child-1"].append(
+        _record("INSERT", "abc", 2, "https://example.com/v3")
+    )
+
+    consumer.poll()
+    assert cache.get("abc")["long_url"] == "https://example.com/v2"
+    assert [shard for shard, _ in streams.opened] == ["parent"]
+
+    consumer.poll()
+    assert cache.get("abc")["long_url"] == "https://example.com/v3"
+    assert streams.opened[1:] == [
+        ("child-1", "TRIM_HORIZON"), ("child-2", "TRIM_HORIZON")
+    ]
+    assert consumer.stats()["open_shards"] == 2
+
+
+def test_trimmed_records_clear_the_cache(stream_table: Any) -> None:
+    """Test that records lost to retention are treated as a gap."""
+    streams = FakeStreams()
+    streams.add_shard("shard")
+    cache = LookupCache()
+    consumer = ChangeFeedConsumer(
+        cache, "url_mappings", streams_client=streams
+    )
+    consumer.attach()
+    cache.put("abc", _item("abc", "https://example.com/v1"))
+
+    streams.trim_once = "shard"
+    consumer.poll()
+
+    assert cache.get("abc") is None
+    assert consumer.stats()["gaps"] == 1
+    assert streams.opened[-1] == ("shard", "TRIM_HORIZON")
+
+
+def test_late_fills_are_invalidated_again(stream_table: Any) -> None:
+    """Test that a read racing a delete cannot leave a stale entry."""
+    streams = FakeStreams()
+    streams.add_shard("shard")
+    cache = LookupCache()
+    consumer = ChangeFeedConsumer(
+        cache, "url_mappings", reinvalidate_after=0, streams_client=streams
+    )
+    consumer.attach()
+
+    streams.records["shard"].append(_record("REMOVE", "abc", 1))
+    consumer.poll()
+    # A lookup that read the item before the delete fills the cache late
+    cache.put("abc", _item("abc", "https://example.com/deleted"))
+    consumer.poll()
+
+    assert cache.get("abc") is None
+
+
+def test_tables_without_a_stream_are_rejected(dynamodb_table: Any) -> None:
+    """Test that a missing stream is reported."""
+    consumer = ChangeFeedConsumer(LookupCache(), "url_mappings")
+
+    with pytest.raises(ValueError, match="no stream"):
+        consumer.attach()
@@ -0,0 +1,186 @@
+"""Component tests for click rollups and the stats endpoint."""
+
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.handlers import click_stats, redirect_url, shorten_url
+from src.utils.click_rollups import DAY, HOUR, ClickRollups
+
+NOON = datetime(2026, 10, 19, 12, 30)
+
+
+@pytest.fixture
+def rollups(dynamodb_table: Any, mocker: Any) -> ClickRollups:
+    """Provide rollups shared by the redirect and stats handlers."""
+    rollups = ClickRollups("click_rollups", flush_interval=3600)
+    mocker.patch.object(redirect_url, "clicks", rollups)
+    mocker.patch.object(click_stats, "rollups", rollups)
+    return rollups
+
+
+def test_clicks_are_aggregated_before_flushing(
+    rollups: ClickRollups, mocker: Any
+) -> None:
+    """Test that repeated clicks become one update per bucket."""
+    update = mocker.spy(rollups.table, "update_item")
+    for _ in range(3):
+        rollups.record("abc", NOON)
+    rollups.record("abc", NOON.replace(hour=13))
+
+    assert update.call_count == 0
+    assert rollups.flush() == 3
+    assert update.call_count == 3
+
+    items = {
+        item["bucket"]: int(item["clicks"])
+        for item in rollups.table.scan()["Items"]
+    }
+    assert items == {
+        "D#2026-10-19#us-east-1": 4,
+        "H#2026-10-19T12#us-east-1": 3,
+        "H#2026-10-19T13#us-east-1": 1,
+    }
+    assert rollups.stats()["flushed"] == 4
+
+
+def test_record_never_writes(rollups: ClickRollups, mocker: Any) -> None:
+    """Test that clicks are only buffered, and the flusher writes them."""
+    update = mocker.spy(rollups.table, "update_item")
+    rollups.max_pending = 4
+    rollups.flush_interval = 0
+
+    for code in ("a", "b", "c", "a"):
+        rollups.record(code, NOON)
+
+    assert update.call_count == 0
+    assert rollups.stats()["recorded"] == 3
+    assert rollups.stats()["dropped"] == 1
+
+    # A full buffer wakes the flusher before its interval
+    rollups.flush_interval = 3600
+    rollups.start()
+    for _ in range(100):
+        if rollups.stats()["writes"] == 4:
+            break
+        time.sleep(0.01)
+    assert rollups.stats()["writes"] == 4
+    rollups.record("a", NOON)
+    rollups.stop()
+    assert update.call_count == 6
+
+
+def test_failed_flush_keeps_counts(
+    rollups: ClickRollups, mocker: Any
+) -> None:
+    """Test that counts survive a failed flush and are written later."""
+    rollups.record("abc", NOON)
+    error = ClientError({"Error": {"Code": "ThrottlingException"}}, "Update")
+    update = mocker.patch.object(
+        rollups.table, "update_item", side_effect=[error, error]
+    )
+
+    assert rollups.flush() == 0
+    assert rollups.stats()["pending_counters"] == 2
+
+    mocker.stop(update)
+    assert rollups.flush() == 2
+
+
+def test_query_sums_regions_and_fills_gaps(
+    rollups: ClickRollups, mocker: Any
+) -> None:
+    """Test one query returning every bucket of a range."""
+    rollups.record("abc", NOON)
+    rollups.record("abc", NOON.replace(hour=14))
+    rollups.flush()
+    rollups.table.put_item(Item={
+        "short_code": "abc", "bucket": "H#2026-10-19T12#eu-west-1",
+        "clicks": 5,
+    })
+    spy = mocker.spy(rollups.table, "query")
+
+    series = rollups.query(
+        "abc", HOUR, NOON.replace(hour=11), NOON.replace(hour=14)
+    )
+
+    assert spy.call_count == 1
+    assert [bucket["clicks"] for bucket in series] == [0, 6, 0, 1]
+    assert series[0]["start"] == "2026-10-19T11:00:00"
+    assert rollups.query("abc", DAY, NOON, NOON)[0]["clicks"] == 2
+
+
+def test_redirects_are_counted(rollups: ClickRollups) -> None:
+    """Test that successful redirects feed the rollups, misses do not."""
+    response = shorten_url.handler(
+        {"body": json.dumps({"url": "https://example.com"})}, None
+    )
+    short_code = json.loads(response["body"])["short_url"].split("/")[-1]
+
+    for code in (short_code, short_code, "missing"):
+        redirect_url.handler({"pathParameters": {"shortCode": code}}, None)
+
+    assert rollups.stats()["recorded"] == 2
+
+
+def test_stats_endpoint(rollups: ClickRollups) -> None:
+    """Test the stats response for an hourly range."""
+    rollups.record("abc", NOON)
+    rollups.record("abc", NOON)
+    rollups.flush()
+
+    response = click_stats.handler({
+        "pathParameters": {"shortCode": "abc"},
+        "queryStringParameters": {
+            "granularity": "hour",
+            "from": "2026-10-19T11:00:00Z",
+            "to": "2026-10-19T12:59:00Z",
+        },
+    }, None)
+
+    assert response["statusCode"] == 200
+    assert response["headers"]["Cache-Control"] == "no-store"
+    body = json.loads(response["body"])
+    assert body["total"] == 2
+    assert body["from"] == "2026-10-19T11:00:00"
+    assert [b["clicks"] for b in body["buckets"]] == [0, 2]
+
+
+@pytest.mark.parametrize("params", [
+    {"granularity": "minute"},
+    {"from": "yesterday"},
+    {"from": "2026-10-19", "to": "2026-10-18"},
+    {"granularity": "hour", "from": "2026-09-01", "to": "2026-10-01"},
+])
+def test_stats_rejects_bad_ranges(
+    rollups: ClickRollups, params: Any
+) -> None:
+    """Test validation of the granularity and range."""
+    response = click_stats.handler({
+        "pathParameters": {"shortCode": "abc"},
+        "queryStringParameters": params,
+    }, None)
+
+    assert response["statusCode"] == 400
+
+
+def test_lambda_writes_clicks_before_returning(
+    rollups: ClickRollups, mocker: Any
+) -> None:
+    """Test that on Lambda a redirect leaves nothing buffered."""
+    mocker.patch.object(redirect_url, "FLUSH_CLICKS_PER_INVOCATION", True)
+    shorten_url.dynamo_ops.save_url_mapping("lam", "https://example.com")
+
+    response = redirect_url.handler(
+        {"pathParameters": {"shortCode": "lam"}}, None
+    )
+
+    assert response["statusCode"] == 302
+    assert rollups.stats()["writes"] == 2
+    assert sorted(
+        item["bucket"][0] for item in rollups.table.scan()["Items"]
+    ) == ["D", "H"]
@@ -0,0 +1,101 @@
+"""Component tests for hot short code tracking."""
+
+import json
+import random
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from src.handlers import redirect_url, shorten_url
+from src.utils.heavy_hitters import HotLinks, SpaceSaving
+
+
+def _zipf_stream(count: int, codes: int, seed: int) -> list:
+    """Return a skewed stream of codes, as redirect traffic usually is."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(codes)]
+    return rng.choices([f"c{i}" for i in range(codes)], weights, k=count)
+
+
+def test_memory_is_bounded_and_heavy_hitters_are_kept() -> None:
+    """Test the Space-Saving guarantees on a skewed stream."""
+    stream = _zipf_stream(20000, 2000, seed=1)
+    sketch = SpaceSaving(50)
+    for code in stream:
+        sketch.add(code)
+
+    truth = Counter(stream)
+    assert len(sketch) == 50
+    assert sketch.total == len(stream)
+    for item in sketch.top():
+        true_count = truth[item["short_code"]]
+        assert item["count"] - item["error"] <= true_count <= item["count"]
+    # Every code above total / capacity is listed
+    listed = {item["short_code"] for item in sketch.top()}
+    for code, count in truth.items():
+        if count > len(stream) / 50:
+            assert code in listed
+    assert [item["short_code"] for item in sketch.top(3)] == [
+        "c0", "c1", "c2"
+    ]
+
+
+def test_merged_sketches_keep_bounds() -> None:
+    """Test that merging sketches of two pods keeps counts bounded."""
+    first, second = SpaceSaving(40), SpaceSaving(40)
+    stream_a = _zipf_stream(10000, 1000, seed=2)
+    stream_b = _zipf_stream(10000, 1000, seed=3)
+    for code in stream_a:
+        first.add(code)
+    for code in stream_b:
+        second.add(code)
+
+    merged = first.merge(SpaceSaving.from_dict(second.to_dict()))
+
+    truth = Counter(stream_a) + Counter(stream_b)
+    assert len(merged) == 40
+    assert merged.total == 20000
+    for item in merged.top():
+        true_count = truth[item["short_code"]]
+        assert item["count"] - item["error"] <= true_count <= item["count"]
+    assert merged.top(1)[0]["short_code"] == "c0"
+
+
+def test_windows_rotate(mocker: Any) -> None:
+    """Test that old windows age out of the hot list."""
+    now = mocker.patch("src.utils.heavy_hitters.time.monotonic")
+    now.return_value = 0.0
+    hot = HotLinks(capacity=10, window=60)
+    hot.record("old")
+
+    now.return_value = 61.0
+    hot.record("new")
+    assert {item["short_code"] for item in hot.top()} == {"old", "new"}
+
+    now.return_value = 125.0
+    assert [item["short_code"] for item in hot.top()] == ["new"]
+
+    now.return_value = 300.0
+    assert hot.top() == []
+
+
+def test_capacity_must_be_positive() -> None:
+    """Test that an empty sketch is rejected."""
+    with pytest.raises(ValueError):
+        SpaceSaving(0)
+
+
+def test_redirects_are_tracked(dynamodb_table: Any, mocker: Any) -> None:
+    """Test that served redirects, and only those, are tracked."""
+    hot = HotLinks(capacity=10)
+    mocker.patch.object(redirect_url, "hot_links", hot)
+    response = shorten_url.handler(
+        {"body": json.dumps({"url": "https://example.com"})}, None
+    )
+    short_code = json.loads(response["body"])["short_url"].split("/")[-1]
+
+    for code in (short_code, short_code, "missing"):
+        redirect_url.handler({"pathParameters": {"shortCode": code}}, None)
+
+    assert hot.top() == [{"short_code": short_code, "count": 2, "error": 0}]
@@ -0,0 +1,216 @@
+"""Component tests for idempotency keys on the shorten endpoint."""
+
+import json
+import threading
+import time
+from typing import Any, Dict
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.handlers import shorten_url
+from src.utils.api_client import TinyURLClient
+from src.utils.idempotency import IdempotencyStore, fingerprint
+
+
+def _event(body: Dict[str, Any], key: Any = "key-1") -> Dict[str, Any]:
+    headers = {"Content-Type": "application/json"}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return {"headers": headers, "body": json.dumps(body)}
+
+
+@pytest.fixture
+def store(dynamodb_table: Any, mocker: Any) -> IdempotencyStore:
+    """Point the handler at a store that gives up waiting quickly.
+
+    moto evaluates conditional puts without isolation between threads, so
+    puts are serialized to get DynamoDB's atomic conditional writes.
+    """
+    store = IdempotencyStore(
+        table_name="idempotency_keys", wait_timeout=0.3, poll_interval=0.01
+    )
+    put_item = store.table.put_item
+    put_lock = threading.Lock()
+
+    def atomic_put_item(**kwargs: Any) -> Any:
+        with put_lock:
+            return put_item(**kwargs)
+
+    mocker.patch.object(store.table, "put_item", side_effect=atomic_put_item)
+    mocker.patch.object(shorten_url, "idempotency", store)
+    return store
+
+
+def test_retry_replays_first_response(
+    store: IdempotencyStore, mocker: Any
+) -> None:
+    """Test that a retried key gets the same short URL without a write."""
+    save = mocker.spy(shorten_url.dynamo_ops, "save_url_mapping")
+    event = _event({"url": "https://example.com/page"})
+
+    first = shorten_url.handler(event, None)
+    second = shorten_url.handler(event, None)
+
+    assert first["statusCode"] == second["statusCode"] == 200
+    assert second["body"] == first["body"]
+    assert second["headers"]["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first["headers"]
+    assert save.call_count == 1
+
+
+def test_header_name_is_case_insensitive(
+    store: IdempotencyStore, mocker: Any
+) -> None:
+    """Test that HTTP API (lowercased) headers are honored."""
+    save = mocker.spy(shorten_url.dynamo_ops, "save_url_mapping")
+    body = json.dumps({"url": "https://example.com/page"})
+    event = {"headers": {"idempotency-key": "key-1"}, "body": body}
+
+    shorten_url.handler(event, None)
+    replayed = shorten_url.handler(event, None)
+
+    assert replayed["headers"]["Idempotent-Replayed"] == "true"
+    assert save.call_count == 1
+
+
+def test_replays_client_errors(store: IdempotencyStore) -> None:
+    """Test that a taken custom code stays a 409 for the key's retries."""
+    shorten_url.handler(
+        _event({"url": "https://a.com", "custom_code": "mine"}, "other"),
+        None,
+    )
+    event = _event({"url": "https://b.com", "custom_code": "mine"})
+
+    first = shorten_url.handler(event, None)
+    second = shorten_url.handler(event, None)
+
+    assert first["statusCode"] == second["statusCode"] == 409
+    assert second["headers"]["Idempotent-Replayed"] == "true"
+
+
+def test_key_reused_with_different_body(store: IdempotencyStore) -> None:
+    """Test that a key cannot be reused for another request."""
+    shorten_url.handler(_event({"url": "https://example.com/a"}), None)
+
+    response = shorten_url.handler(
+        _event({"url": "https://example.com/b"}), None
+    )
+
+    assert response["statusCode"] == 422
+    assert "different request" in json.loads(response["body"])["error"]
+
+
+@pytest.mark.parametrize("key", ["", "k" * 256])
+def test_invalid_key(store: IdempotencyStore, key: str) -> None:
+    """Test that empty and oversized keys are rejected."""
+    response = shorten_url.handler(
+        _event({"url": "https://example.com"}, key), None
+    )
+
+    assert response["statusCode"] == 400
+
+
+def test_server_error_releases_key(
+    store: IdempotencyStore, mocker: Any
+) -> None:
+    """Test that a failed request can be retried with the same key."""
+    save = mocker.patch.object(
+        shorten_url.dynamo_ops,
+        "save_url_mapping",
+        side_effect=[RuntimeError("boom"), True],
+    )
+    event = _event({"url": "https://example.com"})
+
+    assert shorten_url.handler(event, None)["statusCode"] == 500
+    retried = shorten_url.handler(event, None)
+
+    assert retried["statusCode"] == 200
+    assert "Idempotent-Replayed" not in retried["headers"]
+    assert save.call_count == 2
+
+
+def test_concurrent_duplicates_write_once(
+    store: IdempotencyStore, mocker: Any
+) -> None:
+    """Test that duplicates in flight wait for and share one result."""
+    store.wait_timeout = 5
+    original = shorten_url.dynamo_ops.save_url_mapping
+
+    def slow_save(*args: Any) -> bool:
+        time.sleep(0.1)
+        return original(*args)
+
+    save = mocker.patch.object(
+        shorten_url.dynamo_ops, "save_url_mapping", side_effect=slow_save
+    )
+    event = _event({"url": "https://example.com"})
+    responses: Dict[int, Dict[str, Any]] = {}
+    threads = [
+        threading.Thread(
+            target=lambda i=i: responses.update(
+                {i: shorten_url.handler(event, None)}
+            )
+        )
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert save.call_count == 1
+    assert {r["statusCode"] for r in responses.values()} == {200}
+    assert len({r["body"] for r in responses.values()}) == 1
+
+
+def test_in_progress_key_returns_conflict(store: IdempotencyStore) -> None:
+    """Test that a duplicate gives up while the first one still runs."""
+    body = json.dumps({"url": "https://example.com"})
+    assert store.claim("key-1", fingerprint(body)).acquired
+
+    response = shorten_url.handler(_event(json.loads(body)), None)
+
+    assert response["statusCode"] == 409
+    assert response["headers"]["Retry-After"] == "1"
+
+
+def test_abandoned_claim_is_taken_over(store: IdempotencyStore) -> None:
+    """Test that a claim left by a crashed request expires."""
+    store.lock_timeout = -1
+    assert store.claim("key-1", "hash").acquired
+
+    assert store.claim("key-1", "hash").acquired
+
+
+def test_store_outage_does_not_block_shortening(
+    store: IdempotencyStore, mocker: Any
+) -> None:
+    """Test that requests go through when the key table is unavailable."""
+    mocker.patch.object(store, "claim", side_effect=ClientError(
+        {"Error": {"Code": "ResourceNotFoundException"}}, "PutItem"
+    ))
+
+    response = shorten_url.handler(
+        _event({"url": "https://example.com"}), None
+    )
+
+    assert response["statusCode"] == 200
+
+
+def test_client_sends_idempotency_key(mocker: Any) -> None:
+    """Test that the client sends a fresh key unless given one."""
+    client = TinyURLClient(base_url="http://localhost:8000")
+    request = mocker.patch.object(client.session, "request")
+    request.return_value.status_code = 200
+
+    client.shorten_url("https://example.com")
+    client.shorten_url("https://example.com")
+    client.shorten_url("https://example.com", idempotency_key="fixed")
+
+    keys = [
+        call.kwargs["headers"]["Idempotency-Key"]
+        for call in request.call_args_list
+    ]
+    assert keys[0] and keys[1] and keys[0] != keys[1]
+    assert keys[2] == "fixed"
@@ -0,0 +1,171 @@
+"""Component tests for micro-batched redirect lookups."""
+
+import threading
+from typing import Any, Dict, List
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+from src.utils.dynamo_ops import BATCH_READ_MAX_KEYS, DynamoDBOperations
+from src.utils.lookup_batcher import LookupBatcher
+from src.utils.url_codec import encode_url_attributes
+from src.utils.url_resolver import UrlResolver
+
+
+def _run_concurrently(count: int, target: Any) -> None:
+    threads = [
+        threading.Thread(target=target, args=(i,)) for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_keys_share_one_fetch() -> None:
+    """Test that distinct keys arriving together are fetched in one call."""
+    fetched: List[List[str]] = []
+
+    def fetch_many(keys: List[str]) -> Dict[str, str]:
+        fetched.append(sorted(keys))
+        return {key: key.upper() for key in keys if key != "k3"}
+
+    batcher = LookupBatcher(fetch_many, window=0.2, max_batch=5)
+    results: Dict[str, Any] = {}
+
+    _run_concurrently(
+        5, lambda i: results.update({f"k{i}": batcher.get(f"k{i}")})
+    )
+
+    assert fetched == [["k0", "k1", "k2", "k3", "k4"]]
+    assert results == {"k0": "K0", "k1": "K1", "k2": "K2", "k3": None,
+                       "k4": "K4"}
+    assert batcher.stats()["avg_batch_size"] == 5
+
+
+def test_size_cap_closes_batch_early() -> None:
+    """Test that a full batch is fetched without waiting for the window."""
+    fetched: List[int] = []
+
+    def fetch_many(keys: List[str]) -> Dict[str, str]:
+        fetched.append(len(keys))
+        return {}
+
+    batcher = LookupBatcher(fetch_many, window=5.0, max_batch=4)
+
+    _run_concurrently(8, lambda i: batcher.get(f"k{i}"))
+
+    assert fetched == [4, 4]
+
+
+def test_fetch_errors_reach_every_waiter() -> None:
+    """Test that a failed batch raises in each waiting caller."""
+    def fetch_many(keys: List[str]) -> Dict[str, str]:
+        raise RuntimeError("backend down")
+
+    batcher = LookupBatcher(fetch_many, window=0.05)
+    errors = []
+
+    def call(i: int) -> None:
+        with pytest.raises(RuntimeError):
+            batcher.get(f"k{i}")
+        errors.append(i)
+
+    _run_concurrently(3, call)
+
+    assert sorted(errors) == [0, 1, 2]
+
+
+def test_get_url_mappings_reads_latest_items(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test the batched read statement, pagination and latest-item pick."""
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    client = dynamo_ops.dynamodb.meta.client
+    # Stored compressed, as with URL_COMPRESSION=1
+    long_url = "https://example.com/b/" + "path/" * 20
+    compressed = encode_url_attributes(long_url)
+    execute = mocker.patch.object(client, "execute_statement", side_effect=[
+        {"Items": [
+            {"short_code": "a", "creation_date": "2024-01-01",
+             "long_url": "https://example.com/a-old"},
+            {"short_code": "a", "creation_date": "2024-02-01",
+             "long_url": "https://example.com/a-new"},
+        ], "NextToken": "page-2"},
+        {"Items": [
+            {"short_code": "b", "creation_date": "2024-01-01",
+             "long_url_z": Binary(compressed["long_url_z"]),
+             "expires_at": 1735689600},
+        ]},
+    ])
+
+    mappings = dynamo_ops.get_url_mappings(["a", "b", "c"])
+
+    assert {code: item["long_url"] for code, item in mappings.items()} == {
+        "a": "https://example.com/a-new", "b": long_url,
+    }
+    assert "long_url_z" not in mappings["b"]
+    assert mappings["b"]["expires_at"] == 1735689600
+    first_call = execute.call_args_list[0].kwargs
+    assert first_call["Statement"] == (
+        'SELECT short_code, creation_date, long_url, long_url_z, expires_at '
+        'FROM "url_mappings" WHERE short_code IN [?, ?, ?]'
+    )
+    assert first_call["Parameters"] == ["a", "b", "c"]
+    assert execute.call_args_list[1].kwargs["NextToken"] == "page-2"
+
+
+def test_get_url_mappings_bounds_the_statement(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test the key limit, and that no codes make no request."""
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    execute = mocker.patch.object(
+        dynamo_ops.dynamodb.meta.client, "execute_statement"
+    )
+
+    assert dynamo_ops.get_url_mappings([]) == {}
+    with pytest.raises(ValueError):
+        dynamo_ops.get_url_mappings(
+            [f"c{i}" for i in range(BATCH_READ_MAX_KEYS + 1)]
+        )
+    execute.assert_not_called()
+
+
+def test_get_url_mappings_runs_against_the_table(dynamodb_table: Any) -> None:
+    """Test the statement is accepted and decodes compressed items.
+
+    moto only matches the first value of an ``IN`` list, so this reads one
+    code; the multi-code paths are covered with stubbed responses above.
+    """
+    dynamo_ops = DynamoDBOperations(
+        table_name="url_mappings", compress_urls=True
+    )
+    long_url = "https://example.com/a/" + "path/" * 20
+    dynamo_ops.table.put_item(Item=dynamo_ops.build_item(
+        "a", "https://example.com/old", creation_date="2024-01-01"
+    ))
+    dynamo_ops.table.put_item(Item=dynamo_ops.build_item(
+        "a", long_url, creation_date="2024-02-01"
+    ))
+
+    mappings = dynamo_ops.get_url_mappings(["a"])
+
+    assert mappings["a"]["long_url"] == long_url
+    assert mappings["a"]["creation_date"] == "2024-02-01"
+    assert "long_url_z" not in mappings["a"]
+
+
+def test_resolver_uses_batcher(dynamodb_table: Any, mocker: Any) -> None:
+    """Test that the resolver routes lookups through the batcher."""
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    mocker.patch.object(dynamo_ops, "get_url_mappings", return_value={
+        "abc": {"short_code": "abc", "long_url": "https://example.com"},
+    })
+    resolver = UrlResolver(
+        dynamo_ops, batcher=LookupBatcher(dynamo_ops.get_url_mappings)
+    )
+
+    assert resolver.resolve("abc")[0]
+    assert resolver.resolve("zzz") == (False, None)
+    assert resolver.stats()["batcher"]["batches"] == 2
@@ -0,0 +1,200 @@
+"""Component tests for deadline-bound lookups with stale fallback."""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.handlers import redirect_url
+from src.utils.lookup_cache import LookupCache
+from src.utils.shared_cache import SharedLookupCache
+from src.utils.url_resolver import LookupUnavailable, UrlResolver
+
+ITEM = {"short_code": "abc123", "long_url": "https://example.com/a"}
+ERROR = ClientError({"Error": {"Code": "InternalServerError"}}, "Query")
+
+
+def _resolver(mocker: Any, **cache_options: Any) -> UrlResolver:
+    resolver = UrlResolver(
+        redirect_url.dynamo_ops, cache=LookupCache(**cache_options)
+    )
+    mocker.patch.object(redirect_url, "resolver", resolver)
+    return resolver
+
+
+def _redirect(short_code: str) -> Any:
+    return redirect_url.handler({"pathParameters": {"shortCode": short_code}},
+                                None)
+
+
+def test_slow_lookup_serves_stale_and_refreshes(mocker: Any) -> None:
+    """Test a stale answer within the budget, then a background refresh."""
+    resolver = _resolver(mocker, ttl=0.05, stale_ttl=60)
+    resolver.cache.put("abc123", ITEM)
+    time.sleep(0.06)
+    release = threading.Event()
+    fresh = dict(ITEM, long_url="https://example.com/b")
+
+    def slow_lookup(*args: Any, **kwargs: Any) -> Any:
+        release.wait(5)
+        return True, fresh
+
+    mocker.patch.object(
+        redirect_url.dynamo_ops, "get_url_mapping", side_effect=slow_lookup
+    )
+    mocker.patch.object(redirect_url, "LOOKUP_BUDGET_MS", 50)
+
+    started = time.monotonic()
+    response = _redirect("abc123")
+    assert time.monotonic() - started < 0.5
+    assert response["statusCode"] == 302
+    assert response["headers"]["Location"] == "https://example.com/a"
+
+    # The late answer refreshes the cache for the next request
+    release.set()
+    for _ in range(100):
+        if resolver.cache.get("abc123"):
+            break
+        time.sleep(0.01)
+    assert _redirect("abc123")["headers"]["Location"] == (
+        "https://example.com/b"
+    )
+    assert resolver.stats()["lookups"] == {
+        "not_found": 0, "timeouts": 1, "backend_errors": 0, "shed": 0,
+        "stale_served": 1, "snapshot_served": 0, "unavailable": 0,
+    }
+
+
+def test_backend_errors_are_not_reported_as_missing(mocker: Any) -> None:
+    """Test stale serves and 503s on errors, and 404s only for misses."""
+    resolver = _resolver(mocker, ttl=0.01, stale_ttl=60)
+    resolver.cache.put("abc123", ITEM)
+    time.sleep(0.02)
+    lookup = mocker.patch.object(
+        redirect_url.dynamo_ops, "get_url_mapping", side_effect=ERROR
+    )
+
+    assert _redirect("abc123")["statusCode"] == 302
+    response = _redirect("uncached")
+    assert response["statusCode"] == 503
+    assert response["headers"]["Retry-After"] == "1"
+    assert "no-store" in response["headers"]["Cache-Control"]
+
+    lookup.side_effect = None
+    lookup.return_value = (False, None)
+    assert _redirect("abc123")["statusCode"] == 404
+    # A code found missing is not served stale later
+    assert resolver.cache.get_stale("abc123") is None
+
+    lookups = resolver.stats()["lookups"]
+    assert lookups["backend_errors"] == 2
+    assert lookups["stale_served"] == 1
+    assert lookups["unavailable"] == 1
+    assert lookups["not_found"] == 1
+    assert resolver.cache.stats()["stale_hits"] == 1
+
+
+def test_stalled_backend_does_not_queue_lookups(mocker: Any) -> None:
+    """Test one pending lookup per code, and shedding past the limit."""
+    resolver = UrlResolver(redirect_url.dynamo_ops, workers=2)
+    release = threading.Event()
+
+    def stalled_lookup(*args: Any, **kwargs: Any) -> Any:
+        release.wait(5)
+        return False, None
+
+    lookup = mocker.patch.object(
+        redirect_url.dynamo_ops, "get_url_mapping", side_effect=stalled_lookup
+    )
+
+    for code in ["a"] * 5 + ["b"] * 5 + ["c"]:
+        with pytest.raises(LookupUnavailable):
+            resolver.resolve(code, timeout=0.01)
+
+    lookups = resolver.stats()["lookups"]
+    assert lookups["timeouts"] == 10
+    assert lookups["shed"] == 1
+    assert resolver.stats()["single_flight"]["in_flight"] == 2
+    release.set()
+    for _ in range(100):
+        if not resolver.stats()["single_flight"]["in_flight"]:
+            break
+        time.sleep(0.01)
+    assert lookup.call_count == 2
+    assert resolver.resolve("c", timeout=1) == (False, None)
+
+
+def test_busy_backend_is_not_shed(mocker: Any) -> None:
+    """Test that lookups within the budget queue rather than shed."""
+    resolver = UrlResolver(redirect_url.dynamo_ops, workers=1)
+    release = threading.Event()
+
+    def slow_lookup(short_code: str, **kwargs: Any) -> Any:
+        release.wait(5)
+        return True, dict(ITEM, short_code=short_code)
+
+    mocker.patch.object(
+        redirect_url.dynamo_ops, "get_url_mapping", side_effect=slow_lookup
+    )
+    results = []
+    waiter = threading.Thread(
+        target=lambda: results.append(resolver.resolve("b", timeout=5))
+    )
+
+    # "a" fills the only worker, but is still within "b"'s budget
+    with pytest.raises(LookupUnavailable):
+        resolver.resolve("a", timeout=0.01)
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    waiter.join(5)
+
+    assert results[0][1]["short_code"] == "b"
+    assert resolver.stats()["lookups"]["shed"] == 0
+
+
+def test_stale_window_bounds_stale_serves(tmp_path: Any) -> None:
+    """Test that both caches stop serving stale entries after the window."""
+    for cache in (
+        LookupCache(ttl=0.01, stale_ttl=0.05),
+        SharedLookupCache(
+            str(tmp_path / "cache"), max_entries=64, ttl=0.01,
+            stale_ttl=0.05,
+        ),
+    ):
+        cache.put("abc123", ITEM)
+        time.sleep(0.02)
+
+        assert cache.get("abc123") is None
+        assert cache.get_stale("abc123")["long_url"] == ITEM["long_url"]
+        time.sleep(0.05)
+        assert cache.get_stale("abc123") is None
+        assert cache.stats()["stale_hits"] == 1
+
+
+def test_async_lookup_times_out_without_cancelling(mocker: Any) -> None:
+    """Test the asyncio path keeps a late lookup running for the cache."""
+    resolver = UrlResolver(redirect_url.dynamo_ops, cache=LookupCache())
+
+    def slow_lookup(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(0.2)
+        return True, ITEM
+
+    mocker.patch.object(
+        redirect_url.dynamo_ops, "get_url_mapping", side_effect=slow_lookup
+    )
+
+    async def resolve() -> None:
+        with pytest.raises(LookupUnavailable):
+            await resolver.resolve_async("abc123", timeout=0.05)
+        await asyncio.sleep(0.3)
+
+    asyncio.run(resolve())
+
+    assert resolver.cache.get("abc123") == ITEM
+    assert resolver.stats()["lookups"]["timeouts"] == 1
+    assert json.dumps(resolver.stats())
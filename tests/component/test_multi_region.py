@@ -0,0 +1,122 @@
+"""Component tests for multi-region code allocation and lookups."""
+
+import json
+from typing import Any
+
+import boto3
+import pytest
+
+from src.handlers import shorten_url
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.multi_region import RegionalTables, parse_region_map
+from src.utils.url_resolver import UrlResolver
+
+PREFIXES = {"us-east-1": "a", "eu-west-1": "e"}
+
+
+@pytest.fixture
+def eu_regions(dynamodb_table: Any) -> RegionalTables:
+    """Router for eu-west-1 with us-east-1 as the primary region."""
+    boto3.client("dynamodb", region_name="eu-west-1").create_table(
+        TableName="url_mappings",
+        KeySchema=[
+            {"AttributeName": "short_code", "KeyType": "HASH"},
+            {"AttributeName": "creation_date", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "short_code", "AttributeType": "S"},
+            {"AttributeName": "creation_date", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    local = DynamoDBOperations("url_mappings", region_name="eu-west-1")
+    return RegionalTables(local, "eu-west-1", "us-east-1", PREFIXES)
+
+
+def _shorten(body: Any) -> Any:
+    response = shorten_url.handler({"body": json.dumps(body)}, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_generated_codes_use_region_prefix(
+    eu_regions: RegionalTables, mocker: Any
+) -> None:
+    """Test that codes generated in a region start with its prefix."""
+    mocker.patch.object(shorten_url, "regions", eu_regions)
+    mocker.patch.object(shorten_url, "dynamo_ops", eu_regions.local)
+
+    status, body = _shorten({"url": "https://example.com"})
+
+    assert status == 200
+    short_code = body["short_url"].split("/")[-1]
+    assert short_code.startswith("e") and len(short_code) == 8
+    assert eu_regions.local.get_url_mapping(short_code)[0]
+
+
+def test_custom_codes_are_reserved_in_primary(
+    eu_regions: RegionalTables, mocker: Any
+) -> None:
+    """Test that custom codes claimed in a replica go to the primary."""
+    mocker.patch.object(shorten_url, "regions", eu_regions)
+    mocker.patch.object(shorten_url, "dynamo_ops", eu_regions.local)
+    primary = eu_regions.ops_for("us-east-1")
+    primary.save_url_mapping("taken", "https://example.com/first")
+
+    status, _ = _shorten({"url": "https://example.com", "custom_code": "mine"})
+
+    assert status == 200
+    assert primary.get_url_mapping("mine")[0]
+    assert not eu_regions.local.get_url_mapping("mine")[0]
+    status, _ = _shorten(
+        {"url": "https://example.com", "custom_code": "taken"}
+    )
+    assert status == 409
+
+
+@pytest.mark.parametrize("region", ["eu-west-1", "us-east-1"])
+def test_custom_codes_cannot_use_region_prefixes(
+    eu_regions: RegionalTables, mocker: Any, region: str
+) -> None:
+    """Test that custom codes never enter a region's generated space."""
+    regions = RegionalTables(eu_regions.local, region, "us-east-1", PREFIXES)
+    mocker.patch.object(shorten_url, "regions", regions)
+    mocker.patch.object(shorten_url, "dynamo_ops", regions.ops_for(region))
+
+    for custom_code in ("eAbc12", "aAbc12"):
+        status, body = _shorten(
+            {"url": "https://example.com", "custom_code": custom_code}
+        )
+        assert status == 400
+        assert "reserved" in body["error"]
+    status, _ = _shorten(
+        {"url": "https://example.com", "custom_code": "Abc12"}
+    )
+    assert status == 200
+
+
+def test_local_miss_falls_back_to_home_region(
+    eu_regions: RegionalTables,
+) -> None:
+    """Test that codes not yet replicated are read where they were written."""
+    primary = eu_regions.ops_for("us-east-1")
+    primary.save_url_mapping("aRecent1", "https://example.com/recent")
+    resolver = UrlResolver(eu_regions.local, regions=eu_regions)
+
+    found, item = resolver.resolve("aRecent1")
+
+    assert found and item["long_url"] == "https://example.com/recent"
+    assert resolver.resolve("eMissing") == (False, None)
+    assert resolver.stats()["regions"]["remote_hits"] == 1
+
+
+def test_invalid_prefixes_are_rejected(eu_regions: RegionalTables) -> None:
+    """Test prefix validation and parsing of region maps."""
+    with pytest.raises(ValueError, match="share prefix"):
+        RegionalTables(eu_regions.local, "eu-west-1", "us-east-1",
+                       {"us-east-1": "a", "eu-west-1": "a"})
+    with pytest.raises(ValueError, match="must cover"):
+        RegionalTables(eu_regions.local, "eu-west-1", "us-east-1",
+                       {"eu-west-1": "e"})
+    with pytest.raises(ValueError, match="region=value"):
+        parse_region_map("us-east-1")
+    assert parse_region_map(" us-east-1=a , eu-west-1=e ") == PREFIXES
@@ -0,0 +1,127 @@
+"""Component tests for on-demand request profiling."""
+
+import os
+import threading
+import time
+from typing import Any, List
+
+import pytest
+
+from src.utils.profiler import RequestProfiler, admin_allowed
+
+
+def busy_handler(seconds: float) -> int:
+    """Spin on the CPU for ``seconds``."""
+    total = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def _serve(profiler: RequestProfiler, label: str, seconds: float) -> None:
+    """Serve one request on another thread, as the Flask hooks do."""
+    def request() -> None:
+        sampled = profiler.begin(label)
+        try:
+            busy_handler(seconds)
+        finally:
+            if sampled:
+                profiler.end()
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    thread.join()
+
+
+def _lines(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_sampled_requests_become_folded_stacks(tmp_path: Any) -> None:
+    """Test that sampled stacks are rooted at the request's route."""
+    profiler = RequestProfiler(str(tmp_path), interval=0.001)
+    profiler.start(sample_rate=1.0)
+
+    _serve(profiler, "GET /<short_code>", 0.2)
+    files = profiler.stop()
+
+    assert [os.path.basename(path)[:4] for path in files] == ["cpu-"]
+    lines = _lines(files[0])
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.startswith("GET /<short_code>;")
+    assert any("busy_handler (test_profiler.py:" in line for line in lines)
+    assert int(count) > 0
+    stats = profiler.stats()
+    assert stats["profiled_requests"] == 1
+    assert stats["samples"] >= sum(
+        int(line.rsplit(" ", 1)[1]) for line in lines
+    )
+    assert stats["files"] == [os.path.basename(files[0])]
+
+
+def test_requests_outside_the_sample_are_not_traced(tmp_path: Any) -> None:
+    """Test that idle profilers and unsampled requests record nothing."""
+    profiler = RequestProfiler(str(tmp_path), interval=0.001)
+    threads = threading.active_count()
+
+    assert profiler.begin("GET /idle") is False
+    assert threading.active_count() == threads
+
+    profiler.start(sample_rate=1e-9)
+    _serve(profiler, "GET /unsampled", 0.05)
+
+    assert profiler.stop() == []
+    assert profiler.stats()["profiled_requests"] == 0
+
+
+def test_memory_snapshot_by_allocation_site(tmp_path: Any) -> None:
+    """Test that memory allocated during the session is attributed."""
+    profiler = RequestProfiler(str(tmp_path))
+    profiler.start(sample_rate=1.0, memory=True)
+
+    kept = [bytearray(1024) for _ in range(1000)]
+    files = profiler.stop()
+
+    memory = [path for path in files if "memory-" in path]
+    assert len(memory) == 1
+    heaviest = _lines(memory[0])[0]
+    assert "test_profiler.py" in heaviest
+    assert int(heaviest.rsplit(" ", 1)[1]) >= 1024 * 1000
+    assert kept
+
+
+def test_sessions_expire_and_validate(tmp_path: Any) -> None:
+    """Test automatic expiry, and refused or unavailable sessions."""
+    profiler = RequestProfiler(str(tmp_path), interval=0.001)
+    profiler.start(sample_rate=1.0, duration=0.05)
+    with pytest.raises(ValueError, match="already running"):
+        profiler.start()
+
+    deadline = time.monotonic() + 2
+    while profiler.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not profiler.active
+
+    with pytest.raises(ValueError, match="sample_rate"):
+        profiler.start(sample_rate=0)
+    with pytest.raises(ValueError, match="duration"):
+        profiler.start(duration=3600)
+    with pytest.raises(ValueError, match="disabled"):
+        RequestProfiler().start()
+
+
+@pytest.mark.parametrize("remote_addr, authorization, token, allowed", [
+    ("127.0.0.1", None, None, True),
+    ("::1", None, None, True),
+    ("10.0.0.7", None, None, False),
+    ("10.0.0.7", "Bearer s3cret", "s3cret", True),
+    ("127.0.0.1", None, "s3cret", False),
+    ("10.0.0.7", "Bearer wrong", "s3cret", False),
+])
+def test_admin_allowed(
+    remote_addr: str, authorization: Any, token: Any, allowed: bool
+) -> None:
+    """Test profiling endpoints take a token, or loopback callers without."""
+    assert admin_allowed(remote_addr, authorization, token) is allowed
@@ -0,0 +1,34 @@
+"""Component tests for the Prometheus metrics rendering."""
+
+from src.utils.admission import AdmissionController
+from src.utils.prometheus import render_prometheus
+
+
+def test_nested_counters_are_flattened() -> None:
+    """Test metric naming and which values are exported."""
+    text = render_prometheus({
+        "service": "redirect",
+        "admission": {"in_flight": 3, "queue_delay_ms": 1.5},
+        "resolver": {"single-flight": {"collapsed": 7}},
+        "warmup": {"state": "done", "duration_seconds": None},
+        "cache": {"enabled": True},
+    })
+
+    assert text.splitlines() == [
+        "tiny_url_admission_in_flight 3",
+        "tiny_url_admission_queue_delay_ms 1.5",
+        "tiny_url_resolver_single_flight_collapsed 7",
+        "tiny_url_cache_enabled 1",
+    ]
+    assert text.endswith("\n")
+
+
+def test_autoscaling_series_are_exported() -> None:
+    """Test that the series the HPA metrics are built on exist."""
+    admission = AdmissionController()
+    admission.acquire()
+
+    lines = render_prometheus({"admission": admission.stats()}).splitlines()
+
+    assert "tiny_url_admission_admitted 1" in lines
+    assert "tiny_url_admission_in_flight 1" in lines
@@ -0,0 +1,150 @@
+"""Component tests for the shared-memory lookup cache."""
+
+import multiprocessing
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from src.utils.shared_cache import SharedLookupCache
+
+
+def _item(code: str, expires_at: int = 0) -> dict:
+    return {"long_url": f"https://example.com/{code}", "expires_at": expires_at}
+
+
+def _fill(path: str, start: int, count: int) -> None:
+    """Write entries from another process."""
+    cache = SharedLookupCache(path, max_entries=64)
+    for i in range(start, start + count):
+        cache.put(f"p{i}", _item(f"p{i}"))
+    cache.close()
+
+
+@pytest.fixture
+def path(tmp_path: Any) -> str:
+    """Path of a fresh cache file."""
+    return str(tmp_path / "lookup-cache")
+
+
+def test_round_trip_and_stats(path: str) -> None:
+    """Test cached mappings and hit counters."""
+    cache = SharedLookupCache(path, max_entries=16)
+    cache.put("abc", _item("abc", expires_at=int(time.time()) + 3600))
+
+    item = cache.get("abc")
+    assert item["long_url"] == "https://example.com/abc"
+    assert item["short_code"] == "abc"
+    assert cache.get("zzz") is None
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["max_entries"] == 16
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_entries_are_shared_between_processes(path: str) -> None:
+    """Test that mappings written by one worker are hits for another."""
+    cache = SharedLookupCache(path, max_entries=64)
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_fill, args=(path, start, 10))
+        for start in (0, 10)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    for i in range(20):
+        assert cache.get(f"p{i}")["long_url"] == f"https://example.com/p{i}"
+    assert cache.stats()["size"] == 20
+
+
+def test_clock_keeps_referenced_entries(path: str) -> None:
+    """Test that a full set evicts entries not read since the last sweep."""
+    cache = SharedLookupCache(path, max_entries=4, ways=4)
+    for code in ("a", "b", "c", "d"):
+        cache.put(code, _item(code))
+    assert cache.get("a") and cache.get("c")
+
+    cache.put("e", _item("e"))
+    cache.put("f", _item("f"))
+
+    assert cache.get("a") and cache.get("c")
+    assert cache.get("b") is None and cache.get("d") is None
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["size"] == 4
+
+
+def test_expiry_and_oversized_urls(path: str, mocker: Any) -> None:
+    """Test TTLs, link expiry and URLs that do not fit a slot."""
+    cache = SharedLookupCache(path, ttl=60, slot_size=128)
+    cache.put("soon", _item("soon", expires_at=int(time.time()) + 10))
+    cache.put("later", _item("later"))
+    cache.put("gone", _item("gone", expires_at=int(time.time()) - 1))
+    cache.put("long", {"long_url": "https://example.com/" + "x" * 200})
+
+    assert cache.get("gone") is None
+    assert cache.get("long") is None
+    assert cache.stats()["too_large"] == 1
+
+    now = time.time()
+    mocker.patch("src.utils.shared_cache.time.time", return_value=now + 30)
+    assert cache.get("soon") is None
+    assert cache.get("later")
+
+
+def test_existing_table_keeps_its_geometry(path: str) -> None:
+    """Test that a second opener adopts the table instead of resizing it."""
+    first = SharedLookupCache(path, max_entries=32)
+    first.put("abc", _item("abc"))
+
+    second = SharedLookupCache(path, max_entries=1000)
+
+    assert second.max_entries == 32
+    assert second.get("abc")
+
+
+def test_concurrent_writers_keep_entries_intact(path: str) -> None:
+    """Test that racing threads never produce torn entries."""
+    cache = SharedLookupCache(path, max_entries=32, ways=4)
+    errors = []
+
+    def churn(worker: int) -> None:
+        for i in range(300):
+            code = f"w{worker}-{i % 50}"
+            cache.put(code, _item(code))
+            item = cache.get(f"w{(worker + 1) % 4}-{i % 50}")
+            if item and not item["long_url"].endswith(item["short_code"]):
+                errors.append(item)
+
+    threads = [threading.Thread(target=churn, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.stats()["size"] <= 32
+
+
+def test_refresh_invalidate_and_clear(path: str) -> None:
+    """Test the hooks the change feed uses to keep entries coherent."""
+    cache = SharedLookupCache(path, max_entries=16)
+    cache.put("abc", _item("abc"))
+    cache.put("def", _item("def"))
+
+    assert cache.refresh("abc", {"long_url": "https://example.com/new"})
+    assert not cache.refresh("xyz", _item("xyz"))
+    assert cache.get("abc")["long_url"] == "https://example.com/new"
+    assert cache.get("xyz") is None
+
+    assert cache.invalidate("abc")
+    assert not cache.invalidate("abc")
+    assert cache.get("abc") is None
+
+    cache.clear()
+    assert cache.get("def") is None
+    assert cache.stats()["size"] == 0
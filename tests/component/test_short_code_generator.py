@@ -0,0 +1,92 @@
+"""Component tests for adaptive short code generation."""
+
+import json
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from src.handlers import shorten_url
+from src.utils.short_code_generator import CHARS, ShortCodeGenerator
+
+
+def test_codes_use_the_alphabet_and_keep_the_prefix() -> None:
+    """Test code length, characters and region prefixes."""
+    generator = ShortCodeGenerator(length=8, buffer_size=16)
+
+    codes = [generator.generate() for _ in range(200)]
+    prefixed = generator.generate("ab")
+
+    assert all(len(code) == 8 for code in codes)
+    assert all(set(code) <= set(CHARS) for code in codes)
+    assert len(set(codes)) == 200
+    assert prefixed.startswith("ab") and len(prefixed) == 8
+
+
+def test_characters_are_roughly_uniform() -> None:
+    """Test that rejection sampling does not favour low characters."""
+    generator = ShortCodeGenerator(length=10)
+
+    counts = Counter("".join(generator.generate() for _ in range(6200)))
+
+    # 1000 expected per character; 800..1200 is over 6 standard deviations
+    assert set(counts) == set(CHARS)
+    assert all(800 < count < 1200 for count in counts.values())
+
+
+def test_length_grows_when_collisions_exceed_threshold() -> None:
+    """Test growth, window reset and the stats exported for it."""
+    generator = ShortCodeGenerator(
+        length=6, collision_threshold=0.05, window=100, min_samples=50
+    )
+
+    for i in range(50):
+        generator.record(collided=i % 10 == 0)
+    assert generator.length == 7
+    assert len(generator.generate()) == 7
+
+    stats = generator.stats()
+    assert stats["length_increases"] == 1
+    assert stats["attempts"] == 50
+    assert stats["collisions"] == 5
+    assert stats["collision_rate"] == 0.0
+    assert stats["keyspace"] == len(CHARS) ** 7
+
+
+def test_length_is_stable_below_threshold_and_capped() -> None:
+    """Test that growth needs enough samples and stops at max_length."""
+    generator = ShortCodeGenerator(
+        length=6, max_length=7, collision_threshold=0.05, window=100,
+        min_samples=50,
+    )
+
+    for _ in range(49):
+        generator.record(collided=True)
+    assert generator.length == 6
+
+    for _ in range(200):
+        generator.record(collided=True)
+    assert generator.length == 7
+    assert generator.stats()["collision_rate"] == 1.0
+
+    with pytest.raises(ValueError):
+        ShortCodeGenerator(length=9, max_length=8)
+
+
+def test_handler_records_collisions_and_exhaustion(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test that every taken code and the final 409 are counted."""
+    generator = ShortCodeGenerator()
+    mocker.patch.object(shorten_url, "code_generator", generator)
+    mocker.patch.object(shorten_url, "save_url_mapping", return_value=False)
+
+    response = shorten_url.handler(
+        {"body": json.dumps({"url": "https://example.com/"})}, None
+    )
+
+    assert response["statusCode"] == 409
+    stats = generator.stats()
+    assert stats["attempts"] == shorten_url.MAX_RETRIES
+    assert stats["collisions"] == shorten_url.MAX_RETRIES
+    assert stats["exhausted"] == 1
@@ -0,0 +1,116 @@
+"""Component tests for single-flight lookup coalescing."""
+
+import asyncio
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.single_flight import AsyncSingleFlight, SingleFlight
+from src.utils.url_resolver import UrlResolver
+
+
+def _run_concurrently(count: int, target: Any) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    """Test that concurrent callers for one key run the function once."""
+    flights = SingleFlight()
+    calls = []
+    results = []
+
+    def slow_lookup(key: str) -> str:
+        calls.append(key)
+        time.sleep(0.2)
+        return f"value-{key}"
+
+    _run_concurrently(
+        10, lambda: results.append(flights.do("k", slow_lookup, "k"))
+    )
+
+    assert calls == ["k"]
+    assert results == ["value-k"] * 10
+    assert flights.stats() == {"executed": 1, "collapsed": 9, "in_flight": 0}
+
+
+def test_waiters_share_errors() -> None:
+    """Test that every waiter receives the shared call's exception."""
+    flights = SingleFlight()
+    errors = []
+
+    def failing_lookup() -> None:
+        time.sleep(0.2)
+        raise RuntimeError("backend down")
+
+    def call() -> None:
+        try:
+            flights.do("k", failing_lookup)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    _run_concurrently(5, call)
+
+    assert errors == ["backend down"] * 5
+    assert flights.stats()["executed"] == 1
+
+    # Nothing is cached: the next call runs again
+    with pytest.raises(RuntimeError):
+        flights.do("k", failing_lookup)
+    assert flights.stats()["executed"] == 2
+
+
+def test_async_calls_share_one_execution() -> None:
+    """Test asyncio coalescing, including a cancelled leader."""
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def slow_lookup(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.1)
+        return f"value-{key}"
+
+    async def main() -> list:
+        leader = asyncio.ensure_future(flights.do("k", slow_lookup, "k"))
+        await asyncio.sleep(0)
+        followers = [flights.do("k", slow_lookup, "k") for _ in range(4)]
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ["value-k"] * 4
+    assert calls == ["k"]
+    assert flights.stats() == {"executed": 1, "collapsed": 4, "in_flight": 0}
+
+
+def test_resolver_collapses_concurrent_lookups(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test that the resolver issues one query for concurrent misses."""
+    dynamodb_table.put_item(Item={
+        "short_code": "viral", "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/viral", "expires_at": 0,
+    })
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    resolver = UrlResolver(dynamo_ops)
+    query = dynamo_ops.table.query
+
+    def slow_query(**kwargs: Any) -> Any:
+        time.sleep(0.2)
+        return query(**kwargs)
+
+    spy = mocker.patch.object(
+        dynamo_ops.table, "query", side_effect=slow_query
+    )
+    results = []
+
+    _run_concurrently(8, lambda: results.append(resolver.resolve("viral")))
+
+    assert spy.call_count == 1
+    assert all(found for found, _ in results)
+    assert resolver.stats()["single_flight"]["collapsed"] == 7
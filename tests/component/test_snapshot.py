@@ -0,0 +1,104 @@
+"""Component tests for redirect snapshots."""
+
+import json
+import os
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+from src.handlers import redirect_url
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.snapshot import (
+    Snapshot, SnapshotStore, export_snapshot, write_snapshot
+)
+from src.utils.url_resolver import UrlResolver
+
+
+def test_write_and_lookup(tmp_path: Any) -> None:
+    """Test binary search lookups over a written snapshot."""
+    path = str(tmp_path / "links.snap")
+    entries = [
+        (f"code{i:03d}", f"https://example.com/{i}", 0) for i in range(200)
+    ]
+
+    assert write_snapshot(path, entries) == 200
+
+    snapshot = Snapshot(path)
+    assert len(snapshot) == 200
+    assert snapshot.verify()
+    assert snapshot.get("code000")["long_url"] == "https://example.com/0"
+    assert snapshot.get("code199")["long_url"] == "https://example.com/199"
+    assert snapshot.get("code2000") is None
+    assert snapshot.get("missing") is None
+
+
+def test_export_keeps_latest_live_mapping(
+    dynamodb_table: Any, tmp_path: Any
+) -> None:
+    """Test exporting from the table with a parallel scan."""
+    dynamodb_table.put_item(Item={
+        "short_code": "dup", "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/old", "expires_at": 0,
+    })
+    dynamodb_table.put_item(Item={
+        "short_code": "dup", "creation_date": "2024-06-01T00:00:00",
+        "long_url": "https://example.com/new", "expires_at": 0,
+    })
+    dynamodb_table.put_item(Item={
+        "short_code": "gone", "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/gone", "expires_at": 1000,
+    })
+    path = str(tmp_path / "export.snap")
+
+    count = export_snapshot(
+        DynamoDBOperations(table_name="url_mappings"), path,
+        segments=3, run_size=1,
+    )
+
+    assert count == 1
+    assert Snapshot(path).get("dup")["long_url"] == "https://example.com/new"
+    assert Snapshot(path).get("gone") is None
+    assert not [name for name in os.listdir(tmp_path) if "snapshot-" in name]
+
+
+def test_store_swaps_replaced_snapshot(tmp_path: Any) -> None:
+    """Test that a snapshot replaced on disk is picked up."""
+    path = str(tmp_path / "links.snap")
+    write_snapshot(path, [("a", "https://example.com/v1", 0)])
+    store = SnapshotStore(path, reload_interval=0)
+    assert store.get("a")["long_url"] == "https://example.com/v1"
+
+    write_snapshot(path, [("a", "https://example.com/v2", 0)])
+
+    assert store.get("a")["long_url"] == "https://example.com/v2"
+
+
+def test_redirect_falls_back_to_snapshot(
+    dynamodb_table: Any, tmp_path: Any, mocker: Any
+) -> None:
+    """Test serving redirects from the snapshot when DynamoDB errors."""
+    path = str(tmp_path / "links.snap")
+    write_snapshot(path, [("snapped", "https://example.com/snap", 0)])
+    mocker.patch.object(
+        redirect_url, "resolver",
+        UrlResolver(redirect_url.dynamo_ops, snapshot=SnapshotStore(path)),
+    )
+    mocker.patch.object(
+        redirect_url.dynamo_ops.table, "query",
+        side_effect=ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Query"
+        ),
+    )
+
+    response = redirect_url.handler(
+        {"pathParameters": {"shortCode": "snapped"}}, None
+    )
+    assert response["statusCode"] == 302
+    assert response["headers"]["Location"] == "https://example.com/snap"
+
+    # Codes the snapshot lacks may still exist: not a cacheable 404
+    response = redirect_url.handler(
+        {"pathParameters": {"shortCode": "other"}}, None
+    )
+    assert response["statusCode"] == 503
+    assert "unavailable" in json.loads(response["body"])["error"]
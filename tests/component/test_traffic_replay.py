@@ -0,0 +1,118 @@
+"""Component tests for access logging and traffic replay."""
+
+import gzip
+import threading
+import time
+from typing import Any, List, Optional
+
+from src.utils.access_log import (
+    ROUTE_REDIRECT, ROUTE_SHORTEN, AccessLog, AccessRecord, pseudonymize,
+    read_access_logs,
+)
+from src.utils.api_client import APIResponse
+from src.utils.traffic_replay import TrafficReplayer, peak_concurrency
+
+
+class _Target:
+    """Stand-in client that answers after a fixed delay."""
+
+    def __init__(self, delay: float, missing: tuple = ()) -> None:
+        self.delay = delay
+        self.missing = missing
+        self.calls: List[Any] = []
+        self.lock = threading.Lock()
+
+    def redirect(self, short_code: str) -> APIResponse:
+        with self.lock:
+            self.calls.append(short_code)
+        time.sleep(self.delay)
+        return APIResponse(404 if short_code in self.missing else 302)
+
+    def shorten_url(
+        self, url: str, custom_code: Optional[str] = None
+    ) -> APIResponse:
+        with self.lock:
+            self.calls.append(("shorten", custom_code))
+        time.sleep(self.delay)
+        return APIResponse(200)
+
+
+def test_logs_are_scrubbed_and_merged_in_start_order(tmp_path: Any) -> None:
+    """Test pseudonymized codes and merging of per-process files."""
+    pod_a = AccessLog(str(tmp_path), "redirect-a", key="shared")
+    pod_b = AccessLog(str(tmp_path), "redirect-b", key="shared",
+                      max_pending=2)
+    # A slow request finishes, and is logged, after a later one
+    pod_a.record(100.5, ROUTE_REDIRECT, "secret1", 302, 0.002)
+    pod_a.flush()
+    pod_a.record(100.0, ROUTE_REDIRECT, "secret1", 302, 0.9)
+    pod_a.flush()
+    pod_b.record(100.2, ROUTE_SHORTEN, None, 200, 0.01)
+    pod_b.record(100.7, ROUTE_REDIRECT, "secret1", 404, 0.003)
+    pod_b.record(100.8, ROUTE_REDIRECT, "dropped", 302, 0.003)
+    pod_b.stop()
+
+    records = list(read_access_logs([pod_a.path, pod_b.path]))
+
+    assert [record.timestamp for record in records] == [
+        100.0, 100.2, 100.5, 100.7
+    ]
+    pseudonym = pseudonymize("secret1", b"shared")
+    assert {record.code for record in records} == {pseudonym, ""}
+    assert records[0] == AccessRecord(
+        100.0, ROUTE_REDIRECT, pseudonym, 302, 900.0
+    )
+    assert pod_b.stats()["dropped"] == 1
+    with gzip.open(pod_a.path, "rt") as f:
+        assert "secret1" not in f.read()
+
+
+def test_replay_keeps_schedule_order_and_bursts() -> None:
+    """Test that a burst is replayed concurrently and in recorded order."""
+    records = [
+        AccessRecord(50.0 + i * 0.001, ROUTE_REDIRECT, f"c{i}", 302, 100.0)
+        for i in range(5)
+    ] + [
+        AccessRecord(50.3, "GET /stats/<short_code>", "c1", 200, 5.0),
+        AccessRecord(50.4, ROUTE_SHORTEN, "", 200, 20.0),
+        AccessRecord(50.6, ROUTE_REDIRECT, "gone", 302, 4.0),
+    ]
+    target = _Target(delay=0.1, missing=("gone",))
+
+    started = time.monotonic()
+    report = TrafficReplayer(target, speed=2.0, max_concurrency=8).replay(
+        records
+    )
+    elapsed = time.monotonic() - started
+
+    assert target.calls == [
+        "c0", "c1", "c2", "c3", "c4", ("shorten", None), "gone"
+    ]
+    # 0.6s recorded at double speed, plus the last request
+    assert 0.38 < elapsed < 0.6
+    assert report["requests"] == 7
+    assert report["peak_concurrency"] == {"recorded": 5, "replay": 5}
+    assert report["skipped"] == {"GET /stats/<short_code>": 1}
+    assert report["status_changes"] == {"302->404": 1}
+    redirects = report["routes"][ROUTE_REDIRECT]
+    assert redirects["count"] == 6
+    assert redirects["recorded_ms"]["p50"] == 100.0
+    assert 95 < redirects["replay_ms"]["p50"] < 150
+    assert report["schedule_lag_ms"]["max"] < 50
+
+
+def test_seed_creates_codes_that_were_found() -> None:
+    """Test that only codes recorded as found are created, once each."""
+    records = [
+        AccessRecord(1.0, ROUTE_REDIRECT, "hot", 302, 1.0),
+        AccessRecord(2.0, ROUTE_REDIRECT, "hot", 302, 1.0),
+        AccessRecord(3.0, ROUTE_REDIRECT, "missing", 404, 1.0),
+        AccessRecord(4.0, ROUTE_SHORTEN, "custom", 200, 1.0),
+    ]
+    target = _Target(delay=0)
+
+    created = TrafficReplayer(target, max_concurrency=2).seed(records)
+
+    assert created == 1
+    assert target.calls == [("shorten", "hot")]
+    assert peak_concurrency([(0, 2), (1, 3), (2, 4)]) == 2
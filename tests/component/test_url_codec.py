@@ -0,0 +1,83 @@
+"""Component tests for the compressed long_url encoding."""
+
+import json
+from typing import Any
+
+import pytest
+
+from src.handlers import redirect_url, shorten_url
+from src.utils import url_codec
+from src.utils.dynamo_ops import DynamoDBOperations
+
+TRACKING_URL = (
+    "https://www.example.com/products/shoes/running?utm_source=newsletter"
+    "&utm_medium=email&utm_campaign=spring_sale&utm_content=cta"
+    "&gclid=EAIaIQobChMI8xq2vLrM"
+)
+
+
+def test_round_trip_shrinks_tracking_urls() -> None:
+    """Test that URLs survive encoding and tracking URLs get smaller."""
+    blob = url_codec.compress_url(TRACKING_URL)
+
+    assert blob[0] == url_codec.CURRENT_VERSION
+    assert len(blob) < len(TRACKING_URL) / 2
+    assert url_codec.decompress_url(blob) == TRACKING_URL
+
+
+def test_unknown_version_is_rejected() -> None:
+    """Test that blobs from an unknown dictionary are not misread."""
+    with pytest.raises(ValueError, match="Unknown URL encoding version"):
+        url_codec.decompress_url(b"\xff" + b"data")
+
+
+def test_trained_dictionary_fits_and_helps() -> None:
+    """Test that a trained dictionary respects its size and compresses."""
+    urls = [
+        f"https://shop.example.com/item/{i}?campaign=autumn&channel=mail"
+        for i in range(50)
+    ]
+
+    dictionary = url_codec.train_dictionary(urls, size=128)
+
+    assert 0 < len(dictionary) <= 128
+    assert b"campaign=autumn&channel=mail" in dictionary
+
+
+def test_plain_and_encoded_rows_coexist(dynamodb_table: Any) -> None:
+    """Test that reads decode compressed rows and pass plain ones through."""
+    plain = DynamoDBOperations(table_name="url_mappings", compress_urls=False)
+    compact = DynamoDBOperations(table_name="url_mappings", compress_urls=True)
+    plain.save_url_mapping("old", TRACKING_URL)
+    compact.save_url_mapping("new", TRACKING_URL)
+
+    items = {
+        item["short_code"]: item for item in dynamodb_table.scan()["Items"]
+    }
+    stored = items["new"]
+    assert "long_url" not in stored
+    assert url_codec.ENCODED_ATTRIBUTE in stored
+
+    for ops in (plain, compact):
+        for code in ("old", "new"):
+            found, item = ops.get_url_mapping(code)
+            assert found and item["long_url"] == TRACKING_URL
+            assert url_codec.ENCODED_ATTRIBUTE not in item
+
+
+def test_redirect_is_transparent(dynamodb_table: Any, mocker: Any) -> None:
+    """Test that shorten and redirect work end to end with compression."""
+    compact = DynamoDBOperations(table_name="url_mappings", compress_urls=True)
+    mocker.patch.object(shorten_url, "dynamo_ops", compact)
+    mocker.patch.object(redirect_url.resolver, "dynamo_ops", compact)
+
+    response = shorten_url.handler(
+        {"body": json.dumps({"url": TRACKING_URL})}, None
+    )
+    short_code = json.loads(response["body"])["short_url"].split("/")[-1]
+    redirect = redirect_url.handler(
+        {"pathParameters": {"shortCode": short_code}}, None
+    )
+
+    assert redirect["statusCode"] == 302
+    assert redirect["headers"]["Location"] == TRACKING_URL
@@ -0,0 +1,168 @@
+"""Component tests for the lookup cache and its pre-warming."""
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.lookup_cache import LookupCache
+from src.utils.snapshot import write_snapshot
+from src.utils.url_resolver import UrlResolver
+from src.utils.warmup import (
+    DONE, FAILED, TIMED_OUT, CacheWarmer, load_hot_codes
+)
+
+
+def _mappings(codes: List[str]) -> Dict[str, Dict[str, Any]]:
+    return {
+        code: {"short_code": code, "long_url": f"https://example.com/{code}"}
+        for code in codes if not code.startswith("gone")
+    }
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Test LRU eviction and hit counters."""
+    cache = LookupCache(max_entries=2)
+    cache.put("a", {"long_url": "https://a.example"})
+    cache.put("b", {"long_url": "https://b.example"})
+    assert cache.get("a")
+
+    cache.put("c", {"long_url": "https://c.example"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_honors_ttl_and_link_expiry(mocker: Any) -> None:
+    """Test that entries expire with the TTL or the link, if sooner."""
+    now = mocker.patch("src.utils.lookup_cache.time.monotonic")
+    now.return_value = 0.0
+    cache = LookupCache(ttl=60)
+    cache.put("soon", {"expires_at": int(time.time()) + 10})
+    cache.put("later", {"expires_at": int(time.time()) + 3600})
+    cache.put("expired", {"expires_at": int(time.time()) - 1})
+
+    assert cache.get("expired") is None
+    now.return_value = 30.0
+    assert cache.get("soon") is None
+    assert cache.get("later")
+    now.return_value = 61.0
+    assert cache.get("later") is None
+
+
+def test_resolver_serves_found_codes_from_cache(
+    dynamodb_table: Any, mocker: Any
+) -> None:
+    """Test that only the first lookup of a code reaches DynamoDB."""
+    dynamodb_table.put_item(Item={
+        "short_code": "hot", "creation_date": "2024-01-01T00:00:00",
+        "long_url": "https://example.com/hot", "expires_at": 0,
+    })
+    dynamo_ops = DynamoDBOperations(table_name="url_mappings")
+    resolver = UrlResolver(dynamo_ops, cache=LookupCache())
+    spy = mocker.spy(dynamo_ops, "get_url_mapping")
+
+    for _ in range(3):
+        assert resolver.resolve("hot")[0]
+    assert resolver.resolve("cold") == (False, None)
+    assert resolver.resolve("cold") == (False, None)
+
+    assert spy.call_count == 3
+    assert resolver.stats()["cache"]["hits"] == 2
+
+
+def test_warmer_fills_cache_in_batches() -> None:
+    """Test that hot codes are read in parallel batches."""
+    cache = LookupCache()
+    batches = []
+
+    def fetch_many(codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        batches.append(codes)
+        return _mappings(codes)
+
+    warmer = CacheWarmer(cache, fetch_many, batch_size=25)
+    codes = [f"c{i}" for i in range(60)] + ["gone1"]
+
+    assert not warmer.ready
+    assert warmer.run(lambda: codes) == DONE
+
+    assert warmer.ready
+    assert sorted(len(batch) for batch in batches) == [11, 25, 25]
+    assert cache.stats()["size"] == 60
+    assert cache.get("c59")["long_url"] == "https://example.com/c59"
+    stats = warmer.stats()
+    assert stats["requested"] == 61
+    assert stats["loaded"] == 60
+    assert stats["batches"] == 3
+    assert stats["duration_seconds"] is not None
+
+
+def test_warmer_stops_at_budget() -> None:
+    """Test that slow reads do not hold readiness past the budget."""
+    release = threading.Event()
+
+    def slow_fetch(codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        release.wait(5)
+        return _mappings(codes)
+
+    warmer = CacheWarmer(LookupCache(), slow_fetch, budget=0.2, workers=2)
+    started = time.monotonic()
+
+    state = warmer.run(lambda: [f"c{i}" for i in range(200)])
+    release.set()
+
+    assert state == TIMED_OUT
+    assert warmer.ready
+    assert time.monotonic() - started < 2
+
+
+def test_warmer_skips_when_codes_are_unavailable() -> None:
+    """Test that a missing hot code list only skips warming."""
+    warmer = CacheWarmer(LookupCache(), _mappings)
+
+    assert warmer.run(lambda: load_hot_codes("/nonexistent", 10)) == FAILED
+    assert warmer.ready
+
+
+def test_warmer_counts_failed_batches() -> None:
+    """Test that failing reads are counted and do not stop warming."""
+    def fetch_many(codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        if "c0" in codes:
+            raise RuntimeError("throttled")
+        return _mappings(codes)
+
+    warmer = CacheWarmer(LookupCache(), fetch_many, batch_size=10)
+
+    assert warmer.run(lambda: [f"c{i}" for i in range(30)]) == DONE
+    assert warmer.stats()["failed_batches"] == 1
+    assert warmer.stats()["loaded"] == 20
+
+
+def test_load_hot_codes_from_file_and_url(tmp_path: Any, mocker: Any) -> None:
+    """Test both hot code sources."""
+    path = tmp_path / "hot_codes.txt"
+    path.write_text("# hottest first\nabc\n\ndef\nabc\nghi\n")
+    assert load_hot_codes(str(path), limit=2) == ["abc", "def"]
+
+    get = mocker.patch("src.utils.warmup.requests.get")
+    get.return_value.json.return_value = {
+        "items": [{"short_code": "x", "count": 9, "error": 0}]
+    }
+    assert load_hot_codes("http://redirect:8001/", limit=5) == ["x"]
+    get.assert_called_once_with(
+        "http://redirect:8001/hot", params={"limit": 5}, timeout=5.0
+    )
+
+
+def test_load_hot_codes_from_snapshot(tmp_path: Any) -> None:
+    """Test that a snapshot file supplies its codes."""
+    path = str(tmp_path / "url_mappings.snap")
+    write_snapshot(path, [
+        (code, f"https://example.com/{code}", 0) for code in ("a", "b", "c")
+    ])
+
+    assert load_hot_codes(path, limit=2) == ["a", "b"]
+    assert load_hot_codes(path, limit=10) == ["a", "b", "c"]
@@ -0,0 +1,118 @@
+"""Component tests for coalesced shorten writes."""
+
+import json
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from src.handlers import shorten_url
+from src.utils.dynamo_ops import DynamoDBOperations
+from src.utils.write_coalescer import WriteCoalescer
+
+
+def _run_concurrently(count: int, target: Any) -> None:
+    threads = [
+        threading.Thread(target=target, args=(i,)) for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.fixture
+def dynamo_ops(dynamodb_table: Any, mocker: Any) -> DynamoDBOperations:
+    """Provide DynamoDB operations with batched reads emulated per code.
+
+    moto does not evaluate PartiQL ``IN`` lists, so the batched read is
+    answered with one regular lookup per code.
+    """
+    ops = DynamoDBOperations(table_name="url_mappings")
+
+    def get_url_mappings(short_codes: List[str]) -> Dict[str, Any]:
+        found = {code: ops.get_url_mapping(code)[1] for code in short_codes}
+        return {code: item for code, item in found.items() if item}
+
+    mocker.patch.object(ops, "get_url_mappings", side_effect=get_url_mappings)
+    return ops
+
+
+def test_concurrent_saves_share_one_batch(
+    dynamo_ops: DynamoDBOperations, mocker: Any
+) -> None:
+    """Test that writes arriving together are written in one batch."""
+    batch_write = mocker.spy(dynamo_ops, "batch_write_items")
+    coalescer = WriteCoalescer(dynamo_ops, window=0.2, max_batch=5)
+    results: Dict[int, bool] = {}
+
+    _run_concurrently(5, lambda i: results.update(
+        {i: coalescer.save(f"code{i}", f"https://example.com/{i}")}
+    ))
+
+    assert results == dict.fromkeys(range(5), True)
+    assert batch_write.call_count == 1
+    assert len(batch_write.call_args.args[0]) == 5
+    for i in range(5):
+        found, item = dynamo_ops.get_url_mapping(f"code{i}")
+        assert found and item["long_url"] == f"https://example.com/{i}"
+    assert coalescer.stats()["avg_batch_size"] == 5
+
+
+def test_taken_and_duplicate_codes_are_rejected(
+    dynamo_ops: DynamoDBOperations,
+) -> None:
+    """Test that existing codes and repeats within a batch are not saved."""
+    dynamo_ops.save_url_mapping("taken", "https://example.com/original")
+    coalescer = WriteCoalescer(dynamo_ops, window=0.2, max_batch=3)
+    results: Dict[int, bool] = {}
+    codes = ["taken", "fresh", "fresh"]
+
+    _run_concurrently(3, lambda i: results.update(
+        {i: coalescer.save(codes[i], f"https://example.com/{i}")}
+    ))
+
+    assert sorted(results.values()) == [False, False, True]
+    assert dynamo_ops.get_url_mapping("taken")[1]["long_url"] == (
+        "https://example.com/original"
+    )
+    assert coalescer.stats()["conflicts"] == 2
+
+
+def test_unprocessed_items_are_retried(
+    dynamo_ops: DynamoDBOperations, mocker: Any
+) -> None:
+    """Test that items left unprocessed by DynamoDB are still written."""
+    real_batch_write = dynamo_ops.batch_write_items
+    calls: List[int] = []
+
+    def flaky_batch_write(items: List[Dict[str, Any]]) -> List[Any]:
+        calls.append(len(items))
+        if len(calls) == 1:
+            return items
+        return real_batch_write(items)
+
+    mocker.patch.object(
+        dynamo_ops, "batch_write_items", side_effect=flaky_batch_write
+    )
+    coalescer = WriteCoalescer(dynamo_ops, window=0)
+
+    assert coalescer.save("retry", "https://example.com")
+    assert calls == [1, 1]
+    assert dynamo_ops.get_url_mapping("retry")[0]
+
+
+def test_handler_uses_coalescer(
+    dynamo_ops: DynamoDBOperations, mocker: Any
+) -> None:
+    """Test that the shorten handler reports taken codes via the batch."""
+    mocker.patch.object(
+        shorten_url, "write_coalescer", WriteCoalescer(dynamo_ops, window=0)
+    )
+    mocker.patch.object(shorten_url, "dynamo_ops", dynamo_ops)
+    event = {"body": json.dumps(
+        {"url": "https://example.com", "custom_code": "mine"}
+    )}
+
+    assert shorten_url.handler(event, None)["statusCode"] == 200
+    assert shorten_url.handler(event, None)["statusCode"] == 409